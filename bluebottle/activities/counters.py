@@ -0,0 +1,130 @@
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bluebottle.activities.models import Activity, Contributor, ContributorCounts
+
+CHANGED = object()
+
+
+def get_key(model_name, status):
+    return f'{model_name}:{status}'
+
+
+def is_changed(instance, fields):
+    initial = getattr(instance, '_initial_values', None) or {}
+    return any(initial.get(field, CHANGED) != getattr(instance, field) for field in fields)
+
+
+def get_contributor_counts(activity_id):
+    """
+    Count the contributors of an activity, by contributor type and status
+    """
+    counts = Contributor.objects.filter(
+        activity_id=activity_id
+    ).order_by().values(
+        'polymorphic_ctype__model', 'status'
+    ).annotate(
+        count=Count('pk')
+    ).values_list(
+        'polymorphic_ctype__model', 'status', 'count'
+    )
+
+    return dict((get_key(model_name, status), count) for model_name, status, count in counts)
+
+
+def get_counts(activity, fresh=False):
+    """
+    The stored contributor counts of an activity.
+
+    With `fresh` the counts are read from the database instead of from the activity, for
+    conditions that are evaluated while contributors are being saved.
+    """
+    if fresh:
+        counts = ContributorCounts.objects.filter(
+            activity_id=activity.pk
+        ).values_list('counts', flat=True).first()
+    else:
+        try:
+            counts = activity.contributor_counts.counts
+        except ContributorCounts.DoesNotExist:
+            counts = None
+
+    if counts is None:
+        # Not reconciled yet
+        counts = get_contributor_counts(activity.pk)
+    return counts
+
+
+def count_contributors(activity, statuses=None, types=None, exclude=None, fresh=False):
+    """
+    Number of contributors of `activity` with one of `statuses`.
+
+    `types` limits the count to contributors of these models, `exclude` leaves out
+    contributors of these models.
+    """
+    if not activity.pk:
+        return 0
+
+    model_names = set(model._meta.model_name for model in types) if types else None
+    excluded = set(model._meta.model_name for model in exclude or ())
+
+    total = 0
+    for key, count in get_counts(activity, fresh).items():
+        model_name, status = key.split(':', 1)
+        if (
+            (statuses is None or status in statuses) and
+            (model_names is None or model_name in model_names) and
+            model_name not in excluded
+        ):
+            total += count
+    return total
+
+
+def update_contributor_counts(activity_id, create=True):
+    """
+    Recount the contributors of an activity. Without `create` only existing counts are
+    updated, which is safe while the activity itself is being deleted.
+
+    The activity is locked while counting, so concurrent recounts of the same activity
+    wait for each other instead of storing a count that misses the other contributor.
+    """
+    with transaction.atomic():
+        list(
+            Activity.objects.non_polymorphic().select_for_update().filter(
+                pk=activity_id
+            ).values_list('pk', flat=True)
+        )
+        counts = get_contributor_counts(activity_id)
+
+        if create:
+            contributor_counts, _created = ContributorCounts.objects.update_or_create(
+                activity_id=activity_id, defaults={'counts': counts}
+            )
+            return contributor_counts
+
+        ContributorCounts.objects.filter(activity_id=activity_id).update(counts=counts)
+
+
+@receiver(post_save)
+def update_contributor_counts_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not isinstance(instance, Contributor):
+        return
+
+    if created or is_changed(instance, ('status', 'activity_id')):
+        contributor_counts = update_contributor_counts(instance.activity_id)
+
+        previous = (getattr(instance, '_initial_values', None) or {}).get('activity_id')
+        if previous and previous != instance.activity_id:
+            update_contributor_counts(previous, create=False)
+
+        if Contributor.activity.is_cached(instance):
+            # Keep the activity that is saved with the contributor up to date
+            instance.activity.contributor_counts = contributor_counts
+
+
+@receiver(post_delete)
+def update_contributor_counts_on_delete(sender, instance, **kwargs):
+    if isinstance(instance, Contributor):
+        update_contributor_counts(instance.activity_id, create=False)
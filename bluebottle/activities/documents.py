@@ -3,6 +3,7 @@ from builtins import str
 from django_elasticsearch_dsl import Document, fields
 from elasticsearch_dsl.field import DateRange
 
+from bluebottle.activities.counters import count_contributors
 from bluebottle.activities.models import Activity
 from bluebottle.clients.utils import tenant_url
 from bluebottle.funding.models import Donor
@@ -54,6 +55,7 @@ class ActivityDocument(Document):
             'office_location__country',
             'office_location__subregion',
             'office_location__subregion__region',
+            'contributor_counts',
         ).prefetch_related(
             'segments',
             'segments__segment_type',
@@ -303,7 +305,7 @@ class ActivityDocument(Document):
         ]
 
     def prepare_contributor_count(self, instance):
-        return instance.contributors.filter(status__in=('succeeded', 'accepted')).count()
+        return count_contributors(instance, ('succeeded', 'accepted'))
 
     def prepare_donation_count(self, instance):
         return instance.contributors.instance_of(Donor).filter(status='succeeded').count()
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from bluebottle.activities.recommendations import MatchingRecommender
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+
+
+class Command(BaseCommand):
+    help = "Send the matching activities mail to all subscribed members"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--schema", dest="schema_name", help="specify tenant schema, defaults to all tenants"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", default=False,
+            help="only report the number of queries and mails and the duration"
+        )
+
+    def handle(self, *args, **options):
+        tenants = Client.objects.all()
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+
+        for tenant in tenants:
+            with LocalTenant(tenant, clear_tenant=True):
+                stats = MatchingRecommender(dry_run=options['dry_run']).recommend()
+
+                self.stdout.write(
+                    "{}: {} members, {} profiles, {} searches in {} msearch requests, "
+                    "{} database queries, {} mails {}in {:.2f}s".format(
+                        tenant.client_name,
+                        stats['members'], stats['profiles'], stats['searches'], stats['msearches'],
+                        stats['queries'], stats['mails'],
+                        'to send ' if options['dry_run'] else '',
+                        stats['duration']
+                    )
+                )
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from bluebottle.activities.counters import get_contributor_counts
+from bluebottle.activities.models import Activity, ContributorCounts
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.time_based.counters import get_slot_participant_counts
+from bluebottle.time_based.models import DateActivitySlot, SlotParticipantCounts
+
+
+class Command(BaseCommand):
+    help = "Recount the stored contributor counts of activities and participant counts of slots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--schema", dest="schema_name", help="specify tenant schema, defaults to all tenants"
+        )
+        parser.add_argument(
+            "--dry-run", action="store_true", default=False,
+            help="only report the counts that are out of date"
+        )
+
+    def reconcile(self, objects, stored, count, model, field, dry_run):
+        fixed = 0
+        for pk in objects.order_by('pk').values_list('pk', flat=True).iterator():
+            counts = count(pk)
+            if stored.get(pk) != counts:
+                fixed += 1
+                if not dry_run:
+                    model.objects.update_or_create(**{field: pk, 'defaults': {'counts': counts}})
+        return fixed
+
+    def handle(self, *args, **options):
+        tenants = Client.objects.all()
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+
+        for tenant in tenants:
+            with LocalTenant(tenant, clear_tenant=True):
+                activities = self.reconcile(
+                    Activity.objects.all(),
+                    dict(ContributorCounts.objects.values_list('activity_id', 'counts')),
+                    get_contributor_counts,
+                    ContributorCounts,
+                    'activity_id',
+                    options['dry_run']
+                )
+                slots = self.reconcile(
+                    DateActivitySlot.objects.all(),
+                    dict(SlotParticipantCounts.objects.values_list('slot_id', 'counts')),
+                    get_slot_participant_counts,
+                    SlotParticipantCounts,
+                    'slot_id',
+                    options['dry_run']
+                )
+
+                self.stdout.write(
+                    "{}: {} activities and {} slots {}".format(
+                        tenant.client_name, activities, slots,
+                        'out of date' if options['dry_run'] else 'fixed'
+                    )
+                )
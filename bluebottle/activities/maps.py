@@ -0,0 +1,78 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bluebottle.activities.models import Activity
+from bluebottle.geo.maps import EMPTY_POINT, MapLayer
+
+ACTIVITY_POSITIONS = (
+    'collectactivity__location__position',
+    'timebasedactivity__periodicactivity__location__position',
+    'timebasedactivity__deadlineactivity__location__position',
+    'timebasedactivity__scheduleactivity__location__position',
+    'timebasedactivity__dateactivity__slots__location__position',
+    'funding__initiative__place__position',
+)
+
+
+class ActivityMapLayer(MapLayer):
+    """
+    Positions of public activities: their location, the locations of their slots, or the
+    impact location of the initiative for fundings.
+    """
+    name = 'activities'
+    statuses = ('succeeded', 'open', 'full', 'running')
+
+    def get_resource_type(self, content_type_id):
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        return model.JSONAPIMeta.resource_name
+
+    def get_points(self, polygon, **filters):
+        queryset = Activity.objects.filter(status__in=self.statuses, **filters).order_by()
+
+        positions = [
+            queryset.annotate(
+                point=F(path)
+            ).exclude(
+                point=EMPTY_POINT
+            ).filter(
+                point__within=polygon
+            ).values_list('id', 'polymorphic_ctype_id', 'point')
+            for path in ACTIVITY_POSITIONS
+        ]
+
+        for activity_id, content_type_id, point in positions[0].union(*positions[1:], all=True):
+            yield (self.get_resource_type(content_type_id), activity_id, point.x, point.y)
+
+
+activity_map = ActivityMapLayer()
+
+MAP_MODELS = ('time_based.dateactivityslot', 'geo.geolocation', 'initiatives.initiative')
+
+
+def get_map_fields(sender, instance):
+    """
+    The fields that change the activity map, or None if the instance is not on the map
+    """
+    if isinstance(instance, Activity):
+        return ('status', 'location_id', 'office_location_id')
+    elif sender._meta.label_lower in MAP_MODELS:
+        return ('status', 'location_id', 'place_id', 'position')
+
+
+@receiver(pre_save)
+def check_activity_map(sender, instance, raw=False, **kwargs):
+    fields = get_map_fields(sender, instance)
+    if fields and not raw:
+        activity_map.check_changed(instance, fields)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_activity_map(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+
+    if get_map_fields(sender, instance):
+        activity_map.invalidate_if_changed(instance, created=created or signal is post_delete)
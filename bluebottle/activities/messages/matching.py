@@ -173,9 +173,9 @@ class BaseDoGoodHoursReminderNotification(TransitionMessage):
             Q(sent__year=now().year) | Q(sent__isnull=True)
         ).exists()
 
-    def compose_and_send(self, **base_context):
+    def compose_and_send(self, recipients=None, **base_context):
         # Mark as sent before SMTP so a crash mid-send still dedupes on retry.
-        for message in self.get_messages(**base_context):
+        for message in self.get_messages(recipients=recipients, **base_context):
             context = self.get_context(message.recipient, **base_context)
             reply_to = self.reply_to
             if reply_to:
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.13 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0103_alter_confirmationanswer_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContributorCounts',
+            fields=[
+                ('activity', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='contributor_counts', serialize=False, to='activities.activity')),
+                ('counts', models.JSONField(default=dict)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
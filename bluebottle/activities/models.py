@@ -412,6 +412,23 @@ class Organizer(Contributor):
         resource_name = "contributors/organizers"
 
 
+class ContributorCounts(models.Model):
+    """
+    The number of contributors of an activity, by contributor type and status.
+
+    Kept up to date when contributors are saved or deleted, see bluebottle.activities.counters.
+    The `reconcile_contributor_counts` command fixes counts that drifted.
+    """
+    activity = models.OneToOneField(
+        Activity,
+        primary_key=True,
+        related_name='contributor_counts',
+        on_delete=models.CASCADE
+    )
+    counts = models.JSONField(default=dict)
+    updated = models.DateTimeField(auto_now=True)
+
+
 class Contribution(TriggerMixin, PolymorphicModel):
     status = models.CharField(max_length=40)
 
@@ -679,3 +696,5 @@ class FileUploadAnswer(ActivityAnswer):
 
 from bluebottle.activities.states import *  # noqa
 from bluebottle.activities.signals import *  # noqa
+from bluebottle.activities import maps  # noqa
+from bluebottle.activities import counters  # noqa
@@ -0,0 +1,327 @@
+import logging
+import time
+from collections import Counter, defaultdict, namedtuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Prefetch
+from elasticsearch_dsl import MultiSearch
+from elasticsearch_dsl.query import (
+    Nested, Q, ConstantScore, MatchAll, Term, Terms, GeoDistance
+)
+
+from bluebottle.activities.messages.matching import MatchingActivitiesNotification
+from bluebottle.activities.models import Activity, Contributor
+from bluebottle.initiatives.models import InitiativePlatformSettings
+from bluebottle.members.models import Member
+from bluebottle.notifications.messages import send_message_batch
+from bluebottle.segments.models import Segment
+
+logger = logging.getLogger('bluebottle')
+
+
+MatchingProfile = namedtuple(
+    'MatchingProfile',
+    ['skills', 'themes', 'closed_segments', 'office', 'exclude_online', 'distance', 'position']
+)
+
+
+def get_matching_profile(user, office_restrictions=False):
+    """
+    Everything about a user that the matching activities depend on, except the activities
+    the user contributes to. Users with the same profile get the same matches.
+    """
+    closed_segments = getattr(user, 'closed_segments', None)
+    if closed_segments is None:
+        closed_segments = user.segments.filter(closed=True)
+
+    office = None
+    if office_restrictions:
+        if user.location:
+            subregion = user.location.subregion
+            office = (
+                user.location.id,
+                subregion.id if subregion else '',
+                subregion.region.id if subregion and subregion.region else ''
+            )
+        else:
+            office = (None, None, None)
+
+    distance = position = None
+    if user.search_distance and user.search_distance != "0km" and user.place:
+        distance = user.search_distance
+        position = (float(user.place.position[1]), float(user.place.position[0]))
+
+    return MatchingProfile(
+        skills=tuple(sorted(skill.pk for skill in user.skills.all())),
+        themes=tuple(sorted(theme.pk for theme in user.favourite_themes.all())),
+        closed_segments=tuple(sorted(segment.pk for segment in closed_segments)),
+        office=office,
+        exclude_online=user.exclude_online,
+        distance=distance,
+        position=position,
+    )
+
+
+def get_matching_search(profile):
+    query = ConstantScore(
+        filter=Nested(
+            path='expertise',
+            query=Q('terms', expertise__id=list(profile.skills))
+        )
+    ) | ConstantScore(
+        boost=1.5,
+        filter=Nested(
+            path='theme',
+            query=Q('terms', theme__id=list(profile.themes))
+        )
+    ) | ConstantScore(boost=0.5, filter=MatchAll())
+
+    from bluebottle.activities.documents import activity
+    search = activity.search().filter(
+        Q('terms', status=['open', 'running']) &
+        (
+            ~Nested(
+                path='segments',
+                query=(
+                    Term(segments__closed=True)
+                )
+            ) | Nested(
+                path='segments',
+                query=(
+                    Terms(
+                        segments__id=list(profile.closed_segments)
+                    )
+                )
+            )
+        )
+    )
+
+    if profile.office is not None:
+        location, subregion, region = profile.office
+        if location:
+            search = search.filter(
+                Nested(
+                    path='office_restriction',
+                    query=Term(
+                        office_restriction__restriction='all'
+                    ) | (
+                        Term(office_restriction__office=location) &
+                        Term(office_restriction__restriction='office')
+                    ) | (
+                        Term(office_restriction__subregion=subregion) &
+                        Term(office_restriction__restriction='office_subregion')
+                    ) | (
+                        Term(office_restriction__region=region) &
+                        Term(office_restriction__restriction='office_region')
+                    )
+                )
+            )
+        else:
+            search = search.filter(
+                Nested(
+                    path='office_restriction',
+                    query=Term(
+                        office_restriction__restriction='all'
+                    )
+                )
+            )
+
+    if profile.exclude_online:
+        search = search.filter(
+            Term(is_online=True)
+        )
+
+    if profile.position:
+        position = {
+            'lat': profile.position[0],
+            'lon': profile.position[1],
+        }
+        search = search.filter(
+            GeoDistance(distance=profile.distance, position=position) |
+            Term(is_online=True)
+        )
+        query = query | ConstantScore(
+            boost=0.001,
+            filter=Q(
+                'geo_distance',
+                distance=profile.distance,
+                position=position
+            )
+        )
+
+    return search.query(query)
+
+
+class MatchingRecommender(object):
+    """
+    Sends the matching activities mail to all subscribed members of the current tenant.
+
+    Members are read in chunks. Members with the same matching profile get the same search
+    results, so every profile is searched once per run, with one msearch request for the new
+    profiles of a chunk. The activities a member contributes to are left out afterwards: the
+    profiles are searched for `margin` more activities than a mail needs, and members that
+    contribute to more of them than that are searched for separately. The mails of a chunk are
+    sent together.
+
+    With `dry_run` nothing is sent. `stats` counts members, profiles, searches, database
+    queries, mails and the duration of the run.
+    """
+    size = 10
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.results = {}
+        self.stats = Counter()
+
+    @property
+    def chunk_size(self):
+        return getattr(settings, 'MATCHING_CHUNK_SIZE', 500)
+
+    @property
+    def margin(self):
+        return getattr(settings, 'MATCHING_SEARCH_MARGIN', 10)
+
+    def get_members(self):
+        return Member.objects.filter(
+            subscribed=True
+        ).select_related(
+            'place', 'location__subregion__region'
+        ).prefetch_related(
+            'skills',
+            'favourite_themes',
+            Prefetch('segments', queryset=Segment.objects.filter(closed=True), to_attr='closed_segments')
+        ).order_by('pk')
+
+    def get_member_chunks(self):
+        members = self.get_members()
+        last = None
+        while True:
+            chunk = members if last is None else members.filter(pk__gt=last)
+            chunk = list(chunk[:self.chunk_size])
+            if not chunk:
+                break
+
+            yield chunk
+            last = chunk[-1].pk
+
+    def search(self, profiles):
+        if not profiles:
+            return
+
+        multi_search = MultiSearch()
+        for profile in profiles:
+            multi_search = multi_search.add(
+                get_matching_search(profile).extra(size=self.size + self.margin)
+            )
+
+        for profile, response in zip(profiles, multi_search.execute(raise_on_error=False)):
+            if response is None:
+                # Members with this profile get no mail this run
+                logger.error(f'Matching activities search failed for {profile}')
+                self.stats['failed_searches'] += 1
+                continue
+
+            self.results[profile] = [int(match.meta.id) for match in response]
+
+        self.stats['msearches'] += 1
+        self.stats['searches'] += len(profiles)
+
+    def search_member(self, member, profile):
+        search = get_matching_search(profile).filter(~Term(contributors=member.pk))
+        self.stats['searches'] += 1
+        return [int(match.meta.id) for match in search.extra(size=self.size).execute()]
+
+    def get_matches(self, members, profiles):
+        """
+        Return a dict of member id to the ids of the matching activities
+        """
+        activity_ids = set(
+            activity_id for profile in set(profiles.values()) for activity_id in self.results.get(profile, [])
+        )
+
+        contributed = defaultdict(set)
+        contributors = Contributor.objects.filter(
+            user__in=members,
+            activity_id__in=activity_ids,
+            status__in=('succeeded', 'accepted')
+        ).values_list('user_id', 'activity_id')
+
+        for user_id, activity_id in contributors:
+            contributed[user_id].add(activity_id)
+
+        matches = {}
+        for member in members:
+            profile = profiles[member.pk]
+            if profile not in self.results:
+                matches[member.pk] = []
+                continue
+
+            results = self.results[profile]
+            member_matches = [pk for pk in results if pk not in contributed[member.pk]]
+
+            if len(member_matches) < self.size and len(results) == self.size + self.margin:
+                member_matches = self.search_member(member, profile)
+
+            matches[member.pk] = member_matches[:self.size]
+
+        return matches
+
+    def send(self, members, matches):
+        activities = Activity.objects.in_bulk(
+            set(pk for member_matches in matches.values() for pk in member_matches)
+        )
+
+        batch = []
+        for member in members:
+            member_activities = [
+                activities[pk] for pk in matches[member.pk] if pk in activities
+            ]
+            if member_activities:
+                batch.append(
+                    (MatchingActivitiesNotification(member), None, {'activities': member_activities})
+                )
+
+        if self.dry_run:
+            self.stats['mails'] += len(batch)
+            return
+
+        try:
+            self.stats['mails'] += send_message_batch(batch)
+        except Exception as e:
+            # Nothing was stored: send_message_batch only fails before the messages are created
+            logger.error(e)
+            for item in batch:
+                try:
+                    self.stats['mails'] += send_message_batch([item])
+                except Exception as e:
+                    logger.error(e)
+
+    def count_query(self, execute, sql, params, many, context):
+        self.stats['queries'] += 1
+        return execute(sql, params, many, context)
+
+    def recommend(self):
+        started = time.monotonic()
+
+        with connection.execute_wrapper(self.count_query):
+            platform_settings = InitiativePlatformSettings.load()
+            if platform_settings.enable_matching_emails:
+                for members in self.get_member_chunks():
+                    profiles = dict(
+                        (
+                            member.pk,
+                            get_matching_profile(member, platform_settings.enable_office_restrictions)
+                        )
+                        for member in members
+                    )
+                    self.search([
+                        profile for profile in set(profiles.values()) if profile not in self.results
+                    ])
+
+                    self.send(members, self.get_matches(members, profiles))
+                    self.stats['members'] += len(members)
+
+        self.stats['profiles'] = len(self.results)
+        self.stats['duration'] = time.monotonic() - started
+        return self.stats
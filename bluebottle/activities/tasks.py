@@ -3,25 +3,25 @@ from datetime import date, datetime
 
 from celery.schedules import crontab
 from dateutil.relativedelta import relativedelta
+from django.db import connection
 from django.db.models import Case, Count, When
 from django.utils.timezone import now
-from elasticsearch_dsl.query import (
-    Nested, Q, ConstantScore, MatchAll, Term, Terms, GeoDistance
-)
+from elasticsearch_dsl.query import Term
 
 from bluebottle.celery import app
 from bluebottle.activities.messages.matching import (
-    MatchingActivitiesNotification,
     DoGoodHoursReminderQ1Notification,
     DoGoodHoursReminderQ4Notification,
     DoGoodHoursReminderQ3Notification,
     DoGoodHoursReminderQ2Notification
 )
 from bluebottle.activities.models import Activity, Contributor
-from bluebottle.clients.models import Client
-from bluebottle.clients.utils import LocalTenant
+from bluebottle.activities.recommendations import (
+    MatchingRecommender, get_matching_profile, get_matching_search
+)
+from bluebottle.clients.scheduler import tenant_periodic_task
 from bluebottle.initiatives.models import InitiativePlatformSettings
-from bluebottle.members.models import Member, MemberPlatformSettings
+from bluebottle.members.models import MemberPlatformSettings
 from bluebottle.time_based.models import TeamMember, Registration
 
 logger = logging.getLogger('bluebottle')
@@ -30,101 +30,10 @@ logger = logging.getLogger('bluebottle')
 def get_matching_activities(user):
     settings = InitiativePlatformSettings.load()
 
-    query = ConstantScore(
-        filter=Nested(
-            path='expertise',
-            query=Q('terms', expertise__id=[skill.pk for skill in user.skills.all()])
-        )
-    ) | ConstantScore(
-        boost=1.5,
-        filter=Nested(
-            path='theme',
-            query=Q('terms', theme__id=[theme.pk for theme in user.favourite_themes.all()])
-        )
-    ) | ConstantScore(boost=0.5, filter=MatchAll())
-
-    from bluebottle.activities.documents import activity
-    search = activity.search().filter(
-        Q('terms', status=['open', 'running']) &
-        (
-            ~Nested(
-                path='segments',
-                query=(
-                    Term(segments__closed=True)
-                )
-            ) | Nested(
-                path='segments',
-                query=(
-                    Terms(
-                        segments__id=[
-                            segment.id for segment in user.segments.filter(closed=True)
-                        ]
-                    )
-                )
-            )
-        ) &
-        ~Term(contributors=user.pk)
-    )
+    profile = get_matching_profile(user, settings.enable_office_restrictions)
+    search = get_matching_search(profile).filter(~Term(contributors=user.pk))
 
-    if settings.enable_office_restrictions:
-        if user.location:
-            search = search.filter(
-                Nested(
-                    path='office_restriction',
-                    query=Term(
-                        office_restriction__restriction='all'
-                    ) | (
-                        Term(office_restriction__office=user.location.id) &
-                        Term(office_restriction__restriction='office')
-                    ) | (
-                        Term(
-                            office_restriction__subregion=user.location.subregion.id
-                            if user.location.subregion else ''
-                        ) &
-                        Term(office_restriction__restriction='office_subregion')
-                    ) | (
-                        Term(
-                            office_restriction__region=user.location.subregion.region.id
-                            if user.location.subregion and user.location.subregion.region else ''
-                        ) &
-                        Term(office_restriction__restriction='office_region')
-                    )
-                )
-            )
-        else:
-            search = search.filter(
-                Nested(
-                    path='office_restriction',
-                    query=Term(
-                        office_restriction__restriction='all'
-                    )
-                )
-            )
-
-    if user.exclude_online:
-        search = search.filter(
-            Term(is_online=True)
-        )
-
-    if user.search_distance and user.search_distance != "0km" and user.place:
-        position = {
-            'lat': float(user.place.position[1]),
-            'lon': float(user.place.position[0]),
-        }
-        search = search.filter(
-            GeoDistance(distance=user.search_distance, position=position) |
-            Term(is_online=True)
-        )
-        query = query | ConstantScore(
-            boost=0.001,
-            filter=Q(
-                'geo_distance',
-                distance=user.search_distance,
-                position=position
-            )
-        )
-
-    result = search.query(query).extra(explain=True).execute()
+    result = search.extra(explain=True).execute()
 
     pks = [int(match.meta.id) for match in result]
     preserved = Case(*[When(pk=pk, then=pos) for pos, pk in enumerate(pks)])
@@ -134,112 +43,97 @@ def get_matching_activities(user):
     ).order_by(preserved)
 
 
-@app.task
+@tenant_periodic_task(crontab(0, 0, day_of_month='2'))
 def recommend():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            settings = InitiativePlatformSettings.load()
-            if settings.enable_matching_emails:
-                for user in Member.objects.filter(subscribed=True):
-                    try:
-                        activities = get_matching_activities(user)
-
-                        if activities:
-                            notification = MatchingActivitiesNotification(user)
-                            notification.compose_and_send(activities=activities)
-                    except Exception as e:
-                        logger.error(e)
+    MatchingRecommender().recommend()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute=0, hour=10))
 def do_good_hours_reminder():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            settings = MemberPlatformSettings.load()
-            if settings.do_good_hours:
-                offset = settings.fiscal_month_offset
-                today = date.today()
-                q1 = (datetime(2000, 1, 1).date() + relativedelta(months=offset)).replace(today.year)
-                q2 = q1 + relativedelta(months=3)
-                q3 = q1 + relativedelta(months=6)
-                q4 = q1 + relativedelta(months=9)
-                notification = None
-                if settings.reminder_q1 and today == q1:
-                    notification = DoGoodHoursReminderQ1Notification(settings)
-                elif settings.reminder_q2 and today == q2:
-                    notification = DoGoodHoursReminderQ2Notification(settings)
-                elif settings.reminder_q3 and today == q3:
-                    notification = DoGoodHoursReminderQ3Notification(settings)
-                elif settings.reminder_q4 and today == q4:
-                    notification = DoGoodHoursReminderQ4Notification(settings)
-
-                if notification:
-                    try:
-                        notification.compose_and_send()
-                    except Exception as e:
-                        logger.error(e)
-
-
-@app.task
+    settings = MemberPlatformSettings.load()
+    if settings.do_good_hours:
+        offset = settings.fiscal_month_offset
+        today = date.today()
+        q1 = (datetime(2000, 1, 1).date() + relativedelta(months=offset)).replace(today.year)
+        q2 = q1 + relativedelta(months=3)
+        q3 = q1 + relativedelta(months=6)
+        q4 = q1 + relativedelta(months=9)
+        notification = None
+        if settings.reminder_q1 and today == q1:
+            notification = DoGoodHoursReminderQ1Notification(settings)
+        elif settings.reminder_q2 and today == q2:
+            notification = DoGoodHoursReminderQ2Notification(settings)
+        elif settings.reminder_q3 and today == q3:
+            notification = DoGoodHoursReminderQ3Notification(settings)
+        elif settings.reminder_q4 and today == q4:
+            notification = DoGoodHoursReminderQ4Notification(settings)
+
+        if notification:
+            try:
+                notification.compose_and_send()
+            except Exception as e:
+                logger.error(e)
+
+
+@tenant_periodic_task(crontab(minute=0, hour=10))
 def data_retention_contribution_task():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            settings = MemberPlatformSettings.load()
-            if settings.retention_anonymize:
-                history = now() - relativedelta(months=settings.retention_anonymize)
-                Activity.objects.filter(created__lt=history, has_deleted_data=False).update(has_deleted_data=True)
-
-                registrations = Registration.objects.filter(created__lt=history, user__isnull=False)
-
-                registrations = Registration.objects.filter(created__lt=history)
-                if registrations.count():
-                    # Delete registrations. They may contain personal information
-                    logger.info(f'DATA RETENTION: {tenant.schema_name} deleting {registrations.count()} contributors')
-                    for registration in registrations:
-                        registration.delete()
-
-                contributors = Contributor.objects.filter(created__lt=history, user__isnull=False)
-                if contributors.count():
-                    logger.info(f'DATA RETENTION: {tenant.schema_name} anonymizing {contributors.count()} contributors')
-                    contributors.update(
-                        user=None,
-                    )
-
-                team_members = TeamMember.objects.filter(
-                    created__lt=history, user__isnull=False
-                )
-                if team_members.count():
-                    logger.info(
-                        f"DATA RETENTION: {tenant.schema_name} anonymizing {team_members.count()} team members"
-                    )
-                    team_members.update(
-                        user=None,
-                    )
+    tenant = connection.tenant
+    settings = MemberPlatformSettings.load()
+    if settings.retention_anonymize:
+        history = now() - relativedelta(months=settings.retention_anonymize)
+        Activity.objects.filter(created__lt=history, has_deleted_data=False).update(has_deleted_data=True)
+
+        registrations = Registration.objects.filter(created__lt=history, user__isnull=False)
+
+        registrations = Registration.objects.filter(created__lt=history)
+        if registrations.count():
+            # Delete registrations. They may contain personal information
+            logger.info(f'DATA RETENTION: {tenant.schema_name} deleting {registrations.count()} contributors')
+            for registration in registrations:
+                registration.delete()
+
+        contributors = Contributor.objects.filter(created__lt=history, user__isnull=False)
+        if contributors.count():
+            logger.info(f'DATA RETENTION: {tenant.schema_name} anonymizing {contributors.count()} contributors')
+            contributors.update(
+                user=None,
+            )
 
-            if settings.retention_delete:
-                history = now() - relativedelta(months=settings.retention_delete)
-                contributors = Contributor.objects.filter(created__lt=history)
-                if contributors.count():
-                    logger.info(
-                        f'DATA RETENTION: {tenant.schema_name} deleting {contributors.count()} contributors'
-                    )
-                    successful = contributors.filter(contributions__status='succeeded').values('activity_id').\
-                        annotate(total=Count('activity_id')).order_by('activity_id')
-                    for success in successful:
-                        activity = Activity.objects.filter(id=success['activity_id']).get()
-                        activity.deleted_successful_contributors = success['total']
-                        activity.save(run_triggers=False)
-                    for contributor in contributors:
-                        contributions = contributor.contributions.all()
-                        contributions.update(contributor=None)
-                        contributor.delete()
+        team_members = TeamMember.objects.filter(
+            created__lt=history, user__isnull=False
+        )
+        if team_members.count():
+            logger.info(
+                f"DATA RETENTION: {tenant.schema_name} anonymizing {team_members.count()} team members"
+            )
+            team_members.update(
+                user=None,
+            )
 
-                team_members = TeamMember.objects.filter(created__lt=history)
-                if team_members.count():
-                    logger.info(
-                        f"DATA RETENTION: {tenant.schema_name} deleting {team_members.count()} team members"
-                    )
-                    team_members.delete()
+    if settings.retention_delete:
+        history = now() - relativedelta(months=settings.retention_delete)
+        contributors = Contributor.objects.filter(created__lt=history)
+        if contributors.count():
+            logger.info(
+                f'DATA RETENTION: {tenant.schema_name} deleting {contributors.count()} contributors'
+            )
+            successful = contributors.filter(contributions__status='succeeded').values('activity_id').\
+                annotate(total=Count('activity_id')).order_by('activity_id')
+            for success in successful:
+                activity = Activity.objects.filter(id=success['activity_id']).get()
+                activity.deleted_successful_contributors = success['total']
+                activity.save(run_triggers=False)
+            for contributor in contributors:
+                contributions = contributor.contributions.all()
+                contributions.update(contributor=None)
+                contributor.delete()
+
+        team_members = TeamMember.objects.filter(created__lt=history)
+        if team_members.count():
+            logger.info(
+                f"DATA RETENTION: {tenant.schema_name} deleting {team_members.count()} team members"
+            )
+            team_members.delete()
 
 
 @app.task(name='bluebottle.activities.tasks.send_activity_message_notification_email')
@@ -270,19 +164,3 @@ def send_activity_message_notification_email(activity_message_id, tenant):
             logger.exception(
                 'Failed to send activity message notification to activity owner'
             )
-
-
-app.add_periodic_task(
-    crontab(0, 0, day_of_month='2'),
-    recommend.s()
-)
-
-app.add_periodic_task(
-    crontab(minute=0, hour=10),
-    do_good_hours_reminder.s()
-)
-
-app.add_periodic_task(
-    crontab(minute=0, hour=10),
-    data_retention_contribution_task.s()
-)
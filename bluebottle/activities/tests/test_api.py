@@ -17,6 +17,7 @@ from django_elasticsearch_dsl.test import ESTestCase
 from pytz import UTC
 from rest_framework import status
 
+from bluebottle.activities.maps import activity_map
 from bluebottle.activities.models import Activity, ActivityMessage
 from bluebottle.activity_links.tests.factories import LinkedDeedFactory, LinkedFundingFactory
 from bluebottle.collect.tests.factories import (
@@ -2221,6 +2222,118 @@ class ActivityLocationAPITestCase(APITestCase):
         self.assertStatus(status.HTTP_200_OK)
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class ActivityMapTilesAPITestCase(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = BlueBottleUserFactory.create(
+            location=LocationFactory.create(subregion=OfficeSubRegionFactory.create())
+        )
+
+        self.amsterdam = CollectActivityFactory.create(
+            status='open',
+            location=GeolocationFactory.create(position=Point(4.89, 52.37)),
+            office_location=LocationFactory.create(subregion=self.user.location.subregion)
+        )
+        self.haarlem = CollectActivityFactory.create(
+            status='succeeded',
+            location=GeolocationFactory.create(position=Point(4.64, 52.38))
+        )
+        self.nairobi = DeadlineActivityFactory.create(
+            status='succeeded',
+            location=GeolocationFactory.create(position=Point(36.82, -1.29))
+        )
+        CollectActivityFactory.create(
+            status='draft',
+            location=GeolocationFactory.create(position=Point(4.89, 52.37))
+        )
+
+        self.url = reverse('activity-location-tiles')
+
+    def get_clusters(self, zoom, bbox='-180,-85,180,85', **query):
+        self.perform_get(user=self.user, query=dict(zoom=zoom, bbox=bbox, **query))
+        self.assertStatus(status.HTTP_200_OK)
+        return self.response.json()['clusters']
+
+    def test_get(self):
+        clusters = self.get_clusters(0)
+
+        self.assertEqual(len(clusters), 2)
+        self.assertEqual(sum(cluster['count'] for cluster in clusters), 3)
+
+        single = [cluster for cluster in clusters if cluster['count'] == 1][0]
+        self.assertEqual(single['id'], self.nairobi.pk)
+        self.assertEqual(single['type'], 'activities/time-based/deadlines')
+
+        pair = [cluster for cluster in clusters if cluster['count'] == 2][0]
+        self.assertEqual(pair['bounds'], [52.37, 4.64, 52.38, 4.89])
+
+    def test_get_zoomed_in(self):
+        clusters = self.get_clusters(12, bbox='4.5,52.3,5.0,52.4')
+
+        self.assertEqual(
+            set(cluster['id'] for cluster in clusters),
+            set([self.amsterdam.pk, self.haarlem.pk])
+        )
+
+    def test_get_subregion(self):
+        clusters = self.get_clusters(0, **{'filter[type]': 'office_subregion'})
+
+        self.assertEqual(len(clusters), 1)
+        self.assertEqual(clusters[0]['id'], self.amsterdam.pk)
+
+    def test_invalid(self):
+        self.perform_get(user=self.user, query={'bbox': '-180,-85,180,85'})
+        self.assertStatus(status.HTTP_400_BAD_REQUEST)
+
+        self.perform_get(user=self.user, query={'zoom': 1, 'bbox': '10,10,0,0'})
+        self.assertStatus(status.HTTP_400_BAD_REQUEST)
+
+        self.perform_get(user=self.user, query={'zoom': 12, 'bbox': '-180,-85,180,85'})
+        self.assertStatus(status.HTTP_400_BAD_REQUEST)
+
+    def test_cached(self):
+        self.get_clusters(0)
+
+        with self.assertNumQueries(0):
+            activity_map.get_clusters(0, (-180, -85, 180, 85))
+
+        self.haarlem.location.position = Point(-74.0, 40.7)
+        self.haarlem.location.save()
+
+        clusters = self.get_clusters(0)
+        self.assertEqual(len(clusters), 3)
+
+    def test_saved_again(self):
+        self.haarlem.title = 'Haarlem'
+        self.haarlem.save()
+        self.get_clusters(0)
+
+        # The location is not kept in the initial values after the first save
+        self.haarlem.title = 'Haarlem cleanup'
+        self.haarlem.save()
+
+        with self.assertNumQueries(0):
+            activity_map.get_clusters(0, (-180, -85, 180, 85))
+
+        self.haarlem.location = GeolocationFactory.create(position=Point(-74.0, 40.7))
+        self.haarlem.save()
+
+        clusters = self.get_clusters(0)
+        self.assertEqual(len(clusters), 3)
+
+    def test_get_closed_platform(self):
+        with self.closed_site():
+            self.perform_get(query={'zoom': 0, 'bbox': '-180,-85,180,85'})
+        self.assertStatus(status.HTTP_401_UNAUTHORIZED)
+
+
 class ActivityMessageAPITestCase(BluebottleTestCase):
     def setUp(self):
         super(ActivityMessageAPITestCase, self).setUp()
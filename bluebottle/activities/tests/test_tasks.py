@@ -1,3 +1,4 @@
+import mock
 from dateutil.relativedelta import relativedelta
 from django.contrib.gis.geos import Point
 from django.core import mail
@@ -8,6 +9,7 @@ from django.utils.timezone import now
 from django_elasticsearch_dsl.test import ESTestCase
 
 from bluebottle.activities.models import Contributor, Contribution
+from bluebottle.activities.recommendations import MatchingRecommender, get_matching_profile
 from bluebottle.activities.tasks import (
     recommend, get_matching_activities, data_retention_contribution_task
 )
@@ -342,6 +344,56 @@ class RecommendTaskTestCase(ESTestCase, BluebottleTestCase):
 
         self.assertEqual(len(mail.outbox), 0)
 
+    def test_recommender_dry_run(self):
+        stats = MatchingRecommender(dry_run=True).recommend()
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(stats['mails'], 1)
+        self.assertEqual(stats['msearches'], 1)
+        self.assertTrue(stats['queries'] > 0)
+
+    def test_recommender_same_profile(self):
+        other = BlueBottleUserFactory.create(
+            subscribed=True,
+            search_distance='50km',
+            any_search_distance=False,
+            exclude_online=False,
+            place=PlaceFactory.create(position=self.amsterdam)
+        )
+        other.favourite_themes.set(self.user.favourite_themes.all())
+        other.skills.set(self.user.skills.all())
+
+        self.assertEqual(get_matching_profile(self.user), get_matching_profile(other))
+
+        stats = MatchingRecommender().recommend()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(stats['searches'], stats['profiles'])
+
+    def test_recommender_search_failed(self):
+        def failed(multi_search, raise_on_error=True):
+            self.assertFalse(raise_on_error)
+            return [None] * len(multi_search._searches)
+
+        with mock.patch('elasticsearch_dsl.MultiSearch.execute', autospec=True, side_effect=failed):
+            stats = MatchingRecommender().recommend()
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertTrue(stats['failed_searches'] > 0)
+        self.assertEqual(stats['profiles'], 0)
+
+    def test_recommender_exclude_contributed_to(self):
+        activity = self.matching[-1]
+        DeadlineParticipantFactory.create(activity=activity, user=self.user, status="succeeded")
+
+        recommender = MatchingRecommender(dry_run=True)
+        profile = get_matching_profile(self.user)
+        recommender.search([profile])
+
+        matches = recommender.get_matches([self.user], {self.user.pk: profile})
+        self.assertFalse(activity.pk in matches[self.user.pk])
+        self.assertTrue(activity.pk in recommender.results[profile])
+
 
 class ContributorDataRetentionTest(BluebottleTestCase):
 
@@ -2,7 +2,7 @@ from django.urls import path
 from django.urls import re_path
 
 from bluebottle.activities.views import (
-    ActivityLocationList, ActivityPreviewList, ActivityDetailView, ActivityTransitionList,
+    ActivityLocationList, ActivityMapTileList, ActivityPreviewList, ActivityDetailView, ActivityTransitionList,
     RelatedActivityImageList,
     RelatedActivityImageContent, ActivityImage,
     InviteDetailView, ContributionList, ActivityList,
@@ -75,6 +75,12 @@ urlpatterns = [
         name='activity-location-list'
     ),
 
+    path(
+        '/locations/tiles/',
+        ActivityMapTileList.as_view(),
+        name='activity-location-tiles'
+    ),
+
     re_path(
         r'^/questions/(?P<type>[\w\-]+)/$',
         ActivityQuestionList.as_view(),
@@ -19,6 +19,7 @@ from rest_framework_json_api.relations import (
 )
 from rest_framework_json_api.serializers import ModelSerializer, PolymorphicModelSerializer
 
+from bluebottle.activities.counters import count_contributors
 from bluebottle.activities.models import (
     Activity, Contributor, Contribution, Organizer, EffortContribution, Team, Invite,
     ActivityAnswer, TextAnswer, SegmentAnswer, FileUploadAnswer,
@@ -43,7 +44,7 @@ from bluebottle.time_based.models import (
     Team as ScheduleTeam
 )
 from bluebottle.translations.serializers import TranslationsSerializer
-from bluebottle.utils.exchange_rates import convert
+from bluebottle.utils.exchange_rates import convert_many
 from bluebottle.utils.fields import FSMField, RichTextField, ValidationErrorsField, RequiredErrorsField
 from bluebottle.utils.serializers import ResourcePermissionField
 
@@ -355,9 +356,9 @@ class BaseActivitySerializer(ModelSerializer):
         return bool(user.is_authenticated) and instance.followers.filter(user=user).exists()
 
     def get_contributor_count(self, instance):
-        return instance.deleted_successful_contributors + instance.contributors.not_instance_of(Organizer).filter(
-            status__in=['accepted', 'succeeded', 'activity_refunded']
-        ).count()
+        return instance.deleted_successful_contributors + count_contributors(
+            instance, ['accepted', 'succeeded', 'activity_refunded'], exclude=[Organizer]
+        )
 
     def get_team_count(self, instance):
         return instance.old_teams.filter(status__in=['open', 'finished']).count()
@@ -775,13 +776,10 @@ def get_stats_for_activities(activities):
     ]
 
     amount = {
-        'amount': sum(
-            convert(
-                Money(c['amount'], c['value_currency']),
-                default_currency
-            ).amount
-            for c in amounts if c['amount']
-        ),
+        'amount': convert_many(
+            (Money(c['amount'], c['value_currency']) for c in amounts if c['amount']),
+            default_currency
+        ).amount,
         'currency': default_currency
     }
 
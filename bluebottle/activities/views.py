@@ -13,6 +13,7 @@ from rest_framework.throttling import UserRateThrottle
 from rest_framework_json_api.views import AutoPrefetchMixin
 
 from bluebottle.activities.filters import ActivitySearchFilter
+from bluebottle.activities.maps import activity_map
 from bluebottle.activities.models import (
     Activity, Contributor, Invite, Contribution, ActivityQuestion, ActivityAnswer,
     FileUploadAnswer, ActivityMessage,
@@ -38,6 +39,7 @@ from bluebottle.bluebottle_drf2.renderers import ElasticSearchJSONAPIRenderer
 from bluebottle.cms.models import SitePlatformSettings
 from bluebottle.files.models import RelatedImage
 from bluebottle.files.views import ImageContentView
+from bluebottle.geo.views import MapTileList
 from bluebottle.initiatives.permissions import ContactActivityManagerPermission
 from bluebottle.members.models import MemberPlatformSettings
 from bluebottle.notifications.models import NotificationPlatformSettings
@@ -53,6 +55,21 @@ from bluebottle.utils.views import (
 )
 
 
+def get_office_filters(request):
+    """
+    Filter activities on the work location (group) of the user with `filter[type]`
+    """
+    user = request.user
+    type_filter = request.query_params.get('filter[type]')
+    subregion = user.location.subregion if getattr(user, 'location', None) else None
+
+    if type_filter == 'office_subregion' and subregion:
+        return {'office_location__subregion': subregion.pk}
+    elif type_filter == 'office_region' and subregion and subregion.region_id:
+        return {'office_location__subregion__region': subregion.region_id}
+    return {}
+
+
 class ActivityLocationList(JsonApiViewMixin, ListAPIView):
     serializer_class = ActivityLocationSerializer
     pagination_class = None
@@ -63,30 +80,7 @@ class ActivityLocationList(JsonApiViewMixin, ListAPIView):
     )
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-
-        if self.request.user:
-            type_filter = self.request.query_params.get('filter[type]')
-            if (
-                type_filter == 'office_subregion' and
-                self.request.user.location and
-                self.request.user.location.subregion
-
-            ):
-                subregion = self.request.user.location.subregion
-                queryset = queryset.filter(
-                    office_location__subregion=subregion
-                )
-            elif (
-                type_filter == 'office_region' and
-                self.request.user.location and
-                self.request.user.location.subregion and
-                self.request.user.location.subregion.region
-            ):
-                region = self.request.user.location.subregion.region
-                queryset = queryset.filter(
-                    office_location__subregion__region=region
-                )
+        queryset = super().get_queryset().filter(**get_office_filters(self.request))
 
         queryset = queryset.filter(status__in=("succeeded", "open", "full", "running"))
 
@@ -150,6 +144,16 @@ class ActivityLocationList(JsonApiViewMixin, ListAPIView):
         return sorted(locations, key=lambda location: location.created, reverse=True)
 
 
+class ActivityMapTileList(MapTileList):
+    layer = activity_map
+    permission_classes = (
+        TenantConditionalOpenClose,
+    )
+
+    def get_filters(self):
+        return get_office_filters(self.request)
+
+
 class ActivityPreviewList(JsonApiViewMixin, ListAPIView):
     serializer_class = ActivityPreviewSerializer
     model = Activity
@@ -0,0 +1,175 @@
+import jwt
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework_jwt.authentication import (
+    JSONWebTokenAuthentication as BaseJSONWebTokenAuthentication
+)
+from rest_framework_jwt.blacklist.exceptions import MissingToken
+from rest_framework_jwt.settings import api_settings
+
+
+class AuthContext(object):
+    """
+    The result of authenticating a request with a JWT.
+
+    The token is decoded and verified, and the user is loaded, only once per request.
+    The middleware, the rest framework authentication and the token renewal all use
+    the same context.
+    """
+    user = None
+    token = None
+    payload = None
+    secret = None
+    error = None
+
+    def __init__(self, request):
+        try:
+            self.token = BaseJSONWebTokenAuthentication.get_token_from_request(request)
+        except MissingToken:
+            self.token = None
+
+        if self.token:
+            try:
+                self.payload, self.user = self.decode(self.token)
+
+                if apps.is_installed('rest_framework_jwt.blacklist'):
+                    from rest_framework_jwt.blacklist.models import BlacklistedToken
+                    if BlacklistedToken.is_blocked(self.token, self.payload):
+                        raise exceptions.PermissionDenied(_('Token is blacklisted.'))
+            except exceptions.APIException as e:
+                self.user = None
+                self.error = e
+
+    def get_user(self, payload):
+        username = api_settings.JWT_PAYLOAD_GET_USERNAME_HANDLER(payload)
+        if not username:
+            raise exceptions.AuthenticationFailed(_('Invalid payload.'))
+
+        User = get_user_model()
+        queryset = User.objects.select_related('location', 'place', 'avatar')
+        try:
+            # Same lookup as `get_by_natural_key`, with the relations that are used
+            # on almost every request
+            if isinstance(username, int):
+                return queryset.get(pk=username)
+            return queryset.get(**{'{}__iexact'.format(User.USERNAME_FIELD): username})
+        except User.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+    def decode(self, token):
+        try:
+            algorithms = api_settings.JWT_ALGORITHM
+            if not isinstance(algorithms, list):
+                algorithms = [algorithms]
+
+            header = jwt.get_unverified_header(token)
+            algorithm = header.get('alg')
+            if algorithm not in algorithms:
+                raise jwt.InvalidAlgorithmError()
+
+            if algorithm.startswith('HS') and api_settings.JWT_GET_USER_SECRET_KEY:
+                # The secret depends on the user, so load the user first and then
+                # verify the token with its secret.
+                user = self.get_user(jwt.decode(token, options={'verify_signature': False}))
+                self.secret = api_settings.JWT_GET_USER_SECRET_KEY(user)
+                payload = self.verify(token, algorithm, self.get_keys(self.secret, header.get('kid')))
+            else:
+                payload = api_settings.JWT_DECODE_HANDLER(token)
+                user = self.get_user(payload)
+        except jwt.ExpiredSignatureError:
+            raise exceptions.AuthenticationFailed(_('Token has expired.'))
+        except jwt.DecodeError:
+            raise exceptions.AuthenticationFailed(_('Error decoding token.'))
+        except jwt.InvalidTokenError:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed(_('User account is disabled.'))
+
+        return payload, user
+
+    def get_keys(self, keys, kid=None):
+        """
+        The keys to verify the token with. Like `jwt_decode_handler`: named keys are
+        selected with the `kid` header of the token.
+        """
+        if isinstance(keys, dict):
+            if kid:
+                try:
+                    keys = keys[kid]
+                except KeyError:
+                    raise jwt.InvalidTokenError()
+            elif api_settings.JWT_INSIST_ON_KID:
+                raise jwt.InvalidTokenError()
+            else:
+                keys = list(keys.values())
+
+        if not isinstance(keys, list):
+            keys = [keys]
+        return keys
+
+    def verify(self, token, algorithm, keys):
+        error = None
+        for key in keys:
+            try:
+                return jwt.decode(
+                    token,
+                    key,
+                    algorithms=[algorithm],
+                    options={
+                        'verify_signature': api_settings.JWT_VERIFY,
+                        'verify_exp': api_settings.JWT_VERIFY_EXPIRATION
+                    },
+                    leeway=api_settings.JWT_LEEWAY,
+                    audience=api_settings.JWT_AUDIENCE,
+                    issuer=api_settings.JWT_ISSUER,
+                )
+            except jwt.InvalidSignatureError as e:
+                error = e
+
+        if error is None:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        raise error
+
+    def is_current(self):
+        """
+        False if the secret of the user changed during the request, e.g. when the
+        user logged out.
+        """
+        return (
+            self.secret is None or
+            api_settings.JWT_GET_USER_SECRET_KEY(self.user) == self.secret
+        )
+
+    def authenticate(self):
+        """
+        Return a tuple of user and token, None if the request has no token, or raise
+        the authentication error.
+        """
+        if self.error:
+            raise self.error
+
+        if self.user:
+            return self.user, self.token
+
+
+def get_auth_context(request):
+    # Rest framework requests wrap the django request
+    request = getattr(request, '_request', request)
+
+    try:
+        return request._jwt_auth_context
+    except AttributeError:
+        request._jwt_auth_context = AuthContext(request)
+        return request._jwt_auth_context
+
+
+class JSONWebTokenAuthentication(BaseJSONWebTokenAuthentication):
+    """
+    JWT authentication that reuses the auth context of the request.
+    """
+
+    def authenticate(self, request):
+        return get_auth_context(request).authenticate()
@@ -0,0 +1,87 @@
+import atexit
+import logging
+import time
+from threading import Lock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, DatabaseError
+
+logger = logging.getLogger(__name__)
+
+
+class LastSeenBuffer(object):
+    """
+    Collects `last_seen` timestamps of users and writes them in one query.
+
+    Timestamps are buffered per tenant schema for `LAST_SEEN_FLUSH_INTERVAL` seconds
+    (or until `LAST_SEEN_FLUSH_SIZE` users are buffered), and are then written with a
+    single `UPDATE ... FROM (VALUES ...)` per schema. The update does not go through
+    `Member.save`, so no signals or search index updates are triggered. Whatever is
+    still buffered when the process exits is written on shutdown.
+    """
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = Lock()
+        self._last_flush = time.monotonic()
+
+    @property
+    def interval(self):
+        return getattr(settings, 'LAST_SEEN_FLUSH_INTERVAL', 60)
+
+    @property
+    def size(self):
+        return getattr(settings, 'LAST_SEEN_FLUSH_SIZE', 500)
+
+    def __len__(self):
+        return sum(len(users) for users in self._pending.values())
+
+    def add(self, user, timestamp):
+        with self._lock:
+            self._pending.setdefault(connection.schema_name, {})[user.pk] = timestamp
+
+    def is_due(self):
+        return (
+            len(self) >= self.size or
+            time.monotonic() - self._last_flush >= self.interval
+        )
+
+    def flush_if_due(self):
+        if self._pending and self.is_due():
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+
+        for schema_name, users in pending.items():
+            try:
+                self.write(schema_name, users)
+            except DatabaseError:
+                logger.exception('Failed to update last_seen for %s users in %s', len(users), schema_name)
+
+    def write(self, schema_name, users):
+        model = get_user_model()
+        quote = connection.ops.quote_name
+
+        values = ', '.join(['(%s::integer, %s::timestamptz)'] * len(users))
+        params = [value for item in users.items() for value in item]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'UPDATE {table} AS member SET last_seen = seen.last_seen '
+                'FROM (VALUES {values}) AS seen (id, last_seen) '
+                'WHERE member.{pk} = seen.id '
+                'AND (member.last_seen IS NULL OR member.last_seen < seen.last_seen)'.format(
+                    table='{}.{}'.format(quote(schema_name), quote(model._meta.db_table)),
+                    pk=quote(model._meta.pk.column),
+                    values=values
+                ),
+                params
+            )
+
+
+last_seen_buffer = LastSeenBuffer()
+atexit.register(last_seen_buffer.flush)
@@ -22,9 +22,10 @@ from django_otp.middleware import OTPMiddleware as BaseOTPMiddleware, is_verifie
 
 from django.conf import settings
 from rest_framework import exceptions
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
 from rest_framework_jwt.settings import api_settings
 
+from bluebottle.auth.authentication import get_auth_context
+from bluebottle.auth.last_seen import last_seen_buffer
 from bluebottle.clients import properties
 from bluebottle.utils.utils import get_client_ip
 
@@ -53,10 +54,8 @@ class UserJwtTokenMiddleware(MiddlewareMixin):
         except AttributeError:
             pass
 
-        obj = JSONWebTokenAuthentication()
-
         try:
-            user_auth_tuple = obj.authenticate(request)
+            user_auth_tuple = get_auth_context(request).authenticate()
         except exceptions.APIException:
             user_auth_tuple = None
 
@@ -68,9 +67,13 @@ class UserJwtTokenMiddleware(MiddlewareMixin):
             if not request.user.last_seen or (request.user.last_seen <
                timezone.now() - timedelta(minutes=LAST_SEEN_DELTA)):
                 request.user.last_seen = timezone.now()
-                request.user.save()
+                last_seen_buffer.add(request.user, request.user.last_seen)
             return
 
+    def process_response(self, request, response):
+        last_seen_buffer.flush_if_due()
+        return response
+
 
 class SlidingJwtTokenMiddleware(MiddlewareMixin):
     """
@@ -79,20 +82,14 @@ class SlidingJwtTokenMiddleware(MiddlewareMixin):
 
     def process_response(self, request, response):
         """ Override only the request to add the new token """
-        obj = JSONWebTokenAuthentication()
-
-        try:
-            user_auth_tuple = obj.authenticate(request)
-        except exceptions.APIException:
-            user_auth_tuple = None
+        context = get_auth_context(request)
 
         # Check if request includes valid token
-        if user_auth_tuple is not None:
-            user, _auth = user_auth_tuple
+        if context.user is not None and context.is_current():
+            user = context.user
 
             # Get the payload details
-            jwt_decode_handler = api_settings.JWT_DECODE_HANDLER
-            payload = jwt_decode_handler(_auth)
+            payload = context.payload
             logging.debug('JWT payload found: {0}'.format(payload))
 
             # Check whether we need to renew the token. This will happen if the token
@@ -1,12 +1,21 @@
+import json
+
+import jwt
+from jwt.utils import base64url_encode
 from mock import patch
 
+from django.test import RequestFactory
+from django.test.utils import override_settings
 from django.urls import reverse
 
 from rest_framework import status
+from rest_framework_jwt.settings import api_settings
 
 from bluebottle.test.utils import BluebottleTestCase
 from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
 
+from bluebottle.auth.authentication import AuthContext
+from bluebottle.auth.last_seen import last_seen_buffer
 from bluebottle.auth.middleware import authorization_logger
 
 
@@ -51,6 +60,63 @@ class UserTokenTestCase(BluebottleTestCase):
         self.assertNotEqual(seen2, None)
         self.assertTrue(seen1 == seen2)
 
+    def test_token_decoded_once(self):
+        with patch.object(AuthContext, 'decode', autospec=True, side_effect=AuthContext.decode) as decode:
+            response = self.client.get(reverse('user-current'), token=self.user_token)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(decode.call_count, 1)
+
+    def test_token_kid(self):
+        secrets = {'current': 'some-secret', 'previous': 'other-secret'}
+        payload = api_settings.JWT_PAYLOAD_HANDLER(self.user)
+
+        with patch.object(api_settings, 'JWT_GET_USER_SECRET_KEY', return_value=secrets):
+            token = jwt.encode(payload, 'other-secret', algorithm='HS256', headers={'kid': 'previous'})
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION='JWT {}'.format(token))
+            self.assertEqual(AuthContext(request).user, self.user)
+
+            token = jwt.encode(payload, 'other-secret', algorithm='HS256', headers={'kid': 'current'})
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION='JWT {}'.format(token))
+            context = AuthContext(request)
+            self.assertIsNone(context.user)
+            self.assertIsNotNone(context.error)
+
+    def test_token_without_algorithm(self):
+        payload = api_settings.JWT_PAYLOAD_HANDLER(self.user)
+        token = jwt.encode(payload, 'some-secret', algorithm='HS256')
+        header = base64url_encode(json.dumps({'typ': 'JWT'}).encode()).decode()
+        token = '.'.join([header] + token.split('.')[1:])
+
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION='JWT {}'.format(token))
+        context = AuthContext(request)
+        self.assertIsNone(context.user)
+        self.assertEqual(context.error.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_without_keys(self):
+        payload = api_settings.JWT_PAYLOAD_HANDLER(self.user)
+
+        with patch.object(api_settings, 'JWT_GET_USER_SECRET_KEY', return_value={}):
+            token = jwt.encode(payload, 'some-secret', algorithm='HS256')
+            request = RequestFactory().get('/', HTTP_AUTHORIZATION='JWT {}'.format(token))
+            context = AuthContext(request)
+            self.assertIsNone(context.user)
+            self.assertEqual(context.error.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(LAST_SEEN_FLUSH_INTERVAL=3600, LAST_SEEN_FLUSH_SIZE=100)
+    def test_last_seen_buffered(self):
+        self.addCleanup(last_seen_buffer.flush)
+        last_seen_buffer.flush()
+
+        seen = self.user_last_seen()
+        self.assertIsNone(seen)
+        self.assertEqual(len(last_seen_buffer), 1)
+
+        last_seen_buffer.flush()
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+        self.assertEqual(len(last_seen_buffer), 0)
+
     def test_login_failure_is_logged(self):
         with patch.object(authorization_logger, 'error') as error:
             response = self.client.post(
@@ -1,24 +1,94 @@
-from past.builtins import execfile
 import logging
-from threading import local
+import os
+from threading import local, Lock
+from types import MappingProxyType
 
 from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import Signal
 from django.utils._os import safe_join
 
 
 logger = logging.getLogger(__name__)
 
 
+# Sent with `client_name` to drop the cached properties of a tenant, or without
+# `client_name` to drop the cached properties of all tenants.
+tenant_properties_changed = Signal()
+
+
+EMPTY_PROPERTIES = MappingProxyType({})
+
+
+class TenantPropertiesRegistry(object):
+    """
+    Process wide registry of compiled tenant properties.
+
+    Every tenant settings file is compiled and executed once. The resulting namespace
+    is stored as a read-only mapping and shared between threads, so switching tenants
+    only swaps a reference. An entry is reloaded when the modification time of the
+    settings file changes, or when it is invalidated explicitly.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = Lock()
+
+    def get(self, path):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            self._entries.pop(path, None)
+            raise IOError('No tenant properties at {0}'.format(path))
+
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == mtime:
+            return entry[1]
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry[0] != mtime:
+                entry = (mtime, self.load(path))
+                self._entries[path] = entry
+
+        return entry[1]
+
+    def load(self, path):
+        with open(path) as props_file:
+            code = compile(props_file.read(), path, 'exec')
+
+        namespace = {}
+        # Tenant directories are not python packages (e.g. no __init__.py), so the
+        # settings file is executed with a reference to 'settings' available.
+        exec(code, dict(settings=settings), namespace)
+        return MappingProxyType(namespace)
+
+    def invalidate(self, client_name=None):
+        with self._lock:
+            if client_name is None:
+                self._entries.clear()
+            else:
+                suffix = os.path.join(client_name, 'settings.py')
+                for path in [path for path in self._entries if path.endswith(suffix)]:
+                    del self._entries[path]
+
+
+registry = TenantPropertiesRegistry()
+
+
 class TenantProperties(local):
     """
     A tenant property file is read from the MULTI_TENANT_DIR/<tenant_name>/properties.py.
     It can contain arbitrary python expressions and a reference to 'settings' will be available.
+
+    The compiled properties are shared by all threads through the `registry`, treat them
+    as read-only.
     """
-    tenant_properties = {}
+    tenant_properties = EMPTY_PROPERTIES
 
     def set_tenant(self, tenant):
         self.tenant = tenant
-        self.tenant_properties = {}
+        self.tenant_properties = EMPTY_PROPERTIES
 
         # Always default to standard django settings, e.g.
         # when tenant has no specific config, has no directory
@@ -29,10 +99,7 @@ class TenantProperties(local):
             props_mod = safe_join(settings.MULTI_TENANT_DIR,
                                   tenant.client_name,
                                   "settings.py")
-            # try to load tenant specific properties. We're using execfile since tenant
-            # directories are not python packages (e.g. no __init__.py)
-            execfile(props_mod, dict(settings=settings),
-                     self.tenant_properties)
+            self.tenant_properties = registry.get(props_mod)
 
         except (ImportError, AttributeError, IOError):
             if not isinstance(tenant, FakeTenant):
@@ -53,3 +120,16 @@ class TenantProperties(local):
 
 
 properties = TenantProperties()
+
+
+def invalidate_tenant_properties(sender=None, client_name=None, **kwargs):
+    registry.invalidate(client_name)
+
+
+def clear_tenant_properties_on_setting_change(sender, setting, **kwargs):
+    # Tenant settings files can refer to django settings while they are executed
+    registry.invalidate()
+
+
+tenant_properties_changed.connect(invalidate_tenant_properties)
+setting_changed.connect(clear_tenant_properties_on_setting_change)
@@ -1,32 +1,36 @@
-import subprocess
 from multiprocessing import Pool
 from optparse import make_option
 
+from django.db import connections
+
 from bluebottle.clients.models import Client
+from bluebottle.clients.reindex import reindex_tenant
 from bluebottle.common.management.commands.base import Command as BaseCommand
 
 
-def reindex(schema_name, rebuild=False):
-    """Reindex a tenant. If rebuild=False, use --populate to update in place."""
-    print(f'reindexing tenant {schema_name}' + (' (rebuild)' if rebuild else ' (populate)'))
-    if rebuild:
-        cmd = f'./manage.py tenant_command -s {schema_name} search_index --rebuild -f'
-    else:
-        cmd = f'./manage.py tenant_command -s {schema_name} search_index --populate --refresh'
-    return (schema_name, subprocess.call(cmd, shell=True))
-
-
 class Command(BaseCommand):
     help = (
-        'Reindex all tenants. By default uses --populate (update in place without '
-        'dropping the index). Use --rebuild to recreate indices from scratch.'
+        'Reindex all tenants. By default the current indices are updated in place. Use --rebuild '
+        'to build every index into a new version and swap the index alias when it is complete, '
+        'so search keeps working during the rebuild.'
     )
 
     option_list = BaseCommand.options + (
         make_option(
             '--processes',
             default=8,
-            help='How many processes run in parallel'
+            help='How many tenants are indexed in parallel'
+        ),
+        make_option(
+            '--threads',
+            default=4,
+            help='How many threads prepare documents per tenant'
+        ),
+        make_option(
+            '--chunk-size',
+            dest='chunk_size',
+            default=500,
+            help='How many records are read and indexed per chunk'
         ),
         make_option(
             '-s',
@@ -37,26 +41,60 @@ class Command(BaseCommand):
             '--rebuild',
             action='store_true',
             default=False,
-            help='Drop and recreate indices (full rebuild). Default is populate-only.'
+            help='Build new indices and swap them in when they are complete. Default is populate-only.'
+        ),
+        make_option(
+            '--checkpoint-dir',
+            dest='checkpoint_dir',
+            default=None,
+            help='Store progress per tenant in this directory'
+        ),
+        make_option(
+            '--resume',
+            action='store_true',
+            default=False,
+            help='Resume from the checkpoint in --checkpoint-dir'
+        ),
+        make_option(
+            '--keep-old',
+            dest='keep_old',
+            action='store_true',
+            default=False,
+            help='Do not delete the previous index versions after swapping the alias'
         ),
     )
 
     def handle(self, *args, **options):
-        tenant_schema = options['s']
-        rebuild = options['rebuild']
-        if tenant_schema:
-            tenant, result = reindex(str(tenant_schema), rebuild=rebuild)
-            if result != 0:
-                print(f'Tenant failed to index: {tenant}')
+        kwargs = {
+            'chunk_size': int(options['chunk_size']),
+            'threads': int(options['threads']),
+            'checkpoint_dir': options['checkpoint_dir'],
+            'resume': options['resume'],
+            'keep_old': options['keep_old'],
+            'populate': not options['rebuild'],
+        }
+
+        tenants = Client.objects.all()
+        if options['s']:
+            tenants = tenants.filter(schema_name=options['s'])
+
+        tenants = list(tenants)
+
+        if len(tenants) == 1:
+            results = [reindex_tenant(tenants[0], stdout=self.stdout, **kwargs)]
         else:
+            # Workers are forked from this process, so they should not share its connections
+            connections.close_all()
+
             processes = int(options.get('processes', 8))
             pool = Pool(processes=processes)
             tasks = [
-                pool.apply_async(reindex, args=[str(tenant.schema_name)], kwds={'rebuild': rebuild})
-                for tenant in Client.objects.all()
+                pool.apply_async(reindex_tenant, args=[tenant], kwds=kwargs)
+                for tenant in tenants
             ]
             results = [result.get() for result in tasks]
-            for tenant, result in results:
-                if result != 0:
-                    print(f'Tenant failed to index: {tenant}')
             pool.close()
+
+        for tenant, result in results:
+            if result != 0:
+                self.stdout.write(f'Tenant failed to index: {tenant}')
@@ -28,3 +28,23 @@ class Client(TenantMixin):
 
     def __str__(self):
         return self.name
+
+
+class IndexChange(models.Model):
+    """
+    A change to an indexed instance while the indices of its tenant are rebuilt. The changes
+    are applied to the new indices just before, and right after, their alias is swapped,
+    see bluebottle.clients.reindex.
+    """
+    schema_name = models.CharField(max_length=63)
+    app_label = models.CharField(max_length=100)
+    model_name = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    related = models.BooleanField(default=False)
+
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta(object):
+        indexes = [
+            models.Index(fields=['schema_name', 'id'], name='clients_index_change_schema'),
+        ]
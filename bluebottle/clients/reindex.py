@@ -0,0 +1,400 @@
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import close_old_connections, connection, models
+from django.db.models import QuerySet
+from django.utils.timezone import now
+from django_elasticsearch_dsl.registries import registry
+from elasticsearch.helpers import streaming_bulk
+from elasticsearch_dsl.connections import connections
+
+from bluebottle.clients.models import IndexChange
+from bluebottle.clients.utils import LocalTenant
+
+logger = logging.getLogger(__name__)
+
+
+def get_recording_key(schema_name):
+    return f'reindex_recording_{schema_name}'
+
+
+def record_change(instance, related=False):
+    """
+    Remember that `instance` changed or was deleted, when the indices of the current
+    tenant are being rebuilt. With `related` the documents of the instances related
+    to it are updated.
+    """
+    schema_name = connection.tenant.schema_name
+    if cache.get(get_recording_key(schema_name)) is None:
+        return
+
+    IndexChange.objects.create(
+        schema_name=schema_name,
+        app_label=instance._meta.app_label,
+        model_name=instance._meta.model_name,
+        object_id=instance.pk,
+        related=related,
+    )
+
+
+def get_indexing_queryset(document):
+    """
+    Return the indexing queryset of a document as a queryset, so that it can be chunked.
+    """
+    queryset = document.get_indexing_queryset()
+    if not isinstance(queryset, QuerySet):
+        queryset = document.get_queryset()
+    return queryset.order_by('pk')
+
+
+def iterate_chunks(queryset, chunk_size, last_pk=None):
+    """
+    Keyset pagination over a queryset ordered by pk. Every chunk is a single query
+    (plus prefetches), regardless of how far into the table we are.
+    """
+    while True:
+        chunk_queryset = queryset
+        if last_pk is not None:
+            chunk_queryset = chunk_queryset.filter(pk__gt=last_pk)
+
+        chunk = list(chunk_queryset[:chunk_size])
+        if not chunk:
+            return
+
+        last_pk = chunk[-1].pk
+        yield chunk
+
+
+class Checkpoint(object):
+    """
+    Progress of a tenant reindex, stored as json so an interrupted run can be resumed.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.data = {}
+
+        if path and os.path.exists(path):
+            with open(path) as checkpoint_file:
+                self.data = json.load(checkpoint_file)
+
+    def get(self, alias):
+        return self.data.setdefault(alias, {'documents': {}})
+
+    def save(self):
+        if not self.path:
+            return
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as checkpoint_file:
+            json.dump(self.data, checkpoint_file)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.data = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class TenantReindexer(object):
+    """
+    Rebuild all search indices of a tenant without downtime.
+
+    Documents are written into a fresh, versioned index. When all documents are
+    loaded, the alias that the `MultiTenantIndex` resolves to is swapped to the
+    new index in one atomic request, and the previous versions are removed.
+
+    Index updates keep going to the alias while the new index is loaded. The signal
+    processor records every changed and deleted instance meanwhile, see `record_change`,
+    and those are applied to the new index right before and right after the swap.
+    """
+
+    def __init__(self, tenant, chunk_size=500, threads=4, checkpoint_dir=None, resume=False,
+                 keep_old=False, populate=False, stdout=None):
+        self.tenant = tenant
+        self.chunk_size = chunk_size
+        self.threads = threads
+        self.keep_old = keep_old
+        self.populate = populate
+        self.resume = resume
+        self.stdout = stdout
+
+        checkpoint_path = None
+        if checkpoint_dir:
+            checkpoint_path = os.path.join(checkpoint_dir, f'reindex-{tenant.schema_name}.json')
+
+        self.checkpoint = Checkpoint(checkpoint_path)
+        if not resume:
+            self.checkpoint.clear()
+
+    @property
+    def client(self):
+        return connections.get_connection()
+
+    def report(self, message):
+        message = f'[{self.tenant.schema_name}] {message}'
+        logger.info(message)
+        if self.stdout:
+            self.stdout.write(message)
+
+    def get_documents(self):
+        indices = {}
+        for index in registry.get_indices():
+            indices[index] = sorted(registry._indices[index], key=lambda doc: doc.__name__)
+        return indices
+
+    def create_index(self, index, alias, state):
+        if self.populate:
+            if not self.client.indices.exists(index=alias):
+                index.create()
+            return alias
+
+        if not state.get('name'):
+            state['name'] = f'{alias}-{now().strftime("%Y%m%d%H%M%S")}'
+            state['documents'] = {}
+            self.checkpoint.save()
+
+        if not self.client.indices.exists(index=state['name']):
+            body = index.to_dict()
+            # Bulk loading is a lot faster without refreshes and replicas
+            body.setdefault('settings', {})
+            replicas = body['settings'].get('number_of_replicas', 0)
+            body['settings'].update({'refresh_interval': '-1', 'number_of_replicas': 0})
+            self.client.indices.create(index=state['name'], body=body)
+            state['replicas'] = replicas
+
+        return state['name']
+
+    def prepare_chunk(self, document, chunk, target):
+        with LocalTenant(self.tenant):
+            try:
+                actions = []
+                for instance in chunk:
+                    if document.should_index_object(instance):
+                        action = document._prepare_action(instance, 'index')
+                        action['_index'] = target
+                        actions.append(action)
+                return actions
+            finally:
+                close_old_connections()
+
+    def load_document(self, doc_class, target, state):
+        document = doc_class()
+        label = f'{doc_class.__module__}.{doc_class.__name__}'
+        queryset = get_indexing_queryset(document)
+        last_pk = state['documents'].get(label)
+
+        indexed = 0
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            pending = []
+            for chunk in iterate_chunks(queryset, self.chunk_size, last_pk):
+                pending.append((chunk[-1].pk, executor.submit(self.prepare_chunk, document, chunk, target)))
+
+                # Keep the pool busy, but do not read the whole table ahead
+                while len(pending) > self.threads:
+                    indexed += self.flush(pending.pop(0), label, state)
+
+            while pending:
+                indexed += self.flush(pending.pop(0), label, state)
+
+        duration = time.monotonic() - started
+        self.report(
+            f'{label}: {indexed} documents in {duration:.1f}s '
+            f'({indexed / duration if duration else 0:.0f}/s)'
+        )
+        return indexed
+
+    def flush(self, pending, label, state):
+        last_pk, future = pending
+        actions = future.result()
+        self.bulk(actions, label)
+
+        state['documents'][label] = last_pk
+        self.checkpoint.save()
+        if not self.populate:
+            # Keep recording changes, even when the cache dropped the key
+            self.start_recording()
+
+        return len(actions)
+
+    def bulk(self, actions, label):
+        for ok, result in streaming_bulk(self.client, actions, chunk_size=self.chunk_size, raise_on_error=False):
+            if not ok:
+                if result.get('delete', {}).get('status') == 404:
+                    continue
+                logger.warning('Failed to index %s: %s', label, result)
+
+    def start_recording(self):
+        # The flag expires, so a killed run does not keep recording changes forever. Every
+        # flush sets it again, so it only has to outlive the slowest chunk and alias swap.
+        cache.set(
+            get_recording_key(self.tenant.schema_name),
+            True,
+            getattr(settings, 'REINDEX_RECORDING_TIMEOUT', 6 * 3600)
+        )
+
+    def stop_recording(self):
+        cache.delete(get_recording_key(self.tenant.schema_name))
+        IndexChange.objects.filter(schema_name=self.tenant.schema_name).delete()
+
+    def get_changes(self, replayed):
+        """
+        The changes that were recorded since the index was created and not applied to it yet,
+        as sets of pks per (model, related)
+        """
+        changes = defaultdict(set)
+        for pk, app_label, model_name, object_id, related in IndexChange.objects.filter(
+            schema_name=self.tenant.schema_name
+        ).order_by('pk').values_list('pk', 'app_label', 'model_name', 'object_id', 'related'):
+            if pk not in replayed:
+                replayed.add(pk)
+                changes[(app_label, model_name, related)].add(object_id)
+        return changes
+
+    def prepare_changes(self, documents, target, changes):
+        actions = []
+
+        def index(document, instance):
+            if document.should_index_object(instance):
+                action = document._prepare_action(instance, 'index')
+                action['_index'] = target
+                actions.append(action)
+            else:
+                delete(document, instance)
+
+        def delete(document, instance):
+            actions.append({'_op_type': 'delete', '_index': target, '_id': document.generate_id(instance)})
+
+        for (app_label, model_name, related), pks in changes.items():
+            model = apps.get_model(app_label, model_name)
+            instances = list(model._default_manager.filter(pk__in=pks))
+
+            if related:
+                for instance in instances:
+                    for doc_class in registry._get_related_doc(instance):
+                        if doc_class not in documents:
+                            continue
+                        document = doc_class()
+                        try:
+                            related_objects = document.get_instances_from_related(instance)
+                        except ObjectDoesNotExist:
+                            related_objects = None
+                        if related_objects is None:
+                            continue
+                        if isinstance(related_objects, models.Model):
+                            related_objects = [related_objects]
+                        for related_object in related_objects:
+                            index(document, related_object)
+                continue
+
+            for instance in instances:
+                for doc_class in registry.get_documents([instance.__class__]):
+                    if doc_class in documents:
+                        index(doc_class(), instance)
+
+            # Instances that no longer exist are removed from the new index
+            for pk in pks - set(instance.pk for instance in instances):
+                for doc_class in registry.get_documents([model]):
+                    if doc_class in documents:
+                        delete(doc_class(), model(pk=pk))
+
+        return actions
+
+    def replay_changes(self, documents, target, replayed):
+        """
+        Apply the changes and deletes that were recorded while the index was loaded
+        """
+        changes = self.get_changes(replayed)
+        actions = self.prepare_changes(documents, target, changes)
+        self.bulk(actions, target)
+        self.report(f'{target}: applied {len(actions)} changes')
+        return len(actions)
+
+    def swap_alias(self, alias, target, state):
+        self.client.indices.put_settings(
+            index=target,
+            body={'refresh_interval': None, 'number_of_replicas': state.get('replicas', 0)}
+        )
+        self.client.indices.refresh(index=target)
+
+        previous = []
+        if self.client.indices.exists_alias(name=alias):
+            previous = list(self.client.indices.get_alias(name=alias).keys())
+        elif self.client.indices.exists(index=alias):
+            # Migrate an index that was created before aliases were used. This is the only
+            # moment where the index is briefly unavailable.
+            self.client.indices.delete(index=alias)
+
+        actions = [{'remove': {'index': name, 'alias': alias}} for name in previous]
+        actions.append({'add': {'index': target, 'alias': alias}})
+        self.client.indices.update_aliases(body={'actions': actions})
+
+        if not self.keep_old:
+            for name in previous:
+                if name != target:
+                    self.client.indices.delete(index=name, ignore_unavailable=True)
+
+        self.report(f'{alias} now points to {target}')
+
+    def run(self):
+        with LocalTenant(self.tenant):
+            if self.populate:
+                return self.reindex()
+
+            if not self.resume:
+                IndexChange.objects.filter(schema_name=self.tenant.schema_name).delete()
+            # Changes are recorded from before the first row is read until every alias
+            # is swapped. A failed run stops recording, a resumed run starts again.
+            self.start_recording()
+            try:
+                return self.reindex()
+            finally:
+                self.stop_recording()
+
+    def reindex(self):
+        started = now()
+        total = 0
+
+        for index, documents in self.get_documents().items():
+            alias = index._name
+            state = self.checkpoint.get(alias)
+            if state.get('done'):
+                continue
+
+            target = self.create_index(index, alias, state)
+            for doc_class in documents:
+                total += self.load_document(doc_class, target, state)
+
+            if not self.populate:
+                replayed = set()
+                total += self.replay_changes(documents, target, replayed)
+                self.swap_alias(alias, target, state)
+                # Index updates that were sent to the previous index before the swap
+                total += self.replay_changes(documents, target, replayed)
+
+            state['done'] = True
+            self.checkpoint.save()
+
+        duration = (now() - started).total_seconds()
+        self.report(f'indexed {total} documents in {duration:.1f}s')
+        self.checkpoint.clear()
+        return total
+
+
+def reindex_tenant(tenant, **kwargs):
+    try:
+        TenantReindexer(tenant, **kwargs).run()
+        return (tenant.schema_name, 0)
+    except Exception:
+        logger.exception('Failed to reindex %s', tenant.schema_name)
+        return (tenant.schema_name, 1)
@@ -0,0 +1,188 @@
+import logging
+import time
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from bluebottle.celery import app
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+
+logger = logging.getLogger('bluebottle')
+
+
+class TenantScheduler(object):
+    """
+    Periodic jobs that run once for every tenant.
+
+    The beat entry of a job only dispatches it: it sends one `run_tenant_jobs` task per shard
+    of `PERIODIC_TASK_SHARD_SIZE` tenants, so tenants are handled in parallel by the workers.
+    A lock per job and tenant in the cache makes sure a run is skipped instead of overlapping
+    with a run that is still busy. The duration per tenant and the number of tenants that
+    still have to run (the backlog) are kept in the cache, see `get_stats`.
+    """
+
+    def __init__(self):
+        self.jobs = {}
+        self.tasks = {}
+
+    @property
+    def shard_size(self):
+        return max(1, getattr(settings, 'PERIODIC_TASK_SHARD_SIZE', 1))
+
+    @property
+    def lock_timeout(self):
+        return getattr(settings, 'PERIODIC_TASK_LOCK_TIMEOUT', 3600)
+
+    @property
+    def use_locks(self):
+        return getattr(settings, 'PERIODIC_TASK_LOCKS', True)
+
+    def register(self, schedule, name=None):
+        """
+        Decorator that registers a job, a function that runs in the tenant context.
+
+        Returns the celery task that dispatches the job to all tenants. Registering the
+        same job again returns the task of the first registration.
+        """
+        def decorator(func):
+            job_name = name or f'{func.__module__}.{func.__name__}'
+
+            if job_name in self.tasks:
+                logger.warning(f'Periodic job {job_name} is already registered')
+                return self.tasks[job_name]
+
+            def dispatch():
+                self.dispatch(job_name)
+
+            dispatch.__name__ = func.__name__
+            dispatch.__doc__ = func.__doc__
+
+            task = app.task(name=job_name)(dispatch)
+            app.add_periodic_task(schedule, task.s(), name=job_name)
+
+            self.jobs[job_name] = func
+            self.tasks[job_name] = task
+            return task
+
+        return decorator
+
+    def get_tenants(self):
+        return list(Client.objects.order_by('pk').values_list('pk', flat=True))
+
+    def get_shards(self, tenants):
+        return [
+            tenants[index:index + self.shard_size]
+            for index in range(0, len(tenants), self.shard_size)
+        ]
+
+    def get_lock_key(self, name, tenant):
+        return f'periodic_job_lock_{name}_{tenant.schema_name}'
+
+    def get_backlog_key(self, name):
+        return f'periodic_job_backlog_{name}'
+
+    def get_duration_key(self, name, schema_name):
+        return f'periodic_job_duration_{name}_{schema_name}'
+
+    def acquire(self, name, tenant):
+        """
+        Lock the job for the tenant. Returns the token that releases the lock, or None
+        if another run holds it.
+        """
+        if not self.use_locks:
+            return True
+
+        token = uuid4().hex
+        if cache.add(self.get_lock_key(name, tenant), token, self.lock_timeout):
+            return token
+
+    def release(self, name, tenant, token):
+        """
+        Release the lock, unless it expired and was acquired by another run since
+        """
+        if self.use_locks:
+            key = self.get_lock_key(name, tenant)
+            if cache.get(key) == token:
+                cache.delete(key)
+
+    def dispatch(self, name):
+        tenants = self.get_tenants()
+
+        backlog = cache.get(self.get_backlog_key(name))
+        if backlog:
+            logger.warning(f'Periodic job {name}: {backlog} tenants of the previous run did not finish')
+
+        cache.set(self.get_backlog_key(name), len(tenants), None)
+
+        for shard in self.get_shards(tenants):
+            run_tenant_jobs.delay(name, shard)
+
+    def run(self, name, tenant):
+        token = self.acquire(name, tenant)
+        if not token:
+            logger.warning(f'Periodic job {name}: skipped {tenant.schema_name}, previous run is still busy')
+            return
+
+        started = time.monotonic()
+        try:
+            with LocalTenant(tenant, clear_tenant=True):
+                self.jobs[name]()
+        finally:
+            duration = time.monotonic() - started
+            self.release(name, tenant, token)
+
+            cache.set(self.get_duration_key(name, tenant.schema_name), duration, None)
+            logger.info(f'Periodic job {name}: {tenant.schema_name} took {duration:.2f}s')
+
+    def run_shard(self, name, tenant_ids):
+        error = None
+
+        for tenant in Client.objects.filter(pk__in=tenant_ids).order_by('pk'):
+            try:
+                self.run(name, tenant)
+            except Exception as e:
+                # Do not let one tenant keep the rest of the shard from running
+                logger.exception(f'Periodic job {name}: {tenant.schema_name} failed')
+                error = error or e
+            finally:
+                try:
+                    cache.decr(self.get_backlog_key(name))
+                except ValueError:
+                    pass
+
+        if error:
+            raise error
+
+    def get_stats(self, name):
+        """
+        Return the backlog and the duration of the last run per tenant of a job
+        """
+        schema_names = list(Client.objects.order_by('pk').values_list('schema_name', flat=True))
+        durations = cache.get_many([
+            self.get_duration_key(name, schema_name) for schema_name in schema_names
+        ])
+
+        return {
+            'backlog': cache.get(self.get_backlog_key(name)) or 0,
+            'durations': dict(
+                (schema_name, durations.get(self.get_duration_key(name, schema_name)))
+                for schema_name in schema_names
+            )
+        }
+
+
+tenant_scheduler = TenantScheduler()
+
+
+@app.task(name='bluebottle.clients.scheduler.run_tenant_jobs')
+def run_tenant_jobs(name, tenant_ids):
+    tenant_scheduler.run_shard(name, tenant_ids)
+
+
+def tenant_periodic_task(schedule, name=None):
+    """
+    Register a periodic job that runs for every tenant, see `TenantScheduler`
+    """
+    return tenant_scheduler.register(schedule, name=name)
@@ -1,12 +1,21 @@
+import logging
+from collections import defaultdict
+from threading import local
+
 from django.apps import apps
+from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db import connection, models
+from django.db import connection, models, transaction
+from django_elasticsearch_dsl.apps import DEDConfig
 from django_elasticsearch_dsl.registries import registry
 from django_elasticsearch_dsl.signals import RealTimeSignalProcessor
 
+from bluebottle.clients.reindex import record_change
 from bluebottle.clients.utils import LocalTenant
 from bluebottle.celery import app
 
+logger = logging.getLogger(__name__)
+
 
 def _instance_exists(instance):
     return instance.__class__._default_manager.filter(pk=instance.pk).exists()
@@ -38,6 +47,64 @@ def _split_related_instances(related):
     return existing, missing
 
 
+def _chunks(items, size):
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class IndexUpdateBatch(object):
+    """
+    Index updates collected during a single transaction.
+
+    Updates are keyed by (tenant, model, pk), so saving the same instance several
+    times only results in one update. When the transaction commits all updates for a
+    tenant are sent to the worker as one task.
+    """
+
+    def __init__(self):
+        self.tenants = {}
+        self.updates = defaultdict(dict)
+
+    def add(self, tenant, model_info, related=False):
+        key = (model_info['app_label'], model_info['model_name'], model_info['pk'], related)
+        self.tenants[tenant.schema_name] = tenant
+        self.updates[tenant.schema_name][key] = dict(model_info, related=related)
+
+    def flush(self):
+        for schema_name, updates in self.updates.items():
+            registry_bulk_update_task.delay(
+                list(updates.values()), self.tenants[schema_name]
+            )
+        self.updates.clear()
+
+
+class IndexUpdateQueue(local):
+    """
+    Coalesces index updates per transaction.
+
+    A new batch is started whenever there is no batch waiting for a commit. Outside
+    of a transaction the batch is flushed right away, just like `delay_on_commit`.
+    When a transaction is rolled back django drops the commit hook, and with it the
+    batch.
+    """
+    batch = None
+
+    def is_pending(self, batch):
+        return any(entry[1] == batch.flush for entry in connection.run_on_commit)
+
+    def add(self, tenant, model_info, related=False):
+        if self.batch is None or not connection.in_atomic_block or not self.is_pending(self.batch):
+            self.batch = IndexUpdateBatch()
+            self.batch.add(tenant, model_info, related)
+            transaction.on_commit(self.batch.flush)
+        else:
+            self.batch.add(tenant, model_info, related)
+
+
+index_update_queue = IndexUpdateQueue()
+
+
 class TenantCelerySignalProcessor(RealTimeSignalProcessor):
     """Celery signal processor.
 
@@ -93,6 +160,10 @@ class TenantCelerySignalProcessor(RealTimeSignalProcessor):
                 doc_instance, related, tenant
             )
 
+            if related is not None:
+                for related_instance in [related] if isinstance(related, models.Model) else related:
+                    record_change(related_instance)
+
     def handle_delete(self, sender, instance, **kwargs):
         """Handle delete.
 
@@ -100,13 +171,18 @@ class TenantCelerySignalProcessor(RealTimeSignalProcessor):
         """
         if self._sender_matches_registered_model(sender, self.models):
             registry.delete(instance, raise_on_error=False)
+            record_change(instance)
 
     def handle_save(self, sender, instance, **kwargs):
         """Handle save with a Celery task.
 
         Given an individual model instance, update the object in the index.
-        Update the related objects either.
+        Update the related objects either. Updates are queued until the transaction
+        commits, so that repeated saves are only indexed once.
         """
+        if not DEDConfig.autosync_enabled():
+            return
+
         model_info = {
             'app_label': sender._meta.app_label,
             'model_name': sender._meta.model_name,
@@ -115,14 +191,12 @@ class TenantCelerySignalProcessor(RealTimeSignalProcessor):
         tenant = connection.tenant
 
         if self._sender_matches_registered_model(sender, self.models):
-            registry_update_task.delay_on_commit(
-                model_info, tenant
-            )
+            index_update_queue.add(tenant, model_info)
+            record_change(instance)
 
         if self._sender_matches_registered_model(sender, self.related_models):
-            registry_update_related_task.delay_on_commit(
-                model_info, tenant
-            )
+            index_update_queue.add(tenant, model_info, related=True)
+            record_change(instance, related=True)
 
 
 @app.task
@@ -173,3 +247,69 @@ def registry_update_related_task(model_info, tenant):
         except model.DoesNotExist:
             # Instance was deleted between signal and task execution
             pass
+
+
+def _update_documents(documents, instances, ignore_signals=True):
+    chunk_size = settings.ELASTICSEARCH_INDEX_CHUNK_SIZE
+
+    for doc in documents:
+        if ignore_signals and doc.django.ignore_signals:
+            continue
+
+        for chunk in _chunks(instances, chunk_size):
+            doc().update(chunk)
+
+
+@app.task
+def registry_bulk_update_task(updates, tenant):
+    """
+    Apply a batch of index updates as a Celery task.
+
+    Instances are fetched fresh from the database per model and written to the
+    index with the bulk api, in chunks of ELASTICSEARCH_INDEX_CHUNK_SIZE.
+    """
+    if not DEDConfig.autosync_enabled():
+        # Just like `registry.update`, which the signal processor used before
+        return
+
+    with LocalTenant(tenant):
+        pks = defaultdict(set)
+        for update in updates:
+            pks[(update['app_label'], update['model_name'], update['related'])].add(update['pk'])
+
+        related_instances = defaultdict(dict)
+
+        for (app_label, model_name, related), model_pks in pks.items():
+            model = apps.get_model(app_label, model_name)
+            # Instances that were deleted in the mean time are simply skipped
+            instances = model.objects.filter(pk__in=model_pks)
+
+            if not related:
+                by_class = defaultdict(list)
+                for instance in instances:
+                    by_class[instance.__class__].append(instance)
+
+                for model_class, class_instances in by_class.items():
+                    _update_documents(registry.get_documents([model_class]), class_instances)
+            else:
+                for instance in instances:
+                    for doc in registry._get_related_doc(instance):
+                        try:
+                            related_objects = doc().get_instances_from_related(instance)
+                        except ObjectDoesNotExist:
+                            related_objects = None
+
+                        if related_objects is None:
+                            continue
+                        if isinstance(related_objects, models.Model):
+                            related_objects = [related_objects]
+
+                        for related_object in related_objects:
+                            related_instances[doc][(related_object.__class__, related_object.pk)] = related_object
+
+        for doc, instances in related_instances.items():
+            _update_documents([doc], list(instances.values()), ignore_signals=False)
+
+        logger.debug(
+            'Indexed %s updates for %s', len(updates), tenant.schema_name
+        )
@@ -3,6 +3,8 @@ from decimal import Decimal
 import mock
 from django.contrib.auth.models import Group, Permission
 from django.core.files.base import File
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.test import tag
 from django.test.utils import override_settings
 from django.urls import reverse
@@ -16,7 +18,9 @@ from bluebottle.initiatives.models import InitiativePlatformSettings
 from bluebottle.members.models import MemberPlatformSettings
 from bluebottle.notifications.models import NotificationPlatformSettings
 from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
+from bluebottle.test.factory_models.cms import LinkFactory, LinkGroupFactory, SiteLinksFactory
 from bluebottle.test.utils import BluebottleTestCase, APITestCase
+from bluebottle.utils.cache import public_properties_cache
 
 
 class ClientSettingsTestCase(APITestCase):
@@ -113,6 +117,73 @@ class ClientSettingsTestCase(APITestCase):
             self.assertIn('symbol', actual)
             self.assertTrue(len(actual['symbol']) > 0, 'currency symbol should be non-empty')
 
+    def test_settings_etag(self):
+        response = self.client.get(self.settings_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(self.settings_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        InitiativePlatformSettings.objects.create(activity_types=['deed'])
+
+        response = self.client.get(self.settings_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_settings_vary(self):
+        response = self.client.get(self.settings_url)
+        vary = [header.strip() for header in response['Vary'].split(',')]
+        self.assertIn('Accept-Language', vary)
+        self.assertIn('Authorization', vary)
+
+        response = self.client.get(self.settings_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('Accept-Language', response['Vary'])
+
+    @override_settings(PUBLIC_PROPERTIES_CACHE=True)
+    def test_settings_cached(self):
+        settings = InitiativePlatformSettings.objects.create(activity_types=['event'])
+
+        # Test cases always run in a transaction, which disables the cache
+        with mock.patch.object(public_properties_cache, 'can_store', return_value=True):
+            public_properties_cache.invalidate()
+
+            with CaptureQueriesContext(connection) as uncached:
+                self.client.get(self.settings_url)
+
+            with CaptureQueriesContext(connection) as cached:
+                response = self.client.get(self.settings_url)
+
+            self.assertLess(len(cached), len(uncached))
+            self.assertEqual(response.data['platform']['initiatives']['activity_types'], ['event'])
+
+            settings.activity_types = ['deed']
+            settings.save()
+
+            response = self.client.get(self.settings_url)
+            self.assertEqual(response.data['platform']['initiatives']['activity_types'], ['deed'])
+
+    @override_settings(PUBLIC_PROPERTIES_CACHE=True)
+    def test_settings_cached_site_links_per_user(self):
+        partners = Group.objects.create(name='partners')
+        user = BlueBottleUserFactory.create()
+        partners.user_set.add(user)
+
+        site_links = SiteLinksFactory.create()
+        link_group = LinkGroupFactory.create(name='main', site_links=site_links)
+        LinkFactory.create(link_group=link_group, title='Partners', link='/partners').groups.add(partners)
+
+        with mock.patch.object(public_properties_cache, 'can_store', return_value=True):
+            public_properties_cache.invalidate()
+
+            response = self.client.get(self.settings_url)
+            self.assertEqual(response.data['siteLinks']['groups'][0]['links'], [])
+
+            response = self.client.get(self.settings_url, token='JWT {}'.format(user.get_jwt_token()))
+            self.assertEqual(len(response.data['siteLinks']['groups'][0]['links']), 1)
+
 
 @override_settings(
     ELASTICSEARCH_DSL_AUTOSYNC=True,
@@ -5,6 +5,7 @@ from django.db import connection
 from bluebottle.activities.models import Activity
 from bluebottle.clients.signals import (
     TenantCelerySignalProcessor,
+    registry_bulk_update_task,
     registry_delete_related_task,
 )
 from bluebottle.test.utils import BluebottleTestCase
@@ -32,8 +33,9 @@ class TenantCelerySignalProcessorRegressionTestCase(BluebottleTestCase):
         processor = self._processor()
         activity = DateActivityFactory.create()
 
-        with patch("bluebottle.clients.signals.registry_update_task.delay_on_commit") as delay_mock:
-            processor.handle_save(Activity, activity)
+        with patch("bluebottle.clients.signals.registry_bulk_update_task.delay") as delay_mock:
+            with self.captureOnCommitCallbacks(execute=True):
+                processor.handle_save(Activity, activity)
 
         self.assertTrue(
             delay_mock.called,
@@ -53,6 +55,91 @@ class TenantCelerySignalProcessorRegressionTestCase(BluebottleTestCase):
         )
 
 
+class IndexUpdateCoalescingTestCase(BluebottleTestCase):
+    def _processor(self):
+        processor = TenantCelerySignalProcessor.__new__(TenantCelerySignalProcessor)
+        processor.models = [DateActivity]
+        processor.related_models = [DateActivity]
+        return processor
+
+    def test_repeated_saves_are_coalesced(self):
+        processor = self._processor()
+        activity = DateActivityFactory.create()
+        other = DateActivityFactory.create()
+
+        with patch("bluebottle.clients.signals.registry_bulk_update_task.delay") as delay_mock:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                for _ in range(5):
+                    processor.handle_save(DateActivity, activity)
+                processor.handle_save(DateActivity, other)
+
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(delay_mock.call_count, 1)
+
+        updates, tenant = delay_mock.call_args[0]
+        self.assertEqual(tenant, connection.tenant)
+        self.assertEqual(
+            sorted((update['pk'], update['related']) for update in updates),
+            sorted([(activity.pk, False), (activity.pk, True), (other.pk, False), (other.pk, True)])
+        )
+
+    def test_nothing_sent_before_commit(self):
+        processor = self._processor()
+        activity = DateActivityFactory.create()
+
+        with patch("bluebottle.clients.signals.registry_bulk_update_task.delay") as delay_mock:
+            with self.captureOnCommitCallbacks(execute=False):
+                processor.handle_save(DateActivity, activity)
+
+        self.assertFalse(delay_mock.called)
+
+    def test_bulk_update_task(self):
+        activities = DateActivityFactory.create_batch(3)
+        updates = [
+            {
+                'app_label': 'time_based',
+                'model_name': 'dateactivity',
+                'pk': activity.pk,
+                'related': False
+            } for activity in activities
+        ] + [{'app_label': 'time_based', 'model_name': 'dateactivity', 'pk': -1, 'related': False}]
+
+        document = MagicMock()
+        document.django.ignore_signals = False
+
+        with patch("bluebottle.clients.signals.registry.get_documents", return_value=[document]):
+            with self.settings(ELASTICSEARCH_INDEX_CHUNK_SIZE=2):
+                registry_bulk_update_task(updates, connection.tenant)
+
+        chunks = [call[0][0] for call in document.return_value.update.call_args_list]
+        self.assertEqual(
+            sorted(instance.pk for chunk in chunks for instance in chunk),
+            sorted(activity.pk for activity in activities)
+        )
+        self.assertTrue(all(len(chunk) <= 2 for chunk in chunks))
+
+    def test_autosync_disabled(self):
+        processor = self._processor()
+        activity = DateActivityFactory.create()
+        updates = [{
+            'app_label': 'time_based', 'model_name': 'dateactivity', 'pk': activity.pk, 'related': False
+        }]
+
+        document = MagicMock()
+        document.django.ignore_signals = False
+
+        with self.settings(ELASTICSEARCH_DSL_AUTOSYNC=False):
+            with patch("bluebottle.clients.signals.registry_bulk_update_task.delay") as delay_mock:
+                with self.captureOnCommitCallbacks(execute=True):
+                    processor.handle_save(DateActivity, activity)
+
+            with patch("bluebottle.clients.signals.registry.get_documents", return_value=[document]):
+                registry_bulk_update_task(updates, connection.tenant)
+
+        self.assertFalse(delay_mock.called)
+        self.assertFalse(document.return_value.update.called)
+
+
 class RelatedDeleteReindexRaceTestCase(BluebottleTestCase):
     """
     When a DateActivity is hard-deleted, slots cascade-delete first.
@@ -4,7 +4,7 @@ import os
 from django.test import TestCase
 
 from bluebottle.clients import TenantProperties
-from bluebottle.clients import properties
+from bluebottle.clients import properties, registry, tenant_properties_changed
 
 Mock = mock.Mock
 
@@ -40,3 +40,59 @@ class TestProperties(TestCase):
         with mock.patch("bluebottle.clients.settings", MULTI_TENANT_DIR=tenant_dir):
             properties.set_tenant(Mock(client_name='testtenant'))
             self.assertEqual(properties.set_by_test, True)
+
+
+class TestPropertiesRegistry(TestCase):
+    def setUp(self):
+        self.tenant_dir = os.path.join(os.path.dirname(__file__), 'files/')
+        self.path = os.path.join(self.tenant_dir, 'testtenant', 'settings.py')
+        registry.invalidate()
+
+    def tearDown(self):
+        registry.invalidate()
+
+    def test_compiled_once(self):
+        with mock.patch("bluebottle.clients.settings", MULTI_TENANT_DIR=self.tenant_dir):
+            with mock.patch.object(registry, 'load', wraps=registry.load) as load:
+                properties.set_tenant(Mock(client_name='testtenant'))
+                first = properties.tenant_properties
+                properties.set_tenant(Mock(client_name='testtenant'))
+
+                self.assertEqual(load.call_count, 1)
+                self.assertIs(properties.tenant_properties, first)
+                self.assertEqual(properties.set_by_test, True)
+
+    def test_read_only(self):
+        with mock.patch("bluebottle.clients.settings", MULTI_TENANT_DIR=self.tenant_dir):
+            properties.set_tenant(Mock(client_name='testtenant'))
+
+            with self.assertRaises(TypeError):
+                properties.tenant_properties['set_by_test'] = False
+
+    def test_reload_on_mtime(self):
+        with mock.patch("bluebottle.clients.settings", MULTI_TENANT_DIR=self.tenant_dir):
+            with mock.patch.object(registry, 'load', wraps=registry.load) as load:
+                properties.set_tenant(Mock(client_name='testtenant'))
+                stat = os.stat(self.path)
+                os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+                try:
+                    properties.set_tenant(Mock(client_name='testtenant'))
+                finally:
+                    os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+                self.assertEqual(load.call_count, 2)
+
+    def test_invalidate_signal(self):
+        with mock.patch("bluebottle.clients.settings", MULTI_TENANT_DIR=self.tenant_dir):
+            with mock.patch.object(registry, 'load', wraps=registry.load) as load:
+                properties.set_tenant(Mock(client_name='testtenant'))
+                tenant_properties_changed.send(sender=None, client_name='testtenant')
+                properties.set_tenant(Mock(client_name='testtenant'))
+
+                self.assertEqual(load.call_count, 2)
+
+    def test_missing_tenant(self):
+        with mock.patch("bluebottle.clients.settings", MULTI_TENANT_DIR=self.tenant_dir):
+            properties.set_tenant(Mock(client_name='unknown'))
+
+            self.assertEqual(properties.tenant_properties, {})
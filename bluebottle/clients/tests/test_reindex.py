@@ -0,0 +1,163 @@
+import json
+import os
+import tempfile
+
+import mock
+from django.core.cache import cache
+from django.db import connection
+
+from bluebottle.clients.models import IndexChange
+from bluebottle.clients.reindex import (
+    Checkpoint, TenantReindexer, get_recording_key, iterate_chunks, record_change
+)
+from bluebottle.test.utils import BluebottleTestCase
+from bluebottle.time_based.documents import DateActivityDocument
+from bluebottle.time_based.models import DateActivity
+from bluebottle.time_based.tests.factories import DateActivityFactory
+
+
+class IterateChunksTestCase(BluebottleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.activities = DateActivityFactory.create_batch(5)
+
+    def test_chunks(self):
+        chunks = list(iterate_chunks(DateActivity.objects.order_by('pk'), 2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 2, 1])
+        self.assertEqual(
+            [activity.pk for chunk in chunks for activity in chunk],
+            sorted(activity.pk for activity in self.activities)
+        )
+
+    def test_chunks_resume(self):
+        last_pk = sorted(activity.pk for activity in self.activities)[2]
+        chunks = list(iterate_chunks(DateActivity.objects.order_by('pk'), 2, last_pk))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2])
+
+
+class CheckpointTestCase(BluebottleTestCase):
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'checkpoint.json')
+
+            checkpoint = Checkpoint(path)
+            checkpoint.get('test-activity')['documents']['DateActivityDocument'] = 10
+            checkpoint.save()
+
+            with open(path) as checkpoint_file:
+                self.assertEqual(
+                    json.load(checkpoint_file),
+                    {'test-activity': {'documents': {'DateActivityDocument': 10}}}
+                )
+
+            self.assertEqual(
+                Checkpoint(path).get('test-activity')['documents']['DateActivityDocument'], 10
+            )
+
+            checkpoint.clear()
+            self.assertFalse(os.path.exists(path))
+
+
+class SwapAliasTestCase(BluebottleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client_mock = mock.Mock()
+        patcher = mock.patch(
+            'bluebottle.clients.reindex.connections.get_connection', return_value=self.client_mock
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.reindexer = TenantReindexer(connection.tenant)
+
+    def test_swap_existing_alias(self):
+        self.client_mock.indices.exists_alias.return_value = True
+        self.client_mock.indices.get_alias.return_value = {'test-activity-1': {}}
+
+        self.reindexer.swap_alias('test-activity', 'test-activity-2', {})
+
+        self.client_mock.indices.update_aliases.assert_called_once_with(body={'actions': [
+            {'remove': {'index': 'test-activity-1', 'alias': 'test-activity'}},
+            {'add': {'index': 'test-activity-2', 'alias': 'test-activity'}},
+        ]})
+        self.client_mock.indices.delete.assert_called_once_with(
+            index='test-activity-1', ignore_unavailable=True
+        )
+
+    def test_swap_concrete_index(self):
+        self.client_mock.indices.exists_alias.return_value = False
+        self.client_mock.indices.exists.return_value = True
+
+        self.reindexer.swap_alias('test-activity', 'test-activity-2', {})
+
+        self.client_mock.indices.delete.assert_called_once_with(index='test-activity')
+        self.client_mock.indices.update_aliases.assert_called_once_with(body={'actions': [
+            {'add': {'index': 'test-activity-2', 'alias': 'test-activity'}},
+        ]})
+
+
+class ReplayChangesTestCase(BluebottleTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch('bluebottle.clients.reindex.connections.get_connection')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.reindexer = TenantReindexer(connection.tenant)
+        self.activity = DateActivityFactory.create()
+
+    def replay(self, replayed):
+        with mock.patch('bluebottle.clients.reindex.streaming_bulk', return_value=[]) as bulk:
+            self.reindexer.replay_changes([DateActivityDocument], 'test-activity-2', replayed)
+        return bulk.call_args[0][1]
+
+    def test_not_recording(self):
+        record_change(self.activity)
+
+        self.assertFalse(IndexChange.objects.exists())
+
+    def test_replay(self):
+        self.reindexer.start_recording()
+        self.addCleanup(self.reindexer.stop_recording)
+
+        record_change(self.activity)
+        record_change(DateActivity(pk=self.activity.pk + 1000))
+
+        replayed = set()
+        actions = self.replay(replayed)
+
+        self.assertEqual(
+            sorted((action['_op_type'], action['_id']) for action in actions),
+            [('delete', self.activity.pk + 1000), ('index', self.activity.pk)]
+        )
+        self.assertTrue(all(action['_index'] == 'test-activity-2' for action in actions))
+
+        # Changes made after the first replay are applied once more
+        record_change(self.activity)
+        actions = self.replay(replayed)
+        self.assertEqual([(action['_op_type'], action['_id']) for action in actions], [('index', self.activity.pk)])
+
+    def test_stop_recording(self):
+        self.reindexer.start_recording()
+        record_change(self.activity)
+        self.reindexer.stop_recording()
+
+        record_change(self.activity)
+        self.assertFalse(IndexChange.objects.exists())
+
+    def test_failed_run_stops_recording(self):
+        reindexer = TenantReindexer(connection.tenant, populate=False)
+
+        def fail():
+            self.assertTrue(cache.get(get_recording_key(connection.tenant.schema_name)))
+            raise ValueError('Elasticsearch is down')
+
+        with mock.patch.object(reindexer, 'reindex', side_effect=fail):
+            with self.assertRaises(ValueError):
+                reindexer.run()
+
+        self.assertIsNone(cache.get(get_recording_key(connection.tenant.schema_name)))
+        record_change(self.activity)
+        self.assertFalse(IndexChange.objects.exists())
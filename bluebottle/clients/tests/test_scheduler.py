@@ -0,0 +1,113 @@
+import mock
+from celery.schedules import crontab
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import override_settings
+
+from bluebottle.celery import app
+from bluebottle.clients.models import Client
+from bluebottle.clients.scheduler import tenant_periodic_task, tenant_scheduler
+from bluebottle.test.utils import BluebottleTestCase
+
+job = mock.Mock()
+
+
+def scheduler_test_job():
+    job(connection.tenant.schema_name)
+
+
+@override_settings(
+    PERIODIC_TASK_LOCKS=True,
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+)
+class TenantSchedulerTestCase(BluebottleTestCase):
+    name = 'bluebottle.clients.tests.test_scheduler.scheduler_test_job'
+
+    def setUp(self):
+        super(TenantSchedulerTestCase, self).setUp()
+        cache.clear()
+        job.reset_mock(side_effect=True)
+
+        # Register the job without adding it to the beat schedule
+        with mock.patch.object(app, 'add_periodic_task'):
+            self.task = tenant_periodic_task(crontab(minute='*/15'))(scheduler_test_job)
+        self.addCleanup(self.unregister)
+
+    def unregister(self):
+        tenant_scheduler.jobs.pop(self.name, None)
+        tenant_scheduler.tasks.pop(self.name, None)
+        app.tasks.pop(self.name, None)
+
+    def test_run(self):
+        self.task()
+
+        self.assertEqual(
+            sorted(call[0][0] for call in job.call_args_list),
+            sorted(Client.objects.values_list('schema_name', flat=True))
+        )
+
+    @override_settings(PERIODIC_TASK_SHARD_SIZE=2)
+    def test_shards(self):
+        self.assertEqual(tenant_scheduler.get_shards([1, 2, 3]), [[1, 2], [3]])
+
+        with mock.patch('bluebottle.clients.scheduler.run_tenant_jobs.delay') as delay:
+            self.task()
+
+        tenants = tenant_scheduler.get_tenants()
+        self.assertEqual(delay.call_count, len(tenant_scheduler.get_shards(tenants)))
+        self.assertEqual(tenant_scheduler.get_stats(self.name)['backlog'], len(tenants))
+
+    def test_register_twice(self):
+        @tenant_periodic_task(crontab(minute='*/15'), name=self.name)
+        def other_job():
+            pass
+
+        self.assertIs(other_job, self.task)
+        self.assertEqual(tenant_scheduler.jobs[self.name].__name__, 'scheduler_test_job')
+
+    def test_locked(self):
+        token = tenant_scheduler.acquire(self.name, connection.tenant)
+
+        self.task()
+        self.assertFalse(
+            connection.tenant.schema_name in [call[0][0] for call in job.call_args_list]
+        )
+
+        tenant_scheduler.release(self.name, connection.tenant, token)
+
+        self.task()
+        job.assert_any_call(connection.tenant.schema_name)
+
+    def test_stats(self):
+        self.task()
+
+        stats = tenant_scheduler.get_stats(self.name)
+        self.assertEqual(stats['backlog'], 0)
+        self.assertTrue(stats['durations'][connection.tenant.schema_name] >= 0)
+
+    def test_failure(self):
+        job.side_effect = ValueError('failed')
+
+        with self.assertRaises(ValueError):
+            self.task()
+
+        self.assertTrue(tenant_scheduler.acquire(self.name, connection.tenant))
+        self.assertEqual(tenant_scheduler.get_stats(self.name)['backlog'], 0)
+
+    def test_release_other_run(self):
+        token = tenant_scheduler.acquire(self.name, connection.tenant)
+
+        # The lock expired and another run acquired it
+        cache.delete(tenant_scheduler.get_lock_key(self.name, connection.tenant))
+        other_token = tenant_scheduler.acquire(self.name, connection.tenant)
+        self.assertNotEqual(token, other_token)
+
+        tenant_scheduler.release(self.name, connection.tenant, token)
+        self.assertFalse(tenant_scheduler.acquire(self.name, connection.tenant))
+
+        tenant_scheduler.release(self.name, connection.tenant, other_token)
+        self.assertTrue(tenant_scheduler.acquire(self.name, connection.tenant))
@@ -1,5 +1,7 @@
 from builtins import next
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from mock import patch
 
 from bluebottle.clients.utils import get_user_site_links
@@ -74,6 +76,21 @@ class TestSiteLinks(BluebottleTestCase):
         results = get_user_site_links(self.user1)
         self.assertEqual(len(_group_by_name(results, 'main')['links']), 3)
 
+    def test_user_site_links_queries(self):
+        partners = GroupFactory.create(name='partners')
+        self._add_link(title='Results Page', link='results').groups.add(partners)
+
+        with CaptureQueriesContext(connection) as queries:
+            get_user_site_links(self.user1)
+
+        for index in range(5):
+            self._add_link(title='Partner {}'.format(index), link='partner').groups.add(partners)
+
+        with self.assertNumQueries(len(queries)):
+            results = get_user_site_links(self.user1)
+
+        self.assertEqual(len(_group_by_name(results, 'main')['links']), 2)
+
     @patch('bluebottle.utils.models.get_language')
     def test_language_language_fallback(self, mock_get_language):
         mock_get_language.return_value = 'nl'
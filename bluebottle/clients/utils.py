@@ -13,10 +13,11 @@ from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
 from django.db import connection, ProgrammingError
 from djmoney.contrib.exchange.exceptions import MissingRate
-from djmoney.contrib.exchange.models import get_rate
 from tenant_extras.utils import get_tenant_properties
 
 from bluebottle.clients import properties
+from bluebottle.utils.cache import public_properties_cache
+from bluebottle.utils.exchange_rates import exchange_rates
 from bluebottle.utils.models import Language, get_current_language
 
 logger = logging.getLogger(__name__)
@@ -113,7 +114,7 @@ def get_currencies():
         if currency['code'] in min_amounts:
             currency['minAmount'] = min_amounts[currency['code']]
         try:
-            currency['rate'] = get_rate(properties.DEFAULT_CURRENCY, currency['code'])
+            currency['rate'] = exchange_rates.get_rate(properties.DEFAULT_CURRENCY, currency['code'])
         except (MissingRate, ProgrammingError):
             currency['rate'] = 1
 
@@ -123,10 +124,11 @@ def get_currencies():
 def get_user_site_links(user):
     from bluebottle.cms.models import SiteLinks
 
+    site_links_queryset = SiteLinks.objects.prefetch_related('link_groups__links__groups')
     try:
-        site_links = SiteLinks.objects.get(language=get_current_language())
+        site_links = site_links_queryset.get(language=get_current_language())
     except SiteLinks.DoesNotExist:
-        site_links = SiteLinks.objects.first()
+        site_links = site_links_queryset.first()
 
     # If no site links set, just return empty
     if not site_links:
@@ -137,26 +139,26 @@ def get_user_site_links(user):
         'groups': []
     }
 
+    user_groups = None
+
     for group in site_links.link_groups.all():
         links = []
 
         for link in group.links.all():
-            allowed = True
-            if link.groups.exists():
-                allowed = False
-                for auth_group in link.groups.all():
-                    if user.groups.filter(name=auth_group.name).exists():
-                        allowed = True
-                        break
-            if allowed:
-                link_data = {
-                    'title': link.title,
-                    'isHighlighted': link.highlight,
-                    'openInNewTab': link.open_in_new_tab,
-                    'link': link.link,
-                    'sequence': link.link_order
-                }
-                links.append(link_data)
+            link_groups = set(auth_group.name for auth_group in link.groups.all())
+            if link_groups:
+                if user_groups is None:
+                    user_groups = set(user.groups.values_list('name', flat=True))
+                if not link_groups & user_groups:
+                    continue
+
+            links.append({
+                'title': link.title,
+                'isHighlighted': link.highlight,
+                'openInNewTab': link.open_in_new_tab,
+                'link': link.link,
+                'sequence': link.link_order
+            })
 
         response['groups'].append({
             'title': group.title,
@@ -178,6 +180,67 @@ def get_platform_settings(name):
     return serializer_class(settings_object).to_representation(settings_object)
 
 
+def get_tenant_public_properties():
+    """
+    The public properties that are the same for every user of the tenant.
+
+    The result is cached per tenant and language, see
+    `bluebottle.utils.cache.PublicPropertiesCache`.
+    """
+    from bluebottle.funding.utils import get_currency_settings
+    from bluebottle.funding_flutterwave.utils import get_flutterwave_settings
+    from bluebottle.funding_stripe.utils import get_stripe_settings
+
+    current_tenant = connection.tenant
+    properties = get_tenant_properties()
+
+    config = {
+        'tenant': current_tenant.client_name,
+        'mediaUrl': getattr(properties, 'MEDIA_URL'),
+        'defaultAvatarUrl': "/images/default-avatar.png",
+        'currencies': get_currencies(),
+        'defaultCurrency': getattr(properties, 'DEFAULT_CURRENCY', 'EUR'),
+        'logoUrl': "/images/logo.svg",
+        'mapsApiKey': getattr(properties, 'MAPS_API_KEY', ''),
+        'donationsEnabled': getattr(properties, 'DONATIONS_ENABLED', True),
+        'siteName': current_tenant.name,
+        'languages': [{
+            'code': lang.full_code,
+            'name': lang.language_name,
+            'default': lang.default
+        } for lang in Language.objects.all()],
+        'languageCode': get_current_language().full_code,
+        # Filled in per user, see `get_user_site_links`
+        'siteLinks': {},
+        'platform': {
+            'content': get_platform_settings('cms.SitePlatformSettings'),
+            'initiatives': get_platform_settings('initiatives.InitiativePlatformSettings'),
+            'funding': get_platform_settings('funding.FundingPlatformSettings'),
+            'notifications': get_platform_settings('notifications.NotificationPlatformSettings'),
+            'currencies': get_currency_settings(),
+            'members': get_platform_settings('members.MemberPlatformSettings'),
+        }
+    }
+
+    try:
+        config['platform']['stripe'] = get_stripe_settings()
+    except ImproperlyConfigured:
+        pass
+    try:
+        config['platform']['flutterwave'] = get_flutterwave_settings()
+    except ImproperlyConfigured:
+        pass
+
+    try:
+        config['readOnlyFields'] = {
+            'user': list(properties.TOKEN_AUTH.get('assertion_mapping', {}).keys())
+        }
+    except AttributeError:
+        pass
+
+    return config
+
+
 def get_public_properties(request):
     """
 
@@ -214,56 +277,8 @@ def get_public_properties(request):
 
     # First load tenant settings that should always be exposed
     if connection.tenant:
-        from bluebottle.funding.utils import get_currency_settings
-        from bluebottle.funding_flutterwave.utils import get_flutterwave_settings
-        from bluebottle.funding_stripe.utils import get_stripe_settings
-
-        current_tenant = connection.tenant
-        properties = get_tenant_properties()
-
-        config = {
-            'tenant': current_tenant.client_name,
-            'mediaUrl': getattr(properties, 'MEDIA_URL'),
-            'defaultAvatarUrl': "/images/default-avatar.png",
-            'currencies': get_currencies(),
-            'defaultCurrency': getattr(properties, 'DEFAULT_CURRENCY', 'EUR'),
-            'logoUrl': "/images/logo.svg",
-            'mapsApiKey': getattr(properties, 'MAPS_API_KEY', ''),
-            'donationsEnabled': getattr(properties, 'DONATIONS_ENABLED', True),
-            'siteName': current_tenant.name,
-            'languages': [{
-                'code': lang.full_code,
-                'name': lang.language_name,
-                'default': lang.default
-            } for lang in Language.objects.all()],
-            'languageCode': get_current_language().full_code,
-            'siteLinks': get_user_site_links(request.user),
-            'platform': {
-                'content': get_platform_settings('cms.SitePlatformSettings'),
-                'initiatives': get_platform_settings('initiatives.InitiativePlatformSettings'),
-                'funding': get_platform_settings('funding.FundingPlatformSettings'),
-                'notifications': get_platform_settings('notifications.NotificationPlatformSettings'),
-                'currencies': get_currency_settings(),
-                'members': get_platform_settings('members.MemberPlatformSettings'),
-            }
-        }
-
-        try:
-            config['platform']['stripe'] = get_stripe_settings()
-        except ImproperlyConfigured:
-            pass
-        try:
-            config['platform']['flutterwave'] = get_flutterwave_settings()
-        except ImproperlyConfigured:
-            pass
-
-        try:
-            config['readOnlyFields'] = {
-                'user': list(properties.TOKEN_AUTH.get('assertion_mapping', {}).keys())
-            }
-        except AttributeError:
-            pass
-
+        config = public_properties_cache.get(get_tenant_public_properties)
+        config['siteLinks'] = get_user_site_links(request.user)
     else:
         config = {}
 
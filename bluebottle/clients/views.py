@@ -1,8 +1,13 @@
 # -*- coding: utf-8 -*-
+import hashlib
+import json
 
 from django.db import connection
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
 from django.views.generic import TemplateView
 from rest_framework import views, response
+from rest_framework.utils.encoders import JSONEncoder
 
 from bluebottle.clients.utils import get_public_properties
 from bluebottle.members.models import MemberPlatformSettings
@@ -18,9 +23,19 @@ class Robots(TemplateView):
 class SettingsView(views.APIView):
     """
     Return the tenant settings as a json object
+
+    The response has an ETag, so that clients can revalidate their copy and receive a
+    304 when the settings did not change. The settings depend on the language and the
+    user, which the Vary header tells caches in between.
     """
     permission_classes = ()
 
+    def get_etag(self, obj):
+        content = json.dumps(obj, cls=JSONEncoder, sort_keys=True).encode('utf-8')
+        return quote_etag(hashlib.md5(content).hexdigest())
+
+    vary_headers = ['Accept-Language', 'Authorization', 'Cookie']
+
     def get(self, request, format=None):
         """
         Return settings
@@ -59,4 +74,14 @@ class SettingsView(views.APIView):
                 }
             }
 
-        return response.Response(obj)
+        etag = self.get_etag(obj)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified['ETag'] = etag
+            patch_vary_headers(not_modified, self.vary_headers)
+            return not_modified
+
+        result = response.Response(obj)
+        result['ETag'] = etag
+        patch_vary_headers(result, self.vary_headers)
+        return result
@@ -89,7 +89,7 @@ class CollectContributorExportView(ExportView):
     def get_instances(self):
         return self.get_object().contributors.instance_of(
             CollectContributor
-        )
+        ).select_related('user')
 
 
 class CollectTypeList(TranslatedApiViewMixin, JsonApiViewMixin, ListAPIView):
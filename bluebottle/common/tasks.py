@@ -64,6 +64,28 @@ def _send_celery_mail(msg, tenant=None, send=False):
             )
 
 
+@app.task
+def _send_celery_mail_batch(messages, tenant=None, send=False):
+    """
+        Send a batch of emails over a single connection to the mail backend.
+    """
+    with LocalTenant(tenant, clear_tenant=True):
+        if not messages:
+            return
+
+        if send:
+            try:
+                sent = messages[0].get_connection().send_messages(messages)
+                logger.info(u"Succesfully sent {0} of {1} mails".format(sent, len(messages)))
+            except Exception as e:
+                logger.error(u"Error sending mail batch: {0}".format(e))
+                raise e
+        else:
+            logger.info(
+                u"Sending mail off. Mail task received for {0} messages".format(len(messages))
+            )
+
+
 @app.task
 def _post_to_facebook(instance, tenant=None):
     """ Post a Wallpost to users Facebook page using Celery """
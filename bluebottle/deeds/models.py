@@ -5,6 +5,7 @@ from django.contrib.contenttypes.models import ContentType
 from django.db import models, connection
 from django.utils.translation import gettext_lazy as _
 
+from bluebottle.activities.counters import count_contributors
 from bluebottle.activities.models import Activity, Contributor, EffortContribution
 from bluebottle.activities.models import Organizer
 from bluebottle.deeds.validators import EndDateValidator
@@ -98,7 +99,9 @@ class Deed(Activity):
     @property
     def succeeded_contributor_count(self):
         if self.pk:
-            return self.participants.count() + self.deleted_successful_contributors
+            return count_contributors(
+                self, ('accepted', 'succeeded'), types=[DeedParticipant]
+            ) + self.deleted_successful_contributors
         else:
             return []
 
@@ -2,21 +2,19 @@
 # Generated by Django 1.11.15 on 2020-02-26 07:38
 from __future__ import unicode_literals
 from datetime import datetime
-from timezonefinder import TimezoneFinder
 import pytz
 
 from django.db import migrations
 from django.utils import timezone
 
-
-tf = TimezoneFinder()
+from bluebottle.geo.timezones import timezone_service
 
 
 def set_timezone(apps, schema_editor):
     Event = apps.get_model('events', 'Event')
 
     for event in Event.objects.filter(start__isnull=False, location__isnull=False):
-        tz_name = tf.timezone_at(
+        tz_name = timezone_service.timezone_at(
             lng=event.location.position.x,
             lat=event.location.position.y
         )
@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.files.models import Image
+from bluebottle.files.renditions import is_current
+from bluebottle.files.tasks import generate_image_renditions
+
+
+class Command(BaseCommand):
+    help = "Generate the renditions of images that do not have current renditions yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--schema", dest="schema_name", help="specify tenant schema, defaults to all tenants"
+        )
+        parser.add_argument(
+            "--all", action="store_true", default=False,
+            help="also generate the renditions of images that have current renditions"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=50,
+            help="number of images per task, the tasks run in parallel on the workers"
+        )
+
+    def handle(self, *args, **options):
+        tenants = Client.objects.all()
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+
+        for tenant in tenants:
+            with LocalTenant(tenant, clear_tenant=True):
+                image_ids = [
+                    image.pk for image in Image.objects.exclude(file='').only(
+                        'pk', 'file', 'cropbox', 'renditions'
+                    ).iterator()
+                    if options['all'] or not is_current(image)
+                ]
+
+                chunk_size = options['chunk_size']
+                for index in range(0, len(image_ids), chunk_size):
+                    generate_image_renditions.delay(tenant, image_ids[index:index + chunk_size])
+
+                self.stdout.write(
+                    "{}: {} images scheduled".format(tenant.client_name, len(image_ids))
+                )
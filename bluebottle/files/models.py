@@ -66,6 +66,7 @@ class Image(File):
     origin = models.ForeignKey(
         'activity_pub.Image', null=True, related_name="activities", on_delete=models.SET_NULL
     )
+    renditions = models.JSONField(default=dict, blank=True, editable=False)
 
     class JSONAPIMeta(object):
         resource_name = 'images'
@@ -116,3 +117,6 @@ class RelatedImage(models.Model):
     content_object = GenericForeignKey('content_type', 'object_id')
 
     image = ImageField(null=True)
+
+
+from bluebottle.files.signals import *  # noqa
@@ -0,0 +1,115 @@
+import logging
+import mimetypes
+
+from django.conf import settings
+from django.urls import get_resolver
+from sorl.thumbnail.shortcuts import get_thumbnail
+
+logger = logging.getLogger('bluebottle')
+
+ORIGINAL_SIZE = '1500'
+
+# All sizes that image content views serve, see `ImageContentView.__init_subclass__`
+rendition_sizes = set([ORIGINAL_SIZE])
+
+
+def get_rendition_sizes():
+    # The views register their sizes when they are imported, which loading the urls does
+    get_resolver().url_patterns
+    return sorted(rendition_sizes)
+
+
+def get_cropbox(image, size):
+    """
+    The cropbox of `image` as a tuple, the original size is never cropped
+    """
+    if size == ORIGINAL_SIZE or not image.cropbox:
+        return None
+
+    try:
+        left, upper, right, lower = map(int, image.cropbox.split(','))
+        if right <= left:
+            left, right = min(left, right), max(left, right)
+        if lower <= upper:
+            upper, lower = min(upper, lower), max(upper, lower)
+        return (left, upper, right, lower)
+    except ValueError:
+        return None
+
+
+def render(image, size, **options):
+    """
+    Generate the thumbnail of `image` in `size`, or return it when it already exists
+    """
+    file = image.file
+    cropbox = get_cropbox(image, size)
+
+    try:
+        if 'x' in size:
+            width, height = size.split('x')
+        else:
+            width = height = size
+        if width == height and int(width) < 300:
+            return get_thumbnail(file, size, crop='center', cropbox=cropbox, **options)
+        else:
+            return get_thumbnail(file, size, cropbox=cropbox, **options)
+    except ValueError:
+        return get_thumbnail(file, size, cropbox=cropbox, **options)
+    except ZeroDivisionError:
+        return get_thumbnail(file, size, **options)
+
+
+def is_current(image):
+    """
+    Whether the renditions of `image` were generated for its current file and cropbox
+    """
+    manifest = image.renditions or {}
+    return (
+        bool(image.file) and
+        manifest.get('file') == image.file.name and
+        manifest.get('cropbox') == image.cropbox
+    )
+
+
+def generate_renditions(image):
+    """
+    Generate the thumbnails of `image` in all sizes, and store where they are in
+    `image.renditions`. With `IMAGE_RENDITIONS_WEBP` a WebP version is generated too.
+    """
+    manifest = {
+        'file': image.file.name,
+        'cropbox': image.cropbox,
+        'content_type': mimetypes.guess_type(image.file.name)[0],
+        'sizes': {},
+    }
+
+    for size in get_rendition_sizes():
+        try:
+            rendition = {'url': render(image, size).url}
+            if getattr(settings, 'IMAGE_RENDITIONS_WEBP', False):
+                rendition['webp'] = render(image, size, format='WEBP').url
+            manifest['sizes'][size] = rendition
+        except Exception:
+            logger.exception(f'Could not generate rendition {size} of image {image.pk}')
+
+    image.renditions = manifest
+    # Update instead of save, so the renditions are not scheduled again
+    image.__class__.objects.filter(pk=image.pk).update(renditions=manifest)
+    return manifest
+
+
+def get_rendition(image, size, webp=False):
+    """
+    Return the url and content type of a generated rendition of `image`, or None when it
+    has not been generated for the current file and cropbox.
+    """
+    if not is_current(image):
+        return None
+
+    rendition = image.renditions['sizes'].get(size)
+    if not rendition:
+        return None
+
+    if webp and 'webp' in rendition:
+        return rendition['webp'], 'image/webp'
+    return rendition['url'], image.renditions['content_type']
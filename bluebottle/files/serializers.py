@@ -12,6 +12,7 @@ from sorl.thumbnail import default
 from PIL import UnidentifiedImageError, ImageOps
 
 from bluebottle.files.models import Document, Image, PrivateDocument
+from bluebottle.files.renditions import ORIGINAL_SIZE
 from bluebottle.utils.utils import reverse_signed
 
 
@@ -134,7 +135,6 @@ class ImageField(ResourceRelatedField):
     queryset = Image.objects
 
 
-ORIGINAL_SIZE = '1500'
 IMAGE_SIZES = {
     "email": "200x200",
     "avatar": "200x200",
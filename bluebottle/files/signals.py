@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from bluebottle.files.models import Image
+from bluebottle.files.renditions import is_current
+from bluebottle.files.tasks import generate_image_renditions
+
+
+@receiver(post_save, sender=Image)
+def schedule_image_renditions(sender, instance, raw=False, **kwargs):
+    if raw or not getattr(settings, 'IMAGE_RENDITIONS', True):
+        return
+
+    if instance.file and not is_current(instance):
+        tenant = connection.tenant
+        transaction.on_commit(
+            lambda: generate_image_renditions.delay(tenant, [instance.pk])
+        )
@@ -0,0 +1,18 @@
+import logging
+
+from bluebottle.celery import app
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.files.models import Image
+from bluebottle.files.renditions import generate_renditions
+
+logger = logging.getLogger('bluebottle')
+
+
+@app.task
+def generate_image_renditions(tenant, image_ids):
+    with LocalTenant(tenant, clear_tenant=True):
+        for image in Image.objects.filter(pk__in=image_ids).exclude(file=''):
+            try:
+                generate_renditions(image)
+            except Exception:
+                logger.exception(f'Could not generate renditions of image {image.pk}')
@@ -1,11 +1,14 @@
 from builtins import str
 
 from django.test import TestCase
+from django.test.utils import override_settings
 from django.core.files.uploadedfile import SimpleUploadedFile
 
 from bluebottle.files.tests.factories import ImageFactory
 from bluebottle.files.models import Image
+from bluebottle.files.renditions import ORIGINAL_SIZE, get_rendition, get_rendition_sizes, is_current
 from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
+from bluebottle.test.utils import BluebottleTestCase
 
 
 class ImageTestCase(TestCase):
@@ -42,3 +45,56 @@ class ImageTestCase(TestCase):
         image.save()
 
         self.assertEqual(image.cropbox, "40,133,160,166")
+
+
+@override_settings(IMAGE_RENDITIONS=True)
+class ImageRenditionsTestCase(BluebottleTestCase):
+
+    def create_image(self):
+        path = './bluebottle/files/tests/files/image-wide.png'
+        with open(path, 'rb') as file:
+            file = SimpleUploadedFile(
+                name="image-wide.png",
+                content=file.read(),
+                content_type="image/png"
+            )
+            image = Image(file=file, owner=BlueBottleUserFactory.create())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+
+        image.refresh_from_db()
+        return image
+
+    def test_generate(self):
+        image = self.create_image()
+
+        self.assertTrue(is_current(image))
+        self.assertEqual(sorted(image.renditions['sizes']), get_rendition_sizes())
+        self.assertTrue('200x200' in image.renditions['sizes'])
+
+        url, content_type = get_rendition(image, ORIGINAL_SIZE)
+        self.assertEqual(content_type, 'image/png')
+        self.assertEqual(get_rendition(image, '200x200', webp=True)[1], 'image/png')
+
+    def test_change_cropbox(self):
+        image = self.create_image()
+        image.cropbox = '0,0,100,100'
+
+        self.assertFalse(is_current(image))
+        self.assertIsNone(get_rendition(image, '200x200'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+
+        image.refresh_from_db()
+        self.assertTrue(is_current(image))
+        self.assertEqual(image.renditions['cropbox'], '0,0,100,100')
+
+    @override_settings(IMAGE_RENDITIONS_WEBP=True)
+    def test_webp(self):
+        image = self.create_image()
+
+        url, content_type = get_rendition(image, '200x200', webp=True)
+        self.assertEqual(content_type, 'image/webp')
+        self.assertEqual(get_rendition(image, '200x200')[1], 'image/png')
@@ -13,11 +13,11 @@ from rest_framework.generics import RetrieveDestroyAPIView
 from rest_framework.parsers import FileUploadParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_json_api.views import AutoPrefetchMixin
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
-from sorl.thumbnail.shortcuts import get_thumbnail
 
+from bluebottle.auth.authentication import JSONWebTokenAuthentication
 from bluebottle.bluebottle_drf2.renderers import BluebottleJSONAPIRenderer
 from bluebottle.files.models import Document, Image, PrivateDocument
+from bluebottle.files.renditions import get_rendition, render, rendition_sizes
 from bluebottle.files.serializers import (
     FileSerializer,
     PrivateDocumentSerializer,
@@ -112,6 +112,11 @@ class FileContentView(RetrieveAPIView):
 
 
 class ImageContentView(FileContentView):
+    allowed_sizes = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        rendition_sizes.update(cls.allowed_sizes.values())
 
     def get_random_image_url(self):
         if 'x' in self.kwargs['size']:
@@ -128,6 +133,9 @@ class ImageContentView(FileContentView):
         else:
             return instance
 
+    def accepts_webp(self):
+        return 'image/webp' in self.request.META.get('HTTP_ACCEPT', '')
+
     def retrieve(self, *args, **kwargs):
         image = self.get_image()
         if not image or not image.file:
@@ -135,40 +143,23 @@ class ImageContentView(FileContentView):
                 return HttpResponseRedirect(self.get_random_image_url())
             return HttpResponseNotFound()
 
-        file = image.file
+        size = self.kwargs['size']
 
-        if self.kwargs['size'] not in self.allowed_sizes.values() and self.kwargs['size'] != ORIGINAL_SIZE:
+        if size not in self.allowed_sizes.values() and size != ORIGINAL_SIZE:
             return HttpResponseNotFound()
 
-        size = self.kwargs['size']
-        cropbox = None
-
-        if self.kwargs['size'] != ORIGINAL_SIZE and image.cropbox:
-            try:
-                left, upper, right, lower = map(int, image.cropbox.split(','))
-                if right <= left:
-                    left, right = min(left, right), max(left, right)
-                if lower <= upper:
-                    upper, lower = min(upper, lower), max(upper, lower)
-                cropbox = (left, upper, right, lower)
-            except ValueError:
-                cropbox = None
-
-        try:
-            if 'x' in size:
-                width, height = size.split('x')
-            else:
-                width = height = size
-            if width == height and int(width) < 300:
-                thumbnail = get_thumbnail(file, size, crop='center', cropbox=cropbox)
-            else:
-                thumbnail = get_thumbnail(file, size, cropbox=cropbox)
-        except ValueError:
-            thumbnail = get_thumbnail(file, size, cropbox=cropbox)
-        except ZeroDivisionError:
-            thumbnail = get_thumbnail(file, size)
+        rendition = get_rendition(image, size, webp=self.accepts_webp())
+        if rendition and not settings.DEBUG:
+            # Generated before, so there is no need to check the storage
+            url, content_type = rendition
+            response = HttpResponse()
+            response['Content-Type'] = content_type
+            response['X-Accel-Redirect'] = url
+            response['Vary'] = 'Accept'
+            return response
 
-        content_type = mimetypes.guess_type(file.name)[0]
+        thumbnail = render(image, size)
+        content_type = mimetypes.guess_type(image.file.name)[0]
 
         if settings.DEBUG:
             try:
@@ -72,7 +72,7 @@ class BaseTransitionEffect(Effect):
     def is_valid(self):
         return (
             super().is_valid and
-            self.transition in self.machine.possible_transitions()
+            self.machine.is_possible(self.transition)
         )
 
     def pre_save(self, **kwargs):
@@ -1,34 +1,121 @@
+import logging
+import time
+
 from builtins import str
 from builtins import object
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.utils.translation import gettext_lazy as _
 from future.utils import python_2_unicode_compatible
 
+from bluebottle.utils.cache import get_tenant_cache_name
+
+logger = logging.getLogger('bluebottle')
+
 
 @python_2_unicode_compatible
 class ModelPeriodicTask(object):
+    """
+    Applies `effects` to every instance returned by `get_queryset`.
+
+    Instances are loaded in chunks of `batch_size`, ordered by primary key. Every chunk runs in
+    one transaction and every instance in a savepoint, so an instance that fails is rolled
+    back and logged without stopping the other instances.
+
+    Subclasses can load relations with the chunk with `select_related` and `prefetch_related`,
+    and compute values that conditions use in `annotate`. Only annotate values that the
+    effects of the chunk do not change.
+    """
+
+    batch_size = None
+    select_related = ()
+    prefetch_related = ()
 
     def __init__(self, model, field='states'):
         self.model = model
         self.field = field
+        self.stats = None
 
     def get_queryset(self):
         raise NotImplementedError
 
     effects = []
 
+    def annotate(self, queryset):
+        return queryset
+
+    def get_batch_size(self):
+        return self.batch_size or getattr(settings, 'PERIODIC_TASK_BATCH_SIZE', 100)
+
+    def get_chunks(self):
+        queryset = self.annotate(self.get_queryset()).order_by('pk')
+
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+
+        last = None
+        while True:
+            chunk = queryset if last is None else queryset.filter(pk__gt=last)
+            chunk = list(chunk[:self.get_batch_size()])
+            if not chunk:
+                break
+
+            yield chunk
+            last = chunk[-1].pk
+
+    def execute_instance(self, instance):
+        accumulated_effects = []
+
+        for effect_class in self.effects:
+            effect = effect_class(instance)
+            if effect.is_valid and effect not in accumulated_effects:
+                effect.pre_save(effects=accumulated_effects)
+                if effect.post_save:
+                    instance._postponed_effects.insert(0, effect)
+                accumulated_effects.append(effect)
+
+        instance.save()
+
+    def get_stats_key(self):
+        return get_tenant_cache_name(
+            f'periodic_task_{self.model._meta.label_lower}_{self.__class__.__name__}'
+        )
+
+    def get_stats(self):
+        return cache.get(self.get_stats_key())
+
     def execute(self):
-        for instance in self.get_queryset():
-            accumulated_effects = []
-
-            for effect_class in self.effects:
-                effect = effect_class(instance)
-                if effect.is_valid and effect not in accumulated_effects:
-                    effect.pre_save(effects=accumulated_effects)
-                    if effect.post_save:
-                        instance._postponed_effects.insert(0, effect)
-                    accumulated_effects.append(effect)
-
-            instance.save()
+        started = time.monotonic()
+        processed = failed = 0
+
+        for chunk in self.get_chunks():
+            with transaction.atomic():
+                for instance in chunk:
+                    try:
+                        with transaction.atomic():
+                            self.execute_instance(instance)
+                        processed += 1
+                    except Exception:
+                        logger.exception(f'{self.__class__.__name__} failed for {instance.pk}')
+                        failed += 1
+
+        duration = time.monotonic() - started
+        self.stats = {
+            'processed': processed,
+            'failed': failed,
+            'duration': duration,
+            'per_second': processed / duration if duration else None,
+        }
+
+        if processed or failed:
+            logger.info(
+                f'{self.__class__.__name__}: {processed} processed, {failed} failed in {duration:.2f}s'
+            )
+        cache.set(self.get_stats_key(), self.stats, None)
+        return self.stats
 
     def __str__(self):
         return str(_("Periodic task") + ": " + self.__class__.__name__)
@@ -12,6 +12,25 @@ class TransitionNotPossible(Exception):
     pass
 
 
+class StateMachineDescriptor(object):
+    """
+    Creates the state machine of an instance when it is first accessed, instead of for
+    every instance that is loaded. On the model class it returns the state machine class.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        machine_class = owner._state_machines[self.name]
+        if instance is None:
+            return machine_class
+
+        machine = machine_class(instance)
+        instance.__dict__[self.name] = machine
+        return machine
+
+
 def register(model_cls):
     def _register(state_machine_cls):
         if not hasattr(model_cls, '_state_machines'):
@@ -20,6 +39,7 @@ def register(model_cls):
             model_cls._state_machines = dict(model_cls._state_machines)
 
         model_cls._state_machines[state_machine_cls.name] = state_machine_cls
+        setattr(model_cls, state_machine_cls.name, StateMachineDescriptor(state_machine_cls.name))
         return state_machine_cls
 
     return _register
@@ -66,7 +86,7 @@ class BaseTransition(object):
         return [source.value for source in self.sources]
 
     def is_valid(self, machine):
-        if not all(condition(machine) for condition in self.conditions):
+        if not all(machine.check_condition(condition) for condition in self.conditions):
             raise TransitionNotPossible(
                 _('Conditions not met for transition')
             )
@@ -141,6 +161,11 @@ class Transition(BaseTransition):
             return result
 
     def on_execute(self, machine, save=False, **kwargs):
+        # Logged when the instance is saved, see `TriggerMixin.save`
+        transitions = getattr(machine.instance, '_transitions', None)
+        if transitions is not None:
+            transitions.append(self)
+
         pre_state_transition.send(
             sender=machine.instance.__class__,
             instance=machine.instance,
@@ -231,34 +256,78 @@ class StateMachineMeta(type):
 
         result.transitions = transitions
 
+        # Lookup tables, so that accessing the current state and the candidate transitions
+        # does not scan all states and transitions
+        result._states_by_value = {}
+        for state in states.values():
+            result._states_by_value.setdefault(state.value, state)
+
+        result._initial_transitions = [
+            transition for transition in transitions.values()
+            if EmptyState() in transition.sources
+        ]
+        result._transition_table = {}
+
         return result
 
 
 class StateMachine(with_metaclass(StateMachineMeta, object)):
     @property
     def initial_transition(self):
-        initial_transitions = [
-            transition
-            for transition in list(self.transitions.values())
-            if EmptyState() in transition.sources
-        ]
-        if (len(initial_transitions)) > 1:
+        if (len(self._initial_transitions)) > 1:
             raise AssertionError(
                 'Found multiple transitions from empty state'
             )
 
-        if initial_transitions:
-            return initial_transitions[0]
+        if self._initial_transitions:
+            return self._initial_transitions[0]
 
     @property
     def current_state(self):
-        for state in list(self.states.values()):
-            if state.value == self.state:
-                return state
+        try:
+            return self._states_by_value.get(self.state)
+        except TypeError:
+            return None
+
+    @classmethod
+    def get_candidate_transitions(cls, state):
+        """
+        The transitions that can start in `state`, without checking their conditions.
+        They are computed once per state and machine class.
+        """
+        try:
+            return cls._transition_table[state]
+        except KeyError:
+            candidates = [
+                transition for transition in cls.transitions.values()
+                if state in transition.source_values or (
+                    AllStates() in transition.sources and state != transition.target.value
+                )
+            ]
+            cls._transition_table[state] = candidates
+            return candidates
+        except TypeError:
+            return list(cls.transitions.values())
+
+    def check_condition(self, condition):
+        return condition(self)
+
+    def is_possible(self, transition, **kwargs):
+        """
+        Whether `transition` is one of the `possible_transitions`
+        """
+        if not any(candidate is transition for candidate in self.get_candidate_transitions(self.state)):
+            return False
+
+        try:
+            transition.can_execute(self, **kwargs)
+            return True
+        except TransitionNotPossible:
+            return False
 
     def possible_transitions(self, **kwargs):
         result = []
-        for transition in list(self.transitions.values()):
+        for transition in self.get_candidate_transitions(self.state):
             try:
                 transition.can_execute(self, **kwargs)
                 result.append(transition)
@@ -293,5 +362,27 @@ class ModelStateMachine(with_metaclass(ModelStateMachineMeta, StateMachine)):
     def state(self, state):
         setattr(self.instance, self.field, state)
 
+        # Conditions might depend on the new state
+        if getattr(self.instance, '_condition_memo', None):
+            self.instance._condition_memo.clear()
+
+    def check_condition(self, condition):
+        """
+        Evaluate `condition`. While the triggers of the instance are executed, see
+        `TriggerMixin.execute_triggers`, the result is remembered until the state changes.
+        """
+        memo = getattr(self.instance, '_condition_memo', None)
+        if memo is None:
+            return condition(self)
+
+        key = (self.name, self.state, condition)
+        try:
+            return memo[key]
+        except KeyError:
+            memo[key] = result = condition(self)
+            return result
+        except TypeError:
+            return condition(self)
+
     def save(self):
         self.instance.save()
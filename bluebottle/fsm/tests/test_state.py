@@ -7,6 +7,7 @@ from bluebottle.fsm.state import (
     ModelStateMachine,
     State,
     StateMachine,
+    StateMachineDescriptor,
     Transition,
     TransitionNotPossible,
 )
@@ -41,6 +42,11 @@ class DummyModelStateMachine(ModelStateMachine):
     )
 
 
+class LazyModel(DummyModel):
+    _state_machines = {'states': DummyModelStateMachine}
+    states = StateMachineDescriptor('states')
+
+
 class SimpleMachine(StateMachine):
     draft = DraftState()
     published = PublishedState()
@@ -79,3 +85,77 @@ class StateMachineTestCase(TestCase):
 
     def test_empty_state_singleton(self):
         self.assertIs(EmptyState(), EmptyState())
+
+    def test_lazy_state_machine(self):
+        model = LazyModel()
+        self.assertFalse('states' in model.__dict__)
+
+        machine = model.states
+        self.assertIs(machine.instance, model)
+        self.assertIs(model.states, machine)
+        self.assertIs(LazyModel.states, DummyModelStateMachine)
+
+    def test_candidate_transitions(self):
+        self.assertEqual(
+            DummyModelStateMachine.get_candidate_transitions('draft'),
+            [DummyModelStateMachine.publish]
+        )
+        self.assertEqual(DummyModelStateMachine.get_candidate_transitions('published'), [])
+
+    def test_current_state(self):
+        machine = DummyModelStateMachine(DummyModel(status='published'))
+        self.assertIs(machine.current_state, DummyModelStateMachine.published)
+
+        machine = DummyModelStateMachine(DummyModel(status='unknown'))
+        self.assertIsNone(machine.current_state)
+
+    def test_is_possible(self):
+        machine = DummyModelStateMachine(DummyModel())
+        self.assertTrue(machine.is_possible(DummyModelStateMachine.publish, automatic=False))
+        self.assertFalse(machine.is_possible(DummyModelStateMachine.publish))
+
+        machine = DummyModelStateMachine(DummyModel(status='published'))
+        self.assertFalse(machine.is_possible(DummyModelStateMachine.publish, automatic=False))
+
+
+class ConditionMemoTestCase(TestCase):
+    def setUp(self):
+        self.calls = 0
+
+        def condition(machine):
+            self.calls += 1
+            return True
+
+        class ConditionalStateMachine(ModelStateMachine):
+            draft = DraftState()
+            published = PublishedState()
+            publish = Transition(
+                [DraftState()],
+                PublishedState(),
+                name='publish',
+                conditions=[condition],
+            )
+
+        self.model = DummyModel()
+        self.machine = ConditionalStateMachine(self.model)
+
+    def test_without_memo(self):
+        self.machine.possible_transitions()
+        self.machine.possible_transitions()
+        self.assertEqual(self.calls, 2)
+
+    def test_memo(self):
+        self.model._condition_memo = {}
+
+        self.machine.possible_transitions()
+        self.machine.possible_transitions()
+        self.assertEqual(self.calls, 1)
+
+    def test_memo_state_change(self):
+        self.model._condition_memo = {}
+
+        self.machine.possible_transitions()
+        self.machine.state = 'published'
+        self.machine.state = 'draft'
+        self.machine.possible_transitions()
+        self.assertEqual(self.calls, 2)
@@ -1,6 +1,10 @@
+from django.db.models import DEFERRED
 from django.test import TestCase
 
-from bluebottle.fsm.triggers import ModelChangedTrigger, Trigger
+from bluebottle.fsm.triggers import (
+    InitialValues, ModelChangedTrigger, ModelCreatedTrigger, ModelDeletedTrigger, Trigger, TransitionTrigger,
+    TriggerIndex
+)
 
 
 class TriggerTestCase(TestCase):
@@ -44,3 +48,91 @@ class TriggerTestCase(TestCase):
         instance = type('Instance', (), {'_postponed_effects': []})()
         trigger.execute(instance, [])
         self.assertEqual(len(executed), 1)
+
+
+class TriggerIndexTestCase(TestCase):
+    def setUp(self):
+        self.transition = object()
+        self.title_changed = ModelChangedTrigger(fields=['title'])
+        self.transitioned = TransitionTrigger(self.transition)
+        self.description_changed = ModelChangedTrigger(fields=['description'])
+        self.created = ModelCreatedTrigger()
+        self.deleted = ModelDeletedTrigger()
+        self.title_changed_again = ModelChangedTrigger(fields='title')
+
+        self.index = TriggerIndex([
+            self.title_changed,
+            self.transitioned,
+            self.description_changed,
+            self.created,
+            self.deleted,
+            self.title_changed_again,
+        ])
+
+    def test_index(self):
+        self.assertEqual(self.index.transitions[self.transition], [self.transitioned])
+        self.assertEqual(self.index.created, [self.created])
+        self.assertEqual(self.index.deleted, [self.deleted])
+        self.assertFalse(object() in self.index.transitions)
+
+    def test_changed(self):
+        instance = type('Instance', (), {
+            '_initial_values': {'title': 'before', 'description': 'before'},
+            'title': 'after',
+            'description': 'before',
+        })()
+        self.assertEqual(
+            self.index.get_changed(instance), [self.title_changed, self.title_changed_again]
+        )
+
+        instance.description = 'after'
+        self.assertEqual(
+            self.index.get_changed(instance),
+            [self.title_changed, self.description_changed, self.title_changed_again]
+        )
+
+
+class InitialValuesTestCase(TestCase):
+    def setUp(self):
+        self.names = {'title': 0, 'status': 1, 'description': 2}
+
+    def test_read(self):
+        initial = InitialValues(self.names, ('title', 'draft', None))
+
+        self.assertEqual(initial.get('title'), 'title')
+        self.assertEqual(initial['status'], 'draft')
+        self.assertIsNone(initial.get('description', 'default'))
+        self.assertEqual(initial.get('owner_id', 'default'), 'default')
+        self.assertTrue('status' in initial)
+        self.assertFalse('owner_id' in initial)
+        self.assertEqual(len(initial), 3)
+        self.assertEqual(
+            initial.items(), [('title', 'title'), ('status', 'draft'), ('description', None)]
+        )
+
+        with self.assertRaises(KeyError):
+            initial['owner_id']
+
+    def test_deferred(self):
+        instance = type('Instance', (), {'description': 'loaded later'})()
+        initial = InitialValues(self.names, ('title', 'draft', DEFERRED), instance)
+
+        self.assertEqual(initial.get('description'), 'loaded later')
+
+    def test_deferred_assigned(self):
+        instance = type('Instance', (), {})()
+        initial = InitialValues(self.names, ('title', 'draft', DEFERRED), instance)
+
+        instance.description = 'changed'
+        self.assertIsNone(initial.get('description'))
+
+    def test_deferred_loaded(self):
+        instance = type('Instance', (), {})()
+        initial = InitialValues(self.names, ('title', 'draft', DEFERRED), instance)
+
+        instance.description = 'loaded'
+        initial.loaded(['description'])
+        instance.description = 'changed'
+
+        self.assertEqual(initial.get('description'), 'loaded')
+        self.assertIsNone(initial.instance)
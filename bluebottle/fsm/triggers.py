@@ -1,9 +1,14 @@
 from builtins import object
 from builtins import str
+from collections import defaultdict
+from threading import local
 
 from django.contrib.admin.models import LogEntry
 from django.contrib.admin.options import get_content_type_for_model
-from django.db.models.signals import post_delete, pre_delete
+from django.db.models import DEFERRED
+from django.db.models.fields.related_descriptors import ForeignKeyDeferredAttribute
+from django.db.models.query_utils import DeferredAttribute
+from django.db.models.signals import class_prepared, post_delete, pre_delete
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from django_tools.middlewares.ThreadLocal import get_current_user
@@ -40,6 +45,11 @@ class Trigger(object):
             if effect.is_valid and effect not in previous_effects:
                 previous_effects.append(effect)
                 effect.pre_save(effects=previous_effects)
+
+                # The effect might have changed what conditions depend on
+                if getattr(instance, '_condition_memo', None):
+                    instance._condition_memo.clear()
+
                 if effect.post_save and effect not in instance._postponed_effects:
 
                     instance._postponed_effects.insert(0, effect)
@@ -88,20 +98,15 @@ class ModelCreatedTrigger(Trigger):
         return str(_("Model has been created"))
 
 
-@receiver(pre_delete)
 def pre_delete_trigger(sender, instance, **kwargs):
-    if issubclass(sender, TriggerMixin) and hasattr(instance, 'triggers'):
-        for trigger in instance.triggers.triggers:
-            if isinstance(trigger, ModelDeletedTrigger):
-                BoundTrigger(instance, trigger).execute([])
+    for trigger in sender._trigger_index.deleted:
+        BoundTrigger(instance, trigger).execute([])
 
 
-@receiver(post_delete)
 def post_delete_trigger(sender, instance, **kwargs):
-    if issubclass(sender, TriggerMixin) and hasattr(instance, 'triggers'):
-        while instance._postponed_effects:
-            effect = instance._postponed_effects.pop()
-            effect.post_save()
+    while instance._postponed_effects:
+        effect = instance._postponed_effects.pop()
+        effect.post_save()
 
 
 @python_2_unicode_compatible
@@ -117,38 +122,218 @@ class TransitionTrigger(Trigger):
         return "MISSING TITLE"
 
 
-@receiver(pre_state_transition)
 def transition_trigger(sender, instance, transition, **kwargs):
-    if issubclass(sender, TriggerMixin):
-        instance._transitions.append(transition)
-        if hasattr(instance, 'triggers'):
-            for trigger in instance.triggers.triggers:
-                if isinstance(trigger, TransitionTrigger) and trigger.transition == transition:
-                    instance._triggers.append(BoundTrigger(instance, trigger))
+    for trigger in sender._trigger_index.transitions.get(transition, ()):
+        instance._triggers.append(BoundTrigger(instance, trigger))
+
+
+class TriggerIndex(object):
+    """
+    The triggers of a model, indexed by what fires them: transitions, changes of a set of
+    fields, creation and deletion. Built once, when the triggers are registered.
+    """
+
+    def __init__(self, triggers):
+        self.triggers = triggers
+        self.positions = dict((trigger, position) for position, trigger in enumerate(triggers))
+
+        self.transitions = defaultdict(list)
+        self.changed = defaultdict(list)
+        self.created = []
+        self.deleted = []
+
+        for trigger in triggers:
+            if isinstance(trigger, TransitionTrigger):
+                self.transitions[trigger.transition].append(trigger)
+            elif isinstance(trigger, ModelChangedTrigger):
+                self.changed[tuple(trigger.fields)].append(trigger)
+            elif isinstance(trigger, ModelCreatedTrigger):
+                self.created.append(trigger)
+            elif isinstance(trigger, ModelDeletedTrigger):
+                self.deleted.append(trigger)
+
+    def get_changed(self, instance):
+        """
+        The model changed triggers whose fields changed, in the order they were registered
+        """
+        result = []
+        for triggers in self.changed.values():
+            # Triggers that watch the same fields change together
+            if triggers[0].changed(instance):
+                result += triggers
+
+        return sorted(result, key=self.positions.__getitem__)
+
+
+trigger_receivers = (
+    (pre_delete, pre_delete_trigger),
+    (post_delete, post_delete_trigger),
+    (pre_state_transition, transition_trigger),
+)
+
+
+def connect_trigger_receivers(model_cls):
+    for signal, trigger_receiver in trigger_receivers:
+        signal.connect(trigger_receiver, sender=model_cls, dispatch_uid=f'fsm_{trigger_receiver.__name__}')
+
+    # Subclasses that are not registered themselves use the triggers of this model
+    for subclass in model_cls.__subclasses__():
+        if subclass._trigger_index is model_cls._trigger_index:
+            connect_trigger_receivers(subclass)
+
+
+@receiver(class_prepared)
+def connect_subclass_trigger_receivers(sender, **kwargs):
+    if getattr(sender, '_trigger_index', None) is not None:
+        connect_trigger_receivers(sender)
 
 
 def register(model_cls):
     def _register(TriggerManager):
         model_cls.triggers = TriggerManager()
+        model_cls._trigger_index = TriggerIndex(model_cls.triggers.triggers)
+        connect_trigger_receivers(model_cls)
         return TriggerManager
 
     return _register
 
 
+loading = local()
+attnames_cache = {}
+
+
+def get_descriptor(model_cls, name):
+    for klass in model_cls.__mro__:
+        if name in klass.__dict__:
+            return klass.__dict__[name]
+
+
+def get_attnames(model_cls, relations=True):
+    """
+    The attnames of the fields of a model, a dict that maps them to their position, and the
+    positions of the fields whose value is converted when it is read, like money and files.
+    """
+    try:
+        return attnames_cache[(model_cls, relations)]
+    except KeyError:
+        attnames = tuple(
+            field.attname for field in model_cls._meta.fields
+            if relations or not field.is_relation
+        )
+        converted = tuple(
+            index for index, name in enumerate(attnames)
+            if type(get_descriptor(model_cls, name)) not in (DeferredAttribute, ForeignKeyDeferredAttribute)
+        )
+        result = (attnames, dict((name, index) for index, name in enumerate(attnames)), converted)
+        attnames_cache[(model_cls, relations)] = result
+        return result
+
+
+class InitialValues(object):
+    """
+    The values of the fields of an instance when it was created, loaded or saved, with the
+    read methods of a dict.
+
+    Values are kept in a tuple next to a mapping of field to position that is shared by all
+    instances of the model. Fields that were deferred are kept when they are loaded from the
+    database, see `TriggerMixin.refresh_from_db`, or loaded when they are first asked for.
+    """
+    __slots__ = ('names', 'values', 'instance')
+
+    def __init__(self, names, values, instance=None):
+        self.names = names
+        self.values = values
+        self.instance = instance
+
+    @classmethod
+    def snapshot(cls, instance, relations=True, row=None):
+        """
+        The current values of `instance`. `row` are the values of all fields that the
+        instance was just loaded from, which are kept instead of copied where possible.
+        """
+        attnames, names, converted = get_attnames(type(instance), relations)
+        if row is not None and not converted:
+            return cls(names, row)
+
+        if row is None:
+            data = instance.__dict__
+            values = [data.get(name, DEFERRED) for name in attnames]
+        else:
+            values = list(row)
+
+        for index in converted:
+            # Read the way the model reads it, so it can be compared to the current value
+            if values[index] is not DEFERRED:
+                values[index] = getattr(instance, attnames[index])
+
+        if any(value is DEFERRED for value in values):
+            return cls(names, tuple(values), instance)
+        return cls(names, tuple(values))
+
+    def get(self, key, default=None):
+        try:
+            value = self.values[self.names[key]]
+        except KeyError:
+            return default
+
+        if value is DEFERRED:
+            if key in self.instance.__dict__:
+                # Assigned without being loaded first: the initial value is not known
+                return default
+
+            value = getattr(self.instance, key, default)
+            self.loaded([key])
+        return value
+
+    def loaded(self, fields):
+        """
+        Keep the values of deferred `fields` that were just loaded into the instance.
+        """
+        values = list(self.values)
+        for name in fields:
+            index = self.names.get(name)
+            if index is not None and values[index] is DEFERRED:
+                values[index] = getattr(self.instance, name)
+
+        self.values = tuple(values)
+        if not any(value is DEFERRED for value in values):
+            self.instance = None
+
+    def __getitem__(self, key):
+        if key not in self.names:
+            raise KeyError(key)
+        return self.get(key)
+
+    def __contains__(self, key):
+        return key in self.names
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def keys(self):
+        return self.names.keys()
+
+    def items(self):
+        return [(key, self.get(key)) for key in self.names]
+
+
 class TriggerMixin(object):
     periodic_tasks = []
+    _trigger_index = None
 
     def __copy__(self):
         result = self.__class__.__new__(self.__class__)
         result.__dict__.update(self.__dict__)
+        result._condition_memo = None
 
-        # create a new statemachine when copying models.
-        # Without this model.states.instance still points to the old model,
-        # and state changes are only reflected on the old model.
-        for name, machine_class in list(result._state_machines.items()):
-            machine = machine_class(result)
-
-            setattr(result, name, machine)
+        # Drop the state machines of the old model, they are created again for the copy
+        # when they are accessed. Without this model.states.instance still points to
+        # the old model, and state changes are only reflected on the old model.
+        for name in getattr(result, '_state_machines', {}):
+            result.__dict__.pop(name, None)
 
         return result
 
@@ -158,17 +343,23 @@ class TriggerMixin(object):
         self._triggers = []
         self._postponed_effects = []
         self._transitions = []
+        self._condition_memo = None
 
-        if hasattr(self, '_state_machines'):
-            for name, machine_class in list(self._state_machines.items()):
-                machine = machine_class(self)
+        # State machines are created when they are first accessed, see
+        # `bluebottle.fsm.state.StateMachineDescriptor`.
+        # Instances that are loaded from the database get their initial values in `from_db`
+        if not getattr(loading, 'active', False):
+            self._initial_values = InitialValues.snapshot(self)
 
-                setattr(self, name, machine)
+    def refresh_from_db(self, *args, **kwargs):
+        deferred = self.get_deferred_fields()
+        super(TriggerMixin, self).refresh_from_db(*args, **kwargs)
 
-        self._initial_values = {}
-        for field in self._meta.fields:
-            field_name = f'{field.name}_id' if field.is_relation else field.name
-            self._initial_values[field_name] = getattr(self, field_name)
+        initial = getattr(self, '_initial_values', None)
+        if deferred and isinstance(initial, InitialValues) and initial.instance is not None:
+            # Deferred fields are loaded through here: keep their loaded value before it
+            # can be changed
+            initial.loaded(deferred - self.get_deferred_fields())
 
     @classmethod
     def get_periodic_tasks(cls):
@@ -179,26 +370,36 @@ class TriggerMixin(object):
 
     @classmethod
     def from_db(cls, db, field_names, values):
-        instance = super(TriggerMixin, cls).from_db(db, field_names, values)
-        instance._initial_values = {}
-        for field in instance._meta.fields:
-            field_name = f'{field.name}_id' if field.is_relation else field.name
-            instance._initial_values[field_name] = getattr(instance, field_name)
+        active = getattr(loading, 'active', False)
+        loading.active = True
+        try:
+            instance = super(TriggerMixin, cls).from_db(db, field_names, values)
+        finally:
+            loading.active = active
+
+        # The ORM passes the same field names for every row of a queryset
+        loaded_cls, loaded, complete = getattr(loading, 'field_names', (None, None, False))
+        if loaded_cls is not cls or loaded is not field_names:
+            complete = tuple(field_names) == get_attnames(cls)[0]
+            loading.field_names = (cls, field_names, complete)
+
+        if complete:
+            # Keep the row that the instance was loaded from, instead of copying it
+            instance._initial_values = InitialValues.snapshot(instance, row=values)
+        else:
+            instance._initial_values = InitialValues.snapshot(instance)
 
         return instance
 
     def _check_model_changed_triggers(self):
-        if hasattr(self, 'triggers'):
-            for trigger in self.triggers.triggers:
-                if isinstance(trigger, ModelChangedTrigger):
-                    if trigger.changed(self):
-                        self._triggers.append(BoundTrigger(self, trigger))
+        if self._trigger_index:
+            for trigger in self._trigger_index.get_changed(self):
+                self._triggers.append(BoundTrigger(self, trigger))
 
     def _check_model_created_triggers(self):
-        if hasattr(self, 'triggers') and not self.pk:
-            for trigger in self.triggers.triggers:
-                if isinstance(trigger, ModelCreatedTrigger):
-                    self._triggers.append(BoundTrigger(self, trigger))
+        if self._trigger_index and not self.pk:
+            for trigger in self._trigger_index.created:
+                self._triggers.append(BoundTrigger(self, trigger))
 
     def execute_triggers(self, effects=None, **options):
         if 'user' not in options and get_current_user():
@@ -214,29 +415,50 @@ class TriggerMixin(object):
                     options['message'] = custom_message
                     break
 
-        if hasattr(self, '_state_machines'):
-            for machine_name in self._state_machines:
-                machine = getattr(self, machine_name)
-                if not machine.state and machine.initial_transition:
-                    machine.initial_transition.execute(machine)
+        # Remember the results of transition conditions during this pass, see
+        # `ModelStateMachine.check_condition`. Nested passes share the memo.
+        memoize = getattr(self, '_condition_memo', None) is None
+        if memoize:
+            self._condition_memo = {}
 
-        self._check_model_changed_triggers()
-        self._check_model_created_triggers()
+        try:
+            if hasattr(self, '_state_machines'):
+                for machine_name in self._state_machines:
+                    machine = getattr(self, machine_name)
+                    if not machine.state and machine.initial_transition:
+                        machine.initial_transition.execute(machine)
 
-        if effects is None:
-            effects = []
+            self._check_model_changed_triggers()
+            self._check_model_created_triggers()
 
-        while self._triggers:
-            trigger = self._triggers.pop()
-            trigger.execute(effects, **options)
+            if effects is None:
+                effects = []
 
-        self._triggers = []
+            while self._triggers:
+                trigger = self._triggers.pop()
+                trigger.execute(effects, **options)
+
+            self._triggers = []
+        finally:
+            if memoize:
+                self._condition_memo = None
 
         return effects
 
     def save(self, run_triggers=True, *args, **kwargs):
         if run_triggers:
-            self.execute_triggers()
+            if kwargs.get('update_fields') is not None:
+                deferred = self.get_deferred_fields()
+                before = InitialValues.snapshot(self)
+                self.execute_triggers()
+
+                # Also save what the triggers changed
+                kwargs['update_fields'] = set(kwargs['update_fields']) | set(
+                    name for name in before
+                    if name not in deferred and before.get(name) != getattr(self, name)
+                )
+            else:
+                self.execute_triggers()
 
         super(TriggerMixin, self).save(*args, **kwargs)
 
@@ -247,11 +469,7 @@ class TriggerMixin(object):
 
             self._postponed_effects = []
 
-        self._initial_values = dict(
-            (field.name, getattr(self, field.name))
-            for field in self._meta.fields
-            if not field.is_relation
-        )
+        self._initial_values = InitialValues.snapshot(self, relations=False)
 
         current_user = get_current_user()
         if current_user and current_user.is_authenticated:
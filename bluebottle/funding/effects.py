@@ -8,6 +8,7 @@ from future.utils import python_2_unicode_compatible
 from bluebottle.fsm.effects import Effect
 from bluebottle.fsm.state import TransitionNotPossible
 from bluebottle.funding.models import MoneyContribution
+from bluebottle.funding.totals import get_donated, update_donor_amounts
 from bluebottle.payouts_dorado.adapters import DoradoPayoutAdapter
 from bluebottle.updates.models import Update
 
@@ -49,8 +50,18 @@ class UpdateFundingAmountsEffect(Effect):
 
     display = False
 
+    def pre_save(self, **kwargs):
+        self.created = not self.instance.pk
+        self.previous = None
+        if not self.created:
+            initial = self.instance._initial_values
+            self.previous = get_donated(initial.get('status'), initial.get('payout_amount'))
+
     def post_save(self, **kwargs):
-        self.instance.activity.update_amounts()
+        if hasattr(self, 'previous'):
+            update_donor_amounts(self.instance, self.previous, self.created)
+        else:
+            self.instance.activity.update_amounts()
 
     def __str__(self):
         return _('Update total amounts')
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_datetime
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.funding.models import PaymentWebhookEvent
+from bluebottle.funding.webhooks import get_blocked_queues, process_queue
+
+
+class Command(BaseCommand):
+    help = "Process stored payment webhook events again, by default the ones that failed"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--schema", dest="schema_name", help="specify tenant schema, defaults to all tenants"
+        )
+        parser.add_argument("--provider", help="only replay the events of this provider")
+        parser.add_argument("--event", dest="event_ids", action="append", help="only replay this event id")
+        parser.add_argument(
+            "--status", default="failed", choices=["new", "failed", "processed"],
+            help="replay the events with this status, defaults to failed"
+        )
+        parser.add_argument("--since", help="only replay the events received after this date")
+        parser.add_argument(
+            "--dry-run", action="store_true", default=False,
+            help="only report the events that would be replayed"
+        )
+
+    def handle(self, *args, **options):
+        tenants = Client.objects.all()
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+
+        for tenant in tenants:
+            with LocalTenant(tenant, clear_tenant=True):
+                events = PaymentWebhookEvent.objects.filter(status=options['status'])
+                if options['provider']:
+                    events = events.filter(provider=options['provider'])
+                if options['event_ids']:
+                    events = events.filter(event_id__in=options['event_ids'])
+                if options['since']:
+                    events = events.filter(received__gte=parse_datetime(options['since']))
+
+                queues = set(events.values_list('provider', 'queue'))
+                count = events.count()
+
+                if not options['dry_run']:
+                    events.update(status='new')
+                    for provider, queue in sorted(queues):
+                        process_queue(provider, queue)
+
+                self.stdout.write(
+                    "{}: {} events in {} queues {}".format(
+                        tenant.client_name, count, len(queues),
+                        'to replay' if options['dry_run'] else 'replayed'
+                    )
+                )
+
+                # Events are processed in order, so a queue stays blocked by a failed
+                # event that was not selected, or that failed again
+                for provider, queue, event in get_blocked_queues():
+                    if (provider, queue) not in queues:
+                        continue
+                    if options['dry_run'] and events.filter(pk=event.pk).exists():
+                        continue
+
+                    self.stdout.write(
+                        "{}: queue {} of {} is blocked by {}, replay it with --event {}".format(
+                            tenant.client_name, queue, provider, event, event.event_id
+                        )
+                    )
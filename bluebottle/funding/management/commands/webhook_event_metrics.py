@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.funding.webhooks import get_metrics
+
+
+class Command(BaseCommand):
+    help = "Report the number, duplicates and processing lag of payment webhook events"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--schema", dest="schema_name", help="specify tenant schema, defaults to all tenants"
+        )
+        parser.add_argument(
+            "--hours", type=int, default=24, help="report the events of the last hours, defaults to 24"
+        )
+
+    def handle(self, *args, **options):
+        tenants = Client.objects.all()
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+
+        since = now() - timedelta(hours=options['hours'])
+        for tenant in tenants:
+            with LocalTenant(tenant, clear_tenant=True):
+                for provider, metrics in sorted(get_metrics(since).items()):
+                    self.stdout.write(
+                        "{}: {} {}".format(
+                            tenant.client_name, provider,
+                            ', '.join('{}={}'.format(key, value) for key, value in sorted(metrics.items()))
+                        )
+                    )
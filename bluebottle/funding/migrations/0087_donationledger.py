@@ -0,0 +1,28 @@
+# Generated by Django 5.2.13 on 2026-10-18 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funding', '0086_remove_fundingplatformsettings_allow_anonymous_rewards_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DonationLedger',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('currency', models.CharField(max_length=3)),
+                ('donated', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('pledged', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('funding', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='donation_ledger', to='funding.funding')),
+            ],
+            options={
+                'unique_together': {('funding', 'currency')},
+            },
+        ),
+    ]
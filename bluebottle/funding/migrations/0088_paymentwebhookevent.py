@@ -0,0 +1,37 @@
+# Generated by Django 5.2.13 on 2026-10-18 15:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funding', '0087_donationledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentWebhookEvent',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(max_length=30)),
+                ('event_id', models.CharField(help_text='Id of the event at the payment provider', max_length=255)),
+                ('event_type', models.CharField(max_length=100)),
+                ('queue', models.CharField(help_text='Events with the same queue, like the events of one payment, are processed in order', max_length=255)),
+                ('payload', models.JSONField()),
+                ('status', models.CharField(choices=[('new', 'New'), ('processed', 'Processed'), ('failed', 'Failed')], default='new', max_length=20)),
+                ('result', models.TextField(blank=True)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('duplicates', models.PositiveIntegerField(default=0, help_text='Number of times the provider sent the event again')),
+                ('received', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'payment webhook event',
+                'verbose_name_plural': 'payment webhook events',
+                'indexes': [models.Index(fields=['provider', 'queue', 'status'], name='funding_webhook_queue')],
+                'unique_together': {('provider', 'event_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('funding', '0088_paymentwebhookevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='paymentwebhookevent',
+            name='attempted',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
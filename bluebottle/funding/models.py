@@ -6,7 +6,7 @@ from builtins import object, range
 
 from babel.numbers import get_currency_name
 from django.core.exceptions import ValidationError
-from django.db import connection, models
+from django.db import connection, models, transaction
 from django.db.models import SET_NULL, Count
 from django.db.models.aggregates import Sum
 from django.utils import timezone
@@ -20,7 +20,6 @@ from polymorphic.models import PolymorphicModel
 from tenant_schemas.postgresql_backend.base import FakeTenant
 
 from bluebottle.activities.models import Activity, Contribution, Contributor
-from bluebottle.clients import properties
 from bluebottle.files.fields import ImageField, PrivateDocumentField
 from bluebottle.fsm.triggers import TriggerMixin
 from bluebottle.funding.validators import (
@@ -31,7 +30,8 @@ from bluebottle.funding.validators import (
     TargetValidator, TosAcceptedValidator,
 )
 from bluebottle.funding_stripe.utils import get_stripe
-from bluebottle.utils.exchange_rates import convert
+from bluebottle.utils.cache import public_properties_cache
+from bluebottle.utils.exchange_rates import convert_many
 from bluebottle.utils.fields import MoneyField
 from bluebottle.utils.models import BasePlatformSettings, ValidatedModelMixin
 
@@ -54,6 +54,15 @@ class PaymentCurrency(models.Model):
         verbose_name = _('Payment currency')
         verbose_name_plural = _('Payment currencies')
 
+    def save(self, *args, **kwargs):
+        super(PaymentCurrency, self).save(*args, **kwargs)
+        transaction.on_commit(public_properties_cache.invalidate)
+
+    def delete(self, *args, **kwargs):
+        result = super(PaymentCurrency, self).delete(*args, **kwargs)
+        transaction.on_commit(public_properties_cache.invalidate)
+        return result
+
 
 @python_2_unicode_compatible
 class PaymentProvider(PolymorphicModel):
@@ -132,8 +141,14 @@ class PaymentProvider(PolymorphicModel):
                     default3=50,
                     default4=100,
                 )
+        transaction.on_commit(public_properties_cache.invalidate)
         return model
 
+    def delete(self, *args, **kwargs):
+        result = super(PaymentProvider, self).delete(*args, **kwargs)
+        transaction.on_commit(public_properties_cache.invalidate)
+        return result
+
 
 class Funding(Activity):
 
@@ -240,26 +255,15 @@ class Funding(Activity):
         )
 
     def update_amounts(self):
-        from bluebottle.funding.utils import calculate_total
-
-        from .states import DonorStateMachine
+        """
+        Recalculate the amounts from all donations, and rebuild the donation ledger.
+        Donors update the amounts incrementally, see bluebottle.funding.totals.
+        """
+        from bluebottle.funding.totals import get_amounts, reconcile_ledger
 
         if not self.has_deleted_data:
-            donations = self.donations.filter(
-                status__in=(
-                    DonorStateMachine.succeeded.value,
-                    DonorStateMachine.activity_refunded.value,
-                )
-            )
-            currency = self.target.currency if self.target else properties.DEFAULT_CURRENCY
-
-            self.amount_donated = calculate_total(donations, currency)
-            self.amount_pledged = calculate_total(
-                donations.filter(
-                    donor__payment__pledgepayment__isnull=False
-                ),
-                currency
-            )
+            ledger, _drifted = reconcile_ledger(self)
+            self.amount_donated, self.amount_pledged = get_amounts(self, ledger)
             self.save()
 
     @property
@@ -299,13 +303,10 @@ class Funding(Activity):
             currency = self.target.currency
         else:
             currency = 'EUR'
-        total = convert(self.amount_donated, currency)
-        if self.amount_matching:
-            total += convert(
-                self.amount_matching,
-                currency
-            )
-        return total
+        return convert_many(
+            [self.amount_donated, self.amount_matching or None],
+            currency
+        )
 
     @property
     def payout_account(self):
@@ -448,14 +449,13 @@ class Fundraiser(models.Model):
             ]
         )
 
-        totals = [
-            Money(data['amount__sum'], data['amount_currency']) for data in
-            donations.values('amount_currency').annotate(Sum('amount')).order_by()
-        ]
-
-        totals = [convert(amount, self.amount.currency) for amount in totals]
-
-        return sum(totals) or Money(0, self.amount.currency)
+        return convert_many(
+            (
+                Money(data['amount__sum'], data['amount_currency']) for data in
+                donations.values('amount_currency').annotate(Sum('amount')).order_by()
+            ),
+            self.amount.currency
+        )
 
     class Meta(object):
         verbose_name = _('fundraiser')
@@ -600,6 +600,25 @@ class MoneyContribution(Contribution):
         verbose_name_plural = _('Contributions')
 
 
+class DonationLedger(models.Model):
+    """
+    The totals of the successful donations of a funding in one currency.
+
+    Donors add the change in what they contribute, see bluebottle.funding.totals. The
+    amounts of the funding are the totals of its ledger rows, converted to its currency.
+    """
+    funding = models.ForeignKey(Funding, related_name='donation_ledger', on_delete=models.CASCADE)
+    currency = models.CharField(max_length=3)
+
+    donated = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    pledged = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta(object):
+        unique_together = (('funding', 'currency'),)
+
+
 @python_2_unicode_compatible
 class Payment(TriggerMixin, PolymorphicModel):
     """
@@ -962,4 +981,51 @@ class IbanCheck(models.Model):
         self.save()
 
 
+class PaymentWebhookEvent(models.Model):
+    """
+    A verified webhook event of a payment provider, stored when it is received and
+    processed afterwards, see bluebottle.funding.webhooks.
+    """
+    STATUS_CHOICES = (
+        ('new', _('New')),
+        ('processed', _('Processed')),
+        ('failed', _('Failed')),
+    )
+
+    provider = models.CharField(max_length=30)
+    event_id = models.CharField(
+        max_length=255,
+        help_text=_('Id of the event at the payment provider')
+    )
+    event_type = models.CharField(max_length=100)
+    queue = models.CharField(
+        max_length=255,
+        help_text=_('Events with the same queue, like the events of one payment, are processed in order')
+    )
+    payload = models.JSONField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='new')
+    result = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    duplicates = models.PositiveIntegerField(
+        default=0,
+        help_text=_('Number of times the provider sent the event again')
+    )
+
+    received = models.DateTimeField(default=timezone.now)
+    attempted = models.DateTimeField(null=True, blank=True)
+    processed = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.provider} {self.event_type} {self.event_id}'
+
+    class Meta(object):
+        verbose_name = _('payment webhook event')
+        verbose_name_plural = _('payment webhook events')
+        unique_together = (('provider', 'event_id'),)
+        indexes = [
+            models.Index(fields=['provider', 'queue', 'status'], name='funding_webhook_queue'),
+        ]
+
+
 from bluebottle.funding.periodic_tasks import *  # noqa
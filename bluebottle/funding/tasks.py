@@ -1,47 +1,83 @@
 import logging
+from datetime import timedelta
 
 from celery.schedules import crontab
+from django.utils.timezone import now
 from bluebottle.celery import app
 from djmoney.contrib.exchange.backends import OpenExchangeRatesBackend
 
-from bluebottle.clients.models import Client
+from bluebottle.clients.scheduler import tenant_periodic_task
 from bluebottle.clients.utils import LocalTenant
 
 logger = logging.getLogger('bluebottle')
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def funding_tasks():
     from bluebottle.funding.models import Funding
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in Funding.get_periodic_tasks():
-                task.execute()
+    for task in Funding.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(hour=2, minute=20))
 def donor_tasks():
     from bluebottle.funding.models import Donor
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in Donor.get_periodic_tasks():
-                task.execute()
+    for task in Donor.get_periodic_tasks():
+        task.execute()
+
+
+@tenant_periodic_task(crontab(hour=3, minute=40))
+def reconcile_funding_amounts():
+    """
+    Correct the donation ledgers and amounts of fundings with recent donations, in case
+    they drifted from the donations
+    """
+    from bluebottle.funding.models import Donor
+    from bluebottle.funding.totals import reconcile_funding_amounts as reconcile
+
+    funding_ids = Donor.objects.filter(
+        updated__gte=now() - timedelta(days=2)
+    ).order_by().values_list('activity_id', flat=True).distinct()
+
+    for funding_id in funding_ids:
+        if reconcile(funding_id):
+            logger.warning(f'Reconciled the amounts of funding {funding_id}')
 
 
 @app.task
-def update_rates():
-    OpenExchangeRatesBackend().update_rates()
+def process_webhook_queue(tenant, provider, queue):
+    from bluebottle.funding.webhooks import process_queue
 
+    with LocalTenant(tenant, clear_tenant=True):
+        process_queue(provider, queue)
 
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    funding_tasks.s()
-)
 
-app.add_periodic_task(
-    crontab(hour=2, minute=20),
-    donor_tasks.s()
-)
+@tenant_periodic_task(crontab(minute='*/10'))
+def process_pending_webhook_events():
+    """
+    Process the webhook events that were not picked up, retry the failed events that are
+    due, and report the webhook metrics
+    """
+    from bluebottle.funding.webhooks import get_blocked_queues, get_metrics, get_pending_queues, process_queue
+
+    for provider, queue in get_pending_queues():
+        logger.warning(f'Processing pending {provider} webhook events of {queue}')
+        process_queue(provider, queue)
+
+    blocked = get_blocked_queues()
+    if blocked:
+        logger.warning(f'{len(blocked)} webhook queues are blocked by a failed event')
+        for provider, queue, event in blocked:
+            logger.info(f'Queue {queue} of {provider} is blocked by {event} after {event.attempts} attempts')
+
+    for provider, metrics in get_metrics(now() - timedelta(minutes=10)).items():
+        logger.info(f'{provider} webhook events: {metrics}')
+
+
+@app.task
+def update_rates():
+    OpenExchangeRatesBackend().update_rates()
+
 
 app.add_periodic_task(
     crontab(hour=2, minute=20),
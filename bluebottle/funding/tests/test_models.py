@@ -1,14 +1,16 @@
 from builtins import str
 from datetime import timedelta
+from decimal import Decimal
 
 import mock
 from django.utils.timezone import now
 from moneyed import Money
 
 from bluebottle.activities.tasks import data_retention_contribution_task
-from bluebottle.funding.models import Payout
+from bluebottle.funding.models import DonationLedger, Funding, Payout
 from bluebottle.funding.tests.factories import FundingFactory, BudgetLineFactory, RewardFactory, DonorFactory
 from bluebottle.funding.tests.utils import generate_mock_bank_account
+from bluebottle.funding.totals import reconcile_funding_amounts
 from bluebottle.funding_pledge.tests.factories import PledgePaymentFactory
 from bluebottle.funding_stripe.tests.base import FundingStripeMixin
 from bluebottle.funding_stripe.tests.factories import (
@@ -82,6 +84,55 @@ class FundingTestCase(BluebottleTestCase):
         self.assertEqual(funding.amount_pledged, Money(0, 'EUR'))
         self.assertEqual(funding.genuine_amount_donated, Money(120, 'EUR'))
 
+    def test_donation_ledger(self):
+        funding = FundingFactory.create(target=Money(100, 'EUR'))
+        DonorFactory.create(activity=funding, amount=Money(30, 'EUR'), status='succeeded')
+        donor = DonorFactory.create(activity=funding, amount=Money(20, 'EUR'))
+        donor.states.succeed(save=True)
+
+        self.assertEqual(funding.donation_ledger.get(currency='EUR').donated, Decimal('50'))
+        funding.refresh_from_db()
+        self.assertEqual(funding.amount_donated, Money(50, 'EUR'))
+
+        donor.states.refund(save=True)
+
+        self.assertEqual(funding.donation_ledger.get(currency='EUR').donated, Decimal('30'))
+        funding.refresh_from_db()
+        self.assertEqual(funding.amount_donated, Money(30, 'EUR'))
+
+    def test_donation_ledger_delete(self):
+        funding = FundingFactory.create(target=Money(100, 'EUR'))
+        DonorFactory.create_batch(2, activity=funding, amount=Money(30, 'EUR'), status='succeeded')
+
+        funding.donations.first().delete()
+
+        funding.refresh_from_db()
+        self.assertEqual(funding.amount_donated, Money(30, 'EUR'))
+        self.assertEqual(funding.donation_ledger.get().donated, Decimal('30'))
+
+    def test_donation_ledger_saves_amounts_only(self):
+        funding = FundingFactory.create(target=Money(100, 'EUR'), title='Some title')
+        Funding.objects.filter(pk=funding.pk).update(title='Changed title')
+
+        DonorFactory.create(activity=funding, amount=Money(30, 'EUR'), status='succeeded')
+
+        funding = Funding.objects.get(pk=funding.pk)
+        self.assertEqual(funding.amount_donated, Money(30, 'EUR'))
+        self.assertEqual(funding.title, 'Changed title')
+
+    def test_reconcile_funding_amounts(self):
+        funding = FundingFactory.create(target=Money(100, 'EUR'))
+        DonorFactory.create_batch(3, activity=funding, amount=Money(30, 'EUR'), status='succeeded')
+        DonationLedger.objects.filter(funding=funding).update(donated=Decimal('10'))
+        Funding.objects.filter(pk=funding.pk).update(amount_donated=Money(10, 'EUR'))
+
+        self.assertTrue(reconcile_funding_amounts(funding.pk))
+
+        funding.refresh_from_db()
+        self.assertEqual(funding.amount_donated, Money(90, 'EUR'))
+        self.assertEqual(funding.donation_ledger.get().donated, Decimal('90'))
+        self.assertFalse(reconcile_funding_amounts(funding.pk))
+
     def test_budget_currency_change(self):
         funding = FundingFactory.create(target=Money(100, 'EUR'))
 
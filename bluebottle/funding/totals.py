@@ -0,0 +1,181 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from djmoney.money import Money
+
+from bluebottle.clients import properties
+from bluebottle.funding.models import DonationLedger, Donor, Funding
+from bluebottle.utils.exchange_rates import convert_many
+
+COUNTED_STATUSES = ('succeeded', 'activity_refunded')
+
+AMOUNT_FIELDS = (
+    'amount_donated', 'amount_donated_currency',
+    'amount_pledged', 'amount_pledged_currency',
+)
+
+
+def get_donated(status, payout_amount):
+    """
+    What a donor with `status` and `payout_amount` adds to the amounts of its funding
+    """
+    if status in COUNTED_STATUSES and payout_amount:
+        return payout_amount
+    return None
+
+
+def get_ledger(funding):
+    """
+    The donated and pledged totals of `funding` per currency, aggregated from its donations
+    """
+    totals = Donor.objects.filter(
+        activity_id=funding.pk,
+        status__in=COUNTED_STATUSES,
+        payout_amount__isnull=False,
+    ).order_by().values(
+        'payout_amount_currency'
+    ).annotate(
+        donated=Sum('payout_amount'),
+        pledged=Sum('payout_amount', filter=Q(payment__pledgepayment__isnull=False)),
+    )
+
+    return dict(
+        (total['payout_amount_currency'], (total['donated'] or Decimal(0), total['pledged'] or Decimal(0)))
+        for total in totals
+    )
+
+
+def get_stored_ledger(funding):
+    return dict(
+        (row.currency, (row.donated, row.pledged))
+        for row in DonationLedger.objects.filter(funding_id=funding.pk)
+    )
+
+
+def reconcile_ledger(funding):
+    """
+    Rebuild the ledger rows of `funding` from its donations. Returns the ledger and
+    whether the stored rows had drifted from it.
+    """
+    ledger = get_ledger(funding)
+    stored = get_stored_ledger(funding)
+
+    for currency, (donated, pledged) in ledger.items():
+        if stored.get(currency) != (donated, pledged):
+            DonationLedger.objects.update_or_create(
+                funding_id=funding.pk, currency=currency,
+                defaults={'donated': donated, 'pledged': pledged}
+            )
+
+    stale = set(stored) - set(ledger)
+    if stale:
+        DonationLedger.objects.filter(funding_id=funding.pk, currency__in=stale).delete()
+
+    return ledger, stored != ledger
+
+
+def get_amounts(funding, ledger):
+    """
+    The donated and pledged amounts of `funding`, converted from its ledger to the currency of the target
+    """
+    currency = funding.target.currency if funding.target else properties.DEFAULT_CURRENCY
+
+    donated = convert_many(
+        (Money(donated, code) for code, (donated, _pledged) in ledger.items() if donated), currency
+    )
+    pledged = convert_many(
+        (Money(pledged, code) for code, (_donated, pledged) in ledger.items() if pledged), currency
+    )
+    return donated, pledged
+
+
+def save_amounts(funding, donated, pledged):
+    """
+    Store the amounts of `funding`. Only the amount fields are saved, so only the triggers on
+    the amounts run, and whatever those triggers change.
+    """
+    if funding.amount_donated == donated and funding.amount_pledged == pledged:
+        return False
+
+    funding.amount_donated = donated
+    funding.amount_pledged = pledged
+    funding.save(update_fields=AMOUNT_FIELDS)
+    return True
+
+
+def get_deltas(previous, current, pledge):
+    deltas = defaultdict(lambda: [Decimal(0), Decimal(0)])
+
+    for amount, sign in ((previous, -1), (current, 1)):
+        if amount:
+            delta = deltas[str(amount.currency)]
+            delta[0] += sign * amount.amount
+            if pledge:
+                delta[1] += sign * amount.amount
+
+    return dict((currency, delta) for currency, delta in deltas.items() if any(delta))
+
+
+def update_donor_amounts(donor, previous, created=False):
+    """
+    Add the change in what `donor` contributes to the ledger of its funding, and update the
+    amounts of the funding. `previous` is what the donor contributed before it was saved,
+    see `get_donated`.
+
+    The funding row is locked while its ledger is changed, so concurrent donations are
+    applied one after the other.
+    """
+    current = get_donated(donor.status, donor.payout_amount)
+    if not created and previous == current:
+        if Donor.objects.filter(pk=donor.pk).exists():
+            return
+        # The donor was deleted
+        current = None
+
+    if previous == current:
+        return
+
+    with transaction.atomic():
+        funding = Funding.objects.select_for_update().filter(pk=donor.activity_id).first()
+        if not funding or funding.has_deleted_data:
+            return
+
+        if DonationLedger.objects.filter(funding_id=funding.pk).exists():
+            pledge = Donor.objects.filter(pk=donor.pk, payment__pledgepayment__isnull=False).exists()
+
+            for currency, (donated, pledged) in get_deltas(previous, current, pledge).items():
+                updated = DonationLedger.objects.filter(funding_id=funding.pk, currency=currency).update(
+                    donated=F('donated') + donated, pledged=F('pledged') + pledged
+                )
+                if not updated:
+                    DonationLedger.objects.create(
+                        funding_id=funding.pk, currency=currency, donated=donated, pledged=pledged
+                    )
+            ledger = get_stored_ledger(funding)
+        else:
+            # No ledger yet, the donations already include this donor
+            ledger, _drifted = reconcile_ledger(funding)
+
+        donated, pledged = get_amounts(funding, ledger)
+        save_amounts(funding, donated, pledged)
+
+    if Donor.activity.is_cached(donor) and hasattr(donor.activity, 'amount_donated'):
+        # Keep the funding that is loaded with the donor up to date
+        donor.activity.amount_donated = donated
+        donor.activity.amount_pledged = pledged
+
+
+def reconcile_funding_amounts(funding_id):
+    """
+    Rebuild the ledger of a funding from its donations and correct its amounts.
+    Returns whether anything had drifted.
+    """
+    with transaction.atomic():
+        funding = Funding.objects.select_for_update().filter(pk=funding_id).first()
+        if not funding or funding.has_deleted_data:
+            return False
+
+        ledger, drifted = reconcile_ledger(funding)
+        return save_amounts(funding, *get_amounts(funding, ledger)) or drifted
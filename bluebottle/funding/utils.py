@@ -1,5 +1,5 @@
 from babel.numbers import get_currency_name, get_currency_symbol
-from bluebottle.utils.exchange_rates import convert
+from bluebottle.utils.exchange_rates import convert_many
 from django.db.models import Sum
 from djmoney.money import Money
 
@@ -33,10 +33,11 @@ def calculate_total(queryset, target='EUR'):
         'donor__payout_amount_currency'
     ).annotate(
         total=Sum('donor__payout_amount')
-    ).order_by('-created')
-    amounts = [
-        Money(tot['total'], tot['donor__payout_amount_currency']) for tot in totals
-        if tot['total']
-    ]
-    amounts = [convert(amount, target) for amount in amounts]
-    return sum(amounts) or Money(0, target)
+    ).order_by()
+    return convert_many(
+        (
+            Money(tot['total'], tot['donor__payout_amount_currency']) for tot in totals
+            if tot['total']
+        ),
+        target
+    )
@@ -5,13 +5,13 @@ from django.http.response import HttpResponse
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from rest_framework_json_api.views import AutoPrefetchMixin
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
 
 from bluebottle.activities.permissions import (
     ActivityOwnerPermission, ActivityTypePermission, ActivityStatusPermission,
     ActivitySegmentPermission
 )
 from bluebottle.activities.views import ActivityDetailView
+from bluebottle.auth.authentication import JSONWebTokenAuthentication
 from bluebottle.funding.authentication import ClientSecretAuthentication
 from bluebottle.funding.models import (
     Funding, Donor, Reward,
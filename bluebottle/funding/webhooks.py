@@ -0,0 +1,245 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Avg, Count, F, Max, Min, Sum
+from django.utils.module_loading import autodiscover_modules
+from django.utils.timezone import now
+
+from bluebottle.funding.models import PaymentWebhookEvent
+
+logger = logging.getLogger('bluebottle')
+
+# The functions that process the webhook events of each provider, see `register_processor`
+processors = {}
+
+
+def register_processor(provider):
+    """
+    Register the function that processes the webhook events of `provider`. It is called
+    with the payload of an event and returns a description of what it did.
+    """
+    def decorator(func):
+        processors[provider] = func
+        return func
+    return decorator
+
+
+def receive_event(provider, event_id, event_type, queue, payload):
+    """
+    Store a verified webhook event and schedule the processing of its queue.
+
+    Providers send events again when they are not sure they arrived. Those are only
+    counted, unless processing the event failed before: then it is processed again.
+    Returns the stored event and whether it was new.
+    """
+    try:
+        with transaction.atomic():
+            event = PaymentWebhookEvent.objects.create(
+                provider=provider,
+                event_id=event_id,
+                event_type=event_type,
+                queue=queue,
+                payload=payload,
+            )
+    except IntegrityError:
+        PaymentWebhookEvent.objects.filter(provider=provider, event_id=event_id).update(
+            duplicates=F('duplicates') + 1
+        )
+        event = PaymentWebhookEvent.objects.get(provider=provider, event_id=event_id)
+        logger.info(f'Received {event} again')
+
+        if event.status == 'failed':
+            PaymentWebhookEvent.objects.filter(pk=event.pk).update(status='new')
+            schedule_queue(provider, event.queue)
+        return event, False
+
+    schedule_queue(provider, queue)
+    return event, True
+
+
+def schedule_queue(provider, queue):
+    from bluebottle.funding.tasks import process_webhook_queue
+
+    tenant = connection.tenant
+    if (
+        getattr(settings, 'TESTING', False) or
+        getattr(settings, 'CELERY_ALWAYS_EAGER', False)
+    ):
+        process_webhook_queue(tenant, provider, queue)
+    else:
+        transaction.on_commit(lambda: process_webhook_queue.delay(tenant, provider, queue))
+
+
+def is_due(event):
+    """
+    Whether a failed event should be retried: after a delay that doubles with every attempt,
+    until `PAYMENT_WEBHOOK_MAX_ATTEMPTS` attempts were made.
+    """
+    if event.attempts >= getattr(settings, 'PAYMENT_WEBHOOK_MAX_ATTEMPTS', 5):
+        return False
+
+    delay = timedelta(
+        seconds=getattr(settings, 'PAYMENT_WEBHOOK_RETRY_DELAY', 300) * 2 ** max(event.attempts - 1, 0)
+    )
+    return not event.attempted or event.attempted + delay <= now()
+
+
+def is_blocking(event):
+    """
+    Whether the event keeps its queue from being processed now: it failed, and is not due
+    to be retried, see `is_due`
+    """
+    return event.status == 'failed' and not is_due(event)
+
+
+def get_head(provider, queue):
+    """
+    The first event of the queue that is not processed yet
+    """
+    return PaymentWebhookEvent.objects.filter(
+        provider=provider, queue=queue, status__in=('new', 'failed')
+    ).order_by('received', 'pk').first()
+
+
+def queue_lock(provider, queue):
+    """
+    Lock a queue for the rest of the transaction, so it is never processed by two workers
+    at the same time.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT pg_advisory_xact_lock(hashtext(%s))',
+            ['payment_webhook:{}:{}:{}'.format(connection.schema_name, provider, queue)]
+        )
+
+
+def process_event(event, processor):
+    """
+    Process one event. The result is stored in the same transaction as the changes of
+    the processor. Returns whether the event was processed.
+    """
+    event.attempts += 1
+    event.attempted = now()
+    try:
+        with transaction.atomic():
+            event.result = processor(event.payload) or ''
+            event.status = 'processed'
+            event.processed = now()
+            event.save(update_fields=['status', 'result', 'attempts', 'attempted', 'processed'])
+        logger.info(
+            f'Processed {event} after {(event.processed - event.received).total_seconds():.1f}s'
+        )
+    except Exception as e:
+        logger.exception(f'Could not process {event}')
+        event.status = 'failed'
+        event.result = str(e)
+        event.processed = None
+        event.save(update_fields=['status', 'result', 'attempts', 'attempted', 'processed'])
+
+    return event.status == 'processed'
+
+
+def process_queue(provider, queue):
+    """
+    Process the events of a queue in the order they were received.
+
+    Every event is processed and stored in its own transaction, while the queue is locked.
+    A failed event stops the queue: later events wait until it is retried, see `is_due`,
+    replayed, or sent again by the provider.
+    """
+    if provider not in processors:
+        # The processors are registered in the webhooks modules of the payment apps
+        autodiscover_modules('webhooks')
+    processor = processors[provider]
+
+    while True:
+        with transaction.atomic():
+            queue_lock(provider, queue)
+
+            event = get_head(provider, queue)
+
+            if event is None:
+                return
+
+            if is_blocking(event):
+                logger.info(f'Queue {queue} of {provider} waits for {event}')
+                return
+
+            if not process_event(event, processor):
+                return
+
+
+def get_pending_queues(older_than=timedelta(minutes=10)):
+    """
+    The provider and queue of events that should have been processed already, and of
+    failed events that are due to be retried
+    """
+    pending = set(
+        PaymentWebhookEvent.objects.filter(
+            status='new', received__lt=now() - older_than
+        ).order_by().values_list('provider', 'queue').distinct()
+    )
+
+    failed = PaymentWebhookEvent.objects.filter(
+        status='failed', attempts__lt=getattr(settings, 'PAYMENT_WEBHOOK_MAX_ATTEMPTS', 5)
+    ).only('provider', 'queue', 'attempts', 'attempted')
+    for event in failed:
+        if is_due(event):
+            pending.add((event.provider, event.queue))
+
+    return sorted(pending)
+
+
+def get_blocked_queues():
+    """
+    The provider, queue and first event of the queues that wait for a failed event: until
+    its retry is due, or until it is replayed when it reached `PAYMENT_WEBHOOK_MAX_ATTEMPTS`
+    """
+    queues = PaymentWebhookEvent.objects.filter(
+        status='failed'
+    ).order_by().values_list('provider', 'queue').distinct()
+
+    blocked = []
+    for provider, queue in sorted(queues):
+        event = get_head(provider, queue)
+        if event and is_blocking(event):
+            blocked.append((provider, queue, event))
+    return blocked
+
+
+def get_metrics(since):
+    """
+    Counts, duplicates and processing lag of the webhook events per provider, received after `since`,
+    and the number of blocked queues per provider
+    """
+    events = PaymentWebhookEvent.objects.filter(received__gte=since).order_by()
+    metrics = dict(
+        (row.pop('provider'), row) for row in events.values('provider').annotate(
+            received=Count('pk'),
+            duplicates=Sum('duplicates'),
+            max_attempts=Max('attempts'),
+        )
+    )
+
+    lag = events.filter(status='processed').values('provider').annotate(
+        average_lag=Avg(F('processed') - F('received')),
+        max_lag=Max(F('processed') - F('received')),
+    )
+    for row in lag:
+        metrics[row['provider']].update(average_lag=row['average_lag'], max_lag=row['max_lag'])
+
+    pending = events.exclude(status='processed').values('provider', 'status').annotate(
+        count=Count('pk'), oldest=Min('received')
+    )
+    for row in pending:
+        metrics[row['provider']][row['status']] = row['count']
+        if row['status'] == 'new':
+            metrics[row['provider']]['pending_lag'] = now() - row['oldest']
+
+    for provider, _queue, _event in get_blocked_queues():
+        provider_metrics = metrics.setdefault(provider, {})
+        provider_metrics['blocked'] = provider_metrics.get('blocked', 0) + 1
+
+    return metrics
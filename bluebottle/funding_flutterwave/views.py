@@ -4,8 +4,8 @@ import logging
 from django.http import HttpResponse, HttpResponseNotFound
 from django.views.generic import View
 from rest_framework_json_api.views import AutoPrefetchMixin
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
 
+from bluebottle.auth.authentication import JSONWebTokenAuthentication
 from bluebottle.funding.authentication import DonorAuthentication
 from bluebottle.funding.exception import PaymentException
 from bluebottle.funding.models import Donor
@@ -4,8 +4,8 @@ from bluebottle.funding.authentication import DonorAuthentication
 from django.http import JsonResponse, HttpResponseBadRequest
 from django.views.generic import View
 from rest_framework_json_api.views import AutoPrefetchMixin
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
 
+from bluebottle.auth.authentication import JSONWebTokenAuthentication
 from bluebottle.funding.exception import PaymentException
 from bluebottle.funding.views import PaymentList
 from bluebottle.funding_lipisha.models import LipishaPayment, LipishaBankAccount
@@ -1,21 +1,29 @@
 import json
+import uuid
 from builtins import object
+from datetime import timedelta
+from io import StringIO
 
 import mock
 import munch
 import stripe
 from django.contrib.auth.models import Group
 from django.core import mail
+from django.core.management import call_command
+from django.db import connection
 from django.urls import reverse
+from django.utils.timezone import now
 from moneyed import Money
 from munch import munchify
 from rest_framework import status
 
 from bluebottle.activities.messages.reviewer import get_reviewers_for_activity
-from bluebottle.funding.models import Donor
+from bluebottle.funding.models import Donor, PaymentWebhookEvent
 from bluebottle.funding.tests.factories import (
     FundingFactory, DonorFactory, BudgetLineFactory
 )
+from bluebottle.funding.tasks import process_pending_webhook_events
+from bluebottle.funding.webhooks import get_blocked_queues, get_metrics, get_pending_queues, processors
 from bluebottle.funding_stripe.models import StripePaymentProvider
 from bluebottle.funding_stripe.tests.base import FundingStripeTestCase, patch_stripe_connect_account_api
 from bluebottle.funding_stripe.tests.factories import (
@@ -33,9 +41,10 @@ from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
 
 
 class MockEvent(object):
-    def __init__(self, type, data):
+    def __init__(self, type, data, id=None):
         self.type = type
         self.data = munch.munchify(data)
+        self.id = id or 'evt_{}'.format(uuid.uuid4().hex)
 
 
 class IntentWebhookTestCase(FundingStripeTestCase):
@@ -293,7 +302,150 @@ class IntentWebhookTestCase(FundingStripeTestCase):
             )
             self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-            self.assertEqual(response.content, b'Not an intent payment')
+        event = PaymentWebhookEvent.objects.filter(event_type='charge.refunded').get()
+        self.assertEqual(event.status, 'processed')
+        self.assertEqual(event.result, 'Not an intent payment')
+
+    def post_event(self, event_id, status_code=status.HTTP_200_OK):
+        with mock.patch(
+            'stripe.Webhook.construct_event',
+            return_value=MockEvent(
+                'payment_intent.payment_failed', {'object': {'id': self.intent.intent_id}}, id=event_id
+            )
+        ):
+            response = self.client.post(
+                self.webhook,
+                HTTP_STRIPE_SIGNATURE='some signature'
+            )
+            self.assertEqual(response.status_code, status_code)
+        return PaymentWebhookEvent.objects.get(provider='stripe', event_id=event_id)
+
+    def test_event_stored(self):
+        event = self.post_event('evt_1')
+
+        self.assertEqual(event.event_type, 'payment_intent.payment_failed')
+        self.assertEqual(event.queue, self.intent.intent_id)
+        self.assertEqual(event.status, 'processed')
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(event.result, 'Updated payment to failed')
+        self.assertEqual(self.intent.get_payment().status, 'failed')
+
+    def test_event_duplicate(self):
+        self.post_event('evt_1')
+
+        process = mock.Mock()
+        with mock.patch.dict(processors, {'stripe': process}):
+            event = self.post_event('evt_1')
+
+        self.assertEqual(process.call_count, 0)
+        self.assertEqual(event.duplicates, 1)
+        self.assertEqual(event.attempts, 1)
+
+    def test_event_failed_processed_again(self):
+        process = mock.Mock(side_effect=Exception('Something went wrong'))
+        with mock.patch.dict(processors, {'stripe': process}):
+            event = self.post_event('evt_1')
+
+        self.assertEqual(event.status, 'failed')
+        self.assertEqual(event.result, 'Something went wrong')
+
+        event = self.post_event('evt_1')
+
+        self.assertEqual(event.status, 'processed')
+        self.assertEqual(event.attempts, 2)
+        self.assertEqual(event.duplicates, 1)
+        self.assertEqual(self.intent.get_payment().status, 'failed')
+
+    def test_event_failed_stops_queue(self):
+        process = mock.Mock(side_effect=Exception('Something went wrong'))
+        with mock.patch.dict(processors, {'stripe': process}):
+            failed = self.post_event('evt_1')
+            later = self.post_event('evt_2')
+
+        self.assertEqual(process.call_count, 1)
+        self.assertEqual(failed.status, 'failed')
+        self.assertEqual(later.status, 'new')
+        self.assertEqual(get_pending_queues(), [])
+
+    def test_event_failed_retried(self):
+        process = mock.Mock(side_effect=Exception('Something went wrong'))
+        with mock.patch.dict(processors, {'stripe': process}):
+            failed = self.post_event('evt_1')
+            later = self.post_event('evt_2')
+
+        PaymentWebhookEvent.objects.filter(pk=failed.pk).update(attempted=now() - timedelta(hours=1))
+        self.assertEqual(get_pending_queues(), [('stripe', self.intent.intent_id)])
+
+        process_pending_webhook_events()
+
+        failed.refresh_from_db()
+        later.refresh_from_db()
+        self.assertEqual(failed.status, 'processed')
+        self.assertEqual(failed.attempts, 2)
+        self.assertEqual(later.status, 'processed')
+        self.assertEqual(self.intent.get_payment().status, 'failed')
+
+    def test_event_failed_max_attempts(self):
+        process = mock.Mock(side_effect=Exception('Something went wrong'))
+        with mock.patch.dict(processors, {'stripe': process}):
+            failed = self.post_event('evt_1')
+
+        PaymentWebhookEvent.objects.filter(pk=failed.pk).update(
+            attempts=5, attempted=now() - timedelta(days=1)
+        )
+        self.assertEqual(get_pending_queues(), [])
+
+    def test_event_failed_blocked(self):
+        process = mock.Mock(side_effect=Exception('Something went wrong'))
+        with mock.patch.dict(processors, {'stripe': process}):
+            failed = self.post_event('evt_1')
+
+        self.assertEqual(get_blocked_queues(), [('stripe', self.intent.intent_id, failed)])
+        self.assertEqual(get_metrics(now() - timedelta(hours=1))['stripe']['blocked'], 1)
+
+        PaymentWebhookEvent.objects.filter(pk=failed.pk).update(attempted=now() - timedelta(hours=1))
+        self.assertEqual(get_blocked_queues(), [])
+
+        PaymentWebhookEvent.objects.filter(pk=failed.pk).update(attempts=5)
+        self.assertEqual(get_blocked_queues(), [('stripe', self.intent.intent_id, failed)])
+
+    def test_replay_blocked(self):
+        process = mock.Mock(side_effect=Exception('Something went wrong'))
+        with mock.patch.dict(processors, {'stripe': process}):
+            failed = self.post_event('evt_1')
+            later = self.post_event('evt_2')
+
+        PaymentWebhookEvent.objects.filter(pk=failed.pk).update(attempts=5)
+
+        out = StringIO()
+        call_command(
+            'replay_webhook_events', schema_name=connection.tenant.schema_name,
+            event_ids=['evt_2'], status='new', stdout=out
+        )
+
+        later.refresh_from_db()
+        self.assertEqual(later.status, 'new')
+        self.assertIn(f'is blocked by {failed}, replay it with --event evt_1', out.getvalue())
+
+        out = StringIO()
+        call_command(
+            'replay_webhook_events', schema_name=connection.tenant.schema_name,
+            event_ids=['evt_1'], stdout=out
+        )
+
+        later.refresh_from_db()
+        self.assertEqual(later.status, 'processed')
+        self.assertNotIn('is blocked', out.getvalue())
+
+    def test_event_without_id(self):
+        event = MockEvent('payment_intent.payment_failed', {'object': {'id': self.intent.intent_id}})
+        del event.id
+
+        with mock.patch('stripe.Webhook.construct_event', return_value=event):
+            response = self.client.post(self.webhook, HTTP_STRIPE_SIGNATURE='some signature')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(PaymentWebhookEvent.objects.exists())
 
     def test_refund_from_requested_refund(self):
         self.test_success()
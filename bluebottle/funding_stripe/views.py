@@ -1,3 +1,4 @@
+import json
 import logging
 import uuid
 
@@ -13,17 +14,18 @@ from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_json_api.views import AutoPrefetchMixin
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
 from stripe import InvalidRequestError
 
+from bluebottle.auth.authentication import JSONWebTokenAuthentication
 from bluebottle.funding.authentication import (
     DonorAuthentication,
     ClientSecretAuthentication,
 )
-from bluebottle.funding.models import Donor, FundingPlatformSettings
+from bluebottle.funding.models import FundingPlatformSettings
 from bluebottle.funding.permissions import PaymentPermission, IntentPermission
 from bluebottle.funding.serializers import BankAccountSerializer
 from bluebottle.funding.views import PaymentList
+from bluebottle.funding.webhooks import receive_event
 from bluebottle.funding_stripe.models import (
     StripePayment, StripePayoutAccount, ExternalAccount, StripePaymentProvider, STRIPE_EUROPEAN_COUNTRY_CODES
 )
@@ -40,6 +42,7 @@ from bluebottle.funding_stripe.serializers import (
     ConnectVerificationLinkSerializer
 )
 from bluebottle.funding_stripe.utils import get_stripe
+from bluebottle.funding_stripe.webhooks import get_connect_queue, get_intent_queue
 from bluebottle.grant_management.models import GrantPayment
 from bluebottle.utils.permissions import IsOwner
 from bluebottle.utils.utils import get_current_host
@@ -431,7 +434,19 @@ class ExternalAccountDetails(
         super().perform_update(serializer)
 
 
-class IntentWebHookView(View):
+class StripeWebHookView(View):
+    """
+    Verify a Stripe event and store it in the webhook inbox, see bluebottle.funding.webhooks.
+    The event is processed asynchronously, in order with the other events of its queue.
+    """
+    provider = None
+
+    def get_secret(self, stripe):
+        raise NotImplementedError()
+
+    def get_queue(self, event):
+        raise NotImplementedError()
+
     def post(self, request, **kwargs):
         payload = request.body
         signature_header = request.headers['stripe-signature']
@@ -439,75 +454,42 @@ class IntentWebHookView(View):
 
         try:
             event = stripe.Webhook.construct_event(
-                payload, signature_header, stripe.webhook_secret_intents
+                payload, signature_header, self.get_secret(stripe)
             )
         except stripe.error.SignatureVerificationError:
             # Invalid signature
-            return HttpResponse('Signature failed to verify', status=400)
-
-        try:
-            if event.type == 'payment_intent.succeeded':
-                payment = self.get_payment(event.data.object.id)
-                if payment:
-                    if payment.status != payment.states.succeeded.value:
-                        payment.states.succeed()
-                        payment.update()
-                        payment.donation.save()
-                        payment.save()
-                else:
-                    grant_payment = self.get_grant_payment(event.data.object.id)
-                    if grant_payment:
-                        grant_payment.check_status()
-
-                return HttpResponse('Updated payment to succeeded')
-
-            elif event.type == 'payment_intent.payment_failed':
-                payment = self.get_payment(event.data.object.id)
-                if payment.status != payment.states.failed.value:
-                    payment.states.fail(save=True)
-
-                return HttpResponse('Updated payment to failed')
-
-            elif event.type == 'charge.pending':
-                if not event.data.object.payment_intent:
-                    return HttpResponse('Not an intent payment')
-
-                payment = self.get_payment(event.data.object.payment_intent)
-                if payment.status != payment.states.pending.value:
-                    payment.states.authorize(save=True)
+            error = 'Signature failed to verify'
+            logger.error(error)
+            return HttpResponse(error, status=400)
 
-                return HttpResponse('Updated payment to pending')
+        # Events without an id can not be recognised when they are sent again
+        event_id = getattr(event, 'id', None)
+        if not event_id:
+            error = 'Event without an id'
+            logger.error(error)
+            return HttpResponse(error, status=400)
 
-            elif event.type == 'charge.refunded':
-                if not event.data.object.payment_intent:
-                    return HttpResponse('Not an intent payment')
+        _event, created = receive_event(
+            self.provider,
+            event_id,
+            event.type,
+            self.get_queue(event),
+            json.loads(json.dumps({'id': event_id, 'type': event.type, 'data': event.data}))
+        )
 
-                payment = self.get_payment(event.data.object.payment_intent)
-                payment.states.refund(save=True)
+        if created:
+            return HttpResponse('Received event {}'.format(event.type))
+        return HttpResponse('Already received event {}'.format(event.type))
 
-                return HttpResponse('Updated payment to refunded')
-            else:
-                return HttpResponse('Skipped event {}'.format(event.type))
 
-        except StripePayment.DoesNotExist:
-            return HttpResponse('Payment not found', status=400)
+class IntentWebHookView(StripeWebHookView):
+    provider = 'stripe'
 
-    def get_payment(self, payment_id):
-        if PaymentIntent.objects.filter(intent_id=payment_id).exists():
-            intent = PaymentIntent.objects.get(intent_id=payment_id)
-            try:
-                return intent.payment
-            except StripePayment.DoesNotExist:
-                try:
-                    intent.donation.payment.payment_intent = intent
-                    intent.donation.payment.save()
-                    return intent.payment
-                except Donor.payment.RelatedObjectDoesNotExist:
-                    payment = StripePayment.objects.create(payment_intent=intent, donation=intent.donation)
-                    return payment
+    def get_secret(self, stripe):
+        return stripe.webhook_secret_intents
 
-    def get_grant_payment(self, payment_id):
-        return GrantPayment.objects.filter(intent_id=payment_id).first()
+    def get_queue(self, event):
+        return get_intent_queue(event)
 
 
 class SessionWebHookView(View):
@@ -531,67 +513,14 @@ class SessionWebHookView(View):
                 payment.check_status()
 
 
-class ConnectWebHookView(View):
-    def post(self, request, **kwargs):
+class ConnectWebHookView(StripeWebHookView):
+    provider = 'stripe-connect'
 
-        payload = request.body
-        signature_header = request.headers['stripe-signature']
-        stripe = get_stripe()
-        try:
-            event = stripe.Webhook.construct_event(
-                payload, signature_header, stripe.webhook_secret_connect
-            )
-        except stripe.error.SignatureVerificationError:
-            # Invalid signature
-            error = "Signature failed to verify"
-            logger.error(error)
-            return HttpResponse(error, status=400)
-
-        try:
-            if event.type == "account.updated":
-                account = self.get_account(event.data.object.id)
-
-                external_account_ids = [
-                    external_account.id for external_account
-                    in event.data.object.external_accounts.data
-                ]
-                for bank_account in account.external_accounts.all():
-                    if bank_account.account_id not in external_account_ids:
-                        bank_account.delete()
-
-                for external_account in event.data.object.external_accounts.data:
-                    status = 'new'
-                    if (
-                        account.status == 'verified' and
-                        external_account.requirements.currently_due == [] and
-                        external_account.requirements.past_due == [] and
-                        external_account.requirements.pending_verification == [] and
-                        external_account.future_requirements.currently_due == [] and
-                        external_account.future_requirements.past_due == [] and
-                        external_account.future_requirements.pending_verification == []
-                    ):
-                        status = 'verified'
-                    ExternalAccount.objects.get_or_create(
-                        connect_account=account,
-                        account_id=external_account.id,
-                        defaults={'status': status}
-                    )
-
-                account.update(event.data.object)
-                account.save()
-
-                return HttpResponse("Updated connect account")
-            else:
-                return HttpResponse("Skipped event {}".format(event.type))
-
-        except StripePayoutAccount.DoesNotExist:
-            tenant = connection.tenant
-            error = f"Payout account not found {event.data.object.id} on {tenant.name}"
-            logger.error(error)
-            return HttpResponse("Skipped event {}, account not found".format(event.type))
+    def get_secret(self, stripe):
+        return stripe.webhook_secret_connect
 
-    def get_account(self, account_id):
-        return StripePayoutAccount.objects.get(account_id=account_id)
+    def get_queue(self, event):
+        return get_connect_queue(event)
 
 
 class CountrySpecList(JsonApiViewMixin, AutoPrefetchMixin, ListAPIView):
@@ -0,0 +1,149 @@
+import logging
+
+from django.db import connection
+from munch import munchify
+
+from bluebottle.funding.models import Donor
+from bluebottle.funding.webhooks import register_processor
+from bluebottle.funding_stripe.models import (
+    ExternalAccount, PaymentIntent, StripePayment, StripePayoutAccount
+)
+from bluebottle.grant_management.models import GrantPayment
+
+logger = logging.getLogger('bluebottle')
+
+
+def get_intent_queue(event):
+    """
+    Events of the same payment intent are processed in order
+    """
+    if event.type.startswith('charge.'):
+        return event.data.object.get('payment_intent') or event.data.object.id
+    return event.data.object.id
+
+
+def get_payment(payment_id):
+    intent = PaymentIntent.objects.filter(intent_id=payment_id).first()
+    if intent:
+        try:
+            return intent.payment
+        except StripePayment.DoesNotExist:
+            try:
+                intent.donation.payment.payment_intent = intent
+                intent.donation.payment.save()
+                return intent.payment
+            except Donor.payment.RelatedObjectDoesNotExist:
+                payment = StripePayment.objects.create(payment_intent=intent, donation=intent.donation)
+                return payment
+
+
+def get_grant_payment(payment_id):
+    return GrantPayment.objects.filter(intent_id=payment_id).first()
+
+
+@register_processor('stripe')
+def process_intent_event(payload):
+    event = munchify(payload)
+
+    if event.type == 'payment_intent.succeeded':
+        payment = get_payment(event.data.object.id)
+        if payment:
+            if payment.status != payment.states.succeeded.value:
+                payment.states.succeed()
+                payment.update()
+                payment.donation.save()
+                payment.save()
+        else:
+            grant_payment = get_grant_payment(event.data.object.id)
+            if grant_payment:
+                grant_payment.check_status()
+
+        return 'Updated payment to succeeded'
+
+    elif event.type == 'payment_intent.payment_failed':
+        payment = get_payment(event.data.object.id)
+        if not payment:
+            return 'Payment not found'
+
+        if payment.status != payment.states.failed.value:
+            payment.states.fail(save=True)
+
+        return 'Updated payment to failed'
+
+    elif event.type == 'charge.pending':
+        if not event.data.object.payment_intent:
+            return 'Not an intent payment'
+
+        payment = get_payment(event.data.object.payment_intent)
+        if not payment:
+            return 'Payment not found'
+
+        if payment.status != payment.states.pending.value:
+            payment.states.authorize(save=True)
+
+        return 'Updated payment to pending'
+
+    elif event.type == 'charge.refunded':
+        if not event.data.object.payment_intent:
+            return 'Not an intent payment'
+
+        payment = get_payment(event.data.object.payment_intent)
+        if not payment:
+            return 'Payment not found'
+
+        payment.states.refund(save=True)
+
+        return 'Updated payment to refunded'
+    else:
+        return 'Skipped event {}'.format(event.type)
+
+
+def get_connect_queue(event):
+    return event.data.object.id
+
+
+@register_processor('stripe-connect')
+def process_connect_event(payload):
+    event = munchify(payload)
+
+    if event.type != "account.updated":
+        return "Skipped event {}".format(event.type)
+
+    try:
+        account = StripePayoutAccount.objects.get(account_id=event.data.object.id)
+    except StripePayoutAccount.DoesNotExist:
+        tenant = connection.tenant
+        error = f"Payout account not found {event.data.object.id} on {tenant.name}"
+        logger.error(error)
+        return "Skipped event {}, account not found".format(event.type)
+
+    external_account_ids = [
+        external_account.id for external_account
+        in event.data.object.external_accounts.data
+    ]
+    for bank_account in account.external_accounts.all():
+        if bank_account.account_id not in external_account_ids:
+            bank_account.delete()
+
+    for external_account in event.data.object.external_accounts.data:
+        status = 'new'
+        if (
+            account.status == 'verified' and
+            external_account.requirements.currently_due == [] and
+            external_account.requirements.past_due == [] and
+            external_account.requirements.pending_verification == [] and
+            external_account.future_requirements.currently_due == [] and
+            external_account.future_requirements.past_due == [] and
+            external_account.future_requirements.pending_verification == []
+        ):
+            status = 'verified'
+        ExternalAccount.objects.get_or_create(
+            connect_account=account,
+            account_id=external_account.id,
+            defaults={'status': status}
+        )
+
+    account.update(event.data.object)
+    account.save()
+
+    return "Updated connect account"
@@ -0,0 +1,228 @@
+import math
+from uuid import uuid4
+
+from django.conf import settings
+from django.contrib.gis.geos import Point, Polygon
+from django.core.cache import cache
+from django.db import transaction
+
+from bluebottle.utils.cache import get_tenant_cache_name
+
+MAX_LATITUDE = 85.0511287798
+
+EMPTY_POINT = Point(0, 0)
+
+CHANGED = object()
+
+
+class MapError(ValueError):
+    pass
+
+
+def tile_bounds(zoom, x, y):
+    """
+    (west, south, east, north) of a web mercator (slippy map) tile
+    """
+    n = 2 ** zoom
+
+    def latitude(y):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+    return (x / n * 360 - 180, latitude(y + 1), (x + 1) / n * 360 - 180, latitude(y))
+
+
+def tile_position(zoom, longitude, latitude):
+    """
+    Fractional tile coordinates of a position
+    """
+    n = 2 ** zoom
+    latitude = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude)))
+    return (
+        (longitude + 180) / 360 * n,
+        (1 - math.asinh(math.tan(latitude)) / math.pi) / 2 * n
+    )
+
+
+def get_tiles(zoom, west, south, east, north):
+    """
+    The tiles that cover a bounding box
+    """
+    n = 2 ** zoom
+    min_x, min_y = tile_position(zoom, west, north)
+    max_x, max_y = tile_position(zoom, east, south)
+
+    return [
+        (x, y)
+        for x in range(max(0, int(min_x)), min(n - 1, int(max_x)) + 1)
+        for y in range(max(0, int(min_y)), min(n - 1, int(max_y)) + 1)
+    ]
+
+
+def parse_bbox(value):
+    try:
+        west, south, east, north = [float(part) for part in value.split(',')]
+    except (AttributeError, ValueError):
+        raise MapError('bbox should be "west,south,east,north"')
+
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise MapError('Invalid bbox')
+    return west, south, east, north
+
+
+def cluster(points, zoom, x, y, grid):
+    """
+    Cluster points on a grid of grid x grid cells in a tile.
+
+    Points are (type, id, longitude, latitude) tuples. Clusters of one point keep the
+    type and id of the point.
+    """
+    cells = {}
+    for point in points:
+        tile_x, tile_y = tile_position(zoom, point[2], point[3])
+        cell = (
+            min(grid - 1, max(0, int((tile_x - x) * grid))),
+            min(grid - 1, max(0, int((tile_y - y) * grid)))
+        )
+        cells.setdefault(cell, []).append(point)
+
+    clusters = []
+    for _cell, cell_points in sorted(cells.items()):
+        longitudes = [point[2] for point in cell_points]
+        latitudes = [point[3] for point in cell_points]
+
+        data = {
+            'position': [
+                sum(latitudes) / len(latitudes),
+                sum(longitudes) / len(longitudes)
+            ],
+            'count': len(cell_points),
+        }
+        if len(cell_points) == 1:
+            data['type'], data['id'] = cell_points[0][:2]
+        else:
+            data['bounds'] = [min(latitudes), min(longitudes), max(latitudes), max(longitudes)]
+
+        clusters.append(data)
+    return clusters
+
+
+class MapLayer(object):
+    """
+    Clustered points of a map, per web mercator tile.
+
+    Subclasses return the points in a polygon with `get_points`. The clusters of a tile are
+    cached per tenant, filters and tile. A version token per tenant and layer, renewed by
+    `invalidate`, makes all cached tiles of the layer stale at once.
+    """
+    name = None
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'MAP_TILE_CACHE_TIMEOUT', 3600)
+
+    @property
+    def grid(self):
+        return getattr(settings, 'MAP_CLUSTER_GRID', 8)
+
+    @property
+    def max_tiles(self):
+        return getattr(settings, 'MAP_MAX_TILES', 64)
+
+    @property
+    def max_zoom(self):
+        return getattr(settings, 'MAP_MAX_ZOOM', 20)
+
+    def get_points(self, polygon, **filters):
+        raise NotImplementedError()
+
+    def get_version_key(self):
+        return get_tenant_cache_name(f'map_{self.name}_version')
+
+    def get_version(self):
+        version_key = self.get_version_key()
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, uuid4().hex, None)
+            version = cache.get(version_key)
+        return version
+
+    def invalidate(self):
+        cache.set(self.get_version_key(), uuid4().hex, None)
+
+    def is_changed(self, instance, fields):
+        """
+        Whether one of `fields` differs from the value that is stored. Call it before the
+        instance is saved.
+        """
+        initial = getattr(instance, '_initial_values', None)
+        if initial is None or instance.pk is None:
+            return True
+
+        attnames = set(field.attname for field in instance._meta.concrete_fields)
+        missing = [field for field in fields if field in attnames and field not in initial]
+
+        stored = {}
+        if missing:
+            # Relations are not kept in the initial values after a save, read them instead
+            stored = type(instance)._base_manager.filter(pk=instance.pk).values(*missing).first()
+            if stored is None:
+                return True
+
+        return any(
+            (stored[field] if field in stored else initial.get(field, CHANGED)) != getattr(instance, field, CHANGED)
+            for field in fields
+        )
+
+    def check_changed(self, instance, fields=()):
+        """
+        Remember whether one of `fields` of the instance is about to change, see
+        `invalidate_if_changed`.
+        """
+        instance.__dict__[f'_map_{self.name}_changed'] = self.is_changed(instance, fields)
+
+    def invalidate_if_changed(self, instance, created=False):
+        """
+        Invalidate the tiles if the instance was created or deleted, or if `check_changed`
+        found a change before it was saved.
+        """
+        if instance.__dict__.pop(f'_map_{self.name}_changed', True) or created:
+            self.invalidate()
+            transaction.on_commit(self.invalidate)
+
+    def get_key(self, version, zoom, x, y, filters):
+        filter_key = '-'.join(f'{key}:{value}' for key, value in sorted(filters.items()))
+        return '{}_{}_{}_{}_{}_{}'.format(
+            get_tenant_cache_name(f'map_{self.name}'), version, filter_key or 'all', zoom, x, y
+        )
+
+    def get_tile(self, zoom, x, y, version=None, **filters):
+        key = self.get_key(version or self.get_version(), zoom, x, y, filters)
+
+        clusters = cache.get(key)
+        if clusters is None:
+            polygon = Polygon.from_bbox(tile_bounds(zoom, x, y))
+            polygon.srid = 4326
+
+            points = set(
+                point for point in self.get_points(polygon, **filters)
+                if point[2] is not None and point[3] is not None
+            )
+            clusters = cluster(points, zoom, x, y, self.grid)
+            cache.set(key, clusters, self.timeout)
+
+        return clusters
+
+    def get_clusters(self, zoom, bbox, **filters):
+        if not 0 <= zoom <= self.max_zoom:
+            raise MapError('Invalid zoom')
+
+        tiles = get_tiles(zoom, *bbox)
+        if len(tiles) > self.max_tiles:
+            raise MapError('Too many tiles, zoom in')
+
+        version = self.get_version()
+        return [
+            data
+            for x, y in tiles
+            for data in self.get_tile(zoom, x, y, version=version, **filters)
+        ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.15 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+from bluebottle.geo.timezones import timezone_service
+
+
+def set_timezone_name(apps, schema_editor):
+    Geolocation = apps.get_model('geo', 'Geolocation')
+
+    locations = []
+    for location in Geolocation.objects.filter(position__isnull=False).only('id', 'position').iterator():
+        location.timezone_name = timezone_service.timezone_for_point(location.position)
+        locations.append(location)
+
+        if len(locations) >= 500:
+            Geolocation.objects.bulk_update(locations, ['timezone_name'])
+            locations = []
+
+    Geolocation.objects.bulk_update(locations, ['timezone_name'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('geo', '0040_alter_geolocation_mapbox_id_alter_place_mapbox_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='geolocation',
+            name='timezone_name',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Timezone'),
+        ),
+        migrations.RunPython(set_timezone_name, migrations.RunPython.noop)
+    ]
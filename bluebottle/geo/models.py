@@ -12,15 +12,13 @@ from django_better_admin_arrayfield.models.fields import ArrayField
 from future.utils import python_2_unicode_compatible
 from parler.models import TranslatedFields
 from sorl.thumbnail import ImageField
-from timezonefinder import TimezoneFinder
 
+from bluebottle.geo.timezones import timezone_service
 from bluebottle.utils.validators import FileMimetypeValidator, validate_file_infection
 from .validators import Alpha2CodeValidator, Alpha3CodeValidator, \
     NumericCodeValidator
 from ..utils.models import SortableTranslatableModel
 
-tf = TimezoneFinder()
-
 
 @python_2_unicode_compatible
 class GeoBaseModel(SortableTranslatableModel):
@@ -262,6 +260,7 @@ class Geolocation(models.Model):
     formatted_address = models.CharField(_('Address'), max_length=255, blank=True, null=True)
 
     position = PointField(null=True)
+    timezone_name = models.CharField(_('Timezone'), max_length=64, blank=True, null=True, editable=False)
 
     origin = models.ForeignKey(
         'activity_pub.Place', null=True, related_name="locations", on_delete=models.SET_NULL
@@ -288,10 +287,7 @@ class Geolocation(models.Model):
     @property
     def timezone(self):
         if self.position:
-            return tf.timezone_at(
-                lng=self.position.x,
-                lat=self.position.y
-            )
+            return self.timezone_name or timezone_service.timezone_for_point(self.position)
         return 'Europe/Amsterdam'
 
     def reverse_geocode(self):
@@ -365,4 +361,13 @@ class Geolocation(models.Model):
             or self.mapbox_id in ['unknown', '', None]
         ):
             self.update_location(replace=replace)
+
+        if not self.position:
+            self.timezone_name = None
+        elif replace or not self.timezone_name:
+            self.timezone_name = timezone_service.timezone_for_point(self.position)
+
+        if kwargs.get('update_fields') and 'position' in kwargs['update_fields']:
+            kwargs['update_fields'] = list(kwargs['update_fields']) + ['timezone_name']
+
         return super().save(*args, **kwargs)
@@ -5,7 +5,6 @@ from django.contrib.gis.geos import Point
 from rest_framework import serializers
 from rest_framework_json_api.serializers import ModelSerializer
 from staticmaps_signature import StaticMapURLSigner
-from timezonefinder import TimezoneFinder
 
 from bluebottle.bluebottle_drf2.serializers import ImageSerializer
 from bluebottle.geo.models import Country, Location, Place, Geolocation
@@ -14,8 +13,6 @@ staticmap_url_signer = StaticMapURLSigner(
     public_key=settings.STATIC_MAPS_API_KEY, private_key=settings.STATIC_MAPS_API_SECRET
 )
 
-tf = TimezoneFinder()
-
 
 class PointSerializer(serializers.CharField):
 
@@ -1,11 +1,17 @@
 from builtins import object
+
+from unittest import mock
+from django.contrib.gis.geos import Point
 from django.core.exceptions import ValidationError
+from django.test.utils import override_settings
 
 from bluebottle.offices.tests.factories import LocationFactory
 from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
 from bluebottle.deeds.tests.factories import DeedFactory
 from bluebottle.test.utils import BluebottleTestCase
-from bluebottle.geo.models import Region, SubRegion, Country, Location
+from bluebottle.geo.models import Region, SubRegion, Country, Location, Geolocation
+from bluebottle.geo.timezones import timezone_service
+from bluebottle.test.factory_models.geo import GeolocationFactory
 
 
 class GeoTestsMixin(object):
@@ -169,3 +175,40 @@ class LocationTestCase(BluebottleTestCase):
         self.assertRaises(
             Location.DoesNotExist, Location.objects.get, pk=self.to_be_merged.pk
         )
+
+
+@override_settings(MAPBOX_API_KEY=None)
+class GeolocationTimezoneTestCase(BluebottleTestCase):
+    def setUp(self):
+        timezone_service.clear()
+        self.location = GeolocationFactory.create(position=Point(13.4, 52.5))
+
+    def test_timezone_stored(self):
+        self.assertEqual(self.location.timezone_name, 'Europe/Berlin')
+
+        with mock.patch.object(timezone_service, 'timezone_at') as timezone_at:
+            self.assertEqual(Geolocation.objects.get(pk=self.location.pk).timezone, 'Europe/Berlin')
+
+        self.assertFalse(timezone_at.called)
+
+    def test_position_changed(self):
+        self.location.position = Point(-74.0, 40.7)
+        self.location.save()
+
+        self.location.refresh_from_db()
+        self.assertEqual(self.location.timezone_name, 'America/New_York')
+
+    def test_no_position(self):
+        self.location.position = None
+        self.location.save()
+
+        self.assertIsNone(self.location.timezone_name)
+        self.assertEqual(self.location.timezone, 'Europe/Amsterdam')
+
+    def test_lookup_cached(self):
+        timezone_service.clear()
+
+        timezone_service.timezone_at(lng=13.40001, lat=52.50001)
+        timezone_service.timezone_at(lng=13.40002, lat=52.50002)
+
+        self.assertEqual(timezone_service.cache_info().hits, 1)
@@ -0,0 +1,48 @@
+from functools import lru_cache
+from threading import Lock
+
+from django.conf import settings
+
+
+class TimezoneService(object):
+    """
+    Resolve the timezone of a position.
+
+    The timezone data is only loaded on the first lookup, and is shared by the whole
+    process. Lookups are cached on coordinates rounded to `TIMEZONE_LOOKUP_PRECISION`
+    decimals (3 decimals is roughly 100 meters).
+    """
+
+    def __init__(self):
+        self._finder = None
+        self._lock = Lock()
+        self._lookup = lru_cache(maxsize=getattr(settings, 'TIMEZONE_LOOKUP_CACHE_SIZE', 4096))(self._timezone_at)
+
+    @property
+    def finder(self):
+        if self._finder is None:
+            with self._lock:
+                if self._finder is None:
+                    from timezonefinder import TimezoneFinder
+                    self._finder = TimezoneFinder()
+        return self._finder
+
+    def _timezone_at(self, lng, lat):
+        return self.finder.timezone_at(lng=lng, lat=lat)
+
+    def timezone_at(self, lng, lat):
+        precision = getattr(settings, 'TIMEZONE_LOOKUP_PRECISION', 3)
+        return self._lookup(round(lng, precision), round(lat, precision))
+
+    def timezone_for_point(self, point):
+        if point:
+            return self.timezone_at(lng=point.x, lat=point.y)
+
+    def cache_info(self):
+        return self._lookup.cache_info()
+
+    def clear(self):
+        self._lookup.cache_clear()
+
+
+timezone_service = TimezoneService()
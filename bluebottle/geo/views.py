@@ -5,9 +5,12 @@ from rest_framework.generics import (
     ListAPIView, RetrieveAPIView, CreateAPIView,
     RetrieveUpdateAPIView
 )
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework_json_api.views import AutoPrefetchMixin
 
 from bluebottle.bb_accounts.permissions import IsAuthenticatedOrOpenPermission
+from bluebottle.geo.maps import MapError, parse_bbox
 from bluebottle.geo.models import Location, Country, Geolocation, Place
 from bluebottle.geo.permissions import IsConnectedToProfile
 from bluebottle.geo.serializers import (
@@ -120,3 +123,30 @@ class NewCountryList(JsonApiViewMixin, ListAPIView):
     queryset = Country.objects.all()
     serializer_class = InitiativeCountrySerializer
     pagination_class = None
+
+
+class MapTileList(APIView):
+    """
+    Clustered points of a map layer in a bounding box.
+
+    `?bbox=west,south,east,north&zoom=<zoom>` returns the clusters of the web mercator tiles
+    at `zoom` that cover the bounding box. Clusters of one point contain its type and id.
+    """
+    layer = None
+
+    def get_filters(self):
+        return {}
+
+    def get(self, request, *args, **kwargs):
+        try:
+            try:
+                zoom = int(request.query_params.get('zoom'))
+            except (TypeError, ValueError):
+                raise MapError('zoom should be a number')
+
+            bbox = parse_bbox(request.query_params.get('bbox'))
+            clusters = self.layer.get_clusters(zoom, bbox, **self.get_filters())
+        except MapError as e:
+            return Response({'detail': str(e)}, status=400)
+
+        return Response({'clusters': clusters})
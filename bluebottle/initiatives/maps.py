@@ -0,0 +1,57 @@
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from bluebottle.geo.maps import EMPTY_POINT, MapLayer
+from bluebottle.initiatives.models import Initiative
+
+
+class InitiativeMapLayer(MapLayer):
+    """
+    Positions of approved initiatives: their impact location, or else their work location.
+    """
+    name = 'initiatives'
+
+    def get_points(self, polygon, **filters):
+        points = Initiative.objects.filter(
+            status='approved', **filters
+        ).exclude(
+            place__position=EMPTY_POINT
+        ).annotate(
+            point=Coalesce('place__position', 'location__position')
+        ).filter(
+            point__within=polygon
+        ).order_by().values_list('id', 'point')
+
+        for initiative_id, point in points:
+            yield ('initiatives', initiative_id, point.x, point.y)
+
+
+initiative_map = InitiativeMapLayer()
+
+
+def get_map_fields(sender, instance):
+    """
+    The fields that change the initiative map, or None if the instance is not on the map
+    """
+    if isinstance(instance, Initiative):
+        return ('status', 'place_id', 'location_id', 'title', 'slug')
+    elif sender._meta.label_lower in ('geo.geolocation', 'geo.location'):
+        return ('position', )
+
+
+@receiver(pre_save)
+def check_initiative_map(sender, instance, raw=False, **kwargs):
+    fields = get_map_fields(sender, instance)
+    if fields and not raw:
+        initiative_map.check_changed(instance, fields)
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def invalidate_initiative_map(sender, instance, signal, created=False, raw=False, **kwargs):
+    if raw:
+        return
+
+    if get_map_fields(sender, instance):
+        initiative_map.invalidate_if_changed(instance, created=created or signal is post_delete)
@@ -647,3 +647,6 @@ class Theme(SortableTranslatableModel):
 
     class JSONAPIMeta(object):
         resource_name = "themes"
+
+
+from bluebottle.initiatives import maps  # noqa
@@ -1344,6 +1344,59 @@ class InitiativeAPITestCase(APITestCase):
         self.assertRelationship('segments', [segment])
 
 
+@override_settings(
+    CACHES={
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+)
+class InitiativeMapAPITestCase(BluebottleTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = JSONAPITestClient()
+
+        self.amsterdam = InitiativeFactory.create(
+            status='approved',
+            place=GeolocationFactory.create(position=Point(4.89, 52.37))
+        )
+        self.nairobi = InitiativeFactory.create(
+            status='approved',
+            place=GeolocationFactory.create(position=Point(36.82, -1.29))
+        )
+        InitiativeFactory.create(
+            status='draft',
+            place=GeolocationFactory.create(position=Point(4.89, 52.37))
+        )
+
+    def test_map_list_cached(self):
+        url = reverse('initiative-map-list')
+        self.assertEqual(len(self.client.get(url).json()), 2)
+
+        # Updates without signals do not invalidate the cached list
+        Initiative.objects.filter(status='draft').update(status='approved')
+        self.assertEqual(len(self.client.get(url).json()), 2)
+
+        InitiativeFactory.create(
+            status='approved',
+            place=GeolocationFactory.create(position=Point(-74.0, 40.7))
+        )
+        self.assertEqual(len(self.client.get(url).json()), 4)
+
+    def test_map_tiles(self):
+        response = self.client.get(
+            reverse('initiative-map-tiles'), {'zoom': 0, 'bbox': '-180,-85,180,85'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        clusters = response.json()['clusters']
+        self.assertEqual(
+            set((cluster['type'], cluster['id']) for cluster in clusters),
+            set([('initiatives', self.amsterdam.pk), ('initiatives', self.nairobi.pk)])
+        )
+
+
 class InitiativePlatformSettingsApiTestCase(APITestCase):
 
     def setUp(self):
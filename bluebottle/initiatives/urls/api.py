@@ -5,7 +5,7 @@ from bluebottle.initiatives.views import (
     InitiativeList, InitiativeDetail, InitiativeImage,
     RelatedInitiativeImageList, RelatedInitiativeImageContent,
     InitiativeReviewTransitionList,
-    InitiativeMapList, InitiativePreviewList, InitiativeRedirectList,
+    InitiativeMapList, InitiativeMapTileList, InitiativePreviewList, InitiativeRedirectList,
     ThemeList, ThemeDetail
 )
 
@@ -66,6 +66,11 @@ urlpatterns = [
         InitiativeMapList.as_view(),
         name='initiative-map-list'
     ),
+    path(
+        '/map/tiles/',
+        InitiativeMapTileList.as_view(),
+        name='initiative-map-tiles'
+    ),
     path(
         '/preview/',
         InitiativePreviewList.as_view(),
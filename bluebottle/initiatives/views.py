@@ -18,7 +18,9 @@ from bluebottle.bluebottle_drf2.renderers import ElasticSearchJSONAPIRenderer
 from bluebottle.files.models import RelatedImage
 from bluebottle.files.views import ImageContentView
 from bluebottle.funding.models import Funding
+from bluebottle.geo.views import MapTileList
 from bluebottle.initiatives.filters import InitiativeSearchFilter
+from bluebottle.initiatives.maps import initiative_map
 from bluebottle.initiatives.models import Initiative
 from bluebottle.initiatives.models import Theme
 from bluebottle.initiatives.permissions import (
@@ -125,17 +127,23 @@ class InitiativeMapList(generics.ListAPIView):
         return queryset
 
     def list(self, request, *args, **kwargs):
-        cache_key = '{}.initiative_preview_data'.format(connection.tenant.schema_name)
-        cache.set(cache_key, None)
+        # The map version changes whenever an initiative or its location changes
+        cache_key = '{}.initiative_preview_data.{}'.format(
+            connection.tenant.schema_name, initiative_map.get_version()
+        )
         data = cache.get(cache_key)
-        if not data:
+        if data is None:
             queryset = self.get_queryset().order_by('created')
             serializer = self.get_serializer(queryset, many=True)
             data = serializer.data
-            cache.set(cache_key, data)
+            cache.set(cache_key, data, initiative_map.timeout)
         return Response(data)
 
 
+class InitiativeMapTileList(MapTileList):
+    layer = initiative_map
+
+
 class InitiativeDetail(JsonApiViewMixin, AutoPrefetchMixin, RetrieveUpdateAPIView):
     queryset = Initiative.objects.select_related(
         'owner', 'reviewer', 'promoter', 'place', 'location',
@@ -8,8 +8,9 @@ from django.conf import settings
 from django.contrib.admin.sites import AdminSite
 from django.contrib.auth.models import Group, Permission
 from django.core import mail
+from django.db import connection
 from django.test.client import RequestFactory
-from django.test.utils import override_settings
+from django.test.utils import override_settings, CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from djmoney.money import Money
@@ -30,6 +31,7 @@ from bluebottle.time_based.tests.factories import (
     DeadlineParticipantFactory,
     TimeContributionFactory,
 )
+from bluebottle.utils.admin import export_as_csv_action
 from bluebottle.utils.models import Language
 
 factory = RequestFactory()
@@ -465,7 +467,7 @@ class MemberAdminExportTest(BluebottleTestCase):
 
         response = self.export_action(self.member_admin, self.request, self.member_admin.get_queryset(self.request))
 
-        data = response.content.decode('utf-8').split("\r\n")
+        data = b''.join(response.streaming_content).decode('utf-8').split("\r\n")
         headers = data[0].split(";")
         user_data = []
         for row in data:
@@ -492,7 +494,7 @@ class MemberAdminExportTest(BluebottleTestCase):
 
         response = self.export_action(self.member_admin, self.request, self.member_admin.get_queryset(self.request))
 
-        data = response.content.decode('utf-8').split("\r\n")
+        data = b''.join(response.streaming_content).decode('utf-8').split("\r\n")
         headers = data[0].split(";")
         data = data[1].split(";")
 
@@ -512,7 +514,7 @@ class MemberAdminExportTest(BluebottleTestCase):
         member.save()
         response = self.export_action(self.member_admin, self.request, self.member_admin.get_queryset(self.request))
 
-        data = response.content.decode('utf-8').split("\r\n")
+        data = b''.join(response.streaming_content).decode('utf-8').split("\r\n")
         headers = data[0].split(";")
         user_data = []
         for row in data:
@@ -527,6 +529,32 @@ class MemberAdminExportTest(BluebottleTestCase):
         self.assertEqual(user_data[12], 'Bitterballen')
         self.assertEqual(user_data[13], 'Bier')
 
+    @override_settings(CSV_EXPORT_CHUNK_SIZE=2)
+    def test_member_export_queries(self):
+        export_action = export_as_csv_action(fields=(('email', 'email'), ('place__locality', 'city')))
+        food = SegmentTypeFactory.create(name='Food')
+        segment = SegmentFactory.create(segment_type=food, name='Bitterballen')
+
+        def export():
+            response = export_action(self.member_admin, self.request, Member.objects.all())
+            return b''.join(response.streaming_content).decode('utf-8').split("\r\n")
+
+        for member in BlueBottleUserFactory.create_batch(2):
+            member.segments.add(segment)
+
+        with CaptureQueriesContext(connection) as queries:
+            export()
+
+        for member in BlueBottleUserFactory.create_batch(2):
+            member.segments.add(segment)
+
+        # One chunk more, with one query for the members and one for their segments
+        with self.assertNumQueries(len(queries) + 2):
+            data = export()
+
+        self.assertEqual(data[0], 'email;city;Food')
+        self.assertEqual(len([row for row in data if row.endswith(';Bitterballen')]), 4)
+
 
 @override_settings(SEND_WELCOME_MAIL=True)
 class AccountMailAdminTest(BluebottleAdminTestCase):
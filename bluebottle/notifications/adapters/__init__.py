@@ -8,3 +8,6 @@ class BaseMessageAdapter(object):
 
     def send(self):
         raise NotImplementedError()
+
+    def prepare(self, **context):
+        raise NotImplementedError()
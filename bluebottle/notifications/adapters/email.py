@@ -1,5 +1,5 @@
 from bluebottle.notifications.adapters import BaseMessageAdapter
-from bluebottle.utils.email_backend import send_mail
+from bluebottle.utils.email_backend import send_mail, prepare_mail
 
 
 class EmailMessageAdapter(BaseMessageAdapter):
@@ -8,8 +8,8 @@ class EmailMessageAdapter(BaseMessageAdapter):
     def template_name(self):
         return 'mails/{}'.format(self.message.template)
 
-    def send(self, **context):
-        send_mail(
+    def get_kwargs(self, **context):
+        return dict(
             template_name=self.template_name,
             subject=self.message.subject,
             to=self.message.recipient,
@@ -20,3 +20,9 @@ class EmailMessageAdapter(BaseMessageAdapter):
             insert_method=self.message.insert_method,
             **context
         )
+
+    def send(self, **context):
+        send_mail(**self.get_kwargs(**context))
+
+    def prepare(self, **context):
+        return prepare_mail(**self.get_kwargs(**context))
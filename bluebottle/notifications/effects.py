@@ -1,6 +1,8 @@
 import logging
 
+from django.db.models import QuerySet
 from django.template.loader import render_to_string
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from future.utils import python_2_unicode_compatible
 
@@ -24,7 +26,7 @@ class BaseNotificationEffect(Effect):
             if self.message.delay and self.message.task_id:
                 message.send_delayed()
             else:
-                message.compose_and_send()
+                message.schedule(recipients=self.recipients)
 
     def __repr__(self):
         return '<Effect: Send {}>'.format(self.message)
@@ -51,11 +53,21 @@ class BaseNotificationEffect(Effect):
     def __str__(self):
         return _('Message {subject} to {recipients}').format(**self._content())
 
+    @cached_property
+    def recipients(self):
+        return self.message(self.instance, **self.options).get_recipients()
+
+    @property
+    def has_recipients(self):
+        if isinstance(self.recipients, QuerySet):
+            return self.recipients.exists()
+        return len(self.recipients) > 0
+
     @property
     def is_valid(self):
         return (
             all([condition(self) for condition in self.conditions]) and
-            len(self.message(self.instance, **self.options).get_recipients()) > 0
+            self.has_recipients
         )
 
     def to_html(self):
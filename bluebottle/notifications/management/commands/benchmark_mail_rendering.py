@@ -0,0 +1,93 @@
+"""
+Measure the time it takes to inline the css of every mail in the preview corpus.
+
+Every message that `preview_all_messages` can render is inlined a number of times, once
+with a plain premailer transform of the complete mail and once with the compiled mail
+cache. The content block is changed for every round, so that only the layout can be
+reused.
+
+Usage:
+    python manage.py benchmark_mail_rendering
+    python manage.py benchmark_mail_rendering --module activities --rounds 20
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import translation
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import tenant_url
+from bluebottle.notifications.management.commands.preview_all_messages import (
+    MESSAGE_MODULES, discover_message_classes, preview_message
+)
+from bluebottle.utils.compiled_mail import compiled_mail_cache, inline
+
+
+class Command(BaseCommand):
+    help = 'Benchmark mail rendering with and without the compiled mail cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tenant', type=str, default='goodup_demo', help='Schema name of the tenant to use')
+        parser.add_argument('--module', type=str, help='Only benchmark messages of a specific module')
+        parser.add_argument('--language', type=str, default='en', help='Language to render the messages in')
+        parser.add_argument('--rounds', type=int, default=10, help='Number of recipients per message')
+
+    def handle(self, *args, **options):
+        connection.set_tenant(Client.objects.get(schema_name=options['tenant']))
+        base_url = tenant_url()
+        language = options['language']
+        rounds = options['rounds']
+
+        modules = MESSAGE_MODULES
+        if options['module']:
+            modules = dict(
+                (name, path) for name, path in MESSAGE_MODULES.items()
+                if options['module'].lower() in name.lower()
+            )
+
+        corpus = []
+        for module_path in modules.values():
+            for name, message_class in discover_message_classes(module_path):
+                content = preview_message(name, message_class, language, 'html')
+                if content:
+                    corpus.append((name, message_class.template, content['html']))
+
+        compiled_mail_cache.clear()
+        compiled_mail_cache.reset_stats()
+
+        plain = 0
+        compiled = 0
+        with translation.override(language):
+            for name, template, html in corpus:
+                mails = [
+                    html.replace('<!--/mail-slot:content-->', '<p>{}</p><!--/mail-slot:content-->'.format(index))
+                    for index in range(rounds)
+                ]
+
+                started = time.perf_counter()
+                for mail in mails:
+                    inline(mail, base_url)
+                plain_time = time.perf_counter() - started
+
+                started = time.perf_counter()
+                for mail in mails:
+                    compiled_mail_cache.transform(mail, base_url, (connection.tenant.schema_name, template, language))
+                compiled_time = time.perf_counter() - started
+
+                plain += plain_time
+                compiled += compiled_time
+
+                self.stdout.write(
+                    f'{name:60} {plain_time / rounds * 1000:8.1f} ms {compiled_time / rounds * 1000:8.1f} ms'
+                )
+
+        messages = len(corpus) * rounds
+        if not messages:
+            self.stderr.write('No messages rendered')
+            return
+
+        self.stdout.write(f'\n{len(corpus)} messages, {rounds} recipients each')
+        self.stdout.write(f'premailer:     {plain / messages * 1000:.1f} ms per message')
+        self.stdout.write(f'compiled mail: {compiled / messages * 1000:.1f} ms per message')
+        self.stdout.write(f'cache: {compiled_mail_cache.stats}')
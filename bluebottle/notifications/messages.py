@@ -1,24 +1,27 @@
 # -*- coding: utf-8 -*-
+import json
 import logging
 from builtins import object
 from builtins import str
 from functools import partial
 from operator import attrgetter
 
+from django.conf import settings
 from django.contrib.admin.options import get_content_type_for_model
 from django.core.cache import cache
-from django.db import connection
+from django.db import connection, models
 from django.template import loader
 from django.utils import translation as django_translation
 from django.utils.html import format_html
+from django.utils.timezone import now
 from future.utils import python_2_unicode_compatible
 
 from bluebottle.celery import app
 from bluebottle.clients import properties
 from bluebottle.mails.models import MailPlatformSettings
-from bluebottle.notifications.models import Message, MessageTemplate
+from bluebottle.notifications.models import Message, MessageTemplate, NotificationJob
 from bluebottle.utils import translation
-from bluebottle.utils.utils import get_current_language, to_text, get_tenant_name
+from bluebottle.utils.utils import get_current_language, to_text, get_tenant_name, get_class, GetClassError
 
 logger = logging.getLogger(__name__)
 
@@ -203,10 +206,11 @@ class TransitionMessage(object):
             object_id=self.obj.pk
         ).count() > 0
 
-    def get_messages(self, **base_context):
+    def get_messages(self, recipients=None, **base_context):
         custom_message = self.options.get('custom_message', '')
         custom_template = self.get_message_template()
-        recipients = list(set(self.get_recipients()))
+        if recipients is None:
+            recipients = list(set(self.get_recipients()))
         for recipient in filter(None, recipients):
             with translation.override(recipient.primary_language):
                 if self.send_once and self.already_send(recipient):
@@ -251,8 +255,8 @@ class TransitionMessage(object):
     def get_bcc_addresses(self):
         return []
 
-    def compose_and_send(self, **base_context):
-        for message in self.get_messages(**base_context):
+    def compose_and_send(self, recipients=None, **base_context):
+        for message in self.get_messages(recipients=recipients, **base_context):
             context = self.get_context(message.recipient, **base_context)
             reply_to = self.reply_to
             if reply_to:
@@ -261,6 +265,80 @@ class TransitionMessage(object):
 
             message.send(**context)
 
+    def send_batch(self, recipients, **base_context):
+        """
+        Compose and send the message to a batch of recipients.
+
+        The messages are stored with one query, and the mails are handed to the
+        mail backend together. Returns the number of messages sent.
+        """
+        return send_message_batch([(self, recipients, base_context)])
+
+    def get_job_options(self):
+        """
+        The options that are stored with a notification job. Model instances are stored as
+        references. Returns None when an option can not be stored, so the message is sent
+        right away with all its options instead.
+        """
+        options = {}
+        instances = {}
+        for key, value in self.options.items():
+            if isinstance(value, models.Model):
+                instances[key] = [value._meta.label_lower, value.pk]
+                continue
+
+            try:
+                options[key] = json.loads(json.dumps(value))
+            except (TypeError, ValueError):
+                logger.warning(
+                    'Option %s of %s can not be stored in a notification job, sending it right away',
+                    key, self.__class__.__name__
+                )
+                return None
+
+        if instances:
+            options['_instances'] = instances
+        return options
+
+    def schedule(self, recipients=None):
+        """
+        Compose and send the message in the background, one batch of recipients at a time.
+        The recipients are looked up by the worker. Falls back to sending right away when
+        the message can not be stored as a job, using `recipients` when they are known already.
+        """
+        path = '{}.{}'.format(self.__class__.__module__, self.__class__.__name__)
+        options = self.get_job_options()
+
+        try:
+            is_importable = get_class(path) is self.__class__
+        except GetClassError:
+            is_importable = False
+
+        if (
+            not getattr(settings, 'NOTIFICATION_JOBS', False) or
+            options is None or
+            not is_importable or
+            not getattr(self.obj, 'pk', None) or
+            self.__class__.compose_and_send is not TransitionMessage.compose_and_send
+        ):
+            if recipients is not None:
+                recipients = list(set(recipients))
+            self.compose_and_send(recipients=recipients)
+            return
+
+        job = NotificationJob.objects.create(
+            message=path,
+            options=options,
+            content_object=self.obj,
+        )
+
+        if getattr(settings, 'TESTING', False) or getattr(settings, 'CELERY_ALWAYS_EAGER', False):
+            process_notification_job(job.pk, connection.tenant)
+        else:
+            process_notification_job.delay_on_commit(job.pk, connection.tenant)
+
+        return job
+
     @property
     def is_delayed(self):
         return cache.get(self.task_id)
@@ -280,6 +358,87 @@ class TransitionMessage(object):
         )
 
 
+def send_message_batch(batch):
+    """
+    Compose and send several notifications at once.
+
+    `batch` is a list of (notification, recipients, base_context) tuples, recipients
+    can be None to use the recipients of the notification. The messages are stored with
+    one query, and the mails are handed to the mail backend together. Once the messages
+    are stored, failures are logged instead of raised: when the batch can not be sent, the
+    stored messages are sent one by one. Returns the number of messages sent.
+    """
+    from bluebottle.cms.models import SitePlatformSettings
+    from bluebottle.utils.email_backend import send_mail_batch
+
+    composed = [
+        (notification, message, base_context)
+        for notification, recipients, base_context in batch
+        for message in notification.get_messages(recipients=recipients, **base_context)
+    ]
+    if not composed:
+        return 0
+
+    messages = [message for _notification, message, _base_context in composed]
+    Message.objects.bulk_create(messages)
+
+    shared_context = {
+        'settings': MailPlatformSettings.load(),
+        'content': SitePlatformSettings.load(),
+    }
+    reply_to = shared_context['settings'].reply_to
+    if reply_to:
+        shared_context['reply_to'] = reply_to
+
+    prepared = []
+    for notification, message, base_context in composed:
+        try:
+            context = notification.get_context(message.recipient, **base_context)
+            context.update(shared_context)
+            prepared.append((message, message.prepare(**context)))
+        except Exception:
+            logger.exception('Failed to prepare message %s', message.pk)
+
+    try:
+        send_mail_batch([mail for _message, mail in prepared])
+    except Exception:
+        logger.exception('Failed to send a batch of %s messages, sending them one by one', len(prepared))
+        sent = []
+        for message, mail in prepared:
+            try:
+                send_mail_batch([mail])
+                sent.append((message, mail))
+            except Exception:
+                logger.exception('Failed to send message %s', message.pk)
+        prepared = sent
+
+    Message.objects.filter(pk__in=[message.pk for message, _mail in prepared]).update(sent=now())
+
+    return len(prepared)
+
+
+def get_recipient_chunks(recipients, chunk_size):
+    """
+    Yield the recipients in lists of at most `chunk_size`, without duplicates.
+
+    Querysets are paged by primary key, so only one chunk of recipients is loaded at a time.
+    """
+    if isinstance(recipients, models.QuerySet):
+        recipients = recipients.order_by('pk').distinct()
+        last = None
+        while True:
+            page = recipients if last is None else recipients.filter(pk__gt=last)
+            chunk = list(page[:chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            last = chunk[-1].pk
+    else:
+        recipients = list(filter(None, dict.fromkeys(recipients)))
+        for start in range(0, len(recipients), chunk_size):
+            yield recipients[start:start + chunk_size]
+
+
 @app.task(acks_late=True)
 def compose_and_send(message, tenant):
     from bluebottle.clients.utils import LocalTenant
@@ -292,3 +451,40 @@ def compose_and_send(message, tenant):
         except Exception:
             logger.exception('Failed to send notification %s', message)
             raise
+
+
+@app.task(acks_late=True)
+def process_notification_job(job_id, tenant):
+    from bluebottle.clients.utils import LocalTenant
+
+    with LocalTenant(tenant, clear_tenant=True):
+        try:
+            job = NotificationJob.objects.get(pk=job_id, status='new')
+        except NotificationJob.DoesNotExist:
+            return
+
+        job.status = 'running'
+        job.started = now()
+        job.save(update_fields=['status', 'started'])
+
+        try:
+            if job.content_object is None:
+                raise ValueError('Object of notification job {} does not exist'.format(job.pk))
+
+            message = job.get_message()
+            chunks = get_recipient_chunks(message.get_recipients(), settings.NOTIFICATION_JOB_CHUNK_SIZE)
+            for chunk in chunks:
+                job.recipients += len(chunk)
+                job.sent += message.send_batch(
+                    sorted(chunk, key=lambda recipient: recipient.primary_language or '')
+                )
+                job.save(update_fields=['recipients', 'sent'])
+
+            job.status = 'succeeded'
+        except Exception:
+            job.status = 'failed'
+            logger.exception('Failed to process notification job %s', job.pk)
+            raise
+        finally:
+            job.finished = now()
+            job.save(update_fields=['status', 'finished'])
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.13 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0019_notificationjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notificationjob',
+            name='recipient_ids',
+            field=models.JSONField(blank=True, default=list),
+        ),
+    ]
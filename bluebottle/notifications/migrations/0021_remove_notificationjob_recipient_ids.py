@@ -0,0 +1,17 @@
+# Generated by Django 5.2.13 on 2026-10-18 18:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0020_notificationjob_recipient_ids'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='notificationjob',
+            name='recipient_ids',
+        ),
+    ]
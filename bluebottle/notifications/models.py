@@ -1,5 +1,6 @@
 from builtins import object
 
+from django.apps import apps
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.postgres.fields import ArrayField
@@ -48,6 +49,45 @@ class Message(models.Model):
         self.sent = now()
         self.save()
 
+    def prepare(self, **context):
+        return self.get_adapter()(self).prepare(**context)
+
+
+class NotificationJob(models.Model):
+    """
+    A notification that is composed and sent to its recipients in the background.
+    """
+    STATUSES = (
+        ('new', _('New')),
+        ('running', _('Running')),
+        ('succeeded', _('Succeeded')),
+        ('failed', _('Failed')),
+    )
+
+    message = models.CharField(max_length=500)
+    options = models.JSONField(default=dict, blank=True)
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    content_object = GenericForeignKey('content_type', 'object_id')
+
+    status = models.CharField(max_length=20, choices=STATUSES, default='new')
+    recipients = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+
+    created = models.DateTimeField(default=now)
+    started = models.DateTimeField(null=True, blank=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def get_message(self):
+        options = dict(self.options)
+        for key, (label, pk) in options.pop('_instances', {}).items():
+            options[key] = apps.get_model(label)._default_manager.filter(pk=pk).first()
+        return get_class(self.message)(self.content_object, **options)
+
+    def __str__(self):
+        return '{} ({})'.format(self.message, self.status)
+
 
 class NotificationPlatformSettings(BasePlatformSettings):
     SHARE_OPTIONS = (
@@ -1,9 +1,15 @@
 from builtins import str
+import mock
 from django.core import mail
+from django.db import connection
+from django.test.utils import override_settings
 
 from bluebottle.activities.messages.activity_manager import ActivityRejectedNotification
 from bluebottle.time_based.tests.factories import DateActivityFactory
+from bluebottle.members.models import Member
 from bluebottle.notifications.effects import NotificationEffect
+from bluebottle.notifications.messages import process_notification_job
+from bluebottle.notifications.models import Message, NotificationJob
 from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
 from bluebottle.test.utils import BluebottleTestCase
 
@@ -25,3 +31,101 @@ class NotificationEffectsTestCase(BluebottleTestCase):
         effect.post_save()
 
         self.assertEqual(mail.outbox[0].subject, subject)
+
+
+class NotificationJobTestCase(BluebottleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = BlueBottleUserFactory.create(email='faal@haas.nl')
+        self.activity = DateActivityFactory.create(title='Bound to fail', owner=self.user)
+        mail.outbox = []
+
+    def test_job(self):
+        effect = NotificationEffect(ActivityRejectedNotification)(self.activity, user=self.user)
+        effect.post_save()
+
+        job = NotificationJob.objects.get()
+        self.assertEqual(job.status, 'succeeded')
+        self.assertEqual(job.content_object, self.activity)
+        self.assertEqual(job.recipients, 1)
+        self.assertEqual(job.sent, 1)
+        self.assertEqual(job.options['_instances']['user'], ['members.member', self.user.pk])
+        self.assertIsNotNone(job.finished)
+
+        message = Message.objects.get(recipient=self.user)
+        self.assertIsNotNone(message.sent)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, 'Your activity "Bound to fail" has been rejected')
+
+    def test_job_recipients_resolved_by_worker(self):
+        message = ActivityRejectedNotification(self.activity)
+        with mock.patch('bluebottle.notifications.messages.process_notification_job'):
+            with mock.patch.object(ActivityRejectedNotification, 'get_recipients') as get_recipients:
+                job = message.schedule()
+
+        get_recipients.assert_not_called()
+
+        owner = BlueBottleUserFactory.create()
+        self.activity.owner = owner
+        self.activity.save()
+
+        process_notification_job(job.pk, connection.tenant)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(Message.objects.get().recipient, owner)
+
+    @override_settings(NOTIFICATION_JOB_CHUNK_SIZE=2)
+    def test_job_chunks(self):
+        others = BlueBottleUserFactory.create_batch(4)
+        recipients = Member.objects.filter(pk__in=[self.user.pk] + [other.pk for other in others])
+
+        with mock.patch.object(ActivityRejectedNotification, 'get_recipients', return_value=recipients):
+            with mock.patch.object(
+                ActivityRejectedNotification, 'send_batch', autospec=True, side_effect=lambda self, chunk: len(chunk)
+            ) as send_batch:
+                NotificationEffect(ActivityRejectedNotification)(self.activity).post_save()
+
+        self.assertEqual([len(call.args[1]) for call in send_batch.call_args_list], [2, 2, 1])
+        job = NotificationJob.objects.get()
+        self.assertEqual(job.recipients, 5)
+        self.assertEqual(job.sent, 5)
+
+    def test_job_option_not_stored(self):
+        message = ActivityRejectedNotification(self.activity, custom_message=object())
+
+        with self.assertLogs('bluebottle.notifications.messages', level='WARNING'):
+            self.assertIsNone(message.get_job_options())
+
+    def test_send_batch(self):
+        other = BlueBottleUserFactory.create()
+        message = ActivityRejectedNotification(self.activity)
+
+        self.assertEqual(message.send_batch([self.user, other]), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Message.objects.filter(sent__isnull=False).count(), 2)
+
+    def test_send_batch_failed(self):
+        other = BlueBottleUserFactory.create()
+        message = ActivityRejectedNotification(self.activity)
+
+        from bluebottle.utils.email_backend import send_mail_batch
+
+        def send_small_batches(mails):
+            if len(mails) > 1:
+                raise ValueError('Batch too large')
+            send_mail_batch(mails)
+
+        with mock.patch('bluebottle.utils.email_backend.send_mail_batch', side_effect=send_small_batches):
+            self.assertEqual(message.send_batch([self.user, other]), 2)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(Message.objects.count(), 2)
+        self.assertEqual(Message.objects.filter(sent__isnull=False).count(), 2)
+
+    @override_settings(NOTIFICATION_JOBS=False)
+    def test_jobs_disabled(self):
+        effect = NotificationEffect(ActivityRejectedNotification)(self.activity)
+        effect.post_save()
+
+        self.assertEqual(NotificationJob.objects.count(), 0)
+        self.assertEqual(len(mail.outbox), 1)
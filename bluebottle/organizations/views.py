@@ -8,7 +8,7 @@ from rest_framework_json_api.pagination import JsonApiPageNumberPagination
 from rest_framework_json_api.parsers import JSONParser
 from rest_framework_json_api.views import AutoPrefetchMixin
 
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
+from bluebottle.auth.authentication import JSONWebTokenAuthentication
 
 
 from bluebottle.bluebottle_drf2.renderers import BluebottleJSONAPIRenderer
@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+from bluebottle.members.models import UserSegment
+from bluebottle.segments.models import Segment
+
+
+class UserSegmentNames(object):
+    """
+    Names of the segments of users, by segment type.
+
+    The segments are loaded once, the segments of a batch of users with one query.
+    """
+
+    def __init__(self):
+        self._segments = None
+
+    @property
+    def segments(self):
+        if self._segments is None:
+            self._segments = dict(
+                (segment.pk, (segment.segment_type_id, segment.name))
+                for segment in Segment.objects.prefetch_related('translations')
+            )
+        return self._segments
+
+    def for_users(self, user_ids):
+        """
+        Return a dict of user id to a dict of segment type id to segment names
+        """
+        result = defaultdict(lambda: defaultdict(list))
+
+        user_segments = UserSegment.objects.filter(
+            member_id__in=set(user_ids) - {None}
+        ).order_by(
+            'member_id', 'segment_id'
+        ).values_list(
+            'member_id', 'segment_id'
+        )
+
+        for user_id, segment_id in user_segments:
+            try:
+                segment_type_id, name = self.segments[segment_id]
+            except KeyError:
+                # Created after the segments were loaded
+                continue
+            result[user_id][segment_type_id].append(name)
+
+        return result
@@ -171,7 +171,7 @@ LOGIN_URL = 'two_factor:login'
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ('django_filters.rest_framework.DjangoFilterBackend',),
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_jwt.authentication.JSONWebTokenAuthentication',
+        'bluebottle.auth.authentication.JSONWebTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.TokenAuthentication'
     ),
@@ -203,6 +203,10 @@ JWT_AUTH = {
 # TODO: move this setting into the JWT_AUTH settings.
 JWT_TOKEN_RENEWAL_DELTA = datetime.timedelta(minutes=30)
 JWT_TOKEN_RENEWAL_LIMIT = datetime.timedelta(days=90)
+
+# Buffer last_seen updates for this many seconds / users before writing them
+LAST_SEEN_FLUSH_INTERVAL = 60
+LAST_SEEN_FLUSH_SIZE = 500
 JWT_EXPIRATION_DELTA = datetime.timedelta(days=7)
 
 # List of paths to ignore for locale redirects
@@ -457,6 +461,10 @@ THUMBNAIL_QUALITY = 85
 THUMBNAIL_PRESERVE_FORMAT = True
 THUMBNAIL_ENGINE = 'bluebottle.files.engines.Engine'
 
+# Generate all image sizes when an image is saved, see bluebottle.files.renditions
+IMAGE_RENDITIONS = True
+IMAGE_RENDITIONS_WEBP = False
+
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 10240
 
@@ -589,6 +597,14 @@ SEND_WELCOME_MAIL = True
 
 EMAIL_BACKEND = 'bluebottle.utils.email_backend.TestMailBackend'
 
+# Reuse smtp connections in TenantAwareBackend for this many messages / seconds. 0 disables pooling.
+EMAIL_POOL_MAX_MESSAGES = 100
+EMAIL_POOL_MAX_AGE = 60
+
+# Inline the css of mail layouts once per tenant, template and language
+MAIL_TEMPLATE_CACHE = True
+MAIL_TEMPLATE_CACHE_SIZE = 128
+
 # and provide a default (without it django-rest-framework-jwt will default
 # to SECRET_KEY. Even better, provide one in a client's properties.py file
 TENANT_JWT_SECRET = 'global-tenant-secret'
@@ -625,6 +641,10 @@ LIVE_PAYMENTS_ENABLED = False
 MINIMAL_PAYOUT_AMOUNT = 20
 
 CELERY_MAIL = False
+
+# Send notifications from transition effects through background jobs, in batches of recipients
+NOTIFICATION_JOBS = True
+NOTIFICATION_JOB_CHUNK_SIZE = 100
 SEND_MAIL = False
 
 DJANGO_WYSIWYG_FLAVOR = "tinymce_advanced"
@@ -657,6 +677,44 @@ FLUENT_CONTENTS_CACHE_OUTPUT = False
 
 CACHE_MIDDLEWARE_SECONDS = 0
 
+# Keep loaded platform settings in process, see bluebottle.utils.cache.PlatformSettingsCache
+PLATFORM_SETTINGS_CACHE = True
+
+# Cache the part of /api/config that is the same for every user, see
+# bluebottle.utils.cache.PublicPropertiesCache
+PUBLIC_PROPERTIES_CACHE = True
+PUBLIC_PROPERTIES_CACHE_TIMEOUT = 300
+
+# Read the engagement statistics from the daily facts, see bluebottle.statistics.rollup
+STATISTICS_ROLLUP = True
+STATISTICS_ROLLUP_REFRESH_DAYS = 31
+
+# Clustered map tiles, see bluebottle.geo.maps
+MAP_TILE_CACHE_TIMEOUT = 3600
+MAP_CLUSTER_GRID = 8
+MAP_MAX_TILES = 64
+
+# Periodic jobs that run for every tenant, see bluebottle.clients.scheduler
+PERIODIC_TASK_SHARD_SIZE = 1
+PERIODIC_TASK_LOCKS = True
+PERIODIC_TASK_LOCK_TIMEOUT = 3600
+# Number of instances a model periodic task loads and commits at once
+PERIODIC_TASK_BATCH_SIZE = 100
+
+# Monthly matching activities mail, see bluebottle.activities.recommendations
+MATCHING_CHUNK_SIZE = 500
+MATCHING_SEARCH_MARGIN = 10
+
+# Number of rows that are read at once by csv and xlsx exports
+CSV_EXPORT_CHUNK_SIZE = 1000
+# Days after which background exports and their files are deleted
+EXPORT_JOB_RETENTION_DAYS = 7
+
+# Failed payment webhook events are retried automatically this many times, after a delay
+# in seconds that doubles with every attempt, see bluebottle.funding.webhooks
+PAYMENT_WEBHOOK_MAX_ATTEMPTS = 5
+PAYMENT_WEBHOOK_RETRY_DELAY = 300
+
 # Amounts shown in donation modal
 DONATION_AMOUNTS = {
     'EUR': (25, 50, 75, 100),
@@ -767,6 +825,11 @@ ELASTICSEARCH_DSL = {
 }
 ELASTICSEARCH_DSL_SIGNAL_PROCESSOR = 'bluebottle.clients.signals.TenantCelerySignalProcessor'
 
+# Number of documents sent to elasticsearch per bulk request by the index update tasks
+ELASTICSEARCH_INDEX_CHUNK_SIZE = 500
+# Seconds a rebuild keeps recording changes without flushing a chunk, see bluebottle.clients.reindex
+REINDEX_RECORDING_TIMEOUT = 6 * 3600
+
 LOGOUT_REDIRECT_URL = 'admin:index'
 LOGIN_REDIRECT_URL = 'admin:index'
 
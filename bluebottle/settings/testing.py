@@ -44,6 +44,8 @@ MERCHANT_ACCOUNTS = [
 
 # Set up a proper testing email backend
 EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+EMAIL_POOL_MAX_MESSAGES = 0
+LAST_SEEN_FLUSH_INTERVAL = 0
 COMPRESS_ENABLED = False
 
 # Disable parler translation cache so tests see fresh DB state (avoids duplicate key etc.)
@@ -210,6 +212,15 @@ CACHES = {
 }
 
 AXES_CACHE = 'axes_cache'
+
+# Test transactions are rolled back, which would leave stale platform settings in process
+PLATFORM_SETTINGS_CACHE = False
+PUBLIC_PROPERTIES_CACHE = False
+STATISTICS_ROLLUP = False
+# The file based test cache is shared by test runs, so locks could skip periodic jobs
+PERIODIC_TASK_LOCKS = False
+# Most test images are not real images
+IMAGE_RENDITIONS = False
 STATIC_MAPS_API_KEY = 'someinvalidapikey'
 STATIC_MAPS_API_SECRET = 'fpqFpdo4RY9GDc-xxawF6Ipmp3Y='
 
@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.statistics.rollup import statistics_rollup
+
+
+def parse_date(value):
+    return datetime.datetime.strptime(value, '%Y-%m-%d').date()
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily facts of the engagement statistics"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--schema", dest="schema_name", help="specify tenant schema, defaults to all tenants"
+        )
+        parser.add_argument("--start", type=parse_date, help="first day (YYYY-MM-DD)")
+        parser.add_argument("--end", type=parse_date, help="last day (YYYY-MM-DD)")
+
+    def handle(self, *args, **options):
+        tenants = Client.objects.all()
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+
+        for tenant in tenants:
+            with LocalTenant(tenant, clear_tenant=True):
+                backfill = statistics_rollup.backfill(options['start'], options['end'])
+                self.stdout.write(
+                    "Backfilled statistics for {} in {}".format(
+                        tenant.client_name, backfill.finished - backfill.started
+                    )
+                )
@@ -0,0 +1,79 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.offices.models import OfficeSubRegion
+from bluebottle.statistics.models import StatisticFact
+from bluebottle.statistics.rollup import statistics_rollup
+from bluebottle.statistics.statistics import Statistics
+
+
+class Command(BaseCommand):
+    help = "Compare the daily facts of the engagement statistics with the live queries"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-s", "--schema", dest="schema_name", help="specify tenant schema, defaults to all tenants"
+        )
+        parser.add_argument(
+            "--fix", action="store_true", default=False,
+            help="backfill the facts of tenants with differences"
+        )
+
+    def get_statistics(self):
+        """
+        All time, every year with facts, and every work location group this year
+        """
+        tz = timezone.get_current_timezone()
+        this_year = timezone.localtime().year
+        first = StatisticFact.objects.filter(date__isnull=False).order_by('date').first()
+
+        yield Statistics()
+
+        for year in range(first.date.year if first else this_year, this_year + 1):
+            yield Statistics(
+                datetime.datetime(year, 1, 1, tzinfo=tz),
+                datetime.datetime(year + 1, 1, 1, tzinfo=tz)
+            )
+
+        for subregion in OfficeSubRegion.objects.all():
+            yield Statistics(
+                datetime.datetime(this_year, 1, 1, tzinfo=tz),
+                datetime.datetime(this_year + 1, 1, 1, tzinfo=tz),
+                subregion=subregion
+            )
+
+    def handle(self, *args, **options):
+        tenants = Client.objects.all()
+        if options['schema_name']:
+            tenants = tenants.filter(schema_name=options['schema_name'])
+
+        for tenant in tenants:
+            with LocalTenant(tenant, clear_tenant=True):
+                if not statistics_rollup.is_enabled():
+                    self.stdout.write("{}: statistic facts are not used".format(tenant.client_name))
+                    continue
+
+                differences = [
+                    (statistics, difference)
+                    for statistics in self.get_statistics()
+                    for difference in statistics_rollup.check(statistics)
+                ]
+
+                for statistics, (name, value, live) in differences:
+                    self.stdout.write(
+                        "{}: {} {} (subregion {}): facts {}, live {}".format(
+                            tenant.client_name, statistics, name,
+                            statistics.subregion.pk if statistics.subregion else '-',
+                            value, live
+                        )
+                    )
+
+                if not differences:
+                    self.stdout.write("{}: statistic facts are consistent".format(tenant.client_name))
+                elif options['fix']:
+                    statistics_rollup.backfill()
+                    self.stdout.write("{}: statistic facts backfilled".format(tenant.client_name))
@@ -0,0 +1,43 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('offices', '0005_alter_officeregion_options_and_more'),
+        ('statistics', '0013_auto_20201207_1137'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticFact',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=40)),
+                ('source', models.CharField(max_length=100)),
+                ('date', models.DateField(blank=True, null=True)),
+                ('currency', models.CharField(blank=True, default='', max_length=3)),
+                ('value', models.DecimalField(decimal_places=4, default=0, max_digits=24)),
+                ('subregion', models.ForeignKey(
+                    blank=True, null=True,
+                    on_delete=django.db.models.deletion.CASCADE,
+                    to='offices.officesubregion'
+                )),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['metric', 'date'], name='statistic_fact_metric_date'),
+                    models.Index(fields=['date'], name='statistic_fact_date'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='StatisticRollupBackfill',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started', models.DateTimeField(auto_now_add=True)),
+                ('finished', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
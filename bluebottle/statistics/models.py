@@ -271,3 +271,40 @@ class Statistic(models.Model):
 
     class Meta(object):
         ordering = ('sequence', )
+
+
+class StatisticFact(models.Model):
+    """
+    Daily rollup of an engagement statistic.
+
+    One row per metric, source, day, work location group and currency. The facts are
+    recomputed for a day whenever an object that feeds them changes, see
+    `bluebottle.statistics.rollup`.
+    """
+    metric = models.CharField(max_length=40)
+    source = models.CharField(max_length=100)
+    date = models.DateField(null=True, blank=True)
+    subregion = models.ForeignKey(
+        'offices.OfficeSubRegion',
+        null=True, blank=True,
+        on_delete=models.CASCADE
+    )
+    currency = models.CharField(max_length=3, blank=True, default='')
+    value = models.DecimalField(max_digits=24, decimal_places=4, default=0)
+
+    class Meta(object):
+        indexes = [
+            models.Index(fields=['metric', 'date'], name='statistic_fact_metric_date'),
+            models.Index(fields=['date'], name='statistic_fact_date'),
+        ]
+
+
+class StatisticRollupBackfill(models.Model):
+    """
+    Backfills of the statistic facts. The facts are only used once a backfill finished.
+    """
+    started = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+
+from bluebottle.statistics import signals  # noqa
@@ -0,0 +1,502 @@
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, models, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from django.utils.functional import cached_property
+from moneyed.classes import Money
+
+from bluebottle.activities.models import EffortContribution
+from bluebottle.clients import properties
+from bluebottle.collect.models import CollectActivity, CollectContribution
+from bluebottle.deeds.models import Deed
+from bluebottle.funding.models import Donor, Funding
+from bluebottle.funding_pledge.models import PledgePayment
+from bluebottle.members.models import Member
+from bluebottle.statistics.models import StatisticFact, StatisticRollupBackfill
+from bluebottle.time_based.models import (
+    DateActivity,
+    DateActivitySlot,
+    PeriodicActivity,
+    DeadlineActivity,
+    ScheduleActivity,
+    TimeContribution
+)
+from bluebottle.utils.cache import memoize
+from bluebottle.utils.exchange_rates import convert_many
+
+ACTIVITY_SUBREGION = 'office_location__subregion'
+CONTRIBUTOR_SUBREGION = 'contributor__user__location__subregion'
+
+CHANGED = object()
+
+
+def get_path_values(instance, path):
+    """
+    The values of a `__` separated path on an instance, following to-many relations.
+    """
+    values = [instance]
+    parts = path.split('__')
+    for index, part in enumerate(parts):
+        result = []
+        for value in values:
+            try:
+                attribute = getattr(value, part)
+            except ObjectDoesNotExist:
+                continue
+
+            if isinstance(attribute, models.Manager):
+                result.extend(attribute.all())
+            elif attribute is not None or index == len(parts) - 1:
+                result.append(attribute)
+        values = result
+
+    return values
+
+
+class RollupSource(object):
+    """
+    A queryset that feeds a metric, aggregated per day of `date_field`.
+
+    `triggers` are (model, path) pairs: a change to an instance of the model marks the day
+    of the date on the path as dirty. By default the source model and date field.
+    """
+
+    def __init__(
+        self, model, date_field, filters, aggregate=None, subregion_field=None,
+        currency_field=None, triggers=None, fields=()
+    ):
+        self.model = model
+        self.date_field = date_field
+        self.filters = filters
+        self.aggregate = aggregate or Count('id')
+        self.subregion_field = subregion_field
+        self.currency_field = currency_field
+        self.triggers = triggers or [(model, date_field)]
+        self.fields = ('status', ) + tuple(fields)
+
+    @property
+    def name(self):
+        return '{}:{}'.format(self.model._meta.label_lower, self.date_field)
+
+    @cached_property
+    def date_path(self):
+        fields = []
+        model = self.model
+        for part in self.date_field.split('__'):
+            field = model._meta.get_field(part)
+            fields.append(field)
+            model = field.related_model
+        return fields
+
+    @property
+    def is_date(self):
+        """
+        Date fields include the end date of a date range, datetime fields stop at the
+        start of the end date.
+        """
+        field = self.date_path[-1]
+        return isinstance(field, models.DateField) and not isinstance(field, models.DateTimeField)
+
+    @property
+    def is_joined(self):
+        """
+        Unbounded statistics do not join on a to-many date field, so they can not be
+        answered from the facts of the joined rows.
+        """
+        return any(field.one_to_many or field.many_to_many for field in self.date_path)
+
+    def to_date(self, value):
+        if isinstance(value, datetime.datetime):
+            return timezone.localtime(value).date()
+        return value
+
+    def get_queryset(self):
+        if self.is_date:
+            date = F(self.date_field)
+        else:
+            date = TruncDate(self.date_field, tzinfo=timezone.get_current_timezone())
+
+        return self.model.objects.order_by().filter(self.filters).annotate(statistic_date=date)
+
+    def get_date_range(self):
+        return self.get_queryset().aggregate(first=Min('statistic_date'), last=Max('statistic_date'))
+
+    def get_facts(self, metric, dates, undated=False):
+        condition = Q(statistic_date__in=dates)
+        if undated and not self.is_joined:
+            condition |= Q(statistic_date__isnull=True)
+
+        annotations = {}
+        if self.subregion_field:
+            annotations['statistic_subregion'] = F(self.subregion_field)
+        if self.currency_field:
+            annotations['statistic_currency'] = F(self.currency_field)
+
+        rows = self.get_queryset().filter(condition).annotate(**annotations).values(
+            'statistic_date', *annotations
+        ).annotate(value=self.aggregate)
+
+        for row in rows:
+            yield StatisticFact(
+                metric=metric.name,
+                source=self.name,
+                date=row['statistic_date'],
+                subregion_id=row.get('statistic_subregion'),
+                currency=row.get('statistic_currency') or '',
+                value=metric.to_fact_value(row['value']),
+            )
+
+    def is_changed(self, instance, created, path):
+        initial = getattr(instance, '_initial_values', None)
+        if created or initial is None:
+            return True
+
+        fields = self.fields
+        if '__' not in path:
+            fields += (path, )
+
+        return any(
+            initial.get(field, CHANGED) != getattr(instance, field, CHANGED)
+            for field in fields
+        )
+
+    def get_dates(self, instance, created=False):
+        dates = set()
+        for model, path in self.triggers:
+            if isinstance(instance, model) and self.is_changed(instance, created, path):
+                values = get_path_values(instance, path)
+                if '__' not in path and hasattr(instance, '_initial_values'):
+                    values.append(instance._initial_values.get(path))
+
+                dates.update(self.to_date(value) for value in values)
+
+        return dates
+
+    def get_condition(self, start, end):
+        condition = Q(source=self.name)
+        if start:
+            condition &= Q(date__gte=start)
+        if end:
+            condition &= Q(date__lte=end) if self.is_date else Q(date__lt=end)
+        return condition
+
+
+class RollupMetric(object):
+    """
+    A statistic that is the sum of the facts of its sources.
+    """
+
+    def __init__(self, name, sources, kind='count'):
+        self.name = name
+        self.sources = sources
+        self.kind = kind
+
+    @property
+    def is_regional(self):
+        return any(source.subregion_field for source in self.sources)
+
+    @property
+    def is_joined(self):
+        return any(source.is_joined for source in self.sources)
+
+    def to_fact_value(self, value):
+        if self.kind == 'duration':
+            return value.total_seconds() if value else 0
+        return value or 0
+
+    def to_value(self, totals):
+        if self.kind == 'money':
+            return convert_many(
+                (Money(total['total'], total['currency']) for total in totals),
+                properties.DEFAULT_CURRENCY
+            )
+
+        total = sum(total['total'] for total in totals)
+        if self.kind == 'duration':
+            return float(total) / 3600 if total else 0
+        return int(total)
+
+
+def activity_sources(date_fields, statuses):
+    return [
+        RollupSource(
+            model, date_field, Q(status__in=statuses),
+            subregion_field=ACTIVITY_SUBREGION,
+            triggers=[(model, date_field), (DateActivitySlot, 'start')] if model is DateActivity else None,
+            fields=('office_location_id', )
+        )
+        for model, date_field in date_fields
+    ]
+
+
+TIME_ACTIVITY_DATES = [
+    (DateActivity, 'slots__start'),
+    (PeriodicActivity, 'deadline'),
+    (DeadlineActivity, 'deadline'),
+    (ScheduleActivity, 'deadline'),
+]
+
+METRICS = [
+    RollupMetric('time_activities_succeeded', activity_sources(TIME_ACTIVITY_DATES, ['succeeded'])),
+    RollupMetric('fundings_succeeded', [
+        RollupSource(Funding, 'deadline', Q(status='succeeded')),
+    ]),
+    RollupMetric('deeds_succeeded', [
+        RollupSource(Deed, 'start', Q(status='succeeded')),
+    ]),
+    RollupMetric('deeds_online', [
+        RollupSource(Deed, 'start', Q(status__in=('open', 'full', 'running'))),
+    ]),
+    RollupMetric('fundings_online', [
+        RollupSource(Funding, 'transition_date', Q(status='open')),
+    ]),
+    RollupMetric('activities_succeeded', activity_sources(TIME_ACTIVITY_DATES + [
+        (CollectActivity, 'end'),
+        (Funding, 'deadline'),
+        (Deed, 'end'),
+    ], ['succeeded'])),
+    RollupMetric('activities_online', activity_sources([
+        (DateActivity, 'slots__start'),
+        (PeriodicActivity, 'start'),
+        (DeadlineActivity, 'start'),
+        (ScheduleActivity, 'start'),
+        (CollectActivity, 'start'),
+        (Funding, 'started'),
+        (Deed, 'start'),
+    ], ['open', 'full', 'running'])),
+    RollupMetric('donated_total', [
+        RollupSource(
+            Donor, 'created', Q(status='succeeded'),
+            aggregate=Sum('amount'), currency_field='amount_currency'
+        ),
+    ], kind='money'),
+    RollupMetric('time_spent', [
+        RollupSource(
+            TimeContribution, 'start', Q(status='succeeded'),
+            aggregate=Sum('value'), subregion_field=CONTRIBUTOR_SUBREGION,
+            fields=('value', )
+        ),
+    ], kind='duration'),
+    RollupMetric('deeds_done', [
+        RollupSource(
+            EffortContribution, 'start',
+            Q(
+                status='succeeded',
+                contributor__polymorphic_ctype__app_label='deeds',
+                contributor__polymorphic_ctype__model='deedparticipant',
+            ),
+            subregion_field=CONTRIBUTOR_SUBREGION
+        ),
+    ]),
+    RollupMetric('collect_done', [
+        RollupSource(
+            CollectContribution, 'start',
+            Q(
+                status='succeeded',
+                contributor__polymorphic_ctype__app_label='collect',
+                contributor__polymorphic_ctype__model='collectcontributor',
+            ),
+            subregion_field=CONTRIBUTOR_SUBREGION
+        ),
+    ]),
+    RollupMetric('donations', [
+        RollupSource(Donor, 'contributor_date', Q(status='succeeded')),
+    ]),
+    RollupMetric('amount_matched', [
+        RollupSource(
+            Funding, 'transition_date',
+            Q(status__in=['succeeded', 'open', 'partial'], amount_matching__gt=0),
+            aggregate=Sum('amount_matching'), currency_field='amount_matching_currency',
+            fields=('amount_matching', 'amount_matching_currency')
+        ),
+    ], kind='money'),
+    RollupMetric('pledged_total', [
+        RollupSource(
+            PledgePayment, 'created', Q(donation__status='succeeded'),
+            aggregate=Sum('donation__amount'), currency_field='donation__amount_currency',
+            triggers=[(PledgePayment, 'created'), (Donor, 'payment__created')]
+        ),
+    ], kind='money'),
+    RollupMetric('members', [
+        RollupSource(
+            Member, 'date_joined', Q(is_active=True),
+            subregion_field='location__subregion'
+        ),
+    ]),
+]
+
+
+@memoize(timeout=300)
+def is_backfilled():
+    return StatisticRollupBackfill.objects.filter(finished__isnull=False).exists()
+
+
+class StatisticsRollup(object):
+    """
+    Daily facts of the engagement statistics.
+
+    `Statistics` reads day aligned date ranges, optionally per region or work location
+    group, by summing the facts of those days instead of running the live queries.
+    Statistics that count distinct people, or that are filtered on a user, are not
+    additive per day and are always computed live.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = dict((metric.name, metric) for metric in metrics)
+
+    @property
+    def sources(self):
+        for metric in self.metrics.values():
+            for source in metric.sources:
+                yield metric, source
+
+    @property
+    def trigger_models(self):
+        return set(
+            model for _metric, source in self.sources for model, _path in source.triggers
+        )
+
+    def is_enabled(self):
+        return getattr(settings, 'STATISTICS_ROLLUP', False) and is_backfilled()
+
+    def to_day(self, value):
+        """
+        The date of a statistics bound, None if the bound does not fall on midnight.
+        """
+        if isinstance(value, datetime.datetime):
+            value = timezone.localtime(value)
+            if value.time() != datetime.time(0):
+                return None
+            return value.date()
+        return value
+
+    def get_value(self, name, statistics):
+        metric = self.metrics.get(name)
+        if not metric or statistics.user or not self.is_enabled():
+            return None
+
+        start = self.to_day(statistics.start)
+        end = self.to_day(statistics.end)
+        if (statistics.start and not start) or (statistics.end and not end):
+            return None
+
+        if not start and not end and metric.is_joined:
+            return None
+
+        condition = Q()
+        for source in metric.sources:
+            condition |= source.get_condition(start, end)
+
+        facts = StatisticFact.objects.filter(condition, metric=name)
+        if metric.is_regional:
+            if statistics.subregion:
+                facts = facts.filter(subregion=statistics.subregion)
+            if statistics.region:
+                facts = facts.filter(subregion__region=statistics.region)
+
+        totals = facts.order_by('currency').values('currency').annotate(total=Sum('value'))
+        return metric.to_value(list(totals))
+
+    def get_dates(self, instance, created=False):
+        """
+        The days of the facts that depend on instance
+        """
+        dates = set()
+        for _metric, source in self.sources:
+            dates |= source.get_dates(instance, created)
+        return dates
+
+    def update(self, dates):
+        """
+        Recompute the facts of the dates. None recomputes the facts without a date.
+
+        Updates of a tenant run one at a time: the facts are computed and replaced while
+        holding a lock, so an update that read older data can not overwrite newer facts.
+        """
+        dates = set(dates)
+        undated = None in dates
+        dates.discard(None)
+
+        existing = Q(date__in=dates)
+        if undated:
+            existing |= Q(date__isnull=True)
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT pg_advisory_xact_lock(hashtext(%s))',
+                    ['statistics_rollup:{}'.format(connection.schema_name)]
+                )
+
+            facts = []
+            for metric, source in self.sources:
+                facts.extend(source.get_facts(metric, dates, undated))
+
+            StatisticFact.objects.filter(existing).delete()
+            StatisticFact.objects.bulk_create(facts)
+
+        return len(facts)
+
+    def get_date_range(self):
+        first = last = None
+        for _metric, source in self.sources:
+            date_range = source.get_date_range()
+            if date_range['first'] and (not first or date_range['first'] < first):
+                first = date_range['first']
+            if date_range['last'] and (not last or date_range['last'] > last):
+                last = date_range['last']
+        return first, last
+
+    def backfill(self, start=None, end=None, chunk_size=31):
+        """
+        Recompute all facts, `chunk_size` days at a time.
+        """
+        backfill = StatisticRollupBackfill.objects.create()
+        first, last = self.get_date_range()
+        start = start or first
+        end = end or last
+
+        self.update([None])
+        if start and end:
+            day = start
+            while day <= end:
+                self.update(
+                    day + datetime.timedelta(days=offset)
+                    for offset in range(min(chunk_size, (end - day).days + 1))
+                )
+                day += datetime.timedelta(days=chunk_size)
+
+        backfill.finished = timezone.now()
+        backfill.save()
+        is_backfilled.delete_memoized()
+        return backfill
+
+    def check(self, statistics):
+        """
+        Compare the facts with the live queries, returns a list of (metric, facts, live)
+        """
+        from bluebottle.statistics.statistics import Statistics
+
+        live = Statistics(
+            statistics.start, statistics.end,
+            subregion=statistics.subregion, region=statistics.region, live=True
+        )
+
+        differences = []
+        for name in self.metrics:
+            value = self.get_value(name, statistics)
+            live_value = getattr(live, name)
+            if isinstance(value, float):
+                # Hours are summed from seconds in a different order
+                value, live_value = round(value, 4), round(live_value, 4)
+
+            if value is not None and value != live_value:
+                differences.append((name, value, live_value))
+        return differences
+
+
+statistics_rollup = StatisticsRollup(METRICS)
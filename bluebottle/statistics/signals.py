@@ -0,0 +1,59 @@
+from threading import local
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bluebottle.statistics.rollup import statistics_rollup
+from bluebottle.statistics.tasks import update_statistic_facts
+
+
+class DirtyDates(local):
+    """
+    Days of which the statistic facts are stale.
+
+    The days are collected per thread and recomputed in one task per tenant once the
+    transaction commits.
+    """
+
+    def __init__(self):
+        self.pending = {}
+
+    def add(self, dates):
+        tenant = getattr(connection, 'tenant', None)
+        if not dates or not tenant:
+            return
+
+        self.pending.setdefault(tenant.schema_name, (tenant, set()))[1].update(dates)
+
+        if not any(entry[1] == self.flush for entry in connection.run_on_commit):
+            transaction.on_commit(self.flush)
+
+    def flush(self):
+        pending, self.pending = self.pending, {}
+        for tenant, dates in pending.values():
+            update_statistic_facts.delay(tenant, dates)
+
+
+dirty_dates = DirtyDates()
+
+trigger_models = tuple(statistics_rollup.trigger_models)
+
+
+@receiver(post_save)
+def mark_statistic_dates_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw or not getattr(settings, 'STATISTICS_ROLLUP', False):
+        return
+
+    if isinstance(instance, trigger_models):
+        dirty_dates.add(statistics_rollup.get_dates(instance, created))
+
+
+@receiver(post_delete)
+def mark_statistic_dates_on_delete(sender, instance, **kwargs):
+    if not getattr(settings, 'STATISTICS_ROLLUP', False):
+        return
+
+    if isinstance(instance, trigger_models):
+        dirty_dates.add(statistics_rollup.get_dates(instance, created=True))
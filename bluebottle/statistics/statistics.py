@@ -1,4 +1,5 @@
 from builtins import object
+from functools import wraps
 
 from django.contrib.contenttypes.models import ContentType
 from django.db.models import Q, Count
@@ -20,16 +21,34 @@ from bluebottle.time_based.models import (
     ScheduleActivity,
     TimeContribution
 )
-from bluebottle.utils.exchange_rates import convert
+from bluebottle.utils.exchange_rates import convert_many
+
+
+def rollup(func):
+    """
+    Read the statistic from the daily facts if possible, see `bluebottle.statistics.rollup`
+    """
+    @wraps(func)
+    def wrapper(self):
+        if not self.live:
+            from bluebottle.statistics.rollup import statistics_rollup
+
+            value = statistics_rollup.get_value(func.__name__, self)
+            if value is not None:
+                return value
+
+        return func(self)
+    return wrapper
 
 
 class Statistics(object):
-    def __init__(self, start=None, end=None, subregion=None, region=None, user=None):
+    def __init__(self, start=None, end=None, subregion=None, region=None, user=None, live=False):
         self.subregion = subregion
         self.region = region
         self.start = start
         self.end = end
         self.user = user
+        self.live = live
 
     timeout = 3600
 
@@ -109,6 +128,7 @@ class Statistics(object):
         return people_count
 
     @property
+    @rollup
     def time_activities_succeeded(self):
         """ Total number of succeeded tasks """
 
@@ -125,6 +145,7 @@ class Statistics(object):
         )
 
     @property
+    @rollup
     def fundings_succeeded(self):
         """ Total number of succeeded tasks """
         tasks = Funding.objects.filter(
@@ -134,6 +155,7 @@ class Statistics(object):
         return len(tasks)
 
     @property
+    @rollup
     def deeds_succeeded(self):
         """ Total number of succeeded tasks """
         return len(Deed.objects.filter(
@@ -146,6 +168,7 @@ class Statistics(object):
         """ Total number of online tasks """
 
     @property
+    @rollup
     def deeds_online(self):
         """ Total number of online tasks """
 
@@ -155,6 +178,7 @@ class Statistics(object):
         ))
 
     @property
+    @rollup
     def fundings_online(self):
         """ Total number of succeeded tasks """
         fundings = Funding.objects.filter(
@@ -164,6 +188,7 @@ class Statistics(object):
         return len(fundings)
 
     @property
+    @rollup
     def activities_succeeded(self):
         """ Total number of succeeded tasks """
 
@@ -183,6 +208,7 @@ class Statistics(object):
         )
 
     @property
+    @rollup
     def activities_online(self):
         """Total number of activities that have been in campaign mode"""
 
@@ -202,6 +228,7 @@ class Statistics(object):
         )
 
     @property
+    @rollup
     def donated_total(self):
         """ Total amount donated to all activities"""
         donations = Donor.objects.filter(
@@ -211,15 +238,13 @@ class Statistics(object):
         if self.user:
             donations = donations.filter(user=self.user)
         totals = donations.order_by('amount_currency').values('amount_currency').annotate(total=Sum('amount'))
-        amounts = [Money(total['total'], total['amount_currency']) for total in totals]
-        if totals:
-            donated = sum([convert(amount, properties.DEFAULT_CURRENCY) for amount in amounts])
-        else:
-            donated = Money(0, properties.DEFAULT_CURRENCY)
-
-        return donated
+        return convert_many(
+            (Money(total['total'], total['amount_currency']) for total in totals),
+            properties.DEFAULT_CURRENCY
+        )
 
     @property
+    @rollup
     def time_spent(self):
         """ Total amount of time spent on realized tasks """
         contributions = TimeContribution.objects.filter(
@@ -244,6 +269,7 @@ class Statistics(object):
         return 0
 
     @property
+    @rollup
     def deeds_done(self):
         """ Total amount of time spent on realized tasks """
         efforts = EffortContribution.objects.filter(
@@ -265,6 +291,7 @@ class Statistics(object):
         return efforts.count()
 
     @property
+    @rollup
     def collect_done(self):
         efforts = CollectContribution.objects.filter(
             self.date_filter('start'),
@@ -306,6 +333,7 @@ class Statistics(object):
         return contributions['count'] or 0
 
     @property
+    @rollup
     def donations(self):
         """ Total number of realized task members """
         donations = Donor.objects.filter(
@@ -316,6 +344,7 @@ class Statistics(object):
         return len(donations)
 
     @property
+    @rollup
     def amount_matched(self):
         """ Total amount matched on realized (done and incomplete) activities """
         totals = Funding.objects.filter(
@@ -325,11 +354,10 @@ class Statistics(object):
             amount_matching__gt=0
         ).values('amount_matching_currency').annotate(total=Sum('amount_matching'))
 
-        amounts = [Money(total['total'], total['amount_matching_currency']) for total in totals]
-        if totals:
-            return sum([convert(amount, properties.DEFAULT_CURRENCY) for amount in amounts])
-        else:
-            return Money(0, properties.DEFAULT_CURRENCY)
+        return convert_many(
+            (Money(total['total'], total['amount_matching_currency']) for total in totals),
+            properties.DEFAULT_CURRENCY
+        )
 
     @property
     def participants(self):
@@ -352,6 +380,7 @@ class Statistics(object):
         return initiative_owners.count() + self.activity_participants
 
     @property
+    @rollup
     def pledged_total(self):
         """ Total amount of pledged donations """
         donations = PledgePayment.objects.filter(
@@ -362,15 +391,13 @@ class Statistics(object):
             'donation__amount_currency'
         ).annotate(total=Sum('donation__amount'))
 
-        amounts = [Money(total['total'], total['donation__amount_currency']) for total in totals]
-        if totals:
-            donated = sum([convert(amount, properties.DEFAULT_CURRENCY) for amount in amounts])
-        else:
-            donated = Money(0, properties.DEFAULT_CURRENCY)
-
-        return donated
+        return convert_many(
+            (Money(total['total'], total['donation__amount_currency']) for total in totals),
+            properties.DEFAULT_CURRENCY
+        )
 
     @property
+    @rollup
     def members(self):
         """ Total amount of members."""
         members = Member.objects.filter(
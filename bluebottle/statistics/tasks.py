@@ -0,0 +1,33 @@
+import datetime
+
+from celery.schedules import crontab
+from django.conf import settings
+from django.utils import timezone
+
+from bluebottle.celery import app
+from bluebottle.clients.scheduler import tenant_periodic_task
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.statistics.rollup import statistics_rollup
+
+
+@app.task
+def update_statistic_facts(tenant, dates):
+    with LocalTenant(tenant, clear_tenant=True):
+        statistics_rollup.update(dates)
+
+
+@tenant_periodic_task(crontab(hour=3, minute=30))
+def refresh_statistic_facts():
+    """
+    Recompute the facts around today, for changes that did not mark their days as dirty,
+    like a changed location of a member.
+    """
+    if not statistics_rollup.is_enabled():
+        return
+
+    days = getattr(settings, 'STATISTICS_ROLLUP_REFRESH_DAYS', 31)
+    today = timezone.localtime().date()
+    statistics_rollup.update(
+        [today + datetime.timedelta(days=offset) for offset in range(-days, days + 1)] +
+        [None]
+    )
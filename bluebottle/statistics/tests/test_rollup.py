@@ -0,0 +1,130 @@
+import datetime
+
+import mock
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test.utils import override_settings
+from django.utils import timezone
+from moneyed.classes import Money
+
+from bluebottle.clients.scheduler import tenant_scheduler
+from bluebottle.deeds.tests.factories import DeedFactory, DeedParticipantFactory
+from bluebottle.funding.tests.factories import FundingFactory, DonorFactory
+from bluebottle.funding_pledge.tests.factories import PledgePaymentFactory
+from bluebottle.statistics.models import StatisticRollupBackfill
+from bluebottle.statistics.rollup import statistics_rollup
+from bluebottle.statistics.statistics import Statistics
+from bluebottle.statistics.tasks import refresh_statistic_facts
+from bluebottle.statistics.tests.test_unit import StatisticsDateTest
+
+
+@override_settings(
+    STATISTICS_ROLLUP=True,
+    CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }
+    }
+)
+class StatisticsRollupTest(StatisticsDateTest):
+    def setUp(self):
+        super(StatisticsRollupTest, self).setUp()
+        tz = timezone.get_current_timezone()
+        today = timezone.localtime().date()
+
+        self.today = datetime.datetime(today.year, today.month, today.day, tzinfo=tz)
+
+        deed = DeedFactory.create(
+            start=today - datetime.timedelta(days=3),
+            end=today - datetime.timedelta(days=1),
+        )
+        deed.states.submit()
+        deed.states.publish(save=True)
+        DeedParticipantFactory.create(activity=deed)
+
+        funding = FundingFactory.create()
+        donor = DonorFactory.create(activity=funding, amount=Money(35, 'EUR'))
+        PledgePaymentFactory.create(donation=donor)
+
+        statistics_rollup.backfill()
+
+    def assertConsistent(self, *args, **kwargs):
+        statistics = Statistics(*args, **kwargs)
+        self.assertEqual(statistics_rollup.check(statistics), [])
+
+    def test_consistent(self):
+        self.assertConsistent()
+        self.assertConsistent(self.today - datetime.timedelta(days=9))
+        self.assertConsistent(end=self.today - datetime.timedelta(days=2))
+        self.assertConsistent(self.today - datetime.timedelta(days=7), self.today)
+
+    def test_read_from_facts(self):
+        statistics = Statistics(self.today - datetime.timedelta(days=30), self.today)
+
+        for name in ('activities_succeeded', 'donated_total', 'pledged_total', 'members'):
+            self.assertIsNotNone(statistics_rollup.get_value(name, statistics))
+
+        self.assertEqual(statistics.pledged_total, Money(35, 'EUR'))
+
+    def test_live(self):
+        statistics = Statistics(self.today - datetime.timedelta(hours=3), self.today)
+        self.assertIsNone(statistics_rollup.get_value('activities_succeeded', statistics))
+
+        statistics = Statistics(self.today - datetime.timedelta(days=3), self.today, user=self.other_user)
+        self.assertIsNone(statistics_rollup.get_value('time_spent', statistics))
+
+        statistics = Statistics()
+        self.assertIsNone(statistics_rollup.get_value('people_involved', statistics))
+        self.assertIsNone(statistics_rollup.get_value('time_activities_succeeded', statistics))
+
+    def test_not_backfilled(self):
+        StatisticRollupBackfill.objects.all().delete()
+
+        statistics = Statistics(self.today - datetime.timedelta(days=30), self.today)
+        self.assertIsNone(statistics_rollup.get_value('members', statistics))
+
+    def test_update_on_transition(self):
+        start = self.today - datetime.timedelta(days=9)
+        end = self.today + datetime.timedelta(days=10)
+        online = Statistics(start, end).deeds_online
+
+        deed = DeedFactory.create(
+            start=timezone.localtime().date() + datetime.timedelta(days=2),
+            end=timezone.localtime().date() + datetime.timedelta(days=4),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            deed.states.submit()
+            deed.states.publish(save=True)
+
+        self.assertIsNotNone(statistics_rollup.get_value('deeds_online', Statistics(start, end)))
+        self.assertEqual(Statistics(start, end).deeds_online, online + 1)
+        self.assertConsistent(start, end)
+
+    def test_update_locks(self):
+        with CaptureQueriesContext(connection) as queries:
+            statistics_rollup.update([timezone.localtime().date()])
+
+        sql = [query['sql'] for query in queries.captured_queries]
+        lock = next(index for index, statement in enumerate(sql) if 'pg_advisory_xact_lock' in statement)
+        self.assertFalse(any(statement.startswith('SELECT') for statement in sql[:lock]))
+        self.assertTrue(any(statement.startswith('DELETE') for statement in sql[lock:]))
+        self.assertConsistent()
+
+    @override_settings(STATISTICS_ROLLUP_REFRESH_DAYS=2)
+    def test_refresh(self):
+        job = tenant_scheduler.jobs[refresh_statistic_facts.name]
+
+        with mock.patch.object(statistics_rollup, 'update') as update:
+            job()
+
+        today = timezone.localtime().date()
+        self.assertEqual(
+            update.call_args[0][0],
+            [today + datetime.timedelta(days=offset) for offset in range(-2, 3)] + [None]
+        )
+
+        StatisticRollupBackfill.objects.all().delete()
+        with mock.patch.object(statistics_rollup, 'update') as update:
+            job()
+
+        update.assert_not_called()
@@ -0,0 +1,91 @@
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bluebottle.activities.counters import is_changed
+from bluebottle.time_based.models import DateActivitySlot, DateParticipant, SlotParticipantCounts
+
+
+def get_slot_participant_counts(slot_id):
+    """
+    Count the participants of a slot, by status
+    """
+    return dict(
+        DateParticipant.objects.filter(
+            slot_id=slot_id
+        ).order_by().values('status').annotate(
+            count=Count('pk')
+        ).values_list('status', 'count')
+    )
+
+
+def get_counts(slot, fresh=False):
+    """
+    The stored participant counts of a slot, see `bluebottle.activities.counters.get_counts`
+    """
+    if fresh:
+        counts = SlotParticipantCounts.objects.filter(
+            slot_id=slot.pk
+        ).values_list('counts', flat=True).first()
+    else:
+        try:
+            counts = slot.participant_counts.counts
+        except SlotParticipantCounts.DoesNotExist:
+            counts = None
+
+    if counts is None:
+        # Not reconciled yet
+        counts = get_slot_participant_counts(slot.pk)
+    return counts
+
+
+def count_slot_participants(slot, statuses=None, fresh=False):
+    if not slot.pk:
+        return 0
+
+    return sum(
+        count for status, count in get_counts(slot, fresh).items()
+        if statuses is None or status in statuses
+    )
+
+
+def update_slot_participant_counts(slot_id, create=True):
+    """
+    Recount the participants of a slot, while the slot is locked, see
+    `bluebottle.activities.counters.update_contributor_counts`
+    """
+    with transaction.atomic():
+        list(DateActivitySlot.objects.select_for_update().filter(pk=slot_id).values_list('pk', flat=True))
+        counts = get_slot_participant_counts(slot_id)
+
+        if create:
+            participant_counts, _created = SlotParticipantCounts.objects.update_or_create(
+                slot_id=slot_id, defaults={'counts': counts}
+            )
+            return participant_counts
+
+        SlotParticipantCounts.objects.filter(slot_id=slot_id).update(counts=counts)
+
+
+@receiver(post_save, sender=DateParticipant)
+def update_slot_participant_counts_on_save(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+
+    if created or is_changed(instance, ('status', 'slot_id')):
+        previous = (getattr(instance, '_initial_values', None) or {}).get('slot_id')
+        if previous and previous != instance.slot_id:
+            update_slot_participant_counts(previous, create=False)
+
+        if instance.slot_id:
+            participant_counts = update_slot_participant_counts(instance.slot_id)
+
+            if DateParticipant.slot.is_cached(instance):
+                instance.slot.participant_counts = participant_counts
+
+
+@receiver(post_delete, sender=DateParticipant)
+def update_slot_participant_counts_on_delete(sender, instance, **kwargs):
+    if instance.slot_id:
+        update_slot_participant_counts(instance.slot_id, create=False)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.13 on 2026-10-18 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('time_based', '0149_alter_dateregistration_options_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotParticipantCounts',
+            fields=[
+                ('slot', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='participant_counts', serialize=False, to='time_based.dateactivityslot')),
+                ('counts', models.JSONField(default=dict)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -10,7 +10,6 @@ from django.utils import timezone
 from djchoices.choices import DjangoChoices, ChoiceItem
 from parler.models import TranslatableModel, TranslatedFields
 from polymorphic.models import PolymorphicModel
-from timezonefinder import TimezoneFinder
 
 from bluebottle.activities.models import Activity, Contributor, Contribution
 from bluebottle.files.fields import PrivateDocumentField
@@ -28,8 +27,6 @@ from bluebottle.utils.models import ValidatedModelMixin
 from bluebottle.utils.utils import get_current_host, get_current_language
 from bluebottle.utils.widgets import get_human_readable_duration
 
-tf = TimezoneFinder()
-
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
@@ -120,11 +117,7 @@ class TimeBasedActivity(Activity):
     @property
     def local_timezone(self):
         if self.location and self.location.position:
-            tz_name = tf.timezone_at(
-                lng=self.location.position.x,
-                lat=self.location.position.y
-            )
-            return pytz.timezone(tz_name)
+            return pytz.timezone(self.location.timezone)
 
     @property
     def utc_offset(self):
@@ -140,18 +133,22 @@ class TimeBasedActivity(Activity):
             "review",
         ]
 
+    @staticmethod
+    def get_participant_models():
+        return (
+            PeriodParticipant,
+            DateParticipant,
+            DeadlineParticipant,
+            PeriodicParticipant,
+            ScheduleParticipant,
+            TeamScheduleParticipant,
+            RegisteredDateParticipant
+        )
+
     @property
     def participants(self):
         if self.pk:
-            return self.contributors.instance_of(
-                PeriodParticipant,
-                DateParticipant,
-                DeadlineParticipant,
-                PeriodicParticipant,
-                ScheduleParticipant,
-                TeamScheduleParticipant,
-                RegisteredDateParticipant
-            )
+            return self.contributors.instance_of(*self.get_participant_models())
         else:
             return Contributor.objects.none()
 
@@ -361,11 +358,7 @@ class ActivitySlot(TriggerMixin, ValidatedModelMixin, models.Model):
     @property
     def local_timezone(self):
         if self.location and self.location.position:
-            tz_name = tf.timezone_at(
-                lng=self.location.position.x,
-                lat=self.location.position.y
-            )
-            return pytz.timezone(tz_name)
+            return pytz.timezone(self.location.timezone)
 
     @property
     def utc_offset(self):
@@ -482,16 +475,13 @@ class DateActivitySlot(ActivitySlot):
 
     @property
     def contributor_count(self):
-        return self.participants.filter(status__in=['accepted', 'succeeded']).count()
+        from bluebottle.time_based.counters import count_slot_participants
+        return count_slot_participants(self, ['accepted', 'succeeded'])
 
     @property
     def local_timezone(self):
         if self.location and self.location.position:
-            tz_name = tf.timezone_at(
-                lng=self.location.position.x,
-                lat=self.location.position.y
-            )
-            return pytz.timezone(tz_name)
+            return pytz.timezone(self.location.timezone)
 
     @property
     def utc_offset(self):
@@ -2151,5 +2141,22 @@ class PeriodicParticipant(Participant, Contributor):
         resource_name = "contributors/time-based/periodic-participants"
 
 
+class SlotParticipantCounts(models.Model):
+    """
+    The number of participants of a date activity slot, by status.
+
+    Kept up to date when participants are saved or deleted, see bluebottle.time_based.counters.
+    """
+    slot = models.OneToOneField(
+        DateActivitySlot,
+        primary_key=True,
+        related_name='participant_counts',
+        on_delete=models.CASCADE
+    )
+    counts = models.JSONField(default=dict)
+    updated = models.DateTimeField(auto_now=True)
+
+
 from bluebottle.time_based.periodic_tasks import *  # noqa
 from bluebottle.time_based.signals import *  # noqa
+from bluebottle.time_based import counters  # noqa
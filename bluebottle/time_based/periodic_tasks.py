@@ -1,8 +1,10 @@
 from datetime import date, timedelta
 
-from django.db.models import DateTimeField, ExpressionWrapper, F, fields
+from django.db.models import Count, DateTimeField, ExpressionWrapper, F, OuterRef, Subquery, fields
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from bluebottle.activities.models import Contributor
 from bluebottle.activities.periodic_tasks import UnpublishedActivitiesReminderTask
 
 from bluebottle.fsm.effects import TransitionEffect
@@ -19,6 +21,7 @@ from bluebottle.time_based.models import (
     DateActivitySlot,
     ScheduleSlot,
     TeamScheduleSlot,
+    TimeBasedActivity,
     RegisteredDateActivity
 )
 from bluebottle.time_based.states import (
@@ -98,6 +101,16 @@ class SlotFinishedTask(ModelPeriodicTask):
             status__in=['open', 'full', 'running']
         )
 
+    def annotate(self, queryset):
+        # Read by activity_has_participants. Finishing slots does not add or remove participants
+        participants = Contributor.objects.instance_of(
+            *TimeBasedActivity.get_participant_models()
+        ).filter(
+            activity_id=OuterRef('activity_id')
+        ).order_by().values('activity_id').annotate(count=Count('pk')).values('count')
+
+        return queryset.annotate(activity_participant_count=Coalesce(Subquery(participants), 0))
+
     effects = [
         TransitionEffect(DateActivitySlotStateMachine.finish),
     ]
@@ -115,6 +128,8 @@ class TimeContributionFinishedTask(ModelPeriodicTask):
             contributor__status__in=('accepted', 'stopped')
         )
 
+    select_related = ('contributor', )
+
     effects = [
         TransitionEffect(TimeContributionStateMachine.succeed),
     ]
@@ -12,6 +12,7 @@ from rest_framework_json_api.relations import (
 )
 from rest_framework_json_api.serializers import ModelSerializer
 
+from bluebottle.activities.counters import count_contributors
 from bluebottle.activities.models import Activity, Organizer
 from bluebottle.activities.utils import BaseActivitySerializer
 from bluebottle.bluebottle_drf2.serializers import PrivateFileSerializer
@@ -438,11 +439,8 @@ class PeriodicActivitySerializer(TimeBasedBaseSerializer):
     )
 
     def get_contributor_count(self, instance):
-        return (
-            instance.deleted_successful_contributors
-            + instance.contributors.not_instance_of(Organizer)
-            .filter(status__in=["accepted", "participating"])
-            .count()
+        return instance.deleted_successful_contributors + count_contributors(
+            instance, ["accepted", "participating"], exclude=[Organizer]
         )
 
     class Meta(TimeBasedBaseSerializer.Meta):
@@ -513,11 +511,8 @@ class DateActivitySerializer(TimeBasedBaseSerializer):
     )
 
     def get_contributor_count(self, instance):
-        return (
-            instance.deleted_successful_contributors
-            + instance.contributors.not_instance_of(Organizer)
-            .filter(status__in=["accepted", "participating"])
-            .count()
+        return instance.deleted_successful_contributors + count_contributors(
+            instance, ["accepted", "participating"], exclude=[Organizer]
         )
 
     def get_filtered_slots(self, obj, only_upcoming=False):
@@ -2,10 +2,7 @@ import logging
 
 from celery.schedules import crontab
 
-from bluebottle.celery import app
-
-from bluebottle.clients.models import Client
-from bluebottle.clients.utils import LocalTenant
+from bluebottle.clients.scheduler import tenant_periodic_task
 from bluebottle.time_based.models import (
     DateActivity,
     DeadlineActivity,
@@ -23,147 +20,63 @@ from bluebottle.time_based.models import (
 logger = logging.getLogger('bluebottle')
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def date_activity_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in DateActivity.get_periodic_tasks():
-                task.execute()
-            for task in DateActivitySlot.get_periodic_tasks():
-                task.execute()
+    for task in DateActivity.get_periodic_tasks():
+        task.execute()
+    for task in DateActivitySlot.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def date_participant_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in DateParticipant.get_periodic_tasks():
-                task.execute()
+    for task in DateParticipant.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def time_contribution_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in TimeContribution.get_periodic_tasks():
-                task.execute()
+    for task in TimeContribution.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def deadline_activity_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in DeadlineActivity.get_periodic_tasks():
-                task.execute()
+    for task in DeadlineActivity.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def periodic_activity_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in PeriodicActivity.get_periodic_tasks():
-                task.execute()
+    for task in PeriodicActivity.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def schedule_activity_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in ScheduleActivity.get_periodic_tasks():
-                task.execute()
+    for task in ScheduleActivity.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def periodic_slot_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in PeriodicSlot.get_periodic_tasks():
-                task.execute()
+    for task in PeriodicSlot.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def schedule_slot_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in ScheduleSlot.get_periodic_tasks():
-                task.execute()
+    for task in ScheduleSlot.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def team_schedule_slot_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in TeamScheduleSlot.get_periodic_tasks():
-                task.execute()
+    for task in TeamScheduleSlot.get_periodic_tasks():
+        task.execute()
 
 
-@app.task
+@tenant_periodic_task(crontab(minute='*/15'))
 def registered_date_activity_tasks():
-    for tenant in Client.objects.all():
-        with LocalTenant(tenant, clear_tenant=True):
-            for task in RegisteredDateActivity.get_periodic_tasks():
-                task.execute()
-            for task in RegisteredDateActivity.get_periodic_tasks():
-                task.execute()
-
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    date_activity_tasks.s()
-
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    date_participant_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    registered_date_activity_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    time_contribution_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    deadline_activity_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    periodic_activity_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    schedule_activity_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    periodic_slot_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    schedule_slot_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    team_schedule_slot_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    team_schedule_slot_tasks.s()
-)
-
-app.add_periodic_task(
-    crontab(minute='*/15'),
-    registered_date_activity_tasks.s()
-)
+    for task in RegisteredDateActivity.get_periodic_tasks():
+        task.execute()
@@ -14,6 +14,7 @@ from bluebottle.members.models import MemberPlatformSettings
 from bluebottle.segments.tests.factories import SegmentFactory
 from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
 from bluebottle.test.factory_models.projects import ThemeFactory
+from bluebottle.utils.models import ExportJob
 
 
 class TimeBasedActivityListAPITestCase:
@@ -1072,3 +1073,36 @@ class TimeBasedActivityAPIExportTestCase:
         self.perform_get(user=self.activity.owner)
 
         self.assertStatus(status.HTTP_404_NOT_FOUND)
+
+    def test_export_job(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(self.url, user=self.activity.owner)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()['status'], 'new')
+        self.assertIsNone(response.json()['url'])
+
+        response = self.client.get(response.json()['status_url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.json()
+        self.assertEqual(data['status'], 'succeeded')
+
+        response = self.client.get(data['url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        job = ExportJob.objects.get(pk=data['id'])
+        self.assertEqual(job.owner, self.activity.owner)
+
+        with job.file.open('rb') as export:
+            workbook = load_workbook(filename=BytesIO(export.read()))
+
+        sheet = workbook.get_active_sheet()
+        self.assertEqual(
+            tuple(sheet.values)[0][:5],
+            ('Email', 'Name', 'Registration Date', 'Status', 'Registration answer', )
+        )
+
+    def test_export_job_incorrect_signature(self):
+        response = self.client.post(self.url + '111', user=self.activity.owner)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(ExportJob.objects.exists())
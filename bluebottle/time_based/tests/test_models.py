@@ -1,10 +1,22 @@
 from datetime import timedelta
+from io import StringIO
 
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 
+from bluebottle.activities.counters import (
+    count_contributors, get_contributor_counts, update_contributor_counts
+)
+from bluebottle.activities.models import ContributorCounts
 from bluebottle.test.utils import BluebottleTestCase
+from bluebottle.time_based.counters import (
+    count_slot_participants, get_slot_participant_counts, update_slot_participant_counts
+)
+from bluebottle.time_based.models import DateParticipant, PeriodicActivity, SlotParticipantCounts
 from bluebottle.time_based.tests.factories import (
-    DateActivityFactory, DateActivitySlotFactory, PeriodicActivityFactory
+    DateActivityFactory, DateActivitySlotFactory, DateParticipantFactory, PeriodicActivityFactory
 )
 
 
@@ -18,6 +30,15 @@ class DeadlineActivityModelTestCase(BluebottleTestCase):
 
         self.assertEqual(list(activity.errors), [])
 
+    def test_deferred_initial_value(self):
+        activity = PeriodicActivityFactory.create(title='Before')
+        activity = PeriodicActivity.objects.defer('title').get(pk=activity.pk)
+
+        self.assertEqual(activity.title, 'Before')
+        activity.title = 'After'
+
+        self.assertEqual(activity._initial_values.get('title'), 'Before')
+
     def test_registration_deadline_validation_no_start_or_deadline(self):
         activity = PeriodicActivityFactory.create(
             start=None,
@@ -88,3 +109,72 @@ class DateActivityModelTestCase(BluebottleTestCase):
         self.assertEqual(self.slotB.sequence, 1)
         self.assertEqual(self.slotC.sequence, 2)
         self.assertEqual(self.slotD.sequence, 3)
+
+
+class ContributorCountsTestCase(BluebottleTestCase):
+
+    def setUp(self):
+        self.activity = DateActivityFactory.create(slots=[])
+        self.slot = DateActivitySlotFactory.create(activity=self.activity)
+        self.participants = DateParticipantFactory.create_batch(
+            3, activity=self.activity, slot=self.slot
+        )
+
+    def assertCounts(self):
+        self.assertEqual(
+            ContributorCounts.objects.get(activity=self.activity).counts,
+            get_contributor_counts(self.activity.pk)
+        )
+        self.assertEqual(
+            SlotParticipantCounts.objects.get(slot=self.slot).counts,
+            get_slot_participant_counts(self.slot.pk)
+        )
+
+    def test_create(self):
+        self.assertCounts()
+        self.assertEqual(
+            count_slot_participants(self.slot, fresh=True),
+            DateParticipant.objects.filter(slot=self.slot).count()
+        )
+        self.assertEqual(
+            count_contributors(self.activity, types=[DateParticipant], fresh=True),
+            DateParticipant.objects.filter(activity=self.activity).count()
+        )
+
+    def test_transition(self):
+        accepted = count_slot_participants(self.slot, ['accepted'], fresh=True)
+
+        self.participants[0].states.withdraw(save=True)
+
+        self.assertCounts()
+        self.assertEqual(count_slot_participants(self.slot, ['withdrawn'], fresh=True), 1)
+        self.assertEqual(count_slot_participants(self.slot, ['accepted'], fresh=True), accepted - 1)
+
+    def test_update_locks(self):
+        for update, parent_id in (
+            (update_contributor_counts, self.activity.pk),
+            (update_slot_participant_counts, self.slot.pk),
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                update(parent_id)
+
+            sql = [query['sql'] for query in queries.captured_queries]
+            lock = next(index for index, statement in enumerate(sql) if 'FOR UPDATE' in statement)
+            self.assertTrue(any('GROUP BY' in statement for statement in sql[lock:]))
+            self.assertCounts()
+
+    def test_delete(self):
+        self.participants[0].delete()
+
+        self.assertCounts()
+        self.assertEqual(count_slot_participants(self.slot, fresh=True), 2)
+
+    def test_reconcile(self):
+        DateParticipant.objects.filter(pk=self.participants[0].pk).update(status='withdrawn')
+        SlotParticipantCounts.objects.filter(slot=self.slot).delete()
+
+        out = StringIO()
+        call_command('reconcile_contributor_counts', schema_name=connection.tenant.schema_name, stdout=out)
+
+        self.assertTrue('1 activities and 1 slots fixed' in out.getvalue())
+        self.assertCounts()
@@ -6,6 +6,7 @@ from django.contrib.gis.geos import Point
 from django.core import mail
 from django.db import connection
 from django.template import defaultfilters
+from django.test.utils import override_settings
 from django.utils import timezone
 from django.utils.timezone import now, get_current_timezone, make_aware
 from pytz import UTC
@@ -19,6 +20,8 @@ from bluebottle.notifications.models import Message
 from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
 from bluebottle.test.factory_models.geo import GeolocationFactory
 from bluebottle.test.utils import BluebottleTestCase
+from bluebottle.time_based.models import DateActivitySlot
+from bluebottle.time_based.periodic_tasks import SlotFinishedTask
 from bluebottle.time_based.tasks import (
     date_activity_tasks,
     periodic_activity_tasks,
@@ -707,6 +710,49 @@ class SlotActivityPeriodicTasksTest(BluebottleTestCase):
 
         self.assertEqual(self.slot.status, 'finished')
 
+    @override_settings(PERIODIC_TASK_BATCH_SIZE=1)
+    def test_finish_in_batches(self):
+        other_slot = DateActivitySlotFactory.create(
+            activity=self.activity, start=self.slot.start, duration=self.slot.duration
+        )
+        DateParticipantFactory.create(activity=self.activity)
+
+        self.run_task(self.after)
+
+        for slot in (self.slot, other_slot):
+            slot.refresh_from_db()
+            self.assertEqual(slot.status, 'finished')
+
+        self.activity.refresh_from_db()
+        self.assertEqual(self.activity.status, 'succeeded')
+
+        stats = SlotFinishedTask(DateActivitySlot).get_stats()
+        self.assertEqual(stats['processed'], 2)
+        self.assertEqual(stats['failed'], 0)
+
+    def test_finish_failure(self):
+        other_slot = DateActivitySlotFactory.create(
+            activity=self.activity, start=self.slot.start, duration=self.slot.duration
+        )
+        execute_instance = SlotFinishedTask.execute_instance
+
+        def fail_first(task, instance):
+            if instance.pk == self.slot.pk:
+                raise ValueError('Failed')
+            return execute_instance(task, instance)
+
+        with mock.patch.object(SlotFinishedTask, 'execute_instance', fail_first):
+            self.run_task(self.after)
+
+        self.slot.refresh_from_db()
+        self.assertEqual(self.slot.status, 'open')
+        other_slot.refresh_from_db()
+        self.assertEqual(other_slot.status, 'finished')
+
+        stats = SlotFinishedTask(DateActivitySlot).get_stats()
+        self.assertEqual(stats['processed'], 1)
+        self.assertEqual(stats['failed'], 1)
+
 
 class PeriodicActivityPeriodicTaskTestCase(BluebottleTestCase):
     factory = PeriodicActivityFactory
@@ -1,5 +1,6 @@
 from django.utils.timezone import now
 
+from bluebottle.activities.counters import count_contributors
 from bluebottle.fsm.effects import RelatedTransitionEffect, TransitionEffect
 from bluebottle.fsm.triggers import (
     register,
@@ -22,7 +23,8 @@ from bluebottle.time_based.messages import (
 )
 from bluebottle.time_based.messages.teams import UserTeamDetailsChangedNotification, \
     CaptainTeamDetailsChangedNotification
-from bluebottle.time_based.models import PeriodicSlot, ScheduleSlot, TeamScheduleSlot
+from bluebottle.time_based.counters import count_slot_participants
+from bluebottle.time_based.models import PeriodicSlot, ScheduleSlot, TeamScheduleSlot, TimeBasedActivity
 from bluebottle.time_based.states import (
     DateStateMachine,
     DateActivitySlotStateMachine,
@@ -293,9 +295,7 @@ def slot_is_full(effect):
     """
     Slot is full. Capacity is filled by participants.
     """
-    participant_count = effect.instance.participants.filter(
-        status__in=['accepted', 'succeeded']
-    ).count()
+    participant_count = count_slot_participants(effect.instance, ['accepted', 'succeeded'], fresh=True)
     if effect.instance.capacity and participant_count >= effect.instance.capacity:
         return True
     return False
@@ -436,7 +436,12 @@ def activity_has_participants(effect):
     """
     Activity has accepted participants.
     """
-    return effect.instance.activity.participants.count() > 0
+    count = getattr(effect.instance, 'activity_participant_count', None)
+    if count is None:
+        count = count_contributors(
+            effect.instance.activity, types=TimeBasedActivity.get_participant_models(), fresh=True
+        )
+    return count > 0
 
 
 def activity_has_no_participants(effect):
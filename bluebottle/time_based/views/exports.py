@@ -1,8 +1,10 @@
 import re
 
+from django.utils.functional import cached_property
 from django.utils.timezone import now
 
 from bluebottle.segments.models import SegmentType
+from bluebottle.segments.utils import UserSegmentNames
 from bluebottle.time_based.models import (
     DeadlineActivity,
     DeadlineParticipant,
@@ -13,7 +15,7 @@ from bluebottle.time_based.models import (
     PeriodicRegistration,
     DateRegistration, RegisteredDateActivity, RegisteredDateParticipant
 )
-from bluebottle.utils.admin import prep_field
+from bluebottle.utils.admin import prep_field, queryset_chunks
 from bluebottle.utils.views import ExportView
 
 
@@ -41,19 +43,17 @@ class TimeBasedExportView(ExportView):
         ('registration__answer', 'Registration answer'),
     )
 
-    def get_row(self, instance):
+    def get_row(self, instance, segments=None):
+        if segments is None:
+            segments = self.segment_names.for_users([instance.user_id])
+
         row = []
 
         for (field, name) in self.get_fields():
             if field.startswith('segment.'):
-                if instance.user:
+                if instance.user_id:
                     row.append(
-                        ", ".join(
-                            [
-                                s.name for s in
-                                instance.user.segments.filter(segment_type_id=field.split('.')[-1])
-                            ]
-                        )
+                        ", ".join(segments[instance.user_id][int(field.split('.')[-1])])
                     )
                 else:
                     row.append('')
@@ -62,18 +62,29 @@ class TimeBasedExportView(ExportView):
 
         return row
 
-    def get_fields(self):
-        fields = super().get_fields()
+    def get_rows(self, instances):
+        for chunk in queryset_chunks(instances):
+            segments = self.segment_names.for_users(instance.user_id for instance in chunk)
+            for instance in chunk:
+                yield self.get_row(instance, segments)
+
+    @cached_property
+    def segment_names(self):
+        return UserSegmentNames()
 
-        segments = tuple(
+    @cached_property
+    def segment_fields(self):
+        return tuple(
             (f"segment.{segment.pk}", segment.name) for segment in SegmentType.objects.all()
         )
-        return fields + segments
+
+    def get_fields(self):
+        return super().get_fields() + self.segment_fields
 
     def get_instances(self):
         return self.get_object().contributors.instance_of(
             self.participant_model
-        ).prefetch_related('user__segments').select_related('user')
+        ).select_related('user')
 
 
 class DeadlineParticipantExportView(TimeBasedExportView):
@@ -130,8 +141,7 @@ class TeamScheduleParticipantExportView(TimeBasedExportView):
     def get_instances(self):
         return (
             self.get_object()
-            .teams.prefetch_related("user__segments")
-            .select_related("user")
+            .teams.select_related("user")
         )
 
     def get_team_row(self, team):
@@ -174,7 +184,6 @@ class PeriodicParticipantExportView(TimeBasedExportView):
     def get_instances(self):
         return (
             self.participant_model.objects.filter(activity=self.get_object())
-            .prefetch_related("user__segments")
             .select_related("user")
         )
 
@@ -194,7 +203,6 @@ class DateParticipantExportView(TimeBasedExportView):
     def get_instances(self):
         return (
             self.participant_model.objects.filter(activity=self.get_object())
-            .prefetch_related("user__segments")
             .select_related("user")
         )
 
@@ -218,7 +226,6 @@ class DateParticipantExportView(TimeBasedExportView):
                 c += 1
             r = 0
 
-            for participant in slot.participants.all():
-                row = self.get_row(participant)
+            for row in self.get_rows(slot.participants.select_related('user')):
                 r += 1
                 worksheet.write_row(r, 0, row)
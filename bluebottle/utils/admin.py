@@ -1,26 +1,34 @@
 import csv
 import datetime
 from builtins import str
+from operator import attrgetter
 
 import six
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.admin.models import CHANGE, LogEntry
 from django.contrib.admin.views.main import ChangeList
 from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection
 from django.db.models import ExpressionWrapper, Q, fields
 from django.db.models.aggregates import Sum
 from django.db.models.fields.files import FieldFile
 from django.db.models.query import QuerySet
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.template import loader
+from django.utils import translation
 from django.utils.encoding import smart_str
+from django.utils.functional import cached_property
 from djmoney.money import Money
 from solo.admin import SingletonModelAdmin
 
 from bluebottle.activities.models import Contributor
 from bluebottle.clients import properties
+from bluebottle.clients.utils import LocalTenant
 from bluebottle.members.models import Member
-from bluebottle.utils.exchange_rates import convert
+from bluebottle.segments.utils import UserSegmentNames
+from bluebottle.utils.exchange_rates import convert_many
 from .models import Language
 from ..segments.models import SegmentType
 
@@ -80,6 +88,149 @@ def escape_csv_formulas(item):
         return item
 
 
+def queryset_chunks(queryset, chunk_size=None):
+    """
+    Iterate over a queryset in lists of `CSV_EXPORT_CHUNK_SIZE` objects, ordered by primary key.
+
+    Every chunk is selected with the last primary key of the previous chunk, so the
+    queries stay fast at the end of large tables.
+    """
+    chunk_size = chunk_size or getattr(settings, 'CSV_EXPORT_CHUNK_SIZE', 1000)
+    queryset = queryset.order_by('pk')
+
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield chunk
+        if len(chunk) < chunk_size:
+            break
+        chunk = list(queryset.filter(pk__gt=chunk[-1].pk)[:chunk_size])
+
+
+class Echo(object):
+    """
+    File like object that returns what is written to it, so that the csv writer can be used
+    to produce the lines of a streaming response.
+    """
+
+    def write(self, value):
+        return value
+
+
+class CSVExport(object):
+    """
+    Write the rows of a queryset as csv.
+
+    Querysets are read in chunks, see `queryset_chunks`. Relations in the field paths are
+    loaded with `select_related`, and the segments of members and contributors are loaded
+    with one query per chunk, so memory use and the number of queries do not depend on the
+    number of rows. Fields that are properties can still run their own queries.
+    """
+
+    def __init__(self, request, queryset, field_names, labels=None, header=True, many_to_many_sep=';'):
+        self.request = request
+        self.queryset = queryset
+        self.field_names = field_names
+        self.labels = labels or field_names
+        self.header = header
+        self.many_to_many_sep = many_to_many_sep
+
+        self.segment_names = UserSegmentNames()
+
+        model = queryset.model
+        if model is Member:
+            self.segment_user_id = attrgetter('pk')
+        elif issubclass(model, Contributor):
+            self.segment_user_id = attrgetter('user_id')
+        else:
+            self.segment_user_id = None
+
+    def get_select_related(self):
+        """
+        The forward relations that are followed by the field paths.
+        """
+        paths = set()
+        for field_name in self.field_names:
+            model = self.queryset.model
+            related = []
+            for bit in field_name.split('__'):
+                try:
+                    field = model._meta.get_field(bit)
+                except FieldDoesNotExist:
+                    break
+
+                if not (field.concrete and (field.many_to_one or field.one_to_one)):
+                    break
+
+                related.append(bit)
+                model = field.related_model
+
+            if related:
+                paths.add('__'.join(related))
+
+        return sorted(paths)
+
+    def get_chunks(self):
+        if not isinstance(self.queryset, QuerySet):
+            yield list(self.queryset)
+            return
+
+        yield from queryset_chunks(self.queryset.select_related(*self.get_select_related()))
+
+    @cached_property
+    def segment_types(self):
+        return list(SegmentType.objects.prefetch_related('translations'))
+
+    def get_segment_columns(self, chunk):
+        """
+        Return the segment columns for the objects in the chunk, by user id.
+        """
+        names = self.segment_names.for_users(self.segment_user_id(obj) for obj in chunk)
+
+        return dict(
+            (
+                user_id,
+                [" | ".join(segments[segment_type.pk]) for segment_type in self.segment_types]
+            )
+            for user_id, segments in names.items()
+        )
+
+    def get_header(self):
+        row = list(self.labels)
+        if self.segment_user_id:
+            # Get translated names for segment types
+            row += [segment_type.name for segment_type in self.segment_types]
+        return row
+
+    def get_rows(self):
+        if self.header:
+            yield self.get_header()
+
+        for chunk in self.get_chunks():
+            if self.segment_user_id:
+                segment_columns = self.get_segment_columns(chunk)
+                empty = [''] * len(self.segment_types)
+
+            for obj in chunk:
+                row = [prep_field(self.request, obj, field, self.many_to_many_sep) for field in self.field_names]
+
+                if self.segment_user_id:
+                    row += segment_columns.get(self.segment_user_id(obj), empty)
+
+                yield row
+
+    def stream(self):
+        writer = csv.writer(Echo(), delimiter=';', dialect='excel')
+
+        tenant = connection.tenant
+        language = translation.get_language()
+
+        # The response is consumed after the view returned, make sure it is rendered
+        # for the tenant and in the language of the request.
+        with LocalTenant(tenant), translation.override(language):
+            for row in self.get_rows():
+                yield writer.writerow([escape_csv_formulas(item) for item in row])
+
+
 def export_as_csv_action(description="Export as CSV", fields=None, exclude=None, header=True,
                          manyToManySep=';'):
     """ This function returns an export csv action. """
@@ -103,53 +254,12 @@ def export_as_csv_action(description="Export as CSV", fields=None, exclude=None,
                 field_names = [field for field in fields]
                 labels = field_names
 
-        response = HttpResponse(content_type='text/csv; charset=utf-8')
+        export = CSVExport(request, queryset, field_names, labels, header, manyToManySep)
+
+        response = StreamingHttpResponse(export.stream(), content_type='text/csv; charset=utf-8')
         response['Content-Disposition'] = 'attachment; filename="%s.csv"' % (
             str(opts).replace('.', '_')
         )
-        writer = csv.writer(response, delimiter=';', dialect='excel')
-
-        if header:
-            row = labels if labels else field_names
-            if queryset.model is Member or issubclass(queryset.model, Contributor):
-                for segment_type in SegmentType.objects.all():
-                    # Get translated name for segment type
-                    segment_type_name = segment_type.name
-                    labels.append(segment_type_name)
-            writer.writerow([escape_csv_formulas(item) for item in row])
-
-        if queryset.model is Member:
-            queryset = queryset.prefetch_related('place')
-            queryset = queryset.prefetch_related('segments')
-            queryset = queryset.prefetch_related('contributor_set')
-
-        for obj in queryset:
-            row = [prep_field(request, obj, field, manyToManySep) for field in field_names]
-
-            # Write extra field data
-            if queryset.model is Member:
-                for segment_type in SegmentType.objects.all():
-                    # Get translated names for segments
-                    segment_list = []
-                    for segment in obj.segments.filter(segment_type=segment_type):
-                        segment_name = segment.name
-                        segment_list.append(segment_name)
-                    segments = " | ".join(segment_list)
-                    row.append(segments)
-            if issubclass(queryset.model, Contributor):
-                for segment_type in SegmentType.objects.all():
-                    if obj.user:
-                        # Get translated names for segments
-                        segment_list = []
-                        for segment in obj.user.segments.filter(segment_type=segment_type):
-                            segment_name = segment.name
-                            segment_list.append(segment_name)
-                        segments = " | ".join(segment_list)
-                    else:
-                        segments = ''
-                    row.append(segments)
-            escaped_row = [escape_csv_formulas(item) for item in row]
-            writer.writerow(escaped_row)
         return response
 
     export_as_csv.short_description = description
@@ -171,9 +281,10 @@ class TotalAmountAdminChangeList(ChangeList):
             total=Sum(total_column)
         ).order_by()
 
-        amounts = [Money(total['total'], total[currency_column]) for total in totals]
-        amounts = [convert(amount, properties.DEFAULT_CURRENCY) for amount in amounts]
-        self.total = sum(amounts) or Money(0, properties.DEFAULT_CURRENCY)
+        self.total = convert_many(
+            (Money(total['total'], total[currency_column]) for total in totals),
+            properties.DEFAULT_CURRENCY
+        )
 
 
 class BasePlatformSettingsAdmin(SingletonModelAdmin):
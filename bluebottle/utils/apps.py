@@ -14,3 +14,4 @@ class UtilsConfig(AppConfig):
         import bluebottle.utils.monkey_patch_current_site  # noqa
         import bluebottle.utils.monkey_patch_object_not_found  # noqa
         import bluebottle.utils.monkey_patch_quill  # noqa
+        import bluebottle.utils.monkey_patch_dkim  # noqa
@@ -1,6 +1,12 @@
+from copy import deepcopy
 from functools import wraps
+from uuid import uuid4
 
+from django.conf import settings
+from django.core.cache import cache
 from django.db import connection
+from django.utils.translation import get_language
+from django_tools.middlewares.ThreadLocal import get_current_request
 from memoize import memoize as original_memoize
 
 
@@ -38,3 +44,179 @@ def memoize(timeout=3600, make_name=None):
         return wrapper
 
     return decorator
+
+
+class PlatformSettingsCache(object):
+    """
+    Tenant scoped cache for platform settings singletons.
+
+    The last loaded instance is kept in process per (schema, model). A version token in the
+    django cache, renewed whenever the settings are saved, tells every process when its copy
+    is stale. Within a request the loaded instance is memoized on the request, so repeated
+    calls to `load()` cost at most one cache lookup per model. Every call returns its own copy.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.stats = {'request': 0, 'process': 0, 'miss': 0}
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'PLATFORM_SETTINGS_CACHE', False)
+
+    def get_key(self, model):
+        return get_tenant_cache_name(f'platform_settings_{model._meta.label_lower}')
+
+    def get_version(self, key):
+        version_key = f'{key}_version'
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, uuid4().hex, None)
+            version = cache.get(version_key)
+        return version
+
+    def get_request_cache(self):
+        request = get_current_request()
+        if request is None:
+            return None
+
+        try:
+            return request._platform_settings
+        except AttributeError:
+            request._platform_settings = {}
+            return request._platform_settings
+
+    def get(self, model, loader):
+        if not self.enabled:
+            return loader()
+
+        key = self.get_key(model)
+        request_cache = self.get_request_cache()
+
+        if request_cache is not None and key in request_cache:
+            self.stats['request'] += 1
+            return self.copy(request_cache[key])
+
+        version = self.get_version(key)
+        entry = self.entries.get(key)
+
+        if entry is not None and entry[0] == version:
+            self.stats['process'] += 1
+            instance = self.copy(entry[1])
+        else:
+            self.stats['miss'] += 1
+            instance = loader()
+            if self.can_store():
+                self.entries[key] = (version, self.copy(instance))
+
+        if request_cache is not None:
+            # Every caller gets its own copy, so changes do not leak to the rest of the request
+            request_cache[key] = self.copy(instance)
+
+        return instance
+
+    def can_store(self):
+        # Never keep data that might still be rolled back
+        return not connection.in_atomic_block
+
+    def copy(self, instance):
+        if instance is None:
+            return None
+
+        instance = deepcopy(instance)
+        if hasattr(instance, 'set_current_language'):
+            instance.set_current_language(get_language())
+        return instance
+
+    def invalidate(self, model):
+        key = self.get_key(model)
+
+        self.entries.pop(key, None)
+        request_cache = self.get_request_cache()
+        if request_cache is not None:
+            request_cache.pop(key, None)
+
+        cache.set(f'{key}_version', uuid4().hex, None)
+
+    def hit_rate(self):
+        total = sum(self.stats.values())
+        if not total:
+            return 0.0
+        return (self.stats['request'] + self.stats['process']) / total
+
+    def reset_stats(self):
+        for key in self.stats:
+            self.stats[key] = 0
+
+
+platform_settings_cache = PlatformSettingsCache()
+
+
+class PublicPropertiesCache(object):
+    """
+    Tenant scoped cache for the part of the public properties (`/api/config`) that is the
+    same for every user.
+
+    Documents are stored in the django cache per (schema, language) and expire after
+    `PUBLIC_PROPERTIES_CACHE_TIMEOUT` seconds, so values that are not invalidated
+    explicitly (exchange rates, tenant properties) are refreshed regularly. Saving platform
+    settings, languages or payment providers renews the version token of the tenant, which
+    makes every cached document stale at once.
+    """
+
+    def __init__(self):
+        self.stats = {'hit': 0, 'miss': 0}
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'PUBLIC_PROPERTIES_CACHE', False)
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'PUBLIC_PROPERTIES_CACHE_TIMEOUT', 300)
+
+    def get_version_key(self):
+        return get_tenant_cache_name('public_properties_version')
+
+    def get_version(self):
+        version_key = self.get_version_key()
+        version = cache.get(version_key)
+        if version is None:
+            cache.add(version_key, uuid4().hex, None)
+            version = cache.get(version_key)
+        return version
+
+    def get_key(self, version):
+        return '{}_{}_{}'.format(get_tenant_cache_name('public_properties'), get_language(), version)
+
+    def get(self, loader):
+        if not self.enabled:
+            return loader()
+
+        version = self.get_version()
+        key = self.get_key(version)
+
+        document = cache.get(key)
+        if document is None:
+            self.stats['miss'] += 1
+            document = loader()
+            if self.can_store():
+                cache.set(key, document, self.timeout)
+        else:
+            self.stats['hit'] += 1
+
+        return document
+
+    def can_store(self):
+        # Never cache data that might still be rolled back
+        return not connection.in_atomic_block
+
+    def invalidate(self):
+        cache.set(self.get_version_key(), uuid4().hex, None)
+
+    def reset_stats(self):
+        for key in self.stats:
+            self.stats[key] = 0
+
+
+public_properties_cache = PublicPropertiesCache()
@@ -0,0 +1,224 @@
+import hashlib
+import re
+from collections import OrderedDict
+from html import escape
+from threading import Lock
+
+import premailer
+from django.conf import settings
+from lxml import etree
+
+from bluebottle.utils.utils import to_text
+
+# `base.mail.html` wraps every per-recipient block in a pair of these comments
+SLOT = re.compile(r'<!--mail-slot:(?P<name>[\w-]+)-->(?P<content>.*?)<!--/mail-slot:(?P=name)-->', re.S)
+SLOT_START = re.compile(r'<!--mail-slot:([\w-]+)-->')
+MARKER = re.compile(r'<!--/?mail-slot:[\w-]+-->')
+
+# Inlining a block on its own only gives the same result as inlining the whole mail
+# if no selector depends on siblings or on the position of an element.
+UNSAFE_SELECTORS = re.compile(r'[+~>]|:(first|last|nth|only)-|:not\(|:has\(|:empty')
+
+
+def inline(html, base_url):
+    return premailer.transform(MARKER.sub('', html), base_url=base_url)
+
+
+class CompiledPremailer(premailer.Premailer):
+    """
+    Premailer that reuses parsed stylesheets.
+
+    Premailer only keeps a small cache that is shared with the selectors, so a large
+    stylesheet is evicted (and parsed again) for almost every mail.
+    """
+
+    def __init__(self, parsed_rules, **kwargs):
+        self.parsed_rules = parsed_rules
+        super(CompiledPremailer, self).__init__(**kwargs)
+
+    def _parse_style_rules(self, css_body, ruleset_index):
+        key = (css_body, ruleset_index)
+        if key not in self.parsed_rules:
+            self.parsed_rules[key] = super(CompiledPremailer, self)._parse_style_rules(css_body, ruleset_index)
+        return self.parsed_rules[key]
+
+
+class CompiledMail(object):
+    """
+    A mail layout with the CSS inlined, split around the per-recipient blocks.
+
+    The layout (everything outside the blocks) is transformed once. The blocks are
+    inlined inside a copy of their ancestors, so that descendant selectors match the
+    same way they would in the complete mail.
+    """
+    max_fragments = 32
+
+    def __init__(self, skeleton, base_url):
+        self.base_url = base_url
+        self.fragments = OrderedDict()
+        self.parsed_rules = {}
+        self.segments = None
+
+        tree = etree.fromstring(skeleton.strip(), etree.HTMLParser())
+        if tree is None:
+            return
+
+        self.css = ''.join(style.text or '' for style in tree.iter('style'))
+        if UNSAFE_SELECTORS.search(self.css):
+            return
+
+        self.wrappers = {}
+        for comment in tree.iter(etree.Comment):
+            if comment.text.startswith('mail-slot:'):
+                ancestors = list(reversed(list(comment.iterancestors())))
+                self.wrappers[comment.text[len('mail-slot:'):]] = (
+                    ''.join(
+                        '<{}{}>'.format(
+                            element.tag,
+                            ''.join(' {}="{}"'.format(key, escape(value)) for key, value in element.attrib.items())
+                        ) for element in ancestors
+                    ),
+                    ''.join('</{}>'.format(element.tag) for element in reversed(ancestors))
+                )
+
+        parts = SLOT_START.split(
+            CompiledPremailer(self.parsed_rules, base_url=base_url).transform(skeleton)
+        )
+        self.names = parts[1::2]
+        if sorted(self.names) != sorted(self.wrappers):
+            return
+
+        self.segments = parts[::2]
+        self.texts = [to_text.handle(segment) for segment in self.segments]
+
+    def transform_fragment(self, name, fragment):
+        key = (name, fragment)
+        if key in self.fragments:
+            return self.fragments[key]
+
+        if '<style' in fragment or '<link' in fragment:
+            # Styles in a block apply to the whole mail
+            return None
+
+        opening, closing = self.wrappers[name]
+        output = CompiledPremailer(
+            self.parsed_rules,
+            base_url=self.base_url,
+            css_text=self.css,
+            disable_leftover_css=True
+        ).transform(
+            '{}<!--mail-slot:{}-->{}<!--/mail-slot:{}-->{}'.format(opening, name, fragment, name, closing)
+        )
+        match = SLOT.search(output)
+        if not match:
+            return None
+
+        html_content = match.group('content')
+        result = (html_content, to_text.handle(html_content))
+
+        self.fragments[key] = result
+        while len(self.fragments) > self.max_fragments:
+            self.fragments.popitem(last=False)
+
+        return result
+
+    def render(self, slots):
+        """
+        Return the inlined html and the plain text of the mail, or None if the
+        blocks can not be inlined separately.
+        """
+        if self.segments is None:
+            return None
+
+        html_parts = []
+        text_parts = []
+        for index, segment in enumerate(self.segments):
+            html_parts.append(segment)
+            text_parts.append(self.texts[index])
+
+            if index < len(self.names):
+                result = self.transform_fragment(self.names[index], slots.get(self.names[index], ''))
+                if result is None:
+                    return None
+
+                html_parts.append(result[0])
+                text_parts.append(result[1])
+
+        return (
+            ''.join(html_parts),
+            '\n\n'.join(part.strip() for part in text_parts if part.strip()) + '\n\n'
+        )
+
+
+class CompiledMailCache(object):
+    """
+    Process wide cache of compiled mail layouts, per tenant, template and language.
+
+    Entries are also keyed on a hash of the rendered layout, so a change in the platform
+    settings or in the templates results in a new entry instead of a stale mail.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.stats = {'hit': 0, 'miss': 0, 'fallback': 0}
+
+    @property
+    def enabled(self):
+        return getattr(settings, 'MAIL_TEMPLATE_CACHE', False)
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'MAIL_TEMPLATE_CACHE_SIZE', 128)
+
+    def get(self, key, skeleton, base_url):
+        key = key + (base_url, hashlib.sha1(skeleton.encode('utf-8')).hexdigest())
+
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                self.stats['hit'] += 1
+                return compiled
+
+        compiled = CompiledMail(skeleton, base_url)
+
+        with self._lock:
+            self.stats['miss'] += 1
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+        return compiled
+
+    def transform(self, html, base_url, key):
+        """
+        Inline the css of a rendered mail. Returns a tuple of the html and the plain text.
+        """
+        if self.enabled:
+            slots = {}
+
+            def extract(match):
+                slots[match.group('name')] = match.group('content')
+                return '<!--mail-slot:{}-->'.format(match.group('name'))
+
+            skeleton = SLOT.sub(extract, html)
+            if slots:
+                result = self.get(key, skeleton, base_url).render(slots)
+                if result is not None:
+                    return result
+
+            self.stats['fallback'] += 1
+
+        html_content = inline(html, base_url)
+        return html_content, to_text.handle(html_content)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def reset_stats(self):
+        self.stats = dict((key, 0) for key in self.stats)
+
+
+compiled_mail_cache = CompiledMailCache()
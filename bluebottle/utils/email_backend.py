@@ -1,10 +1,12 @@
 import inspect
 import logging
 import re
+import smtplib
+import time
 from builtins import str
+from threading import local
 
 import dkim
-import premailer
 from django.conf import settings
 from django.core.mail.backends.smtp import EmailBackend
 from django.db import connection
@@ -19,7 +21,7 @@ from bluebottle.clients.mail import EmailMultiAlternatives
 from bluebottle.clients.utils import tenant_url
 from bluebottle.cms.models import SitePlatformSettings
 from bluebottle.mails.models import MailPlatformSettings
-from bluebottle.utils.utils import to_text
+from bluebottle.utils.compiled_mail import compiled_mail_cache
 
 logger = logging.getLogger(__name__)
 
@@ -68,13 +70,84 @@ except ModuleNotFoundError:
     pass
 
 
+class SMTPConnectionPool(local):
+    """
+    Keeps authenticated smtp connections open between sends, per thread and per mail config.
+
+    A connection is reused for at most EMAIL_POOL_MAX_MESSAGES messages and for at most
+    EMAIL_POOL_MAX_AGE seconds. Connections that no longer respond are dropped.
+    """
+
+    def __init__(self):
+        self.connections = {}
+
+    def acquire(self, key):
+        entry = self.connections.pop(key, None)
+        if entry is None:
+            return None
+
+        connection, opened, sent = entry
+        if (
+            sent < settings.EMAIL_POOL_MAX_MESSAGES and
+            time.monotonic() - opened < settings.EMAIL_POOL_MAX_AGE
+        ):
+            try:
+                if connection.noop()[0] == 250:
+                    return entry
+            except (smtplib.SMTPException, OSError):
+                pass
+
+        self.discard(connection)
+        return None
+
+    def release(self, key, entry):
+        previous = self.connections.pop(key, None)
+        if previous is not None:
+            self.discard(previous[0])
+
+        self.connections[key] = entry
+
+    def discard(self, connection):
+        try:
+            connection.quit()
+        except (smtplib.SMTPException, OSError):
+            try:
+                connection.close()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+    def clear(self):
+        for smtp_connection, _opened, _sent in self.connections.values():
+            self.discard(smtp_connection)
+        self.connections = {}
+
+
+smtp_connection_pool = SMTPConnectionPool()
+
+
 class TenantAwareBackend(EmailBackend):
     """
         Support per-tenant smtp configuration and optionally
         sign the message with a DKIM key, if present.
+
+        Connections are returned to the `smtp_connection_pool` when they are
+        closed, so consecutive sends to the same mail server reuse one connection.
     """
+    opened = None
+    sent = 0
+    broken = False
+
+    @property
+    def pooled(self):
+        return getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 0) > 0
+
+    @property
+    def pool_key(self):
+        return (
+            self.host, self.port, self.username, self.password, self.use_tls, self.use_ssl
+        )
 
-    def open(self):
+    def configure(self):
         tenant_mail_config = getattr(properties, 'MAIL_CONFIG', None)
 
         if tenant_mail_config:
@@ -87,7 +160,97 @@ class TenantAwareBackend(EmailBackend):
             self.use_tls = tenant_mail_config.get('TLS', settings.EMAIL_USE_TLS)
             self.use_ssl = tenant_mail_config.get('SSL', settings.EMAIL_USE_SSL)
 
-        return super(TenantAwareBackend, self).open()
+    def get_dkim(self):
+        try:
+            return (
+                properties.DKIM_SELECTOR,
+                properties.DKIM_DOMAIN,
+                properties.DKIM_PRIVATE_KEY
+            )
+        except AttributeError:
+            return None
+
+    def open(self):
+        self.configure()
+
+        if self.connection is None and self.pooled:
+            entry = smtp_connection_pool.acquire(self.pool_key)
+            if entry:
+                self.connection, self.opened, self.sent = entry
+                self.broken = False
+                return True
+
+        result = super(TenantAwareBackend, self).open()
+        if result:
+            self.opened = time.monotonic()
+            self.sent = 0
+            self.broken = False
+        return result
+
+    def close(self):
+        if self.connection is not None and self.pooled and not self.broken:
+            smtp_connection_pool.release(self.pool_key, (self.connection, self.opened, self.sent))
+            self.connection = None
+            return
+
+        super(TenantAwareBackend, self).close()
+
+    def send_messages(self, email_messages):
+        """
+        Send a batch of messages over one connection, signed with the tenant DKIM key.
+
+        A failing message does not stop the rest of the batch. Throughput and failures
+        are logged per batch, and unless `fail_silently` is set the first error is raised
+        once the whole batch has been tried.
+        """
+        if not email_messages:
+            return 0
+
+        started = time.monotonic()
+        sent = 0
+        errors = []
+
+        with self._lock:
+            new_conn_created = self.open()
+            if not self.connection or new_conn_created is None:
+                # We failed silently on open().
+                return 0
+
+            self.dkim = self.get_dkim()
+            try:
+                for message in email_messages:
+                    try:
+                        if self._send(message):
+                            sent += 1
+                    except smtplib.SMTPServerDisconnected as e:
+                        errors.append(e)
+                        self.broken = True
+                        self.close()
+                        if not self.open():
+                            break
+                    except Exception as e:
+                        errors.append(e)
+            finally:
+                if new_conn_created:
+                    self.close()
+
+        duration = time.monotonic() - started
+        self.last_batch = {
+            'messages': len(email_messages),
+            'sent': sent,
+            'failed': len(email_messages) - sent,
+            'duration': duration,
+        }
+        logger.info(
+            'Mail batch: sent {sent} of {messages} messages, {failed} failed, in {duration:.2f}s'.format(
+                **self.last_batch
+            )
+        )
+
+        if errors and not self.fail_silently:
+            raise errors[0]
+
+        return sent
 
     def _send(self, email_message):
         """A helper method that does the actual sending + DKIM signing."""
@@ -96,17 +259,15 @@ class TenantAwareBackend(EmailBackend):
         try:
             message_string = email_message.message().as_bytes()
             signature = b""
-            try:
-                signature = dkim.sign(message_string,
-                                      properties.DKIM_SELECTOR,
-                                      properties.DKIM_DOMAIN,
-                                      properties.DKIM_PRIVATE_KEY)
-            except AttributeError:
-                pass
+
+            dkim_config = getattr(self, 'dkim', None) or self.get_dkim()
+            if dkim_config:
+                signature = dkim.sign(message_string, *dkim_config)
 
             self.connection.sendmail(
                 email_message.from_email, email_message.recipients(),
                 signature + message_string)
+            self.sent += 1
         except Exception:
             if not self.fail_silently:
                 raise
@@ -160,15 +321,15 @@ def create_message(template_name=None, to=None, subject=None, cc=None, bcc=None,
     with TenantLanguage(language):
         ctx = Context(kwargs)
         ctx['to'] = to  # Add the recipient to the context
-        html_content = premailer.transform(
+        html_content, text_content = compiled_mail_cache.transform(
             get_template(
                 '{0}.html'.format(template_name)
             ).render(
                 ctx.flatten()
             ),
-            base_url=tenant_url()
+            base_url=tenant_url(),
+            key=(connection.tenant.schema_name, template_name, translation.get_language())
         )
-        text_content = to_text.handle(html_content)
 
         args = dict(subject=subject, body=text_content, to=[to.email])
 
@@ -191,11 +352,13 @@ def create_message(template_name=None, to=None, subject=None, cc=None, bcc=None,
         return msg
 
 
-# We need a wrapper outside of Celery to prepare the email because
-# Celery is not tenant aware.
-def send_mail(template_name=None, subject=None, to=None, attachments=None, **kwargs):
-    from bluebottle.common.tasks import _send_celery_mail
+def prepare_mail(template_name=None, subject=None, to=None, attachments=None, **kwargs):
+    """
+    Render a tenant mail for a recipient. Returns None if the mail should not be sent.
 
+    Callers that prepare several mails can pass the platform settings as `settings`
+    and `content` to avoid loading them for every mail.
+    """
     if not to:
         logger.error("No recipient specified")
         return
@@ -214,21 +377,19 @@ def send_mail(template_name=None, subject=None, to=None, attachments=None, **kwa
             'tenant_name': connection.tenant.name
         })
 
-    site_platform_settings = SitePlatformSettings.load()
-    mail_platform_settings = MailPlatformSettings.load()
-    kwargs.update({
-        'settings': mail_platform_settings,
-        'content': site_platform_settings,
-    })
+    if not kwargs.get('content'):
+        kwargs['content'] = SitePlatformSettings.load()
+    if not kwargs.get('settings'):
+        kwargs['settings'] = MailPlatformSettings.load()
 
-    if site_platform_settings.terminated:
+    if kwargs['content'].terminated:
         logger.error(
             f"Trying to send email on terminated platform: {to.email}"
         )
         return
 
     try:
-        msg = create_message(
+        return create_message(
             template_name=template_name,
             to=to,
             subject=subject,
@@ -240,6 +401,31 @@ def send_mail(template_name=None, subject=None, to=None, attachments=None, **kwa
         logger.error(error_message)
         return
 
+
+# We need a wrapper outside of Celery to prepare the email because
+# Celery is not tenant aware.
+def send_mail(template_name=None, subject=None, to=None, attachments=None, **kwargs):
+    msg = prepare_mail(
+        template_name=template_name,
+        subject=subject,
+        to=to,
+        attachments=attachments,
+        **kwargs
+    )
+    if msg:
+        send_mail_batch([msg])
+
+
+def send_mail_batch(messages):
+    """
+    Send prepared mails. With CELERY_MAIL the whole batch is handed to one task.
+    """
+    from bluebottle.common.tasks import _send_celery_mail, _send_celery_mail_batch
+
+    messages = [msg for msg in messages if msg]
+    if not messages:
+        return
+
     # Explicitly set CELERY usage in properties. Used primarily for
     # testing purposes.
     try:
@@ -247,15 +433,17 @@ def send_mail(template_name=None, subject=None, to=None, attachments=None, **kwa
     except AttributeError:
         tenant = None
 
-    if msg and properties.CELERY_MAIL:
-        if properties.SEND_MAIL:
-            _send_celery_mail.delay(msg, tenant, send=True)
+    if properties.CELERY_MAIL:
+        if len(messages) == 1:
+            _send_celery_mail.delay(messages[0], tenant, send=properties.SEND_MAIL)
         else:
-            _send_celery_mail.delay(msg, tenant)
-    elif msg:
+            _send_celery_mail_batch.delay(messages, tenant, send=properties.SEND_MAIL)
+    elif properties.SEND_MAIL:
         try:
-            if properties.SEND_MAIL:
-                msg.send()
+            if len(messages) == 1:
+                messages[0].send()
+            else:
+                messages[0].get_connection().send_messages(messages)
         except Exception as e:
             logger.error("Exception sending synchronous email: {0}".format(e))
             return
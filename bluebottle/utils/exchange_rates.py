@@ -1,16 +1,128 @@
+from collections import defaultdict
+from decimal import Decimal
+from uuid import uuid4
+
 from django.conf import settings
-from djmoney.contrib.exchange.models import convert_money
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from djmoney.contrib.exchange.exceptions import MissingRate
+from djmoney.contrib.exchange.models import ExchangeBackend, Rate, get_default_backend_name
+from djmoney.money import Money
+
+
+class ExchangeRates(object):
+    """
+    Matrix of the exchange rates of the default exchange backend.
+
+    All rates are loaded with one query and kept in process. A version token in the django
+    cache, renewed whenever rates are saved, tells every process when its copy is stale.
+    Rates are shared by all tenants.
+    """
+    version_key = 'exchange_rates_version'
+
+    def __init__(self):
+        self.entry = None
+
+    def get_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, uuid4().hex, None)
+            version = cache.get(self.version_key)
+        return version
+
+    def can_store(self):
+        # Never keep data that might still be rolled back
+        return not connection.in_atomic_block
+
+    def load(self):
+        rates = {}
+        for rate in Rate.objects.filter(backend=get_default_backend_name()).select_related('backend'):
+            rates[rate.currency] = rate.value
+            rates.setdefault(rate.backend.base_currency, Decimal(1))
+        return rates
+
+    @property
+    def rates(self):
+        version = self.get_version()
+        if self.entry is not None and self.entry[0] == version:
+            return self.entry[1]
+
+        rates = self.load()
+        if self.can_store():
+            self.entry = (version, rates)
+        return rates
+
+    def invalidate(self):
+        self.entry = None
+        cache.set(self.version_key, uuid4().hex, None)
+
+    def convert(self, money, currency, rates=None):
+        if hasattr(currency, 'code'):
+            currency = currency.code
+
+        if money.currency.code == currency:
+            return money
+
+        if rates is None:
+            rates = self.rates
+
+        try:
+            amount = money.amount
+            # Same steps as converting through the base currency with djmoney
+            if money.currency.code != settings.BASE_CURRENCY:
+                amount = amount * (1 / rates[money.currency.code])
+            if currency != settings.BASE_CURRENCY:
+                amount = amount * rates[currency]
+        except KeyError as e:
+            raise MissingRate('Rate {} does not exist'.format(e.args[0]))
+
+        return Money(amount, currency)
+
+    def get_rate(self, source, target):
+        return self.convert(Money(1, source), target).amount
+
+    def convert_many(self, amounts, currency):
+        """
+        Sum `amounts` in `currency`.
+
+        The amounts are summed per currency first, so every currency is converted once.
+        """
+        if hasattr(currency, 'code'):
+            currency = currency.code
+
+        totals = defaultdict(Decimal)
+        for money in amounts:
+            if money is not None:
+                totals[money.currency.code] += money.amount
+
+        rates = None
+        if set(totals) - {currency}:
+            rates = self.rates
+
+        return sum(
+            (self.convert(Money(total, code), currency, rates) for code, total in totals.items()),
+            Money(0, currency)
+        )
+
+
+exchange_rates = ExchangeRates()
 
 
 def convert(money, currency):
     """ Convert money object `money` to `currency`."""
-    if hasattr(currency, 'code'):
-        currency = currency.code
+    return exchange_rates.convert(money, currency)
+
 
-    if money.currency.code == currency:
-        return money
+def convert_many(amounts, currency):
+    """ Convert and sum the money objects in `amounts` to `currency`."""
+    return exchange_rates.convert_many(amounts, currency)
 
-    if money.currency.code != settings.BASE_CURRENCY and currency != settings.BASE_CURRENCY:
-        money = convert_money(money, settings.BASE_CURRENCY)
 
-    return convert_money(money, currency)
+@receiver(post_save, sender=ExchangeBackend)
+@receiver(post_delete, sender=ExchangeBackend)
+@receiver(post_save, sender=Rate)
+@receiver(post_delete, sender=Rate)
+def invalidate_exchange_rates(sender, **kwargs):
+    transaction.on_commit(exchange_rates.invalidate)
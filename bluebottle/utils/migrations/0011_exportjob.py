@@ -0,0 +1,34 @@
+import bluebottle.utils.models
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('members', '0108_member_office_manager'),
+        ('utils', '0010_delete_translationplatformsettings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('new', 'New'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='new', max_length=20, verbose_name='status')),
+                ('export_view', models.CharField(max_length=200, verbose_name='export view')),
+                ('object_id', models.PositiveIntegerField()),
+                ('base_url', models.CharField(max_length=200)),
+                ('filename', models.CharField(max_length=500, verbose_name='filename')),
+                ('file', models.FileField(blank=True, null=True, upload_to=bluebottle.utils.models.get_export_path, verbose_name='file')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='created')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='finished')),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='owner')),
+            ],
+            options={
+                'verbose_name': 'export',
+                'verbose_name_plural': 'exports',
+            },
+        ),
+    ]
@@ -1,3 +1,4 @@
+import uuid
 from builtins import object
 from datetime import timedelta
 from operator import attrgetter
@@ -7,7 +8,7 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.db import models, ProgrammingError, OperationalError
+from django.db import models, transaction, ProgrammingError, OperationalError
 from django.db.models.manager import Manager
 from django.utils.timezone import now
 from django.utils.translation import get_language
@@ -17,7 +18,7 @@ from future.utils import python_2_unicode_compatible
 from parler.models import TranslatableModel
 from solo.models import SingletonModel
 
-from bluebottle.utils.cache import memoize
+from bluebottle.utils.cache import memoize, platform_settings_cache, public_properties_cache
 from bluebottle.utils.managers import (
     SortableTranslatableManager,
     PublishedManager
@@ -123,6 +124,12 @@ class Language(models.Model):
         if self.code and self.code not in (code for (code, _) in settings.LANGUAGES):
             raise ValidationError(f'Unknown language code: {self.code}')
         super().save(*args, **kwargs)
+        transaction.on_commit(public_properties_cache.invalidate)
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        transaction.on_commit(public_properties_cache.invalidate)
+        return result
 
     @property
     def full_code(self):
@@ -173,13 +180,30 @@ class BasePlatformSettings(SingletonModel):
     def save(self, *args, **kwargs):
         self.__class__.objects.exclude(id=self.id).delete()
         super(BasePlatformSettings, self).save(*args, **kwargs)
+        self.invalidate_cache()
+
+    def delete(self, *args, **kwargs):
+        result = super(BasePlatformSettings, self).delete(*args, **kwargs)
+        self.invalidate_cache()
+        return result
+
+    @classmethod
+    def invalidate_cache(cls):
+        platform_settings_cache.invalidate(cls)
+        public_properties_cache.invalidate()
+        # Other processes might have cached the old values before this transaction commits
+        transaction.on_commit(lambda: platform_settings_cache.invalidate(cls))
+        transaction.on_commit(public_properties_cache.invalidate)
 
     @classmethod
     def load(cls):
-        try:
-            return cls.objects.first()
-        except cls.DoesNotExist:
-            return cls()
+        def loader():
+            try:
+                return cls.objects.first()
+            except cls.DoesNotExist:
+                return cls()
+
+        return platform_settings_cache.get(cls, loader)
 
     def __str__(self):
         return str(_('Settings'))
@@ -282,3 +306,44 @@ class AnonymizationMixin(object):
     @property
     def anonymized(self):
         return False
+
+
+def get_export_path(instance, filename):
+    return 'private/exports/{}.xlsx'.format(uuid.uuid4())
+
+
+class ExportJob(models.Model):
+    """
+    An xlsx export that is written in the background, see `bluebottle.utils.views.ExportView`.
+    """
+
+    class StatusChoices(DjangoChoices):
+        new = ChoiceItem('new', label=_("New"))
+        running = ChoiceItem('running', label=_("Running"))
+        succeeded = ChoiceItem('succeeded', label=_("Succeeded"))
+        failed = ChoiceItem('failed', label=_("Failed"))
+
+    status = models.CharField(
+        _('status'), max_length=20, choices=StatusChoices.choices, default=StatusChoices.new
+    )
+    export_view = models.CharField(_('export view'), max_length=200)
+    object_id = models.PositiveIntegerField()
+    base_url = models.CharField(max_length=200)
+    filename = models.CharField(_('filename'), max_length=500)
+    file = models.FileField(_('file'), upload_to=get_export_path, null=True, blank=True)
+    owner = models.ForeignKey(
+        'members.Member',
+        verbose_name=_('owner'),
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE
+    )
+    created = models.DateTimeField(_('created'), auto_now_add=True)
+    finished = models.DateTimeField(_('finished'), null=True, blank=True)
+
+    class Meta(object):
+        verbose_name = _('export')
+        verbose_name_plural = _('exports')
+
+    def __str__(self):
+        return self.filename
@@ -0,0 +1,8 @@
+from functools import lru_cache
+
+import dkim
+from dkim.crypto import parse_pem_private_key
+
+# dkim parses the PEM private key for every message it signs. Tenants sign all their
+# mails with the same key, so keep the parsed keys around.
+dkim.parse_pem_private_key = lru_cache(maxsize=256)(parse_pem_private_key)
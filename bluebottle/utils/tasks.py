@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from celery.schedules import crontab
+from django.conf import settings
+from django.utils.module_loading import import_string
+from django.utils.timezone import now
+
+from bluebottle.celery import app
+from bluebottle.clients.scheduler import tenant_periodic_task
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.utils.models import ExportJob
+
+
+@app.task
+def run_export_job(job_id, tenant):
+    with LocalTenant(tenant, clear_tenant=True):
+        job = ExportJob.objects.get(pk=job_id)
+        import_string(job.export_view).run_job(job)
+
+
+@tenant_periodic_task(crontab(hour=4, minute=10))
+def delete_expired_export_jobs():
+    """
+    Delete background exports, and their files, after `EXPORT_JOB_RETENTION_DAYS`
+    """
+    expired = ExportJob.objects.filter(
+        created__lt=now() - timedelta(days=getattr(settings, 'EXPORT_JOB_RETENTION_DAYS', 7))
+    )
+    for job in expired:
+        if job.file:
+            job.file.delete(save=False)
+        job.delete()
@@ -46,7 +46,7 @@ class ExportAsCSVActionTest(BluebottleTestCase):
         )
 
         data = list(csv.reader(
-            response.content.decode('utf-8').split('\n'),
+            b''.join(response.streaming_content).decode('utf-8').split('\n'),
             delimiter=";"
         ))
 
@@ -61,7 +61,7 @@ class ExportAsCSVActionTest(BluebottleTestCase):
         )
 
         data = list(csv.reader(
-            response.content.decode('utf-8').split('\n'),
+            b''.join(response.streaming_content).decode('utf-8').split('\n'),
             delimiter=";"
         ))
 
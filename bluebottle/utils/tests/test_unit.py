@@ -1,6 +1,9 @@
 # -*- coding: utf-8 -*-
+import re
+import smtplib
 import unittest
 import uuid
+from datetime import timedelta
 from builtins import object
 from builtins import str
 
@@ -10,15 +13,21 @@ from django.apps import apps
 from django.conf import settings
 from django.contrib.auth.models import Permission
 from django.core.exceptions import SuspiciousFileOperation, ValidationError
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.core.management import call_command
 from django.db import connection
 from django.test import TestCase, RequestFactory
+from django.template.loader import get_template
 from django.test.utils import override_settings
 from django.utils.encoding import force_bytes
+from django.utils.timezone import now
+from djmoney.contrib.exchange.exceptions import MissingRate
+from djmoney.contrib.exchange.models import Rate
 from moneyed import Money
 from parler import appsettings
 
+from bluebottle.clients.utils import tenant_url
 from bluebottle.cms.models import SitePlatformSettings
 from bluebottle.initiatives.models import Initiative
 from bluebottle.initiatives.tests.factories import InitiativeFactory
@@ -28,14 +37,18 @@ from bluebottle.test.factory_models.accounts import BlueBottleUserFactory
 from bluebottle.test.factory_models.utils import LanguageFactory
 from bluebottle.test.utils import BluebottleTestCase
 from bluebottle.time_based.models import DateActivity
+from bluebottle.utils.cache import platform_settings_cache
+from bluebottle.utils.compiled_mail import compiled_mail_cache, inline
+from bluebottle.utils.exchange_rates import convert, convert_many, exchange_rates
 from bluebottle.utils.fields import RestrictedImageFormField
-from bluebottle.utils.models import Language, get_current_language
+from bluebottle.utils.models import ExportJob, Language, get_current_language
 from bluebottle.utils.permissions import (
     ResourcePermission, ResourceOwnerPermission, RelatedResourceOwnerPermission,
     OneOf
 )
 from bluebottle.utils.serializers import MoneySerializer
 from bluebottle.utils.storage import TenantFileSystemStorage
+from bluebottle.utils.tasks import delete_expired_export_jobs
 from bluebottle.utils.utils import clean_for_hashtag, get_client_ip
 from ..email_backend import send_mail, create_message
 
@@ -234,7 +247,7 @@ class SendMailTestCase(BluebottleTestCase):
         self.assertEqual(msg.activated_language, 'en')
 
 
-from bluebottle.utils.email_backend import TenantAwareBackend
+from bluebottle.utils.email_backend import TenantAwareBackend, smtp_connection_pool
 from bluebottle.clients.mail import EmailMultiAlternatives
 
 
@@ -359,6 +372,81 @@ class TestTenantAwareMailserver(BluebottleTestCase):
             self.assertEqual(smtp.call_args[0], ('tenanthost', 4242))
             self.assertTrue(connection.sendmail.called)
 
+    @override_settings(
+        EMAIL_BACKEND='bluebottle.utils.email_backend.DKIMBackend',
+        EMAIL_HOST='somehost',
+        EMAIL_PORT=1337,
+        EMAIL_POOL_MAX_MESSAGES=3,
+        EMAIL_POOL_MAX_AGE=60)
+    @mock.patch("smtplib.SMTP")
+    def test_pooled_connection(self, smtp):
+        smtp.return_value.noop.return_value = (250, b'OK')
+        self.addCleanup(smtp_connection_pool.clear)
+
+        with mock.patch("bluebottle.utils.email_backend.properties",
+                        new=mock.Mock([])) as properties:
+            properties.MAIL_CONFIG = None
+
+            for _ in range(3):
+                msg = EmailMultiAlternatives(subject="test", body="test",
+                                             to=["test@example.com"])
+                TenantAwareBackend().send_messages([msg, msg])
+
+            # The connection is reused once, after that it has sent more than 3 messages
+            self.assertEqual(smtp.call_count, 2)
+            self.assertEqual(smtp.return_value.sendmail.call_count, 6)
+
+    @override_settings(
+        EMAIL_BACKEND='bluebottle.utils.email_backend.DKIMBackend',
+        EMAIL_HOST='somehost',
+        EMAIL_PORT=1337)
+    @mock.patch("smtplib.SMTP")
+    def test_batch_failure(self, smtp):
+        smtp.return_value.sendmail.side_effect = [
+            smtplib.SMTPRecipientsRefused({}), {}, {}
+        ]
+
+        with mock.patch("bluebottle.utils.email_backend.properties",
+                        new=mock.Mock([])) as properties:
+            properties.MAIL_CONFIG = None
+
+            backend = TenantAwareBackend(fail_silently=True)
+            messages = [
+                EmailMultiAlternatives(subject="test", body="test", to=["test@example.com"])
+                for _ in range(3)
+            ]
+
+            self.assertEqual(backend.send_messages(messages), 2)
+            self.assertEqual(backend.last_batch['failed'], 1)
+            self.assertEqual(smtp.call_count, 1)
+
+    @override_settings(
+        EMAIL_BACKEND='bluebottle.utils.email_backend.DKIMBackend',
+        EMAIL_HOST='somehost',
+        EMAIL_PORT=1337)
+    @mock.patch("smtplib.SMTP")
+    def test_batch_failure_raises(self, smtp):
+        smtp.return_value.sendmail.side_effect = [
+            smtplib.SMTPRecipientsRefused({}), {}, {}
+        ]
+
+        with mock.patch("bluebottle.utils.email_backend.properties",
+                        new=mock.Mock([])) as properties:
+            properties.MAIL_CONFIG = None
+
+            backend = TenantAwareBackend()
+            messages = [
+                EmailMultiAlternatives(subject="test", body="test", to=["test@example.com"])
+                for _ in range(3)
+            ]
+
+            with self.assertRaises(smtplib.SMTPRecipientsRefused):
+                backend.send_messages(messages)
+
+            # The rest of the batch is still sent
+            self.assertEqual(smtp.return_value.sendmail.call_count, 3)
+            self.assertEqual(backend.last_batch['sent'], 2)
+
     def test_reply_to(self):
         """ Test simple / traditional case where config comes from settings """
         reply_to = 'info@test.example.com'
@@ -766,3 +854,183 @@ class GetCurrentLanguageTestCase(BluebottleTestCase):
     )
     def test_get_current_language_with_subcode(self, get_language):
         self.assertEqual(get_current_language().language_name, 'Plat Leids')
+
+
+@override_settings(PLATFORM_SETTINGS_CACHE=True)
+class PlatformSettingsCacheTestCase(BluebottleTestCase):
+
+    def setUp(self):
+        super(PlatformSettingsCacheTestCase, self).setUp()
+        MailPlatformSettings.objects.create(address='info@example.com')
+        platform_settings_cache.entries.clear()
+        platform_settings_cache.reset_stats()
+
+        # Test cases always run in a transaction, which disables the process cache
+        patcher = mock.patch.object(platform_settings_cache, 'can_store', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_load_cached(self):
+        MailPlatformSettings.load()
+
+        with self.assertNumQueries(0):
+            settings = MailPlatformSettings.load()
+
+        self.assertEqual(settings.address, 'info@example.com')
+        self.assertEqual(platform_settings_cache.stats['process'], 1)
+        self.assertEqual(platform_settings_cache.hit_rate(), 0.5)
+
+    def test_load_returns_copy(self):
+        settings = MailPlatformSettings.load()
+        settings.address = 'changed@example.com'
+
+        self.assertEqual(MailPlatformSettings.load().address, 'info@example.com')
+
+    def test_save_invalidates(self):
+        settings = MailPlatformSettings.load()
+        settings.address = 'changed@example.com'
+        settings.save()
+
+        self.assertEqual(MailPlatformSettings.load().address, 'changed@example.com')
+
+    def test_request_memoized(self):
+        request = RequestFactory().get('/')
+        with mock.patch('bluebottle.utils.cache.get_current_request', return_value=request):
+            first = MailPlatformSettings.load()
+            with self.assertNumQueries(0):
+                second = MailPlatformSettings.load()
+
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(platform_settings_cache.stats['request'], 1)
+
+    def test_request_memoized_returns_copy(self):
+        request = RequestFactory().get('/')
+        with mock.patch('bluebottle.utils.cache.get_current_request', return_value=request):
+            first = MailPlatformSettings.load()
+            first.address = 'changed@example.com'
+
+            self.assertEqual(MailPlatformSettings.load().address, 'info@example.com')
+
+
+@override_settings(MAIL_TEMPLATE_CACHE=True)
+class CompiledMailCacheTestCase(BluebottleTestCase):
+    template_name = 'mails/test_messages/test_message'
+
+    def setUp(self):
+        super(CompiledMailCacheTestCase, self).setUp()
+        compiled_mail_cache.clear()
+        compiled_mail_cache.reset_stats()
+
+    def create_message(self, name):
+        user = BlueBottleUserFactory.create(first_name=name)
+        return create_message(
+            to=user,
+            template_name=self.template_name,
+            recipient_name=name,
+            settings=MailPlatformSettings.load(),
+            site='http://testserver'
+        )
+
+    def test_layout_compiled_once(self):
+        first = self.create_message('Ann')
+        second = self.create_message('Bob')
+
+        self.assertEqual(compiled_mail_cache.stats, {'hit': 1, 'miss': 1, 'fallback': 0})
+        self.assertTrue('Hi Ann' in first.body)
+        self.assertTrue('Hi Bob' in second.alternatives[0][0])
+        self.assertFalse('mail-slot' in second.alternatives[0][0])
+
+    def test_same_as_inlined(self):
+        html = get_template('{}.html'.format(self.template_name)).render({
+            'recipient_name': 'Ann',
+            'settings': MailPlatformSettings.load(),
+            'site': 'http://testserver'
+        })
+        message = self.create_message('Ann')
+
+        def normalize(html):
+            return re.sub(r'>\s+<', '><', re.sub(r'\s+', ' ', html)).strip()
+
+        self.assertEqual(
+            normalize(message.alternatives[0][0]),
+            normalize(inline(html, base_url=tenant_url()))
+        )
+
+    @override_settings(MAIL_TEMPLATE_CACHE=False)
+    def test_disabled(self):
+        message = self.create_message('Ann')
+
+        self.assertTrue('Hi Ann' in message.body)
+        self.assertEqual(compiled_mail_cache.stats, {'hit': 0, 'miss': 0, 'fallback': 0})
+
+
+class ExchangeRatesTestCase(BluebottleTestCase):
+
+    def setUp(self):
+        super(ExchangeRatesTestCase, self).setUp()
+        exchange_rates.entry = None
+        self.addCleanup(setattr, exchange_rates, 'entry', None)
+
+    def test_convert(self):
+        self.assertEqual(round(convert(Money(15, 'EUR'), 'USD').amount, 2), 10)
+        self.assertEqual(round(convert(Money(15, 'EUR'), 'NGN').amount, 2), 5000)
+        self.assertEqual(convert(Money(15, 'EUR'), 'EUR'), Money(15, 'EUR'))
+
+    def test_convert_missing_rate(self):
+        with self.assertRaises(MissingRate):
+            convert(Money(15, 'EUR'), 'GBP')
+
+    def test_convert_many(self):
+        amounts = [Money(15, 'EUR'), Money(5, 'USD'), Money(15, 'EUR'), Money(500, 'NGN'), None]
+
+        with self.assertNumQueries(1):
+            total = convert_many(amounts, 'USD')
+
+        self.assertEqual(total.currency.code, 'USD')
+        self.assertEqual(round(total.amount, 2), 26)
+
+    def test_convert_many_same_currency(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(convert_many([Money(15, 'EUR'), Money(5, 'EUR')], 'EUR'), Money(20, 'EUR'))
+            self.assertEqual(convert_many([], 'EUR'), Money(0, 'EUR'))
+
+    def test_rates_cached(self):
+        with mock.patch.object(exchange_rates, 'can_store', return_value=True):
+            convert(Money(15, 'EUR'), 'USD')
+
+            with self.assertNumQueries(0):
+                self.assertEqual(round(convert_many([Money(30, 'EUR')], 'USD').amount, 2), 20)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                Rate.objects.filter(currency='EUR').update(value=3)
+                Rate.objects.get(currency='EUR').save()
+
+            self.assertEqual(round(convert(Money(30, 'EUR'), 'USD').amount, 2), 10)
+
+
+class ExportJobTestCase(BluebottleTestCase):
+
+    def create_job(self, days_ago):
+        job = ExportJob.objects.create(
+            export_view='bluebottle.time_based.views.exports.DateParticipantExportView',
+            object_id=1,
+            base_url='http://testserver',
+            filename='export.xlsx',
+            status=ExportJob.StatusChoices.succeeded,
+        )
+        job.file.save('export.xlsx', ContentFile(b'export'))
+        ExportJob.objects.filter(pk=job.pk).update(created=now() - timedelta(days=days_ago))
+        return job
+
+    @override_settings(EXPORT_JOB_RETENTION_DAYS=7)
+    def test_delete_expired_export_jobs(self):
+        expired = self.create_job(10)
+        recent = self.create_job(1)
+        storage = expired.file.storage
+
+        delete_expired_export_jobs()
+
+        self.assertEqual(list(ExportJob.objects.all()), [recent])
+        self.assertFalse(storage.exists(expired.file.name))
+        self.assertTrue(storage.exists(recent.file.name))
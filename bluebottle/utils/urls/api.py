@@ -1,6 +1,8 @@
 from django.urls import path
-from ..views import LanguageList
+from ..views import ExportJobDownloadView, ExportJobStatusView, LanguageList
 
 urlpatterns = [
     path('languages/', LanguageList.as_view(), name='utils_language_list'),
+    path('exports/<int:pk>', ExportJobStatusView.as_view(), name='export-job-status'),
+    path('exports/<int:pk>/download', ExportJobDownloadView.as_view(), name='export-job-download'),
 ]
@@ -1,9 +1,12 @@
 import json
+import logging
 import mimetypes
 import os
 import re
 from io import BytesIO
 from operator import attrgetter
+from tempfile import TemporaryFile
+from urllib.parse import urljoin
 
 from django.db.models.manager import Manager
 import magic
@@ -11,12 +14,15 @@ import xlsxwriter
 
 from django.contrib.admin.models import ADDITION, CHANGE, LogEntry
 from django.contrib.admin.options import get_content_type_for_model
+from django.core.files import File
 from django.core.paginator import Paginator
 from django.core.signing import TimestampSigner, BadSignature
+from django.db import connection, transaction
 from django.db.models import Case, When, IntegerField
-from django.http import Http404, HttpResponse, HttpResponseNotAllowed
+from django.http import Http404, HttpResponse, HttpResponseNotAllowed, JsonResponse
 from django.utils import translation
 from django.utils.functional import cached_property
+from django.utils.timezone import now
 from django.views.generic import TemplateView
 from django.views.generic.detail import DetailView
 from django.views import View
@@ -28,17 +34,20 @@ from rest_framework_json_api.exceptions import exception_handler
 from rest_framework_json_api.pagination import JsonApiPageNumberPagination
 from rest_framework_json_api.parsers import JSONParser
 from rest_framework_json_api.views import AutoPrefetchMixin
-from rest_framework_jwt.authentication import JSONWebTokenAuthentication
 
 from bluebottle.activities.ical import ActivityIcal
+from bluebottle.auth.authentication import JSONWebTokenAuthentication
 from bluebottle.bluebottle_drf2.renderers import BluebottleJSONAPIRenderer
 from bluebottle.clients import properties
-from bluebottle.utils.admin import prep_field
+from bluebottle.utils.admin import prep_field, queryset_chunks
 from bluebottle.utils.fields import RichTextField
 from bluebottle.utils.permissions import ResourcePermission
-from .models import Language
+from bluebottle.utils.tasks import run_export_job
+from .models import ExportJob, Language
 from .serializers import LanguageSerializer
-from .utils import get_current_language
+from .utils import get_current_language, reverse_signed
+
+logger = logging.getLogger(__name__)
 
 mime = magic.Magic(mime=True)
 
@@ -473,9 +482,49 @@ class IcalView(PrivateFileView):
         return response
 
 
+class ExportJobRequest(object):
+    """
+    Stands in for the request that created an export job, when the export is written in
+    the background.
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def build_absolute_uri(self, location=None):
+        return urljoin(self.base_url, location or '/')
+
+
+def get_export_job_data(job):
+    data = {
+        'id': job.pk,
+        'status': job.status,
+        'status_url': reverse_signed('export-job-status', args=(job.pk, )),
+        'url': None,
+    }
+    if job.status == ExportJob.StatusChoices.succeeded:
+        data['url'] = reverse_signed('export-job-download', args=(job.pk, ))
+    return data
+
+
 class ExportView(PrivateFileView):
+    """
+    Export the related objects of an object as xlsx.
+
+    A GET request returns the workbook directly. A POST request creates an `ExportJob`
+    that writes the workbook in the background, and returns a signed url that can be
+    polled for the status of the job and the download url.
+
+    Rows are read in chunks and the workbook is written in constant memory mode, so rows
+    have to be written in order.
+    """
     filename = 'exports'
 
+    def get_object(self):
+        if getattr(self, 'object', None) is None:
+            self.object = super().get_object()
+        return self.object
+
     def get_fields(self):
         return self.fields
 
@@ -485,8 +534,13 @@ class ExportView(PrivateFileView):
     def get_row(self, instance):
         return [prep_field(self.request, instance, field[0]) for field in self.get_fields()]
 
+    def get_rows(self, instances):
+        for chunk in queryset_chunks(instances):
+            for instance in chunk:
+                yield self.get_row(instance)
+
     def get_data(self):
-        return [self.get_row(instance) for instance in self.get_instances()]
+        return self.get_rows(self.get_instances())
 
     def get_instances(self):
         raise NotImplementedError()
@@ -500,13 +554,14 @@ class ExportView(PrivateFileView):
         for (index, row) in enumerate(self.get_data()):
             worksheet.write_row(index + 1, 0, row)
 
-    def get(self, request, *args, **kwargs):
-        output = BytesIO()
-
-        workbook = xlsxwriter.Workbook(output, {'remove_timezone': True})
+    def write_workbook(self, output):
+        workbook = xlsxwriter.Workbook(output, {'remove_timezone': True, 'constant_memory': True})
         self.write_data(workbook)
         workbook.close()
 
+    def get(self, request, *args, **kwargs):
+        output = BytesIO()
+        self.write_workbook(output)
         output.seek(0)
 
         response = HttpResponse(output.read())
@@ -516,6 +571,62 @@ class ExportView(PrivateFileView):
 
         return response
 
+    def post(self, request, *args, **kwargs):
+        job = ExportJob.objects.create(
+            export_view=f'{self.__class__.__module__}.{self.__class__.__name__}',
+            object_id=self.get_object().pk,
+            base_url=request.build_absolute_uri('/'),
+            filename=self.get_filename(),
+            owner=request.user if request.user.is_authenticated else None,
+        )
+
+        tenant = connection.tenant
+        transaction.on_commit(lambda: run_export_job.delay(job.pk, tenant))
+
+        return JsonResponse(get_export_job_data(job), status=202)
+
+    @classmethod
+    def run_job(cls, job):
+        job.status = ExportJob.StatusChoices.running
+        job.save(update_fields=['status'])
+
+        view = cls()
+        view.request = ExportJobRequest(job.base_url)
+        view.kwargs = {'pk': job.object_id}
+
+        try:
+            view.object = view.get_queryset().get(pk=job.object_id)
+
+            with TemporaryFile() as output:
+                view.write_workbook(output)
+                output.seek(0)
+                job.file.save(job.filename, File(output), save=False)
+
+            job.status = ExportJob.StatusChoices.succeeded
+        except Exception:
+            logger.exception('Export %s failed', job.pk)
+            job.status = ExportJob.StatusChoices.failed
+
+        job.finished = now()
+        job.save()
+
+
+class ExportJobStatusView(PrivateFileView):
+    model = ExportJob
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(get_export_job_data(self.get_object()))
+
+
+class ExportJobDownloadView(PrivateFileView):
+    queryset = ExportJob.objects.filter(status=ExportJob.StatusChoices.succeeded)
+    field = 'file'
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        response['Content-Disposition'] = f'attachment; filename="{self.get_object().filename}"'
+        return response
+
 
 class NoopView(View):
     def dispatch(self, *args, **kwargs):
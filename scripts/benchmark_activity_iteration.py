@@ -0,0 +1,59 @@
+import time
+import tracemalloc
+
+from bluebottle.activities.models import Activity
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+
+ACTIVITIES = 100000
+
+
+def eager_tracking(instance):
+    # What loading an instance did before change tracking was lazy: copy every field into a
+    # dict and create every state machine
+    instance._eager_initial_values = dict(
+        (f'{field.name}_id' if field.is_relation else field.name, getattr(instance, field.attname))
+        for field in instance._meta.fields
+    )
+    for name, machine_class in instance._state_machines.items():
+        instance.__dict__[f'_eager_{name}'] = machine_class(instance)
+
+
+def iterate(count, keep, eager=False):
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    kept = []
+    loaded = 0
+    for activity in Activity.objects.non_polymorphic().order_by('pk')[:count].iterator(chunk_size=2000):
+        if eager:
+            eager_tracking(activity)
+        if keep:
+            kept.append(activity)
+        loaded += 1
+
+    duration = time.perf_counter() - started
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return loaded, duration, peak
+
+
+def run(*args):
+    """
+    Measure the time and memory of iterating activities, with the lazy change tracking and
+    with the eager tracking that was done before. With `keep` all activities are kept in
+    memory, like a list endpoint or an export that collects rows.
+
+    ./manage.py runscript benchmark_activity_iteration --script-args=<schema_name> [count] [keep]
+    """
+    tenant = Client.objects.get(schema_name=args[0]) if args else Client.objects.first()
+    count = int(args[1]) if len(args) > 1 else ACTIVITIES
+    keep = len(args) > 2 and args[2] == 'keep'
+
+    with LocalTenant(tenant, clear_tenant=True):
+        for label, eager in (('eager', True), ('lazy', False)):
+            loaded, duration, peak = iterate(count, keep, eager)
+            print(
+                f'{label:5} {loaded} activities in {duration:.2f}s, '
+                f'{duration / max(loaded, 1) * 1e6:.1f} us per activity, peak {peak / 1024 / 1024:.1f} MiB'
+            )
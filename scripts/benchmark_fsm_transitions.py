@@ -0,0 +1,86 @@
+import time
+from unittest import mock
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.fsm.state import ModelStateMachine, StateMachine
+from bluebottle.initiatives.tests.factories import InitiativeFactory
+from bluebottle.time_based.tests.factories import (
+    DateActivityFactory, DateActivitySlotFactory, DateParticipantFactory, DateRegistrationFactory
+)
+
+PARTICIPANTS = 20
+
+
+def accept_cascade(participants):
+    """
+    Accept the registrations of a date activity that needs review, until its only slot is full.
+    Returns the number of queries, condition evaluations and the duration of the accepts.
+    """
+    initiative = InitiativeFactory.create()
+    initiative.states.submit()
+    initiative.states.approve(save=True)
+
+    activity = DateActivityFactory.create(initiative=initiative, review=True, slots=[])
+    slot = DateActivitySlotFactory.create(activity=activity, capacity=participants)
+    activity.states.publish(save=True)
+
+    registrations = DateRegistrationFactory.create_batch(participants, activity=activity)
+    for registration in registrations:
+        DateParticipantFactory.create(registration=registration, activity=activity, slot=slot)
+
+    conditions = []
+    counting = {}
+    check_condition = ModelStateMachine.check_condition
+
+    def count_condition(machine, condition):
+        # Count evaluations, not lookups in the memo
+        if condition not in counting:
+            def counting_condition(machine, condition=condition):
+                conditions.append(condition)
+                return condition(machine)
+
+            counting[condition] = counting_condition
+        return check_condition(machine, counting[condition])
+
+    with mock.patch.object(ModelStateMachine, 'check_condition', count_condition):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for registration in registrations:
+                registration.states.accept(save=True)
+            duration = time.perf_counter() - started
+
+    return len(queries), len(conditions), duration
+
+
+def measure(participants):
+    with transaction.atomic():
+        result = accept_cascade(participants)
+        transaction.set_rollback(True)
+    return result
+
+
+def run(*args):
+    """
+    Measure the queries and condition evaluations of accepting participants, with and without
+    memoizing conditions during a trigger pass. Nothing is stored.
+
+    ./manage.py runscript benchmark_fsm_transitions --script-args=<schema_name> [participants]
+    """
+    tenant = Client.objects.get(schema_name=args[0]) if args else Client.objects.first()
+    participants = int(args[1]) if len(args) > 1 else PARTICIPANTS
+
+    with LocalTenant(tenant, clear_tenant=True):
+        with mock.patch.object(ModelStateMachine, 'check_condition', StateMachine.check_condition):
+            before = measure(participants)
+        after = measure(participants)
+
+    print(f'{tenant.schema_name}: accept {participants} participants')
+    for label, (queries, conditions, duration) in (('without memo', before), ('with memo', after)):
+        print(
+            f'{label:12} {queries / participants:6.1f} queries, '
+            f'{conditions / participants:6.1f} conditions, {duration / participants * 1000:7.1f} ms per accept'
+        )
@@ -0,0 +1,55 @@
+import statistics
+import time
+
+from django.test import Client as TestClient, RequestFactory
+from django.urls import reverse
+from rest_framework_jwt.authentication import JSONWebTokenAuthentication
+
+from bluebottle.auth.authentication import AuthContext
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.members.models import Member
+
+ROUNDS = 200
+
+
+def p50(func, rounds):
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def legacy_authentication(request):
+    # Before the auth context the token was decoded by the user middleware, by rest
+    # framework and by the sliding token middleware.
+    for _ in range(3):
+        JSONWebTokenAuthentication().authenticate(request)
+
+
+def run(*args):
+    """
+    Median overhead of authenticating an api request with a JWT.
+
+    ./manage.py runscript benchmark_jwt_auth --script-args=<schema_name> [rounds]
+    """
+    tenant = Client.objects.get(schema_name=args[0])
+    rounds = int(args[1]) if len(args) > 1 else ROUNDS
+
+    with LocalTenant(tenant):
+        user = Member.objects.filter(is_active=True).first()
+        token = 'JWT {}'.format(user.get_jwt_token())
+        url = reverse('user-current')
+
+        request = RequestFactory().get(url, HTTP_AUTHORIZATION=token)
+
+        print(f'legacy authentication: {p50(lambda: legacy_authentication(request), rounds):.2f} ms')
+        print(f'auth context:          {p50(lambda: AuthContext(request), rounds):.2f} ms')
+
+    client = TestClient(HTTP_HOST=tenant.domain_url)
+    response_time = p50(lambda: client.get(url, HTTP_AUTHORIZATION=token), rounds)
+    anonymous_time = p50(lambda: client.get(url), rounds)
+
+    print(f'GET {url} authenticated: {response_time:.2f} ms, anonymous: {anonymous_time:.2f} ms')
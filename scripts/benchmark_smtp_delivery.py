@@ -0,0 +1,62 @@
+import time
+
+from aiosmtpd.controller import Controller
+from django.test.utils import override_settings
+
+from bluebottle.clients.mail import EmailMultiAlternatives
+from bluebottle.utils.email_backend import TenantAwareBackend, smtp_connection_pool
+
+MESSAGES = 500
+PORT = 8025
+
+
+class CountingHandler(object):
+    received = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.received += 1
+        return '250 Message accepted for delivery'
+
+
+def create_messages(count):
+    return [
+        EmailMultiAlternatives(
+            subject='Benchmark {}'.format(index),
+            body='Benchmark message',
+            to=['member{}@example.com'.format(index)]
+        ) for index in range(count)
+    ]
+
+
+def run(*args):
+    """
+    Compare a connection per message with pooled batch delivery against a local aiosmtpd server.
+
+    pip install aiosmtpd
+    ./manage.py tenant_command -s <schema> runscript benchmark_smtp_delivery --script-args 500
+    """
+    count = int(args[0]) if args else MESSAGES
+    handler = CountingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=PORT)
+    controller.start()
+
+    try:
+        with override_settings(EMAIL_HOST='127.0.0.1', EMAIL_PORT=PORT, EMAIL_USE_TLS=False):
+            with override_settings(EMAIL_POOL_MAX_MESSAGES=0):
+                started = time.monotonic()
+                for message in create_messages(count):
+                    TenantAwareBackend().send_messages([message])
+                single = time.monotonic() - started
+
+            with override_settings(EMAIL_POOL_MAX_MESSAGES=count):
+                started = time.monotonic()
+                backend = TenantAwareBackend()
+                backend.send_messages(create_messages(count))
+                batched = time.monotonic() - started
+                smtp_connection_pool.clear()
+    finally:
+        controller.stop()
+
+    print('{} messages received'.format(handler.received))
+    print('connection per message: {:.0f} messages/s'.format(count / single))
+    print('pooled batch: {:.0f} messages/s, {}'.format(count / batched, backend.last_batch))
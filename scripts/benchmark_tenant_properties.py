@@ -0,0 +1,45 @@
+import timeit
+
+from django.conf import settings
+from django.utils._os import safe_join
+
+from bluebottle.clients import properties, registry
+from bluebottle.clients.models import Client
+
+ROUNDS = 1000
+
+
+def execfile_set_tenant(tenant):
+    # The pre-registry implementation: compile and exec on every switch
+    tenant_properties = {}
+    path = safe_join(settings.MULTI_TENANT_DIR, tenant.client_name, 'settings.py')
+    try:
+        with open(path) as props_file:
+            exec(compile(props_file.read(), path, 'exec'), dict(settings=settings), tenant_properties)
+    except (ImportError, AttributeError, IOError):
+        pass
+    return tenant_properties
+
+
+def run(*args):
+    """
+    Compare the overhead of switching tenants with and without the compiled properties registry.
+
+    ./manage.py runscript benchmark_tenant_properties
+    """
+    rounds = int(args[0]) if args else ROUNDS
+    tenants = list(Client.objects.all())
+
+    registry.invalidate()
+
+    before = timeit.timeit(
+        lambda: [execfile_set_tenant(tenant) for tenant in tenants], number=rounds
+    )
+    after = timeit.timeit(
+        lambda: [properties.set_tenant(tenant) for tenant in tenants], number=rounds
+    )
+
+    switches = rounds * len(tenants)
+    print(f'{len(tenants)} tenants, {switches} switches')
+    print(f'execfile: {before / switches * 1e6:.1f} us per set_tenant')
+    print(f'registry: {after / switches * 1e6:.1f} us per set_tenant')
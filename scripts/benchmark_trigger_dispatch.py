@@ -0,0 +1,65 @@
+import timeit
+
+from django.db import transaction
+
+from bluebottle.clients.models import Client
+from bluebottle.clients.utils import LocalTenant
+from bluebottle.fsm.triggers import ModelChangedTrigger, ModelCreatedTrigger
+from bluebottle.time_based.models import DateParticipant
+
+INSTANCES = 500
+ROUNDS = 10
+
+
+def scan_triggers(instance):
+    # The implementation before the trigger index: check every trigger of the model
+    triggers = []
+    for trigger in instance.triggers.triggers:
+        if isinstance(trigger, ModelChangedTrigger):
+            if trigger.changed(instance):
+                triggers.append(trigger)
+    if not instance.pk:
+        for trigger in instance.triggers.triggers:
+            if isinstance(trigger, ModelCreatedTrigger):
+                triggers.append(trigger)
+    return triggers
+
+
+def index_triggers(instance):
+    triggers = instance._trigger_index.get_changed(instance)
+    if not instance.pk:
+        triggers = triggers + instance._trigger_index.created
+    return triggers
+
+
+def run(*args):
+    """
+    Measure the cost of finding the triggers to run when saving participants, with a scan
+    of all triggers and with the trigger index. The saves are rolled back.
+
+    ./manage.py runscript benchmark_trigger_dispatch --script-args=<schema_name> [instances]
+    """
+    tenant = Client.objects.get(schema_name=args[0]) if args else Client.objects.first()
+    count = int(args[1]) if len(args) > 1 else INSTANCES
+
+    with LocalTenant(tenant, clear_tenant=True):
+        instances = list(DateParticipant.objects.all()[:count])
+        if not instances:
+            print(f'{tenant.schema_name}: no participants')
+            return
+
+        for instance in instances:
+            assert scan_triggers(instance) == index_triggers(instance)
+
+        scan = timeit.timeit(lambda: [scan_triggers(instance) for instance in instances], number=ROUNDS)
+        index = timeit.timeit(lambda: [index_triggers(instance) for instance in instances], number=ROUNDS)
+
+        with transaction.atomic():
+            save = timeit.timeit(lambda: [instance.save() for instance in instances], number=1)
+            transaction.set_rollback(True)
+
+    lookups = ROUNDS * len(instances)
+    print(f'{tenant.schema_name}: {len(instances)} participants, {len(instances[0].triggers.triggers)} triggers')
+    print(f'scan:  {scan / lookups * 1e6:.1f} us per save')
+    print(f'index: {index / lookups * 1e6:.1f} us per save')
+    print(f'save:  {save / len(instances) * 1e3:.1f} ms per save')